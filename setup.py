@@ -134,7 +134,10 @@ setup(
 
     entry_points={
         'console_scripts': [
-            'rafcon_core = rafcon.core.start:main'
+            'rafcon_core = rafcon.core.start:main',
+            'rafcon_batch = rafcon.core.batch_execution:main',
+            'rafcon_convert_execution_log = rafcon.utils.binary_execution_log:main',
+            'rafcon_convert_state_machine = rafcon.core.storage.packed_state_machine:main'
         ],
         'gui_scripts': [
             'rafcon_execution_log_viewer = rafcon.gui.execution_log_viewer:main',
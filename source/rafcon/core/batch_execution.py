@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2015-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Franz Steinmetz <franz.steinmetz@dlr.de>
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: batch_execution
+   :synopsis: A module to execute a state machine many times with different input data
+
+The state machine is loaded once per process and executed once for each given input data of its root state. The runs
+are either executed one after another in the current process or distributed to several worker processes, each with
+its own copy of the state machine. The result of each run (outcome, output data and timings) is streamed to a results
+file with one JSON object per line.
+"""
+from builtins import range
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import time
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+# the state machine of a worker process, see _initialize_worker
+_worker_state_machine = None
+
+
+def load_input_data(path):
+    """Loads the input data of the runs from a file
+
+    The file either contains a JSON list of dictionaries or one JSON dictionary per line. Each dictionary maps the
+    names of input data ports of the root state to their values.
+
+    :param str path: the path of the file
+    :return: the input data of the runs
+    :rtype: list(dict)
+    """
+    with open(path) as input_file:
+        content = input_file.read()
+    if content.lstrip().startswith('['):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def _to_json_compatible(result):
+    """Converts a result into JSON compatible data, values that cannot be serialized are replaced by their repr"""
+    return json.loads(json.dumps(result, default=repr))
+
+
+def execute_runs(state_machine, input_data_list, start_state_path=None, first_run_index=0):
+    """Executes a loaded state machine once for each input data, one run after another
+
+    The state machine is added to the state machine manager, if not done yet. The execution histories are destroyed
+    after each run, to keep the memory usage constant. Runs with input data for unknown input data ports of the root
+    state are not started, their results contain an `error` instead.
+
+    :param rafcon.core.state_machine.StateMachine state_machine: the state machine to execute
+    :param list(dict) input_data_list: the input data of the root state for each run
+    :param str start_state_path: the path of the state to start the executions from
+    :param int first_run_index: the index of the first run, used for the results
+    :return: generator of the JSON compatible results of the runs, see :func:`run_batch`
+    """
+    import rafcon.core.singleton as core_singletons
+    execution_engine = core_singletons.state_machine_execution_engine
+    if state_machine.state_machine_id not in core_singletons.state_machine_manager.state_machines:
+        core_singletons.state_machine_manager.add_state_machine(state_machine)
+
+    for run_index, input_data in enumerate(input_data_list, first_run_index):
+        result = {'run': run_index, 'process_id': os.getpid(), 'input_data': input_data}
+        result['start_time'] = time.time()
+        try:
+            execution_handle = execution_engine.start(state_machine.state_machine_id,
+                                                      start_state_path=start_state_path, input_data=input_data)
+        except ValueError as e:
+            logger.error("Run {0} was not started: {1}".format(run_index, e))
+            execution_handle = None
+            result['error'] = str(e)
+        if execution_handle is None:
+            result.setdefault('error', "The state machine could not be started")
+        else:
+            execution_handle.join()
+            final_outcome = execution_handle.final_outcome
+            result['outcome_id'] = final_outcome.outcome_id if final_outcome else None
+            result['outcome_name'] = final_outcome.name if final_outcome else None
+            result['output_data'] = execution_handle.output_data
+        result['duration'] = time.time() - result['start_time']
+        state_machine.destroy_execution_histories()
+        yield _to_json_compatible(result)
+
+
+def _initialize_worker(state_machine_path, config_values):
+    """Sets up the environment of a worker process and loads the state machine
+
+    :param str state_machine_path: the path of the state machine
+    :param dict config_values: the core configuration of the parent process
+    """
+    global _worker_state_machine
+    # the parent process handles interrupts
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from rafcon.core.config import global_config
+    from rafcon.core.start import setup_environment
+    import rafcon.core.singleton as core_singletons
+    from rafcon.core.storage import storage
+
+    setup_environment()
+    for key, value in config_values.items():
+        global_config.set_config_value(key, value)
+    core_singletons.library_manager.initialize(on_demand=True)
+    _worker_state_machine = storage.load_state_machine_from_path(state_machine_path)
+
+
+def _execute_worker_run(run):
+    run_index, input_data, start_state_path = run
+    return next(execute_runs(_worker_state_machine, [input_data], start_state_path, run_index))
+
+
+def _get_multiprocessing_context():
+    # worker processes are spawned, as forking copies the threads of the execution engine in an undefined state
+    if hasattr(multiprocessing, 'get_context'):
+        return multiprocessing.get_context('spawn')
+    return multiprocessing
+
+
+def run_batch(state_machine_path, input_data_list, results_path=None, number_of_processes=1, start_state_path=None):
+    """Executes a state machine once for each input data
+
+    With a single process, the runs are executed in the current process, which must be set up (configuration and
+    libraries) as for any other execution. Otherwise, the runs are distributed to the given number of worker processes,
+    which use the core configuration of the current process and load the state machine once each.
+
+    The result of each run is a dictionary with the keys `run` (index of the input data), `process_id`, `input_data`,
+    `start_time`, `duration`, `outcome_id`, `outcome_name` and `output_data` of the root state or, if the run could
+    not be started, `error`. Values that are not JSON serializable are replaced by their repr.
+
+    :param str state_machine_path: the path of the state machine
+    :param list(dict) input_data_list: the input data of the root state for each run
+    :param str results_path: the path of the file, to which the results are written as they arrive, one JSON object
+        per line
+    :param int number_of_processes: the number of processes executing the runs
+    :param str start_state_path: the path of the state to start the executions from
+    :return: the results of all runs, ordered by their run index
+    :rtype: list(dict)
+    """
+    import rafcon.core.singleton as core_singletons
+    start_time = time.time()
+    state_machine = pool = None
+    if number_of_processes <= 1:
+        from rafcon.core.storage import storage
+        state_machine = storage.load_state_machine_from_path(state_machine_path)
+        results = execute_runs(state_machine, input_data_list, start_state_path)
+    else:
+        from rafcon.core.config import global_config
+        config_values = {key: global_config.get_config_value(key) for key in global_config.keys}
+        pool = _get_multiprocessing_context().Pool(number_of_processes, _initialize_worker,
+                                                   (state_machine_path, config_values))
+        runs = [(run_index, input_data, start_state_path) for run_index, input_data in enumerate(input_data_list)]
+        results = pool.imap_unordered(_execute_worker_run, runs)
+
+    collected_results = []
+    results_file = open(results_path, 'w') if results_path else None
+    try:
+        for result in results:
+            collected_results.append(result)
+            if results_file:
+                results_file.write(json.dumps(result) + "\n")
+                results_file.flush()
+            logger.debug("Run {0} finished with outcome '{1}' after {2:.3f}s".format(
+                result['run'], result.get('outcome_name'), result['duration']))
+    finally:
+        if results_file:
+            results_file.close()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if state_machine is not None and \
+                state_machine.state_machine_id in core_singletons.state_machine_manager.state_machines:
+            core_singletons.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+    logger.info("Executed {0} runs in {1:.3f}s".format(len(collected_results), time.time() - start_time))
+    return sorted(collected_results, key=lambda result: result['run'])
+
+
+def main():
+    from rafcon.core.start import parse_state_machine_path, setup_environment, setup_configuration
+    from rafcon.utils.filesystem import get_default_config_path
+    from yaml_configuration.config import config_path
+
+    parser = argparse.ArgumentParser(description="Executes a state machine once for each given input data")
+    parser.add_argument('-o', '--open', type=parse_state_machine_path, dest='state_machine_path', metavar='path',
+                        required=True, help="directory of the state machine to execute")
+    parser.add_argument('-i', '--input', dest='input_path', metavar='path',
+                        help="file with the input data of the root state for each run, either a JSON list of "
+                             "dictionaries or one JSON dictionary per line. By default, the state machine is executed "
+                             "with the default values of its input data ports")
+    parser.add_argument('-n', '--repetitions', type=int, default=1,
+                        help="number of runs for each input data. Default: 1")
+    parser.add_argument('-r', '--results', dest='results_path', metavar='path',
+                        help="file to which the result of each run is written, one JSON object per line")
+    parser.add_argument('-p', '--processes', type=int, default=1,
+                        help="number of worker processes executing the runs in parallel. Default: 1")
+    parser.add_argument('-c', '--config', type=config_path, metavar='path', dest='config_path',
+                        default=get_default_config_path(), nargs='?',
+                        help="path to the configuration file config.yaml. Use 'None' to use the default "
+                             "configuration")
+    parser.add_argument('-s', '--start_state_path', metavar='path', dest='start_state_path', default=None,
+                        help="path within the state machine to the state that should be launched")
+    arguments = parser.parse_args()
+
+    setup_environment()
+    setup_configuration(arguments.config_path, initialize_libraries_on_demand=True)
+
+    input_data_list = load_input_data(arguments.input_path) if arguments.input_path else [{}]
+    input_data_list = [input_data for input_data in input_data_list for _ in range(arguments.repetitions)]
+    results = run_batch(arguments.state_machine_path, input_data_list, arguments.results_path, arguments.processes,
+                        arguments.start_state_path)
+    outcome_counts = {}
+    for result in results:
+        outcome_counts[result.get('outcome_name')] = outcome_counts.get(result.get('outcome_name'), 0) + 1
+    logger.info("Outcomes: {0}".format(", ".join("{0}: {1}".format(outcome_name, count)
+                                                 for outcome_name, count in sorted(outcome_counts.items(),
+                                                                                   key=lambda item: str(item[0])))))
+
+
+if __name__ == '__main__':
+    main()
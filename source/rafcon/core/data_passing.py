@@ -0,0 +1,187 @@
+# Copyright (C) 2014-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Franz Steinmetz <franz.steinmetz@dlr.de>
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: data_passing
+   :synopsis: A module defining how data is passed between states, the execution history and the global variables
+
+"""
+import sys
+from copy import deepcopy
+from enum import Enum
+
+from rafcon.core.config import global_config
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+DataPassingPolicy = Enum('DATA_PASSING_POLICY', 'DEEPCOPY SHARED_READ_ONLY IMMUTABLE')
+
+_immutable_types = {type(None), bool, int, float, complex, type(u''), type(b''), type(Ellipsis), range}
+if sys.version_info[0] == 2:
+    _immutable_types.add(long)  # noqa: F821
+
+
+def register_immutable_type(value_type):
+    """Registers a type, whose instances are never modified after their creation
+
+    Instances of registered types are passed by reference, unless the data passing policy is DEEPCOPY. Only instances
+    of exactly the registered type are considered, not instances of derived types.
+
+    :param type value_type: the immutable type
+    """
+    if not isinstance(value_type, type):
+        raise TypeError("value_type must be a type")
+    _immutable_types.add(value_type)
+
+
+def unregister_immutable_type(value_type):
+    """Removes a type registered with :func:`register_immutable_type`
+
+    :param type value_type: the type to remove
+    """
+    _immutable_types.discard(value_type)
+
+
+def _get_ndarray_type():
+    # numpy is not imported by RAFCON itself, if it was not imported by anybody else, no value can be an ndarray
+    numpy = sys.modules.get('numpy')
+    return getattr(numpy, 'ndarray', None)
+
+
+def is_immutable(value):
+    """Checks whether a value can be shared without being copied
+
+    A value is immutable if its type is registered as immutable, if it is a tuple or frozenset of immutable values or
+    if it is a numpy array not holding Python objects, of which neither the array nor its bases are writable.
+
+    :param value: the value to check
+    :return: True if the value is immutable
+    :rtype: bool
+    """
+    value_type = type(value)
+    if value_type in _immutable_types:
+        return True
+    if value_type is tuple or value_type is frozenset:
+        return all(is_immutable(element) for element in value)
+    ndarray = _get_ndarray_type()
+    if ndarray is not None and isinstance(value, ndarray):
+        return _is_read_only_array(value, ndarray)
+    return False
+
+
+def _is_read_only_array(array, ndarray):
+    """Checks whether the memory of an array can be written neither through the array nor through its bases
+
+    A read-only view on a writable array is not immutable, as the owner of the base array can still modify it.
+    """
+    if array.dtype.hasobject:
+        return False
+    while isinstance(array, ndarray):
+        if array.flags.writeable:
+            return False
+        array = array.base
+    return array is None or type(array) in _immutable_types
+
+
+def get_data_passing_policy():
+    """Returns the configured data passing policy
+
+    :return: the policy as set in the config value DATA_PASSING_POLICY
+    :rtype: DataPassingPolicy
+    """
+    policy_name = global_config.get_config_value("DATA_PASSING_POLICY", "DEEPCOPY")
+    try:
+        return DataPassingPolicy[policy_name]
+    except KeyError:
+        logger.warning("Invalid DATA_PASSING_POLICY {0}, falling back to DEEPCOPY".format(policy_name))
+        return DataPassingPolicy.DEEPCOPY
+
+
+def _share_read_only(value, memo, share_arrays=True):
+    if is_immutable(value):
+        return value
+    value_id = id(value)
+    if value_id in memo:
+        return memo[value_id]
+
+    value_type = type(value)
+    if value_type is dict:
+        result = {}
+        memo[value_id] = result
+        for key, element in value.items():
+            result[key] = _share_read_only(element, memo, share_arrays)
+        return result
+    if value_type is list:
+        result = []
+        memo[value_id] = result
+        result.extend(_share_read_only(element, memo, share_arrays) for element in value)
+        return result
+    if value_type is tuple:
+        result = tuple(_share_read_only(element, memo, share_arrays) for element in value)
+        memo[value_id] = result
+        return result
+
+    ndarray = _get_ndarray_type()
+    if share_arrays and ndarray is not None and isinstance(value, ndarray) and not value.dtype.hasobject:
+        result = value.view()
+        result.flags.writeable = False
+        memo[value_id] = result
+        return result
+
+    return deepcopy(value, memo)
+
+
+def pass_value(value, policy=None):
+    """Returns the value to be handed over to the receiver of a data value
+
+    Depending on the data passing policy, the value is copied or shared:
+
+    * DEEPCOPY: the value is deep-copied (default)
+    * IMMUTABLE: immutable values (see :func:`is_immutable`) are passed by reference, all others are deep-copied
+    * SHARED_READ_ONLY: like IMMUTABLE, but numpy arrays are passed as read-only views on the same memory. dicts,
+      lists and tuples are copied, but their elements are again passed according to the policy. The receiver has to
+      copy an array explicitly before modifying it. The memory is not copied when the array is modified, thus changes
+      made in place by the sender, which can still write to the array, are visible to the receivers. Therefore, values
+      kept beyond the execution of the receiver are passed with :func:`store_value`.
+
+    :param value: the value to pass
+    :param DataPassingPolicy policy: the policy to apply or None for the configured one
+    :return: the value for the receiver
+    """
+    if policy is None:
+        policy = get_data_passing_policy()
+    if policy is DataPassingPolicy.DEEPCOPY:
+        return deepcopy(value)
+    if policy is DataPassingPolicy.SHARED_READ_ONLY:
+        return _share_read_only(value, {})
+    if is_immutable(value):
+        return value
+    return deepcopy(value)
+
+
+def store_value(value, policy=None):
+    """Returns the value to be stored by the global variable manager or the execution history
+
+    Stored values outlive the execution of the states passing them, thus they must not alias memory that a state can
+    still modify. Read-only views as passed with SHARED_READ_ONLY would not protect them from in-place changes of the
+    state owning the array. Therefore, with SHARED_READ_ONLY, arrays are only shared if neither they nor their bases
+    are writable and copied otherwise, while all other values are passed as by :func:`pass_value`.
+
+    :param value: the value to store
+    :param DataPassingPolicy policy: the policy to apply or None for the configured one
+    :return: the value to store
+    """
+    if policy is None:
+        policy = get_data_passing_policy()
+    if policy is DataPassingPolicy.SHARED_READ_ONLY:
+        return _share_read_only(value, {}, share_arrays=False)
+    return pass_value(value, policy)
@@ -30,6 +30,8 @@ import sys
 from gtkmvc3.observable import Observable
 from rafcon.core.execution.execution_status import ExecutionStatus
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
+from rafcon.core.execution.execution_handle import ExecutionHandle
+from rafcon.core.execution.state_executor import StateExecutor
 from rafcon.utils import log
 from rafcon.utils import plugins
 
@@ -42,11 +44,13 @@ class ExecutionEngine(Observable):
     :ivar state_machine_manager: holds the state machine manager of all states that can be executed
     :ivar status: holds the current execution status of the state machine
     :ivar execution_history: the history of the execution TODO: should be an list
+    :ivar state_executor: provides the threads for the execution of the states
 
     """
 
     __wait_for_finishing_thread = None
     __running_state_machine = None
+    __execution_handle = None
 
     def __init__(self, state_machine_manager):
         Observable.__init__(self)
@@ -61,6 +65,7 @@ class ExecutionEngine(Observable):
         self.state_machine_running = False
         self.synchronization_counter = 0
         self.synchronization_lock = Lock()
+        self.state_executor = StateExecutor()
 
     @Observable.observed
     def pause(self):
@@ -85,7 +90,7 @@ class ExecutionEngine(Observable):
                (self._status.execution_mode is StateMachineExecutionStatus.FINISHED)
 
     @Observable.observed
-    def start(self, state_machine_id=None, start_state_path=None):
+    def start(self, state_machine_id=None, start_state_path=None, input_data=None):
         """ Start state machine
 
         If no state machine is running start a specific state machine.
@@ -95,7 +100,11 @@ class ExecutionEngine(Observable):
 
         :param state_machine_id: The id if the state machine to be started
         :param start_state_path: The path of the state in the state machine, from which the execution will start
-        :return:
+        :param dict input_data: Values for the input data ports of the root state by their names, replacing the
+            default values
+        :return: the handle of the started or resumed execution or None, if no state machine could be started
+        :rtype: rafcon.core.execution.execution_handle.ExecutionHandle
+        :raises ValueError: if the input data contains names that are no input data ports of the root state
         """
 
         if not self.finished_or_stopped():
@@ -108,21 +117,34 @@ class ExecutionEngine(Observable):
                     logger.info("Resumed state machine with id {0} but start of state machine id {1} was requested."
                                 "".format(self.state_machine_manager.get_active_state_machine().state_machine_id,
                                           state_machine_id))
+            if input_data:
+                logger.warning("The input data {0} is ignored, as the running state machine is resumed"
+                               "".format(input_data))
             self.set_execution_mode(StateMachineExecutionStatus.STARTED)
+            return self.__execution_handle
         else:
             # do not start another state machine before the old one did not finish its execution
             if self.state_machine_running:
                 logger.warning("An old state machine is still running! Make sure that it terminates,"
                             " before you can start another state machine!")
-                return
+                return None
 
             logger.debug("Start execution engine ...")
+            # check the input data before changing the active state machine and the execution mode, to not leave the
+            # engine in a modified state
+            if state_machine_id is not None:
+                state_machine = self.state_machine_manager.state_machines.get(state_machine_id)
+            else:
+                state_machine = self.state_machine_manager.get_active_state_machine()
+            if state_machine is not None:
+                state_machine.check_input_data(input_data)
+
             if state_machine_id is not None:
                 self.state_machine_manager.active_state_machine_id = state_machine_id
 
             if not self.state_machine_manager.active_state_machine_id:
                 logger.error("There exists no active state machine!")
-                return
+                return None
 
             self.set_execution_mode(StateMachineExecutionStatus.STARTED)
 
@@ -138,7 +160,7 @@ class ExecutionEngine(Observable):
                         cur_path = cur_path + "/" + path
                     self.start_state_paths.append(cur_path)
 
-            self._run_active_state_machine()
+            return self._run_active_state_machine(input_data)
 
     @Observable.observed
     def stop(self):
@@ -162,16 +184,8 @@ class ExecutionEngine(Observable):
         :return: True if the execution finished, False if no state machine was started or a timeout occurred
         :rtype: bool
         """
-        if self.__wait_for_finishing_thread:
-            if not timeout:
-                # signal handlers won't work if timeout is None and the thread is joined
-                while True:
-                    self.__wait_for_finishing_thread.join(0.5)
-                    if not self.__wait_for_finishing_thread.isAlive():
-                        break
-            else:
-                self.__wait_for_finishing_thread.join(timeout)
-            return not self.__wait_for_finishing_thread.is_alive()
+        if self.__execution_handle:
+            return self.__execution_handle.join(timeout)
         else:
             logger.warning("Cannot join as state machine was not started yet.")
             return False
@@ -202,8 +216,12 @@ class ExecutionEngine(Observable):
         else:
             self.set_execution_mode(StateMachineExecutionStatus.FORWARD_INTO)
 
-    def _run_active_state_machine(self):
+    def _run_active_state_machine(self, input_data=None):
         """Store running state machine and observe its status
+
+        :param dict input_data: Values for the input data ports of the root state by their names
+        :return: the handle of the execution
+        :rtype: rafcon.core.execution.execution_handle.ExecutionHandle
         """
 
         # Create new concurrency queue for root state to be able to synchronize with the execution
@@ -213,31 +231,98 @@ class ExecutionEngine(Observable):
         self.__running_state_machine.root_state.concurrency_queue = queue.Queue(maxsize=0)
 
         if self.__running_state_machine:
-            self.__running_state_machine.start()
+            self.__execution_handle = ExecutionHandle(self.__running_state_machine)
+            self.__running_state_machine.execution_handle = self.__execution_handle
+            self.__running_state_machine.start(input_data)
 
-            self.__wait_for_finishing_thread = threading.Thread(target=self._wait_for_finishing)
+            self.__wait_for_finishing_thread = threading.Thread(target=self._wait_for_finishing,
+                                                                args=(self.__execution_handle, ))
             self.__wait_for_finishing_thread.start()
+            return self.__execution_handle
         else:
             logger.warning("Currently no active state machine! Please create a new state machine.")
             self.set_execution_mode(StateMachineExecutionStatus.STOPPED)
+            return None
 
-    def _wait_for_finishing(self):
-        """Observe running state machine and stop engine if execution has finished"""
+    def _wait_for_finishing(self, execution_handle):
+        """Observe running state machine and stop engine if execution has finished
+
+        :param rafcon.core.execution.execution_handle.ExecutionHandle execution_handle: the handle of the execution
+        """
         self.state_machine_running = True
-        self.__running_state_machine.join()
+        execution_handle.state_machine.join()
         self.__set_execution_mode_to_finished()
         self.state_machine_manager.active_state_machine_id = None
         plugins.run_on_state_machine_execution_finished()
         # self.__set_execution_mode_to_stopped()
         self.state_machine_running = False
+        execution_handle.set_finished()
 
     def backward_step(self):
         """Take a backward step for all active states in the state machine
         """
+        if not self._is_backward_step_possible():
+            return
         logger.debug("Executing backward step ...")
         self.run_to_states = []
         self.set_execution_mode(StateMachineExecutionStatus.BACKWARD)
 
+    def _is_backward_step_possible(self):
+        """Checks whether the execution history of the active state machine allows a backward step
+
+        A backward step pops the return and call item of a child state and one call item for every container state
+        left. Thus, if the history is bounded, the retained items must exceed the hierarchy depth.
+
+        :return: False if the history holds no scoped data or the beginning of the retained history was reached
+        """
+        state_machine = self.state_machine_manager.get_active_state_machine()
+        if state_machine is None or not state_machine.execution_histories:
+            return True
+        execution_histories = list(self._get_active_execution_histories(state_machine.execution_histories[-1]))
+        if not all(execution_history.store_scoped_data for execution_history in execution_histories):
+            logger.warning("Backward stepping is not possible, as the execution history does not store scoped data "
+                           "(see config value EXECUTION_HISTORY_STORE_SCOPED_DATA)")
+            return False
+        # the whole history is retained
+        execution_histories = [execution_history for execution_history in execution_histories
+                               if execution_history.number_of_dropped_items > 0]
+        if not execution_histories:
+            return True
+        number_of_items = self._get_hierarchy_depth(state_machine.root_state) + 2
+        if not all(execution_history.is_backward_stepping_possible(number_of_items)
+                   for execution_history in execution_histories):
+            logger.warning("Backward stepping is not possible, as the beginning of the retained execution history "
+                           "was reached (see config value EXECUTION_HISTORY_MAX_LENGTH)")
+            return False
+        return True
+
+    @staticmethod
+    def _get_active_execution_histories(execution_history):
+        """Yields the given execution history and the histories of the running branches of concurrency states
+
+        While the branches of a concurrency state are executed, the ConcurrencyItem is the last item of the history
+        of its parent and each branch steps back within its own history.
+        """
+        from rafcon.core.execution.execution_history import ConcurrencyItem  # delayed imported on purpose
+        execution_histories = [execution_history]
+        while execution_histories:
+            execution_history = execution_histories.pop()
+            yield execution_history
+            last_history_item = execution_history.get_last_history_item()
+            if isinstance(last_history_item, ConcurrencyItem):
+                execution_histories.extend(last_history_item.execution_histories)
+
+    @staticmethod
+    def _get_hierarchy_depth(state):
+        from rafcon.core.states.library_state import LibraryState  # delayed imported on purpose
+        if isinstance(state, LibraryState):
+            # the content of the library is only read, thus no state copy needs to be created
+            state = state._get_library_root_state()
+        child_states = getattr(state, 'states', None)
+        if not child_states:
+            return 1
+        return 1 + max(ExecutionEngine._get_hierarchy_depth(child_state) for child_state in child_states.values())
+
     def step_into(self):
         """Take a forward step (into) for all active states in the state machine
         """
@@ -450,11 +535,12 @@ class ExecutionEngine(Observable):
             state_machine = storage.load_state_machine_from_path(path)
             rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
 
-        rafcon.core.singleton.state_machine_execution_engine.start(
+        execution_handle = rafcon.core.singleton.state_machine_execution_engine.start(
             state_machine.state_machine_id, start_state_path=start_state_path)
 
         if wait_for_execution_finished:
-            self.join()
+            if execution_handle is not None:
+                execution_handle.join()
             self.stop()
         return state_machine
 
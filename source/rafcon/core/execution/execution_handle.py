@@ -0,0 +1,121 @@
+# Copyright (C) 2014-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Franz Steinmetz <franz.steinmetz@dlr.de>
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: execution_handle
+   :synopsis: A module providing a handle to wait for the execution of a state machine to finish
+
+"""
+from builtins import object
+import sys
+import threading
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+
+def wait_for_event(event, timeout=None):
+    """Waits for an event to be set
+
+    With Python 2, waiting without timeout cannot be interrupted by signals, thus the wait is split into intervals.
+
+    :param threading.Event event: the event to wait for
+    :param float timeout: maximum time to wait or None for infinitely
+    :return: whether the event is set
+    :rtype: bool
+    """
+    if timeout is not None or sys.version_info >= (3,):
+        return event.wait(timeout)
+    while not event.wait(0.5):
+        pass
+    return True
+
+
+class ExecutionHandle(object):
+    """A handle to the execution of a state machine, similar to a future
+
+    It is returned by :meth:`rafcon.core.execution.execution_engine.ExecutionEngine.start` and is finished, as soon as
+    the execution of the state machine finished and the execution engine is set to the finished state.
+
+    :ivar rafcon.core.state_machine.StateMachine state_machine: the executed state machine
+    """
+
+    def __init__(self, state_machine):
+        self.state_machine = state_machine
+        self._finished_event = threading.Event()
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+        self._final_outcome = None
+        self._output_data = None
+
+    @property
+    def finished(self):
+        """Whether the execution finished
+
+        :rtype: bool
+        """
+        return self._finished_event.is_set()
+
+    @property
+    def final_outcome(self):
+        """The final outcome of the root state or None, if the execution did not finish yet
+
+        :rtype: rafcon.core.state_elements.logical_port.Outcome
+        """
+        return self._final_outcome
+
+    @property
+    def output_data(self):
+        """The output data of the root state or None, if the execution did not finish yet
+
+        :rtype: dict
+        """
+        return self._output_data
+
+    def join(self, timeout=None):
+        """Blocking wait for the execution to finish
+
+        :param float timeout: maximum time to wait or None for infinitely
+        :return: True if the execution finished, False if a timeout occurred
+        :rtype: bool
+        """
+        return wait_for_event(self._finished_event, timeout)
+
+    def add_done_callback(self, callback):
+        """Adds a function to be called with the handle, when the execution finished
+
+        The function is called in the thread finishing the execution or directly, if the execution already finished.
+
+        :param callback: the function to call
+        """
+        with self._callbacks_lock:
+            if not self.finished:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def set_finished(self):
+        """Stores the results of the root state and notifies all waiting threads
+
+        Called by the execution engine, when the execution finished.
+        """
+        root_state = self.state_machine.root_state
+        self._final_outcome = root_state.final_outcome
+        self._output_data = root_state.output_data
+        with self._callbacks_lock:
+            self._finished_event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                logger.exception("Error in callback of the execution of {0}".format(self.state_machine))
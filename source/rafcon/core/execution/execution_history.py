@@ -23,7 +23,8 @@ from builtins import range
 from builtins import str
 import time
 import copy
-from collections import Iterable, Sized
+from collections import Iterable, Sized, deque
+from itertools import islice
 import json
 from jsonconversion.decoder import JSONObjectDecoder
 from jsonconversion.encoder import JSONObjectEncoder
@@ -34,8 +35,14 @@ from enum import Enum
 from gtkmvc3.observable import Observable
 import traceback
 
+from rafcon.core.config import global_config
+from rafcon.core.data_passing import DataPassingPolicy, get_data_passing_policy, store_value
+from rafcon.core.execution.execution_history_writer import ExecutionHistoryWriter, BackpressurePolicy, \
+    DEFAULT_QUEUE_SIZE, DEFAULT_SAMPLING_INTERVAL
+from rafcon.core.execution.notification_coalescer import observed_during_execution
 from rafcon.core.id_generator import history_item_id_generator
 from rafcon.utils import log
+from rafcon.utils.binary_execution_log import BinaryExecutionLogWriter
 logger = log.get_logger(__name__)
 import os
 import subprocess
@@ -44,17 +51,63 @@ from weakref import ref
 
 
 class ExecutionHistoryStorage(object):
-    def __init__(self, filename):
+    """The execution log, storing the serialized history items in a shelve or a binary execution log
+
+    If `asynchronous` is set, the history items are serialized and written by an :class:`ExecutionHistoryWriter`
+    thread instead of the executing threads.
+
+    :ivar filename: the path of the log file
+    :ivar binary: whether the log is written as binary execution log (see :mod:`rafcon.utils.binary_execution_log`)
+        instead of a shelve
+    :ivar writer: the background writer or None if items are written synchronously
+    :ivar closed: whether the log file was closed
+    """
+
+    def __init__(self, filename, asynchronous=False, binary=False):
         self.filename = filename
+        self.binary = binary
         self.store_lock = Lock()
+        self.writer = None
+        self.closed = False
         try:
-            # 'c' for read/write/create
-            # protocol 2 cause of in some cases smaller file size
-            # writeback disabled, cause we don't need caching of entries in memory but continuous writes to the disk
-            self.store = shelve.open(filename, flag='c', protocol=2, writeback=False)
+            self.store = self._open_store()
             logger.debug('Openend log file for writing %s' % self.filename)
         except Exception as e:
             logger.error('Exception: ' + str(e) + str(traceback.format_exc()))
+        if asynchronous:
+            self._start_writer()
+
+    def _open_store(self):
+        if self.binary:
+            return BinaryExecutionLogWriter(self.filename)
+        # 'c' for read/write/create
+        # protocol 2 cause of in some cases smaller file size
+        # writeback disabled, cause we don't need caching of entries in memory but continuous writes to the disk
+        return shelve.open(self.filename, flag='c', protocol=2, writeback=False)
+
+    def _start_writer(self):
+        policy_name = global_config.get_config_value("EXECUTION_LOG_BACKPRESSURE", "BLOCK")
+        try:
+            backpressure_policy = BackpressurePolicy[policy_name]
+        except KeyError:
+            logger.warning("Invalid EXECUTION_LOG_BACKPRESSURE {0}, falling back to BLOCK".format(policy_name))
+            backpressure_policy = BackpressurePolicy.BLOCK
+        self.writer = ExecutionHistoryWriter(
+            self, global_config.get_config_value("EXECUTION_LOG_QUEUE_SIZE", DEFAULT_QUEUE_SIZE), backpressure_policy,
+            global_config.get_config_value("EXECUTION_LOG_SAMPLING_INTERVAL", DEFAULT_SAMPLING_INTERVAL))
+        self.writer.start()
+
+    def store_history_item(self, history_item):
+        """Writes a history item to the log, either directly or by passing it to the writer thread
+
+        :param HistoryItem history_item: the item to store
+        """
+        if self.writer is not None:
+            # the item is serialized later on, thus the data of the state is taken now
+            history_item.capture_state_data()
+            self.writer.submit(history_item)
+        else:
+            self.store_item(history_item.history_item_id, history_item.to_dict())
 
     def store_item(self, key, value):
         self.store_lock.acquire()
@@ -65,11 +118,31 @@ class ExecutionHistoryStorage(object):
         finally:
             self.store_lock.release()
 
+    def store_items(self, items):
+        """Stores several items at once
+
+        :param list items: list of (key, value) tuples
+        """
+        self.store_lock.acquire()
+        try:
+            for key, value in items:
+                try:
+                    self.store[native_str(key)] = value
+                except Exception as e:
+                    logger.error('Exception: ' + str(e) + str(traceback.format_exc()))
+        finally:
+            self.store_lock.release()
+
     def flush(self):
+        if self.writer is not None:
+            self.writer.drain()
         self.store_lock.acquire()
         try:
-            self.store.close()
-            self.store = shelve.open(self.filename, flag='c', protocol=2, writeback=False)
+            if self.binary:
+                self.store.flush()
+            else:
+                self.store.close()
+                self.store = self._open_store()
             logger.debug('Flushed log file %s' % self.filename)
         except Exception as e:
             logger.error('Exception: ' + str(e) + str(traceback.format_exc()))
@@ -77,9 +150,12 @@ class ExecutionHistoryStorage(object):
             self.store_lock.release()
 
     def close(self, make_read_and_writable_for_all=False):
+        if self.writer is not None:
+            self.writer.stop()
         self.store_lock.acquire()
         try:
             self.store.close()
+            self.closed = True
             logger.debug('Closed log file %s' % self.filename)
             if make_read_and_writable_for_all:
                 ret = subprocess.call(['chmod', 'a+rw', self.filename])
@@ -93,6 +169,8 @@ class ExecutionHistoryStorage(object):
             self.store_lock.release()
     
     def __del__(self):
+        if self.closed:
+            return
         self.store_lock.acquire()
         try:
             self.store.close()
@@ -108,16 +186,31 @@ class ExecutionHistory(Observable, Iterable, Sized):
 
         It stores all history elements in a stack wise fashion.
 
+        The history can be bounded to a maximum number of items (config value EXECUTION_HISTORY_MAX_LENGTH). The
+        history then works as ring buffer: if a new item is pushed onto a full history, the oldest item is dropped.
+        Dropped items are still contained in the execution log, if EXECUTION_LOG_ENABLE is set. Backward stepping is
+        only possible within the retained items.
+
         :ivar initial_prev: optional link to a previous element for the first element pushed into this history of
                             type :class:`rafcon.core.execution.execution_history.HistoryItem`
+        :ivar max_length: the maximum number of retained items or None for an unbounded history
+        :ivar store_scoped_data: whether the history items contain the scoped data of the states, which is required
+            for backward stepping
+        :ivar number_of_dropped_items: the number of items dropped because of the maximum length
     """
 
     def __init__(self, initial_prev=None):
         super(ExecutionHistory, self).__init__()
-        self._history_items = []            
+        self._history_items = deque()
         self.initial_prev = initial_prev
         self.execution_history_storage = None
         self.new_execution_command_handled = True
+        max_length = global_config.get_config_value("EXECUTION_HISTORY_MAX_LENGTH", None)
+        self.max_length = None if max_length in (None, "None") else int(max_length)
+        self.store_scoped_data = global_config.get_config_value("EXECUTION_HISTORY_STORE_SCOPED_DATA", True)
+        self.number_of_dropped_items = 0
+        # held while items are added or removed, see get_items_after
+        self._items_lock = Lock()
 
     def destroy(self):
         # logger.verbose("Destroy execution history!")
@@ -129,7 +222,8 @@ class ExecutionHistory(Observable, Iterable, Sized):
                 execution_history_iterator = iter(self)
                 for history_item in execution_history_iterator:
                     history_item.destroy()
-        self._history_items = None
+        with self._items_lock:
+            self._history_items = None
         self.initial_prev = None
 
     def __iter__(self):
@@ -142,8 +236,45 @@ class ExecutionHistory(Observable, Iterable, Sized):
         return len(self._history_items)
 
     def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._get_slice(index)
         return self._history_items[index]
 
+    def _get_slice(self, index):
+        """Returns the items of a slice without copying the whole history
+
+        The deque is only iterated from the end which is nearer to the sliced items, e.g. `history[-2:]` only touches
+        the last two items.
+        """
+        length = len(self._history_items)
+        positions = range(*index.indices(length))
+        if not positions:
+            return []
+        first, last = min(positions[0], positions[-1]), max(positions[0], positions[-1])
+        if first < length - 1 - last:
+            items = list(islice(self._history_items, first, last + 1))
+        else:
+            items = list(islice(reversed(self._history_items), length - 1 - last, length - first))
+            items.reverse()
+        return [items[position - first] for position in positions]
+
+    def get_items_after(self, number_of_items, max_number_of_items=None):
+        """Returns the items pushed after the given number of items
+
+        The number of dropped items and the items are read at once, so that the result is consistent, even if the
+        execution pushes, drops or pops items meanwhile, e.g. when the history is shown by another thread.
+
+        :param int number_of_items: the number of items already known, including the dropped items
+        :param int max_number_of_items: the maximum number of returned items or None for all following items
+        :return: the number of items pushed before the first returned item, including the dropped items, and the
+            following items
+        :rtype: int, list[HistoryItem]
+        """
+        with self._items_lock:
+            start = max(number_of_items - self.number_of_dropped_items, 0)
+            stop = None if max_number_of_items is None else start + max_number_of_items
+            return self.number_of_dropped_items + start, self[start:stop]
+
     def get_last_history_item(self):
         """Returns the history item that was added last
 
@@ -155,17 +286,40 @@ class ExecutionHistory(Observable, Iterable, Sized):
         except IndexError:  # this is the case for the very first executed state
             return None
 
+    def is_backward_stepping_possible(self, number_of_items=1):
+        """Checks whether the history allows to step back the given number of items
+
+        :param int number_of_items: the number of items that are removed by the backward step
+        :return: False if the history holds no scoped data or if the items were dropped
+        :rtype: bool
+        """
+        if not self.store_scoped_data:
+            return False
+        return self.number_of_dropped_items == 0 or len(self._history_items) > number_of_items
+
+    def _append_item(self, current_item):
+        with self._items_lock:
+            if self.max_length is not None:
+                while len(self._history_items) >= max(self.max_length, 1):
+                    dropped_item = self._history_items.popleft()
+                    # unlink the dropped item, so that it and all its predecessors can be garbage collected
+                    dropped_item.next = None
+                    if self._history_items:
+                        self._history_items[0].unlink_prev()
+                    self.number_of_dropped_items += 1
+            self._history_items.append(current_item)
+
     def _push_item(self, last_history_item, current_item):
         if last_history_item is None:
             current_item.prev = self.initial_prev
         if last_history_item is not None:
             last_history_item.next = current_item
         if self.execution_history_storage is not None:
-            self.execution_history_storage.store_item(current_item.history_item_id, current_item.to_dict())
-        self._history_items.append(current_item)
+            self.execution_history_storage.store_history_item(current_item)
+        self._append_item(current_item)
         return current_item
 
-    @Observable.observed
+    @observed_during_execution
     def push_call_history_item(self, state, call_type, state_for_scoped_data, input_data=None):
         """Adds a new call-history-item to the history item list
 
@@ -180,13 +334,15 @@ class ExecutionHistory(Observable, Iterable, Sized):
         """
         last_history_item = self.get_last_history_item()
         from rafcon.core.states.library_state import LibraryState  # delayed imported on purpose
-        if isinstance(state_for_scoped_data, LibraryState):
+        if not self.store_scoped_data:
+            state_for_scoped_data = None
+        elif isinstance(state_for_scoped_data, LibraryState):
             state_for_scoped_data = state_for_scoped_data.state_copy
         return_item = CallItem(state, last_history_item, call_type, state_for_scoped_data, input_data,
                                state.run_id)
         return self._push_item(last_history_item, return_item)
 
-    @Observable.observed
+    @observed_during_execution
     def push_return_history_item(self, state, call_type, state_for_scoped_data, output_data=None):
         """Adds a new return-history-item to the history item list
 
@@ -201,13 +357,15 @@ class ExecutionHistory(Observable, Iterable, Sized):
         """
         last_history_item = self.get_last_history_item()
         from rafcon.core.states.library_state import LibraryState  # delayed imported on purpose
-        if isinstance(state_for_scoped_data, LibraryState):
+        if not self.store_scoped_data:
+            state_for_scoped_data = None
+        elif isinstance(state_for_scoped_data, LibraryState):
             state_for_scoped_data = state_for_scoped_data.state_copy
         return_item = ReturnItem(state, last_history_item, call_type, state_for_scoped_data, output_data,
                                  state.run_id)
         return self._push_item(last_history_item, return_item)
 
-    @Observable.observed
+    @observed_during_execution
     def push_concurrency_history_item(self, state, number_concurrent_threads):
         """Adds a new concurrency-history-item to the history item list
 
@@ -224,12 +382,12 @@ class ExecutionHistory(Observable, Iterable, Sized):
                                       self.execution_history_storage)
         return self._push_item(last_history_item, return_item)
 
-    @Observable.observed
+    @observed_during_execution
     def push_state_machine_start_history_item(self, state_machine, run_id):
         return_item = StateMachineStartItem(state_machine, run_id)
         if self.execution_history_storage is not None:
-            self.execution_history_storage.store_item(return_item.history_item_id, return_item.to_dict())
-        self._history_items.append(return_item)
+            self.execution_history_storage.store_history_item(return_item)
+        self._append_item(return_item)
         return return_item
 
     @Observable.observed
@@ -240,7 +398,8 @@ class ExecutionHistory(Observable, Iterable, Sized):
         :rtype: HistoryItem
         """
         try:
-            return self._history_items.pop()
+            with self._items_lock:
+                return self._history_items.pop()
         except IndexError:
             logger.error("No item left in the history item list in the execution history.")
             return None
@@ -264,13 +423,17 @@ class HistoryItem(object):
         self.path = copy.deepcopy(state.get_path())
         self.timestamp = time.time()
         self.run_id = run_id
+        self._prev = None
+        self.prev_history_item_id = None
         self.prev = prev
         self.next = None
         self.history_item_id = history_item_id_generator()
         self.state_type = str(type(state).__name__)
+        self._state_data = None
 
     def destroy(self):
         self._state_reference = None
+        self._state_data = None
         self.path = None
         self.timestamp = None
         self.run_id = None
@@ -285,16 +448,45 @@ class HistoryItem(object):
         """
         return self._state_reference
 
+    @property
+    def prev(self):
+        """The previous history item"""
+        return self._prev
+
+    @prev.setter
+    def prev(self, prev):
+        self._prev = prev
+        self.prev_history_item_id = None if prev is None else prev.history_item_id
+
+    def unlink_prev(self):
+        """Removes the reference to the previous history item, but keeps its id for the execution log"""
+        self._prev = None
+
     def __str__(self):
         return "HistoryItem with reference state name %s (time: %s)" % (self.state_reference.name, self.timestamp)
 
-    def to_dict(self):
-        record = dict()
+    def capture_state_data(self):
+        """Takes the data of the referenced state, which is written to the execution log
 
-        # here always the correct path is desired
-        record['path'] = self.state_reference.get_path()
-        record['path_by_name'] = self.state_reference.get_path(by_name=True)
-        record['state_type'] = str(type(self.state_reference).__name__)
+        Items written by a background writer are serialized with :meth:`to_dict` some time after the execution. This
+        method is called by the executing thread beforehand and only takes references: the names of the state and its
+        parents and the other strings are immutable, the path by name is joined and the semantic data is pickled later
+        on by the writer thread. Thus, the record contains the path and the names of the state at execution time, even if
+        the state is renamed or moved in the meantime. Only in-place changes of the semantic data made before the item
+        is written show up in the record.
+        """
+        state = self.state_reference
+        path_names = [state.name]
+        while not state.is_root_state:
+            state = state.parent
+            path_names.append(state.name)
+        self._state_data = self._get_state_data()
+        self._state_data['path'] = self.path
+        self._state_data['path_by_name'] = path_names
+
+    def _get_state_data(self):
+        record = dict()
+        record['state_type'] = self.state_type
 
         from rafcon.core.states.library_state import LibraryState  # delayed imported on purpose
         if isinstance(self.state_reference, LibraryState):
@@ -314,25 +506,35 @@ class HistoryItem(object):
         # there are 3 names of interest:
         # library_name (= library key), library_state_name (name of the user), state_name (name of the developer)
         record['state_name'] = target_state.name
+        record['semantic_data'] = target_state.semantic_data
+        record['description'] = target_state.description
+        return record
+
+    def to_dict(self):
+        if self._state_data is not None:
+            from rafcon.core.states.state import PATH_SEPARATOR  # delayed imported on purpose
+            record = dict(self._state_data)
+            record['path_by_name'] = PATH_SEPARATOR.join(reversed(record['path_by_name']))
+        else:
+            record = self._get_state_data()
+            # here always the correct path is desired
+            record['path'] = self.state_reference.get_path()
+            record['path_by_name'] = self.state_reference.get_path(by_name=True)
+
         record['timestamp'] = self.timestamp
         record['run_id'] = self.run_id  # library state and state copy have the same run_id
         record['history_item_id'] = self.history_item_id
 
         # semantic data
         semantic_data_dict = {}
-        for k, v in target_state.semantic_data.items():
+        for k, v in record['semantic_data'].items():
             try:
                 semantic_data_dict[k] = pickle.dumps(v)
             except Exception as e:
                 semantic_data_dict['!' + k] = (str(e), str(v))
         record['semantic_data'] = semantic_data_dict
 
-        record['description'] = target_state.description
-
-        if self.prev is not None:
-            record['prev_history_item_id'] = self.prev.history_item_id
-        else:
-            record['prev_history_item_id'] = None
+        record['prev_history_item_id'] = self.prev_history_item_id
         # store the specialized class name as item_type,
         # e.g. CallItem, ReturnItem, StatemachineStartItem when saved
         record['item_type'] = self.__class__.__name__
@@ -359,10 +561,7 @@ class StateMachineStartItem(HistoryItem):
         record['path'] = ''
         record['path_by_name'] = ''
         record['os_environment'] = self.os_environment
-        if self.prev is not None:
-            record['prev_history_item_id'] = self.prev.history_item_id
-        else:
-            record['prev_history_item_id'] = None
+        record['prev_history_item_id'] = self.prev_history_item_id
         return record
 
 
@@ -381,8 +580,24 @@ class ScopedDataItem(HistoryItem):
         else:
             raise Exception('unkown calltype, neither CONTAINER nor EXECUTE')
         self.call_type = call_type
-        self.scoped_data = {} if state_for_scoped_data is None else copy.deepcopy(state_for_scoped_data._scoped_data)
-        self.child_state_input_output_data = copy.deepcopy(child_state_input_output_data)
+        data_passing_policy = get_data_passing_policy()
+        if data_passing_policy is DataPassingPolicy.DEEPCOPY:
+            self.scoped_data = {} if state_for_scoped_data is None else \
+                copy.deepcopy(state_for_scoped_data._scoped_data)
+            self.child_state_input_output_data = copy.deepcopy(child_state_input_output_data)
+        else:
+            from rafcon.core.state_elements.scope import ScopedData  # delayed imported on purpose
+            self.scoped_data = {}
+            if state_for_scoped_data is not None:
+                for key, scoped_data in state_for_scoped_data._scoped_data.items():
+                    # a new object without parent and observers, only the value is stored according to the policy
+                    scoped_data_copy = ScopedData(scoped_data.name, store_value(scoped_data.value, data_passing_policy),
+                                                  scoped_data.value_type, scoped_data.from_state,
+                                                  scoped_data.data_port_type)
+                    scoped_data_copy._timestamp = scoped_data.timestamp
+                    self.scoped_data[key] = scoped_data_copy
+            self.child_state_input_output_data = None if child_state_input_output_data is None else \
+                {key: store_value(value, data_passing_policy) for key, value in child_state_input_output_data.items()}
 
     def to_dict(self):
         record = HistoryItem.to_dict(self)
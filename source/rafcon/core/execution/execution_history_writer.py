@@ -0,0 +1,132 @@
+# Copyright (C) 2014-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Franz Steinmetz <franz.steinmetz@dlr.de>
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: execution_history_writer
+   :synopsis: A module providing a background thread writing execution history items to the execution log
+
+"""
+from future import standard_library
+standard_library.install_aliases()
+import queue
+import threading
+import traceback
+from enum import Enum
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+BackpressurePolicy = Enum('EXECUTION_LOG_BACKPRESSURE', 'BLOCK DROP SAMPLE')
+
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_SAMPLING_INTERVAL = 10
+
+_STOP = object()
+
+
+class ExecutionHistoryWriter(threading.Thread):
+    """A thread serializing history items and writing them in batches to an execution history storage
+
+    The history items are put into a bounded queue by the executing threads. Their serialization (`to_dict`) is
+    done by the writer thread, thus the items must already reference all data changing after the execution
+    (see :meth:`rafcon.core.execution.execution_history.HistoryItem.capture_state_data`). If the queue is full, the
+    backpressure policy decides what happens:
+
+    * BLOCK: the executing thread waits until the writer made space in the queue; no item is lost
+    * DROP: the item is not written to the log
+    * SAMPLE: if the queue is at least half full, only every n-th item is written; if the queue is full, the executing
+      thread waits
+
+    :ivar storage: the storage the items are written to, requires a `store_items` method
+    :ivar backpressure_policy: the :data:`BackpressurePolicy` applied if the queue is full
+    :ivar sampling_interval: the n of the SAMPLE policy
+    :ivar batch_size: the maximum number of items written at once
+    :ivar number_of_dropped_items: the number of items, which were not written due to the backpressure policy
+    """
+
+    def __init__(self, storage, queue_size=DEFAULT_QUEUE_SIZE, backpressure_policy=BackpressurePolicy.BLOCK,
+                 sampling_interval=DEFAULT_SAMPLING_INTERVAL, batch_size=DEFAULT_BATCH_SIZE):
+        super(ExecutionHistoryWriter, self).__init__(name="ExecutionHistoryWriter")
+        self.daemon = True
+        self.storage = storage
+        self.backpressure_policy = backpressure_policy
+        self.sampling_interval = max(sampling_interval, 1)
+        self.batch_size = max(batch_size, 1)
+        self.number_of_dropped_items = 0
+        self._queue = queue.Queue(maxsize=max(queue_size, 1))
+        self._sampling_counter = 0
+        self._counter_lock = threading.Lock()
+
+    def submit(self, history_item):
+        """Passes a history item to the writer
+
+        :param rafcon.core.execution.execution_history.HistoryItem history_item: the item to write
+        """
+        if self.backpressure_policy is BackpressurePolicy.DROP:
+            try:
+                self._queue.put_nowait(history_item)
+            except queue.Full:
+                self._drop_item()
+            return
+        if self.backpressure_policy is BackpressurePolicy.SAMPLE and \
+                self._queue.qsize() >= self._queue.maxsize // 2:
+            with self._counter_lock:
+                self._sampling_counter += 1
+                keep_item = self._sampling_counter % self.sampling_interval == 0
+            if not keep_item:
+                self._drop_item()
+                return
+        self._queue.put(history_item)
+
+    def _drop_item(self):
+        with self._counter_lock:
+            self.number_of_dropped_items += 1
+
+    def run(self):
+        stopped = False
+        while not stopped:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = []
+            for history_item in batch:
+                if history_item is _STOP:
+                    stopped = True
+                    continue
+                try:
+                    records.append((history_item.history_item_id, history_item.to_dict()))
+                except Exception as e:
+                    logger.error('Exception: ' + str(e) + str(traceback.format_exc()))
+            if records:
+                self.storage.store_items(records)
+            for _ in batch:
+                self._queue.task_done()
+
+    def drain(self):
+        """Blocks until all submitted items are written"""
+        if self.is_alive():
+            self._queue.join()
+
+    def stop(self):
+        """Writes all submitted items and terminates the writer"""
+        if self.is_alive():
+            self._queue.put(_STOP)
+            self.join()
+        if self.number_of_dropped_items:
+            logger.warning("{0} execution history items were not written to the execution log {1} due to the "
+                           "backpressure policy {2}".format(self.number_of_dropped_items, self.storage.filename,
+                                                            self.backpressure_policy.name))
@@ -0,0 +1,146 @@
+# Copyright (C) 2014-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Franz Steinmetz <franz.steinmetz@dlr.de>
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: notification_coalescer
+   :synopsis: A module to collect the observer notifications of the execution and deliver them in batches
+
+During the execution, the execution status of states changes and items are pushed to the execution history with a high
+rate. Each of these changes is an :class:`gtkmvc3.observable.Observable` notification, which is processed by all
+observers (e.g. the GUI models) in the execution thread. Methods decorated with :func:`observed_during_execution`
+instead report their changes to the installed :class:`NotificationCoalescer`, if any. The coalescer keeps only the last
+call of each method per instance and delivers the notifications, when :meth:`NotificationCoalescer.flush` is called in
+the thread of the observers.
+"""
+from builtins import object
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from gtkmvc3.observable import Observable
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+_installed_coalescer = None
+
+
+def get_installed_coalescer():
+    """Returns the installed notification coalescer
+
+    :rtype: NotificationCoalescer
+    """
+    return _installed_coalescer
+
+
+def observed_during_execution(func):
+    """Decorator for methods of observables, which are called with a high rate during the execution
+
+    Same as :meth:`gtkmvc3.observable.Observable.observed`, as long as no :class:`NotificationCoalescer` is installed.
+    Otherwise, calls from other threads than the one of the coalescer are passed to it instead of notifying the
+    observers.
+    """
+    observed_func = Observable.observed(func)
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        coalescer = _installed_coalescer
+        if coalescer is None or coalescer.is_delivery_thread():
+            return observed_func(self, *args, **kwargs)
+        result = func(self, *args, **kwargs)
+        coalescer.add(self, func.__name__, (self,) + args, kwargs, result)
+        return result
+
+    return wrapper
+
+
+class NotificationCoalescer(object):
+    """Collects notifications of observed methods and delivers them in batches
+
+    Notifications are merged per observable instance and method name, i.e. only the arguments and the result of the
+    last call are delivered. The before and the after notification are both emitted by :meth:`flush`, after the method
+    was called. Thus, observers must read the current values from the observable instead of relying on a before
+    notification.
+
+    :ivar threading.Thread delivery_thread: the thread, in which the observers are notified
+    """
+
+    def __init__(self, delivery_thread=None):
+        self.delivery_thread = delivery_thread or threading.current_thread()
+        self._pending_notifications = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_delivery_thread(self):
+        return threading.current_thread() is self.delivery_thread
+
+    @property
+    def number_of_pending_notifications(self):
+        return len(self._pending_notifications)
+
+    def add(self, observable, method_name, args, kwargs, result):
+        """Adds the notification of a method call, replacing a pending notification of the same method
+
+        :param gtkmvc3.observable.Observable observable: the instance, on which the method was called
+        :param str method_name: the name of the method
+        :param tuple args: the arguments of the call, including the instance
+        :param dict kwargs: the keyword arguments of the call
+        :param result: the return value of the call
+        """
+        key = (id(observable), method_name)
+        with self._lock:
+            self._pending_notifications.pop(key, None)
+            self._pending_notifications[key] = (observable, method_name, args, kwargs, result)
+
+    def flush(self):
+        """Notifies the observers about all pending notifications
+
+        Must be called in the delivery thread. The notifications are delivered in the order of the last call.
+
+        :return: the number of delivered notifications
+        :rtype: int
+        """
+        with self._lock:
+            pending_notifications = self._pending_notifications
+            self._pending_notifications = OrderedDict()
+        for observable, method_name, args, kwargs, result in pending_notifications.values():
+            try:
+                observable._notify_method_before(observable, method_name, args, kwargs)
+                observable._notify_method_after(observable, method_name, result, args, kwargs)
+            except Exception:
+                logger.exception("Error while notifying the observers of {0} about {1}".format(observable,
+                                                                                              method_name))
+        return len(pending_notifications)
+
+    def clear(self):
+        """Drops all pending notifications"""
+        with self._lock:
+            self._pending_notifications.clear()
+
+    def install(self):
+        """Routes the notifications of all methods decorated with :func:`observed_during_execution` to this coalescer
+
+        Only one coalescer can be installed at the same time.
+        """
+        global _installed_coalescer
+        if _installed_coalescer is not None and _installed_coalescer is not self:
+            raise RuntimeError("Another notification coalescer is already installed")
+        _installed_coalescer = self
+
+    def uninstall(self):
+        """Removes the coalescer and delivers the pending notifications
+
+        Must be called in the delivery thread.
+        """
+        global _installed_coalescer
+        if _installed_coalescer is self:
+            _installed_coalescer = None
+        self.flush()
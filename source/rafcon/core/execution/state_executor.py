@@ -0,0 +1,202 @@
+# Copyright (C) 2014-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Franz Steinmetz <franz.steinmetz@dlr.de>
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: state_executor
+   :synopsis: A module providing the threads, in which the run methods of states are executed
+
+"""
+from future import standard_library
+standard_library.install_aliases()
+from builtins import object
+import queue
+import threading
+import traceback
+from enum import Enum
+
+from rafcon.core.config import global_config
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+StateExecutorMode = Enum('STATE_EXECUTOR_MODE', 'THREAD POOL INLINE')
+
+DEFAULT_POOL_SIZE = 16
+
+
+class StateExecutionHandle(object):
+    """A handle for a state run, which can be started and joined like a thread
+
+    :ivar target: the callable to run
+    :ivar name: the name of the handle, used for debugging purposes
+    :ivar inline: whether the target is run in the thread calling :meth:`start`
+    """
+
+    def __init__(self, executor, target, name=None, inline=False):
+        self.target = target
+        self.name = name
+        self.inline = inline
+        self._executor = executor
+        self._finished = threading.Event()
+
+    def start(self):
+        """Runs the target, either directly or in a worker of the executor"""
+        self._executor._run(self)
+
+    def set_finished(self):
+        self._finished.set()
+
+    def join(self, timeout=None):
+        """Waits until the run is finished
+
+        :param float timeout: maximum time to wait or None for infinitely
+        """
+        self._finished.wait(timeout)
+
+    def is_alive(self):
+        return not self._finished.is_set()
+
+
+class _PoolWorker(threading.Thread):
+    """A worker thread of the :class:`StateExecutor`, which runs the targets assigned to it
+
+    After finishing a target, the worker offers itself to the pool again. If the pool already holds enough idle
+    workers, the worker terminates.
+    """
+
+    def __init__(self, executor):
+        super(_PoolWorker, self).__init__(name="StateExecutorWorker")
+        self.daemon = True
+        self._executor = executor
+        self._tasks = queue.Queue()
+
+    def assign(self, handle):
+        self._tasks.put(handle)
+
+    def run(self):
+        while True:
+            handle = self._tasks.get()
+            if handle is None:
+                break
+            _run_target(handle, finish=False)
+            # the worker is released before the handle is finished, so that a subsequent submit (e.g. of the next child
+            # state after joining the current one) can already reuse this worker
+            released = self._executor._release_worker(self)
+            handle.set_finished()
+            if not released:
+                break
+
+
+def _run_target(handle, finish=True):
+    try:
+        handle.target()
+    except Exception:
+        logger.error("Exception in run of {0}: {1}".format(handle.name, traceback.format_exc()))
+    finally:
+        if finish:
+            handle.set_finished()
+
+
+class StateExecutor(object):
+    """Runs the run methods of states
+
+    The executor supports three modes (see :data:`StateExecutorMode`):
+
+    * THREAD: each state run gets a new thread (default)
+    * POOL: state runs are passed to a pool of worker threads, which are reused for subsequent runs
+    * INLINE: like POOL, but runs requested as inline (sequential children of hierarchy states) are executed
+      directly in the thread of the caller
+
+    In POOL and INLINE mode, the number of idle worker threads kept alive is bounded by the pool size. The number of
+    concurrently busy workers is not bounded, as the parent of a state blocks its worker until the child finished. A
+    bound would thus lead to dead locks for deep hierarchies and wide concurrency states.
+
+    :ivar mode: the mode of the executor or None to use the config value STATE_EXECUTOR_MODE
+    :ivar pool_size: the maximum number of idle workers or None to use the config value STATE_EXECUTOR_POOL_SIZE
+    """
+
+    def __init__(self, mode=None, pool_size=None):
+        self.mode = mode
+        self.pool_size = pool_size
+        self._idle_workers = []
+        self._lock = threading.Lock()
+
+    def get_mode(self):
+        """Returns the currently active mode
+
+        :return: the mode, as set or as configured
+        :rtype: StateExecutorMode
+        """
+        if self.mode is not None:
+            return self.mode
+        mode_name = global_config.get_config_value("STATE_EXECUTOR_MODE", "THREAD")
+        try:
+            return StateExecutorMode[mode_name]
+        except KeyError:
+            logger.warning("Invalid STATE_EXECUTOR_MODE {0}, falling back to THREAD".format(mode_name))
+            return StateExecutorMode.THREAD
+
+    def get_pool_size(self):
+        if self.pool_size is not None:
+            return self.pool_size
+        return global_config.get_config_value("STATE_EXECUTOR_POOL_SIZE", DEFAULT_POOL_SIZE)
+
+    def create_handle(self, target, name=None, inline=False):
+        """Creates a handle for running the given target
+
+        The returned handle has to be started by calling its `start` method.
+
+        :param target: the callable to run, usually the run method of a state
+        :param str name: name of the run for debugging purposes
+        :param bool inline: if True and the executor is in INLINE mode, the target is run in the thread calling
+            `start`, which only returns after the target finished
+        :return: a handle, which can be started and joined
+        :rtype: StateExecutionHandle | threading.Thread
+        """
+        if self.get_mode() is StateExecutorMode.THREAD:
+            return threading.Thread(target=target, name=name)
+        return StateExecutionHandle(self, target, name, inline)
+
+    def _run(self, handle):
+        if handle.inline and self.get_mode() is StateExecutorMode.INLINE:
+            _run_target(handle)
+            return
+
+        with self._lock:
+            worker = self._idle_workers.pop() if self._idle_workers else None
+        if worker is None:
+            worker = _PoolWorker(self)
+            worker.start()
+        worker.assign(handle)
+
+    def _release_worker(self, worker):
+        """Puts a worker back into the pool
+
+        :return: True if the worker was put back, False if the worker has to terminate
+        """
+        with self._lock:
+            if len(self._idle_workers) < self.get_pool_size():
+                self._idle_workers.append(worker)
+                return True
+        return False
+
+    @property
+    def number_of_idle_workers(self):
+        with self._lock:
+            return len(self._idle_workers)
+
+    def shutdown(self):
+        """Lets all idle workers terminate"""
+        with self._lock:
+            idle_workers = self._idle_workers
+            self._idle_workers = []
+        for worker in idle_workers:
+            worker.assign(None)
@@ -22,9 +22,9 @@
 
 from builtins import str
 import time
-import copy
 from gtkmvc3.observable import Observable
 from threading import Lock, currentThread, RLock
+from rafcon.core.data_passing import get_data_passing_policy, pass_value, store_value
 from rafcon.core.id_generator import *
 
 from rafcon.utils.type_helpers import type_inherits_of_type
@@ -91,7 +91,7 @@ class GlobalVariableManager(Observable):
                 self.__global_variable_type_dictionary[key] = data_type
                 self.__variable_references[key] = True
             else:
-                self.__global_variable_dictionary[key] = copy.deepcopy(value)
+                self.__global_variable_dictionary[key] = store_value(value)
                 self.__global_variable_type_dictionary[key] = data_type
                 self.__variable_references[key] = False
             # --- release variable
@@ -130,13 +130,13 @@ class GlobalVariableManager(Observable):
                 if per_reference or per_reference is None:
                     return_value = self.__global_variable_dictionary[key]
                 else:
-                    return_value = copy.deepcopy(self.__global_variable_dictionary[key])
+                    return_value = pass_value(self.__global_variable_dictionary[key])
             else:
                 if per_reference:
                     self.unlock_variable(key, access_key)
                     raise RuntimeError("Variable cannot be accessed by reference")
                 else:
-                    return_value = copy.deepcopy(self.__global_variable_dictionary[key])
+                    return_value = pass_value(self.__global_variable_dictionary[key])
             # --- release variable
 
             if unlock:
@@ -310,11 +310,12 @@ class GlobalVariableManager(Observable):
     def global_variable_dictionary(self):
         """Property for the _global_variable_dictionary field"""
         dict_copy = {}
+        data_passing_policy = get_data_passing_policy()
         for key, value in self.__global_variable_dictionary.items():
             if key in self.__variable_references and self.__variable_references[key]:
                 dict_copy[key] = value
             else:
-                dict_copy[key] = copy.deepcopy(value)
+                dict_copy[key] = pass_value(value, data_passing_policy)
 
         return dict_copy
 
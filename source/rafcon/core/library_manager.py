@@ -18,8 +18,11 @@
 """
 
 import os
+import json
 import shutil
 import copy
+import hashlib
+import threading
 from gtkmvc3.observable import Observable
 
 from rafcon.core import interface
@@ -36,6 +39,111 @@ except ImportError:
     OrderedDict = dict
 
 
+class LibraryIndex(object):
+    """Index of the folders below the library root paths
+
+    For every folder, the index holds its status (inode and modification time), whether the folder contains a library
+    and the names of its sub folders. As long as the status of a folder does not change, its content is taken from the
+    index instead of listing the folder and checking each of its entries. The index can be stored in a file, so that it
+    is reused when RAFCON is started again.
+
+    :ivar str path: the path of the index file or None, if the index is not stored
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None):
+        self.path = path
+        self._folders = {}
+        self._previous_folders = {}
+        if path and os.path.isfile(path):
+            try:
+                with open(path) as index_file:
+                    index = json.load(index_file)
+                if index['version'] == self.VERSION:
+                    self._folders = {folder_path: (tuple(status), is_library, sub_folder_names)
+                                     for folder_path, (status, is_library, sub_folder_names)
+                                     in index['folders'].items()}
+            except (IOError, OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning("The library index {0} could not be read: {1}".format(path, e))
+
+    def begin_update(self):
+        """Starts a scan of the library folders
+
+        Folders not requested until :meth:`end_update` is called are removed from the index.
+        """
+        self._previous_folders = self._folders
+        self._folders = {}
+
+    def end_update(self):
+        """Finishes a scan of the library folders and stores the index, if it changed"""
+        changed = self._folders != self._previous_folders
+        self._previous_folders = {}
+        if changed and self.path:
+            self.save()
+
+    def save(self):
+        temporary_path = "{0}.{1}.tmp".format(self.path, os.getpid())
+        try:
+            if not os.path.isdir(os.path.dirname(self.path)):
+                os.makedirs(os.path.dirname(self.path))
+            with open(temporary_path, 'w') as index_file:
+                json.dump({'version': self.VERSION, 'folders': self._folders}, index_file)
+            os.rename(temporary_path, self.path)
+        except (IOError, OSError) as e:
+            logger.warning("The library index {0} could not be stored: {1}".format(self.path, e))
+
+    def get_folder(self, folder_path):
+        """Returns whether the folder contains a library and the names of its sub folders
+
+        :param str folder_path: the path of the folder
+        :return: whether the folder contains a library and the names of its sub folders (only determined for folders
+            without library) or None, if the folder does not exist
+        :rtype: tuple(bool, list)
+        """
+        try:
+            folder_stat = os.stat(folder_path)
+        except OSError:
+            return None
+        status = (folder_stat.st_ino, folder_stat.st_mtime)
+        folder = self._folders.get(folder_path) or self._previous_folders.get(folder_path)
+        if folder is None or folder[0] != status:
+            file_names = os.listdir(folder_path)
+            is_library = storage.STATEMACHINE_FILE in file_names or storage.STATEMACHINE_FILE_OLD in file_names
+            sub_folder_names = [] if is_library else \
+                sorted(name for name in file_names if os.path.isdir(os.path.join(folder_path, name)))
+            folder = status, is_library, sub_folder_names
+        self._folders[folder_path] = folder
+        return folder[1], folder[2]
+
+
+class LibraryWatcher(threading.Thread):
+    """Watches the library root paths for changes
+
+    The file system is polled in the given interval. Changes of the library tree are applied by the update dispatcher
+    of the library manager, see :meth:`LibraryManager.set_update_dispatcher`.
+
+    :ivar float interval: the time between two checks in seconds
+    """
+
+    def __init__(self, library_manager, interval):
+        super(LibraryWatcher, self).__init__(name="LibraryWatcher")
+        self.daemon = True
+        self.interval = interval
+        self._library_manager = library_manager
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._library_manager.update_libraries_from_watcher()
+            except Exception:
+                logger.exception("The libraries could not be updated")
+
+    def stop(self):
+        self._stop_event.set()
+
+
 class LibraryManager(Observable):
     """This class manages all libraries
 
@@ -49,6 +157,9 @@ class LibraryManager(Observable):
     A library is pointed on by the file system path library_os_path which again partial consists of 
     library_root_path + library_path (partly) + library_name.
     :ivar _libraries: a dictionary to hold  all libraries
+
+    The library folders are scanned using a :class:`LibraryIndex`, thus only folders changed since the last scan are
+    listed. If `LIBRARY_WATCHER_INTERVAL` is configured, a :class:`LibraryWatcher` keeps the libraries up to date.
     """
 
     def __init__(self):
@@ -64,28 +175,85 @@ class LibraryManager(Observable):
 
         # loaded libraries
         self._loaded_libraries = {}
+        self._library_interfaces = {}
+        self._loaded_library_fingerprints = {}
+        # fingerprints of loaded libraries are only calculated once the libraries are checked for changes
+        self._track_library_changes = False
         self._libraries_instances = {}
 
+        self._index = None
+        self._watcher = None
+        self._update_lock = threading.RLock()
+        self._update_dispatcher = None
+        self._initialization_pending = False
+
     def prepare_destruction(self):
+        self._stop_watcher()
         self.clean_loaded_libraries()
 
     def clean_loaded_libraries(self):
         self._loaded_libraries.clear()
+        self._library_interfaces.clear()
+        self._loaded_library_fingerprints.clear()
 
-    def initialize(self):
+    def initialize(self, on_demand=False):
         """Initializes the library manager
 
         It searches through all library paths given in the config file for libraries, and loads the states.
 
         This cannot be done in the __init__ function as the library_manager can be compiled and executed by
         singleton.py before the state*.pys are loaded
+
+        :param bool on_demand: If True, the library paths are only searched, when the libraries are needed for the
+            first time, e.g. when the first library state is loaded. This shortens the start-up time of processes
+            executing state machines without libraries.
         """
-        logger.debug("Initializing LibraryManager: Loading libraries ... ")
-        self._libraries = {}
-        self._library_root_paths = {}
         self._replaced_libraries = {}
         self._skipped_states = []
         self._skipped_library_roots = []
+        if on_demand:
+            logger.debug("LibraryManager is initialized when the libraries are needed for the first time")
+            self._initialization_pending = True
+            return
+        logger.debug("Initializing LibraryManager: Loading libraries ... ")
+
+        with self._update_lock:
+            index_path = config.global_config.get_config_value("LIBRARY_INDEX_PATH", None)
+            index_path = self._clean_path(index_path) if index_path else None
+            if self._index is None or self._index.path != index_path:
+                self._index = LibraryIndex(index_path)
+            self._libraries, self._library_root_paths = self._load_libraries()
+            self._initialization_pending = False
+
+        self._stop_watcher()
+        watcher_interval = config.global_config.get_config_value("LIBRARY_WATCHER_INTERVAL", 0)
+        self._track_library_changes = bool(watcher_interval)
+        if watcher_interval:
+            self._watcher = LibraryWatcher(self, watcher_interval)
+            self._watcher.start()
+        logger.debug("Initialization of LibraryManager done")
+
+    def _initialize_if_pending(self):
+        """Initializes the library manager, if this was deferred by `initialize(on_demand=True)`"""
+        if self._initialization_pending:
+            with self._update_lock:
+                if self._initialization_pending:
+                    self.initialize()
+
+    def _stop_watcher(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _load_libraries(self):
+        """Scans the library root paths for libraries
+
+        :return: the library tree and the library root paths
+        :rtype: OrderedDict, dict
+        """
+        libraries = {}
+        library_root_paths = {}
+        self._index.begin_update()
 
         # 1. Load libraries from config.yaml
         for library_root_key, library_root_path in config.global_config.get_config_value("LIBRARY_PATHS").items():
@@ -93,7 +261,8 @@ class LibraryManager(Observable):
             if os.path.exists(library_root_path):
                 logger.debug("Adding library root key '{0}' from path '{1}'".format(
                     library_root_key, library_root_path))
-                self._load_libraries_from_root_path(library_root_key, library_root_path)
+                library_root_paths[library_root_key] = library_root_path
+                libraries[library_root_key] = self._load_nested_libraries(library_root_path, library_root_path)
             else:
                 logger.warning("Configured path for library root key '{}' does not exist: {}".format(
                     library_root_key, library_root_path))
@@ -109,20 +278,22 @@ class LibraryManager(Observable):
                 logger.warning("The library specified in RAFCON_LIBRARY_PATH does not exist: {}".format(library_root_path))
                 continue
             _, library_root_key = os.path.split(library_root_path)
-            if library_root_key in self._libraries:
-                if os.path.realpath(self._library_root_paths[library_root_key]) == os.path.realpath(library_root_path):
+            if library_root_key in libraries:
+                if os.path.realpath(library_root_paths[library_root_key]) == os.path.realpath(library_root_path):
                     logger.info("The library root key '{}' and root path '{}' exists multiple times in your environment"
                                 " and will be skipped.".format(library_root_key, library_root_path))
                 else:
                     logger.warning("The library '{}' is already existing and will be overridden with '{}'".format(
                         library_root_key, library_root_path))
-                    self._load_libraries_from_root_path(library_root_key, library_root_path)
+                    library_root_paths[library_root_key] = library_root_path
+                    libraries[library_root_key] = self._load_nested_libraries(library_root_path, library_root_path)
             else:
-                self._load_libraries_from_root_path(library_root_key, library_root_path)
+                library_root_paths[library_root_key] = library_root_path
+                libraries[library_root_key] = self._load_nested_libraries(library_root_path, library_root_path)
             logger.debug("Adding library '{1}' from {0}".format(library_root_path, library_root_key))
 
-        self._libraries = OrderedDict(sorted(self._libraries.items()))
-        logger.debug("Initialization of LibraryManager done")
+        self._index.end_update()
+        return OrderedDict(sorted(libraries.items())), library_root_paths
 
     @staticmethod
     def _clean_path(path):
@@ -142,14 +313,13 @@ class LibraryManager(Observable):
         path = os.path.realpath(path)
         return path
 
-    def _load_libraries_from_root_path(self, library_root_key, library_root_path):
-        self._library_root_paths[library_root_key] = library_root_path
-        self._libraries[library_root_key] = {}
-        self._load_nested_libraries(library_root_path, self._libraries[library_root_key])
-        self._libraries[library_root_key] = OrderedDict(sorted(self._libraries[library_root_key].items()))
-
     def check_clean_path_of_library(self, folder_path, folder_name):
+        self._initialize_if_pending()
         library_root_path = self._library_root_paths[self._get_library_root_key_for_os_path(folder_path)]
+        return self._check_clean_path(library_root_path, folder_path, folder_name)
+
+    @staticmethod
+    def _check_clean_path(library_root_path, folder_path, folder_name):
         full_path = os.path.join(folder_path, folder_name)[len(library_root_path) + 1:]
         library_path = folder_path[len(library_root_path):]
         if not storage.clean_path(library_path) == library_path or not storage.clean_path(folder_name) == folder_name:
@@ -159,26 +329,31 @@ class LibraryManager(Observable):
                            "".format(not_allowed_characters, full_path))
         return folder_path, folder_name
 
-    def _load_nested_libraries(self, library_path, target_dict):
+    def _load_nested_libraries(self, library_root_path, library_path):
         """Recursively load libraries within path
 
-        Adds all libraries specified in a given path and stores them into the provided library dictionary. The library
-        entries in the dictionary consist only of the path to the library in the file system.
+        Collects all libraries specified in a given path. The library entries in the dictionary consist only of the
+        path to the library in the file system.
 
+        :param library_root_path: the library root path the library path is located in
         :param library_path: the path to add all libraries from
-        :param target_dict: the target dictionary to store all loaded libraries to
+        :return: the libraries and the nested library dictionaries by their names
+        :rtype: OrderedDict
         """
-        for library_name in os.listdir(library_path):
-            library_folder_path, library_name = self.check_clean_path_of_library(library_path, library_name)
+        target_dict = {}
+        folder = self._index.get_folder(library_path)
+        for library_name in folder[1] if folder else []:
+            library_folder_path, library_name = self._check_clean_path(library_root_path, library_path, library_name)
+            if library_name[0] == '.':
+                continue
             full_library_path = os.path.join(library_path, library_name)
-            if os.path.isdir(full_library_path) and library_name[0] != '.':
-                if os.path.exists(os.path.join(full_library_path, storage.STATEMACHINE_FILE)) \
-                        or os.path.exists(os.path.join(full_library_path, storage.STATEMACHINE_FILE_OLD)):
+            sub_folder = self._index.get_folder(full_library_path)
+            if sub_folder is not None:
+                if sub_folder[0]:
                     target_dict[library_name] = full_library_path
                 else:
-                    target_dict[library_name] = {}
-                    self._load_nested_libraries(full_library_path, target_dict[library_name])
-                    target_dict[library_name] = OrderedDict(sorted(target_dict[library_name].items()))
+                    target_dict[library_name] = self._load_nested_libraries(library_root_path, full_library_path)
+        return OrderedDict(sorted(target_dict.items()))
 
     @Observable.observed
     def refresh_libraries(self):
@@ -186,6 +361,136 @@ class LibraryManager(Observable):
         """
         self.initialize()
 
+    def update_libraries(self):
+        """Updates the libraries with the changes in the file system
+
+        In contrast to :meth:`refresh_libraries`, only library folders changed since the last scan are listed again and
+        only loaded libraries whose files changed are removed from the cache, together with the loaded libraries
+        using them. Library states created afterwards use the changed libraries.
+
+        :return: whether any library changed
+        :rtype: bool
+        """
+        loaded_libraries_changed, library_tree = self._detect_library_changes()
+        if library_tree is None:
+            return loaded_libraries_changed
+        self._apply_library_tree(*library_tree)
+        return True
+
+    def update_libraries_from_watcher(self):
+        """Updates the libraries with the changes in the file system from the thread of the :class:`LibraryWatcher`
+
+        The file system is scanned in the calling thread. A changed library tree is applied, and thus the observers of
+        the libraries are notified, by the update dispatcher, see :meth:`set_update_dispatcher`.
+        """
+        _, library_tree = self._detect_library_changes()
+        if library_tree is None:
+            return
+        dispatcher = self._update_dispatcher
+        if dispatcher is None:
+            self._apply_library_tree(*library_tree)
+        else:
+            dispatcher(self._apply_library_tree, *library_tree)
+
+    def set_update_dispatcher(self, dispatcher):
+        """Sets the function applying the library changes detected by the :class:`LibraryWatcher`
+
+        The libraries are observable, thus their observers (e.g. the library tree of the GUI) might require to be
+        notified in a certain thread. The dispatcher is called with a function and its arguments and has to call the
+        function in that thread. Without dispatcher, the changes are applied in the thread of the watcher.
+
+        :param dispatcher: the function scheduling the call of the given function or None
+        """
+        self._update_dispatcher = dispatcher
+
+    def _detect_library_changes(self):
+        """Removes changed loaded libraries from the cache and scans the library root paths
+
+        :return: whether loaded libraries were removed and the new library tree and library root paths or None, if the
+            library tree did not change
+        :rtype: bool, tuple
+        """
+        self._initialize_if_pending()
+        with self._update_lock:
+            self._track_library_changes = True
+            changed_library_os_paths = self._remove_changed_loaded_libraries()
+            libraries, library_root_paths = self._load_libraries()
+            if libraries == self._libraries and library_root_paths == self._library_root_paths:
+                return bool(changed_library_os_paths), None
+            return bool(changed_library_os_paths), (libraries, library_root_paths)
+
+    def _apply_library_tree(self, libraries, library_root_paths):
+        with self._update_lock:
+            logger.info("The libraries changed on the file system and are updated")
+            self._library_root_paths = library_root_paths
+            self.libraries = libraries
+
+    @staticmethod
+    def _get_library_fingerprint(lib_os_path):
+        """Returns a digest of the status of all files of a library"""
+        fingerprint = hashlib.sha1()
+        for dir_path, dir_names, file_names in os.walk(lib_os_path):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                path = os.path.join(dir_path, file_name)
+                try:
+                    file_stat = os.stat(path)
+                except OSError:
+                    continue
+                fingerprint.update("{0}:{1}:{2};".format(path, file_stat.st_mtime, file_stat.st_size).encode('utf-8'))
+        return fingerprint.hexdigest()
+
+    def _get_library_fingerprint_if_tracked(self, lib_os_path):
+        """Returns the fingerprint of a library, if the libraries are checked for changes, else None"""
+        if not self._track_library_changes:
+            return None
+        return self._get_library_fingerprint(lib_os_path)
+
+    def _remove_changed_loaded_libraries(self):
+        """Removes loaded libraries whose files changed and the loaded libraries using them from the cache
+
+        :return: the paths of the removed libraries
+        :rtype: set
+        """
+        from rafcon.core.states.library_state import LibraryState
+        from rafcon.core.states.container_state import ContainerState
+
+        # libraries loaded before the first check have no fingerprint yet
+        for lib_os_path in list(self._loaded_libraries.keys()) + list(self._library_interfaces.keys()):
+            if lib_os_path not in self._loaded_library_fingerprints:
+                self._loaded_library_fingerprints[lib_os_path] = self._get_library_fingerprint(lib_os_path)
+
+        removed_library_os_paths = set()
+        for lib_os_path, fingerprint in list(self._loaded_library_fingerprints.items()):
+            if self._get_library_fingerprint(lib_os_path) != fingerprint:
+                logger.info("The library {0} changed on the file system".format(lib_os_path))
+                removed_library_os_paths.add(lib_os_path)
+
+        # libraries using a changed library contain library states created from the outdated library
+        used_library_os_paths = {}
+        for lib_os_path, state_machine in list(self._loaded_libraries.items()):
+            used_library_os_paths[lib_os_path] = set()
+            states = [state_machine.root_state]
+            while states:
+                state = states.pop()
+                if isinstance(state, LibraryState):
+                    used_library_os_paths[lib_os_path].add(state.lib_os_path)
+                elif isinstance(state, ContainerState):
+                    states.extend(state.states.values())
+        changed = bool(removed_library_os_paths)
+        while changed:
+            changed = False
+            for lib_os_path, library_os_paths in used_library_os_paths.items():
+                if lib_os_path not in removed_library_os_paths and library_os_paths & removed_library_os_paths:
+                    removed_library_os_paths.add(lib_os_path)
+                    changed = True
+
+        for lib_os_path in removed_library_os_paths:
+            self._loaded_libraries.pop(lib_os_path, None)
+            self._library_interfaces.pop(lib_os_path, None)
+            self._loaded_library_fingerprints.pop(lib_os_path, None)
+        return removed_library_os_paths
+
     #########################################################################
     # Properties for all class fields that must be observed by gtkmvc3
     #########################################################################
@@ -194,6 +499,7 @@ class LibraryManager(Observable):
     def libraries(self):
         """Getter for library tree
         """
+        self._initialize_if_pending()
         return self._libraries
 
     @libraries.setter
@@ -208,6 +514,7 @@ class LibraryManager(Observable):
     def library_root_paths(self):
         """Getter for library paths
         """
+        self._initialize_if_pending()
         return self._library_root_paths
 
     def get_os_path_to_library(self, library_path, library_name, allow_user_interaction=True):
@@ -234,6 +541,7 @@ class LibraryManager(Observable):
                                            "path separators {2}{2} in a row like '{0}' with library name {1}"
                                            "".format(library_path, library_name, os.sep))
 
+        self._initialize_if_pending()
         if not self._library_root_paths:
             raise LibraryNotFoundException("There are no libraries registered")
 
@@ -325,6 +633,7 @@ class LibraryManager(Observable):
 
     def _get_library_root_key_for_os_path(self, path):
         """Return library root key if path is within library root paths"""
+        self._initialize_if_pending()
         path = os.path.realpath(path)
         library_root_key = None
         for library_root_key, library_root_path in self._library_root_paths.items():
@@ -374,6 +683,50 @@ class LibraryManager(Observable):
         else:
             logger.warning("Library manager will not create a library instance which is not in the mounted libraries.")
 
+    def get_library_template(self, lib_os_path):
+        """Returns the loaded state machine of the library specified via the lib_os_path
+
+        The library is only loaded once. The root state of the returned state machine serves as template for all
+        library states of this library and thus must not be modified.
+
+        :param lib_os_path: the location of the library
+        :return: the library state machine
+        :rtype: rafcon.core.state_machine.StateMachine
+        """
+        with self._update_lock:
+            if lib_os_path not in self._loaded_libraries:
+                fingerprint = self._get_library_fingerprint_if_tracked(lib_os_path)
+                self._loaded_libraries[lib_os_path] = storage.load_state_machine_from_path(lib_os_path)
+                if fingerprint:
+                    self._loaded_library_fingerprints.setdefault(lib_os_path, fingerprint)
+            return self._loaded_libraries[lib_os_path]
+
+    def get_library_interface(self, lib_os_path):
+        """Returns the version and the root state of the library specified via the lib_os_path
+
+        If the library is not loaded yet, only its root state is loaded, without child states. The returned root state
+        is shared and must not be modified.
+
+        :param lib_os_path: the location of the library
+        :return: the version of the library and the root state of the library
+        :rtype: str, rafcon.core.states.state.State
+        """
+        with self._update_lock:
+            if lib_os_path in self._loaded_libraries:
+                state_machine = self._loaded_libraries[lib_os_path]
+                return state_machine.version, state_machine.root_state
+            if lib_os_path not in self._library_interfaces:
+                fingerprint = self._get_library_fingerprint_if_tracked(lib_os_path)
+                try:
+                    self._library_interfaces[lib_os_path] = storage.load_state_machine_interface(lib_os_path)
+                except (ValueError, KeyError):
+                    # e.g. state machines stored in old formats
+                    state_machine = self.get_library_template(lib_os_path)
+                    return state_machine.version, state_machine.root_state
+                if fingerprint:
+                    self._loaded_library_fingerprints.setdefault(lib_os_path, fingerprint)
+            return self._library_interfaces[lib_os_path]
+
     def get_library_state_copy_instance(self, lib_os_path):
         """ A method to get a state copy of the library specified via the lib_os_path.
 
@@ -385,22 +738,14 @@ class LibraryManager(Observable):
         # state_machine = storage.load_state_machine_from_path(lib_os_path)
         # return state_machine.version, state_machine.root_state
 
-        # TODO observe changes on file system and update data
-        if lib_os_path in self._loaded_libraries:
-            # this list can also be taken to open library state machines TODO -> implement it -> because faster
-            state_machine = self._loaded_libraries[lib_os_path]
-            # logger.info("Take copy of {0}".format(lib_os_path))
-            # as long as the a library state root state is never edited so the state first has to be copied here
-            state_copy = copy.deepcopy(state_machine.root_state)
-            return state_machine.version, state_copy
-        else:
-            state_machine = storage.load_state_machine_from_path(lib_os_path)
-            self._loaded_libraries[lib_os_path] = state_machine
-            if config.global_config.get_config_value("NO_PROGRAMMATIC_CHANGE_OF_LIBRARY_STATES_PERFORMED", False):
-                return state_machine.version, state_machine.root_state
-            else:
-                state_copy = copy.deepcopy(state_machine.root_state)
-                return state_machine.version, state_copy
+        first_load = lib_os_path not in self._loaded_libraries
+        state_machine = self.get_library_template(lib_os_path)
+        if first_load and \
+                config.global_config.get_config_value("NO_PROGRAMMATIC_CHANGE_OF_LIBRARY_STATES_PERFORMED", False):
+            return state_machine.version, state_machine.root_state
+        # as long as the a library state root state is never edited so the state first has to be copied here
+        state_copy = copy.deepcopy(state_machine.root_state)
+        return state_machine.version, state_copy
 
     def remove_library_from_file_system(self, library_path, library_name):
         """Remove library from hard disk."""
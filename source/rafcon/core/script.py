@@ -18,12 +18,20 @@
 
 from future.utils import string_types
 from builtins import str
+from builtins import object
 import os
 import imp
+import hashlib
 import yaml
+from threading import Lock
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
 from gtkmvc3.observable import Observable
 
 from rafcon.core.id_generator import generate_script_id
+from rafcon.core.config import global_config
 import rafcon.core.singleton
 
 from rafcon.utils import filesystem
@@ -36,6 +44,91 @@ DEFAULT_SCRIPT_FILE = "default_script.py"
 
 DEFAULT_SCRIPT = filesystem.read_file(os.path.dirname(__file__), DEFAULT_SCRIPT_FILE)
 
+SCRIPT_CODE_CACHE_SIZE = 1000
+
+
+def get_script_hash(script_text):
+    """Returns the content hash of a script text
+
+    :param str script_text: the text of the script
+    :return: the hex digest of the script text
+    :rtype: str
+    """
+    return hashlib.sha1(script_text.encode('utf-8')).hexdigest()
+
+
+class ScriptCache(object):
+    """A process wide cache for the code objects of compiled scripts
+
+    The code objects are keyed by the content hash of the script text and the script filename. Thus, scripts are only
+    compiled once, no matter how often they are executed and how many states share the same script text (e.g. the
+    instances of a library).
+
+    The cache additionally counts how a module build request was served:
+
+    * module hit: the module built before could be reused, as the script did not change
+    * code hit: a new module was created from a cached code object
+    * miss: the script had to be compiled
+
+    :ivar max_size: the maximum number of cached code objects, the least recently used ones are dropped first
+    """
+
+    def __init__(self, max_size=SCRIPT_CODE_CACHE_SIZE):
+        self.max_size = max_size
+        self._code_objects = OrderedDict()
+        self._lock = Lock()
+        self.module_hits = 0
+        self.code_hits = 0
+        self.misses = 0
+
+    def get_code(self, script_hash, script_text, filename):
+        """Returns the code object of a script, compiles the script if it is not yet cached
+
+        :param str script_hash: the content hash of the script text
+        :param str script_text: the script text
+        :param str filename: the filename of the script
+        :return: the code object of the script
+        """
+        key = (script_hash, filename)
+        with self._lock:
+            code = self._code_objects.pop(key, None)
+            if code is not None:
+                self._code_objects[key] = code
+                self.code_hits += 1
+                return code
+        code = compile(script_text, '%s (%s)' % (filename, script_hash[:8]), 'exec')
+        with self._lock:
+            self.misses += 1
+            self._code_objects[key] = code
+            while len(self._code_objects) > self.max_size:
+                self._code_objects.popitem(last=False)
+        return code
+
+    def register_module_hit(self):
+        with self._lock:
+            self.module_hits += 1
+
+    def get_statistics(self):
+        """Returns the hit and miss counters of the cache
+
+        :return: dict with the keys 'module_hits', 'code_hits', 'misses' and 'size'
+        :rtype: dict
+        """
+        with self._lock:
+            return {'module_hits': self.module_hits, 'code_hits': self.code_hits, 'misses': self.misses,
+                    'size': len(self._code_objects)}
+
+    def clear(self):
+        """Removes all cached code objects and resets the counters"""
+        with self._lock:
+            self._code_objects.clear()
+            self.module_hits = 0
+            self.code_hits = 0
+            self.misses = 0
+
+
+script_cache = ScriptCache()
+
 
 class Script(Observable, yaml.YAMLObject):
     """A class for representing the script file for all execution states in a state machine.
@@ -45,8 +138,11 @@ class Script(Observable, yaml.YAMLObject):
     :ivar path: the path where the script resides
     :ivar filename: the full name of the script file
     :ivar _compiled_module: the compiled module
+    :ivar _compiled_module_key: the content hash and filename of the script the compiled module was built from
     :ivar _script_id: the id of the script
     :ivar check_path: a flag to indicate if the path should be checked for existence
+    :ivar fresh_module_per_run: if True, the module is built anew on each run, which is required for scripts depending
+        on a clean module level state; None to use the config value SCRIPT_FRESH_MODULE_PER_RUN
 
     """
 
@@ -58,9 +154,11 @@ class Script(Observable, yaml.YAMLObject):
         self._path = None
         self._filename = None
         self._compiled_module = None
+        self._compiled_module_key = None
         self._script_id = generate_script_id()
         self._parent = None
         self._check_path = check_path
+        self.fresh_module_per_run = None
 
         self._script = DEFAULT_SCRIPT
         self.filename = filename
@@ -76,6 +174,8 @@ class Script(Observable, yaml.YAMLObject):
     def script(self, value):
         if not isinstance(value, string_types):
             raise ValueError("The script text needs to be string")
+        if value != self._script:
+            self._compiled_module_key = None
         self._script = value
 
     def execute(self, state, inputs=None, outputs=None, backward_execution=False):
@@ -119,8 +219,23 @@ class Script(Observable, yaml.YAMLObject):
     def build_module(self):
         """Builds a temporary module from the script file
 
+        The module is only rebuilt if the script text or filename changed since the last build, or if a fresh module
+        per run is requested. The compiled code is taken from the :data:`script_cache`.
+
         :raises exceptions.IOError: if the compilation of the script module failed
         """
+        script_hash = get_script_hash(self.script)
+        module_key = (script_hash, self.filename)
+        fresh_module_per_run = self.fresh_module_per_run
+        if fresh_module_per_run is None:
+            fresh_module_per_run = global_config.get_config_value("SCRIPT_FRESH_MODULE_PER_RUN", False)
+
+        if not fresh_module_per_run and self._compiled_module is not None and \
+                self._compiled_module_key == module_key:
+            script_cache.register_module_hit()
+            return
+
+        code = script_cache.get_code(script_hash, self.script, self.filename)
         try:
             imp.acquire_lock()
             module_name = os.path.splitext(self.filename)[0] + str(self._script_id)
@@ -128,8 +243,6 @@ class Script(Observable, yaml.YAMLObject):
             # load module
             tmp_module = imp.new_module(module_name)
 
-            code = compile(self.script, '%s (%s)' % (self.filename, self._script_id), 'exec')
-
             try:
                 exec(code, tmp_module.__dict__)
             except RuntimeError as e:
@@ -137,6 +250,7 @@ class Script(Observable, yaml.YAMLObject):
 
             # return the module
             self.compiled_module = tmp_module
+            self._compiled_module_key = module_key
         finally:
             imp.release_lock()
 
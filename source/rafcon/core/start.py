@@ -28,10 +28,31 @@ import argparse
 from os.path import realpath, dirname, join, exists
 import signal
 import time
-from queue import Empty
 import threading
 import sys
 
+
+def _get_process_start_time():
+    """Determines the start time of the process from the proc file system, which is only available on Linux
+
+    :return: the start time of the process as returned by :func:`time.time` or None, if it cannot be determined
+    """
+    try:
+        with open("/proc/uptime") as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+        with open("/proc/self/stat") as stat_file:
+            stat = stat_file.read()
+        # the start time is the 22nd field, the fields after the process name in parentheses start with the 3rd one
+        start_ticks = float(stat[stat.rindex(')') + 2:].split()[19])
+        return time.time() - (uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (IOError, OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+# the start-up phases are measured, see --profile-startup
+_process_start_time = _get_process_start_time() if "--profile-startup" in sys.argv else None
+_import_start_time = time.time()
+
 import rafcon
 from yaml_configuration.config import config_path
 import rafcon.utils.filesystem as filesystem
@@ -39,14 +60,22 @@ import rafcon.utils.filesystem as filesystem
 from rafcon.core.config import global_config
 import rafcon.core.singleton as core_singletons
 from rafcon.core.storage import storage
-from rafcon.core.states.state import StateExecutionStatus
+from rafcon.core.execution.execution_handle import wait_for_event
 
 from rafcon.utils import plugins
 from rafcon.utils import log
+from rafcon.utils.timer import PhaseTimer
 
 logger = log.get_logger("rafcon.start.core")
 
 _user_abort = False
+# the events of all threads waiting in wait_for_state_machine_finished, which are set if the user aborts
+_waiting_events = set()
+
+startup_timer = PhaseTimer()
+if _process_start_time is not None:
+    startup_timer.start_phase("interpreter start-up", _process_start_time)
+startup_timer.start_phase("imports", _import_start_time)
 
 
 def pre_setup_plugins():
@@ -69,11 +98,13 @@ def post_setup_plugins(parser_result):
 def setup_environment():
     """Ensures that the environmental variable RAFCON_LIB_PATH is existent
     """
-    try:
+    # GLib is only used if already imported (e.g. by the GUI), as importing it delays the start of RAFCON without GUI
+    if "gi.repository.GLib" in sys.modules:
         from gi.repository import GLib
         user_data_folder = GLib.get_user_data_dir()
-    except ImportError:
-        user_data_folder = join(os.path.expanduser("~"), ".local", "share")
+    else:
+        # the user data directory as defined by the XDG Base Directory Specification, which GLib follows
+        user_data_folder = os.environ.get("XDG_DATA_HOME") or join(os.path.expanduser("~"), ".local", "share")
     rafcon_root_path = dirname(realpath(rafcon.__file__))
     user_library_folder = join(user_data_folder, "rafcon", "libraries")
 
@@ -134,13 +165,17 @@ def setup_argument_parser():
                         help="path within a state machine to the state that should be launched. The state path "
                              "consists of state ids (e.g. QPOXGD/YVWJKZ whereof QPOXGD is the root state and YVWJKZ "
                              "it's child state to start from).")
+    parser.add_argument('--profile-startup', action='store_true', dest='profile_startup',
+                        help="print the durations of the start-up phases, from the start of the interpreter to the "
+                             "start of the state machine execution")
     return parser
 
 
-def setup_configuration(config_path):
+def setup_configuration(config_path, initialize_libraries_on_demand=False):
     """Loads the core configuration from the specified path and uses its content for further setup
 
     :param config_path: Path to the core config file
+    :param bool initialize_libraries_on_demand: Whether to defer the search for libraries until a library is needed
     """
     if config_path is not None:
         config_path, config_file = filesystem.separate_folder_path_and_file_name(config_path)
@@ -149,7 +184,7 @@ def setup_configuration(config_path):
         global_config.load(path=config_path)
 
     # Initialize libraries
-    core_singletons.library_manager.initialize()
+    core_singletons.library_manager.initialize(on_demand=initialize_libraries_on_demand)
 
 
 def open_state_machine(state_machine_path):
@@ -165,38 +200,83 @@ def open_state_machine(state_machine_path):
 
 
 def start_state_machine(sm, start_state_path=None):
-    core_singletons.state_machine_execution_engine.start(sm.state_machine_id, start_state_path=start_state_path)
+    """Starts the execution of a state machine
+
+    :param rafcon.core.state_machine.StateMachine sm: The state machine to execute
+    :param str start_state_path: The path of the state to start the execution from
+    :return: the handle of the execution
+    :rtype: rafcon.core.execution.execution_handle.ExecutionHandle
+    """
+    execution_handle = core_singletons.state_machine_execution_engine.start(sm.state_machine_id,
+                                                                            start_state_path=start_state_path)
 
     if reactor_required():
         sm_thread = threading.Thread(target=stop_reactor_on_state_machine_finish, args=[sm, ])
         sm_thread.start()
+    return execution_handle
+
+
+class _ExecutionStartObserver(object):
+    """Records the time, at which the root state of a state machine starts its execution
+
+    The time is taken in the execution thread, when the execution status of the root state changes for the first time.
+    """
+
+    def __init__(self, state_machine):
+        self.root_state = state_machine.root_state
+        self.start_time = None
+        self._started = threading.Event()
+        self.root_state.add_observer(self, 'state_execution_status', None, self._on_execution_status_changed)
+
+    def _on_execution_status_changed(self, state, result, args):
+        if not self._started.is_set():
+            self.start_time = time.time()
+            self._started.set()
+
+    def wait(self, execution_handle):
+        """Waits until the root state started its execution or the execution finished without executing it
+
+        :param rafcon.core.execution.execution_handle.ExecutionHandle execution_handle: the handle of the execution
+        :return: the start time of the root state as returned by :func:`time.time` or None, if it was not executed
+        """
+        if execution_handle is None:
+            return None
+        _waiting_events.add(self._started)
+        try:
+            if not _user_abort:
+                execution_handle.add_done_callback(lambda handle: self._started.set())
+                wait_for_event(self._started)
+        finally:
+            _waiting_events.discard(self._started)
+        return self.start_time
+
+    def remove(self):
+        """Removes the observer, which must only be done when the execution finished"""
+        self.root_state.remove_observer(self, 'state_execution_status')
 
 
 def wait_for_state_machine_finished(state_machine):
     """ wait for a state machine to finish its execution
 
+    Returns as soon as the execution finished or the user aborted the execution, e.g. if the state machine could not
+    be stopped in the signal handler.
+
     :param state_machine: the statemachine to synchronize with
     :return:
     """
-    global _user_abort
-
-    from rafcon.core.states.execution_state import ExecutionState
-    if not isinstance(state_machine.root_state, ExecutionState):
-        while len(state_machine.execution_histories[0]) < 1:
-            time.sleep(0.1)
-    else:
-        time.sleep(0.5)
-
-    while state_machine.root_state.state_execution_status is not StateExecutionStatus.INACTIVE:
-        try:
-            state_machine.root_state.concurrency_queue.get(timeout=1)
-            # this check triggers if the state machine could not be stopped in the signal handler
-            if _user_abort:
-                return
-        except Empty:
-            pass
-        # no logger output here to make it easier for the parser
-        logger.verbose("RAFCON live signal")
+    execution_handle = state_machine.execution_handle
+    if execution_handle is None:
+        logger.warning("The state machine {0} was not started".format(state_machine))
+        return
+    stop_waiting = threading.Event()
+    _waiting_events.add(stop_waiting)
+    try:
+        if _user_abort:
+            return
+        execution_handle.add_done_callback(lambda handle: stop_waiting.set())
+        wait_for_event(stop_waiting)
+    finally:
+        _waiting_events.discard(stop_waiting)
 
 
 def stop_reactor_on_state_machine_finish(state_machine):
@@ -233,6 +313,8 @@ def signal_handler(signal, frame):
         logger.exception("Could not stop state machine")
 
     _user_abort = True
+    for stop_waiting in list(_waiting_events):
+        stop_waiting.set()
 
     # shutdown twisted correctly
     if reactor_required():
@@ -252,21 +334,28 @@ def main():
 
     logger.info("initialize RAFCON ... ")
 
+    startup_timer.start_phase("plugins")
     pre_setup_plugins()
 
+    startup_timer.start_phase("environment")
     setup_environment()
 
     logger.info("parse arguments ... ")
+    startup_timer.start_phase("argument parsing")
     parser = setup_argument_parser()
     user_input = parser.parse_args()
     if not user_input.state_machine_path:
         logger.error("You have to specify a valid state machine path")
         exit(-1)
 
-    setup_configuration(user_input.config_path)
+    # libraries are searched when the first library state is loaded
+    startup_timer.start_phase("configuration")
+    setup_configuration(user_input.config_path, initialize_libraries_on_demand=True)
 
+    startup_timer.start_phase("plugins post init")
     post_setup_plugins(user_input)
 
+    startup_timer.start_phase("state machine loading")
     first_sm = None
     for sm_path in user_input.state_machine_path:
         sm = open_state_machine(sm_path)
@@ -274,7 +363,15 @@ def main():
             first_sm = sm
 
     if not user_input.remote:
-        start_state_machine(first_sm, user_input.start_state_path)
+        # the phase lasts until the root state is executed in its thread
+        startup_timer.start_phase("execution start")
+        execution_start_observer = _ExecutionStartObserver(first_sm)
+        execution_handle = start_state_machine(first_sm, user_input.start_state_path)
+        startup_timer.stop(execution_start_observer.wait(execution_handle))
+    else:
+        startup_timer.stop()
+    if user_input.profile_startup:
+        logger.info(startup_timer.get_report("Start-up profile"))
 
     if reactor_required():
         from twisted.internet import reactor
@@ -284,6 +381,7 @@ def main():
 
     if not user_input.remote:
         wait_for_state_machine_finished(first_sm)
+        execution_start_observer.remove()
     else:
         while not _user_abort:
             time.sleep(1)
@@ -119,6 +119,12 @@ class DataFlow(StateElement):
             'to_key': state_element.to_key
         }
 
+    def _reset_parent_data_flow_routes(self):
+        """Informs the parent about a changed origin or target of the data flow"""
+        parent = self.parent
+        if parent is not None:
+            parent.reset_data_flow_routes()
+
 #########################################################################
 # Properties for all class field that must be observed by the gtkmvc3
 #########################################################################
@@ -147,6 +153,7 @@ class DataFlow(StateElement):
             self._from_state = old_from_state
             self._from_key = old_from_key
             raise ValueError("The data flow origin could not be changed: {0}".format(message))
+        self._reset_parent_data_flow_routes()
 
     @property
     def from_state(self):
@@ -162,6 +169,7 @@ class DataFlow(StateElement):
             raise ValueError("from_state must be a string")
 
         self._change_property_with_validity_check('_from_state', from_state)
+        self._reset_parent_data_flow_routes()
 
     @property
     def from_key(self):
@@ -177,6 +185,7 @@ class DataFlow(StateElement):
             raise ValueError("from_key must be of type int")
 
         self._change_property_with_validity_check('_from_key', from_key)
+        self._reset_parent_data_flow_routes()
 
     @lock_state_machine
     @Observable.observed
@@ -202,6 +211,7 @@ class DataFlow(StateElement):
             self._to_state = old_to_state
             self._to_key = old_to_key
             raise ValueError("The data flow target could not be changed: {0}".format(message))
+        self._reset_parent_data_flow_routes()
 
     @property
     def to_state(self):
@@ -217,6 +227,7 @@ class DataFlow(StateElement):
             raise ValueError("to_state must be a string")
 
         self._change_property_with_validity_check('_to_state', to_state)
+        self._reset_parent_data_flow_routes()
 
     @property
     def to_key(self):
@@ -232,6 +243,7 @@ class DataFlow(StateElement):
             raise ValueError("to_key must be of type int")
 
         self._change_property_with_validity_check('_to_key', to_key)
+        self._reset_parent_data_flow_routes()
 
     @property
     def data_flow_id(self):
@@ -103,6 +103,12 @@ class Transition(StateElement):
             'to_outcome': state_element.to_outcome
         }
 
+    def _reset_parent_transition_index(self):
+        """Informs the parent about a changed origin of the transition"""
+        parent = self.parent
+        if parent is not None:
+            parent.reset_transition_index()
+
 #########################################################################
 # Properties for all class field that must be observed by the gtkmvc3
 #########################################################################
@@ -132,6 +138,7 @@ class Transition(StateElement):
             self._from_state = old_from_state
             self._from_outcome = old_from_outcome
             raise ValueError("The transition origin could not be changed: {0}".format(message))
+        self._reset_parent_transition_index()
 
     @lock_state_machine
     @Observable.observed
@@ -175,6 +182,7 @@ class Transition(StateElement):
             raise ValueError("from_state must be a string")
 
         self._change_property_with_validity_check('_from_state', from_state)
+        self._reset_parent_transition_index()
 
     @property
     def from_outcome(self):
@@ -191,6 +199,7 @@ class Transition(StateElement):
             raise ValueError("from_outcome must be of type int")
 
         self._change_property_with_validity_check('_from_outcome', from_outcome)
+        self._reset_parent_transition_index()
 
     @property
     def to_state(self):
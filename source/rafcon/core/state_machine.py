@@ -36,6 +36,7 @@ import rafcon
 from rafcon.core.execution.execution_history import ExecutionHistory, ExecutionHistoryStorage
 from rafcon.core.id_generator import generate_state_machine_id, run_id_generator
 from rafcon.utils import log
+from rafcon.utils.binary_execution_log import FILE_EXTENSION as BINARY_LOG_FILE_EXTENSION
 from rafcon.utils.hashable import Hashable
 from rafcon.utils.storage_utils import get_current_time_string
 import time
@@ -55,10 +56,13 @@ class StateMachine(Observable, JSONObject, Hashable):
     :ivar int StateMachine.state_machine_id: the id of the state machine
     :ivar rafcon.core.states.state StateMachine.root_state: the root state of the state machine
     :ivar str StateMachine.base_path: the path, where to save the state machine
+    :ivar rafcon.core.execution.execution_handle.ExecutionHandle StateMachine.execution_handle: the handle of the
+        last execution started by the execution engine
     """
 
     state_machine_id = None
     version = None
+    execution_handle = None
 
     old_marked_dirty = True
 
@@ -135,16 +139,37 @@ class StateMachine(Observable, JSONObject, Hashable):
         }
         return dict_representation
 
-    def start(self):
+    def start(self, input_data=None):
         """Starts the execution of the root state.
+
+        :param dict input_data: values for the input data ports of the root state by their names, replacing the
+            default values
+        :raises ValueError: if the input data contains names that are no input data ports of the root state
         """
+        self.check_input_data(input_data)
         # load default input data for the state
         self._root_state.input_data = self._root_state.get_default_input_values_for_state(self._root_state)
+        if input_data:
+            self._root_state.input_data.update(input_data)
         self._root_state.output_data = self._root_state.create_output_dictionary_for_state(self._root_state)
         new_execution_history = self._add_new_execution_history()
         new_execution_history.push_state_machine_start_history_item(self, run_id_generator())
         self._root_state.start(new_execution_history)
 
+    def check_input_data(self, input_data):
+        """Checks that the given input data only contains names of input data ports of the root state
+
+        :param dict input_data: values for the input data ports of the root state by their names
+        :raises ValueError: if the input data contains names that are no input data ports of the root state
+        """
+        if not input_data:
+            return
+        port_names = set(port.name for port in self._root_state.input_data_ports.values())
+        unknown_names = [name for name in input_data if name not in port_names]
+        if unknown_names:
+            raise ValueError("The root state '{0}' has no input data ports named {1}".format(
+                self._root_state.name, ", ".join(sorted("'{0}'".format(name) for name in unknown_names))))
+
     def join(self):
         """Wait for root state to finish execution"""
         self._root_state.join()
@@ -230,10 +255,14 @@ class StateMachine(Observable, JSONObject, Hashable):
                 base_dir = base_dir.replace('%RAFCON_TEMP_PATH_BASE', RAFCON_TEMP_PATH_BASE)
             if not os.path.exists(base_dir):
                 os.makedirs(base_dir)
-            shelve_name = os.path.join(base_dir, '%s_rafcon_execution_log_%s.shelve' %
-                                       (time.strftime('%Y-%m-%d-%H:%M:%S', time.localtime()),
-                                        self.root_state.name.replace(' ', '-')))
-            execution_history_store = ExecutionHistoryStorage(shelve_name)
+            binary = global_config.get_config_value("EXECUTION_LOG_FORMAT", "SHELVE") == "BINARY"
+            log_name = os.path.join(base_dir, '%s_rafcon_execution_log_%s.%s' %
+                                    (time.strftime('%Y-%m-%d-%H:%M:%S', time.localtime()),
+                                     self.root_state.name.replace(' ', '-'),
+                                     BINARY_LOG_FILE_EXTENSION if binary else 'shelve'))
+            execution_history_store = ExecutionHistoryStorage(
+                log_name, asynchronous=global_config.get_config_value("EXECUTION_LOG_ASYNCHRONOUS", True),
+                binary=binary)
             new_execution_history.set_execution_history_storage(execution_history_store)
         self._execution_histories.append(new_execution_history)
         return new_execution_history
@@ -24,6 +24,7 @@ from gtkmvc3.observable import Observable
 from rafcon.core.state_machine import StateMachine
 
 from rafcon.utils import log
+from rafcon.utils import storage_utils
 logger = log.get_logger(__name__)
 
 
@@ -123,6 +124,9 @@ class StateMachineManager(Observable):
 
         # destroy execution history
         removed_state_machine.destroy_execution_histories()
+        # the digests of the saved files are no longer needed
+        if removed_state_machine.file_system_path:
+            storage_utils.forget_written_files(removed_state_machine.file_system_path)
         return removed_state_machine
 
     def get_active_state_machine(self):
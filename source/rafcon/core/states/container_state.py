@@ -27,6 +27,7 @@ from threading import Condition
 from gtkmvc3.observable import Observable
 
 from rafcon.core.custom_exceptions import RecoveryModeException
+from rafcon.core.data_passing import get_data_passing_policy, pass_value
 from rafcon.core.decorators import lock_state_machine
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
 from rafcon.core.id_generator import *
@@ -75,7 +76,11 @@ class ContainerState(State):
 
         self._states = OrderedDict()
         self._transitions = {}
+        # index of the transitions by their origin (from_state, from_outcome), None if it has to be rebuilt
+        self._transitions_by_origin = None
         self._data_flows = {}
+        # routing tables of the data flows by target and by source port, None if they have to be rebuilt
+        self._data_flow_routes = None
         self._scoped_variables = {}
         self._scoped_data = {}
         self._current_state = None
@@ -1211,6 +1216,7 @@ class ContainerState(State):
         else:
             self.transitions[transition_id] = \
                 Transition(None, None, to_state_id, to_outcome, transition_id, self)
+        self.reset_transition_index()
 
         # notify all states waiting for transition to be connected
         self._transitions_cv.acquire()
@@ -1242,6 +1248,8 @@ class ContainerState(State):
 
         new_transition = Transition(from_state_id, from_outcome, to_state_id, to_outcome, transition_id, self)
         self.transitions[transition_id] = new_transition
+        if self._transitions_by_origin is not None:
+            self._transitions_by_origin[(from_state_id, from_outcome)] = new_transition
 
         # notify all states waiting for transition to be connected
         self._transitions_cv.acquire()
@@ -1262,11 +1270,29 @@ class ContainerState(State):
             raise TypeError("state must be of type State")
         if not isinstance(outcome, Outcome):
             raise TypeError("outcome must be of type Outcome")
-        result_transition = None
-        for key, transition in self.transitions.items():
-            if transition.from_state == state.state_id and transition.from_outcome == outcome.outcome_id:
-                result_transition = transition
-        return result_transition
+        return self.get_transitions_by_origin().get((state.state_id, outcome.outcome_id))
+
+    def get_transitions_by_origin(self):
+        """Returns the transitions of the container state indexed by their origin
+
+        The index is built on first access and kept in sync with the transitions afterwards.
+
+        :return: dict mapping (from_state, from_outcome) to the respective transition
+        :rtype: dict
+        """
+        transitions_by_origin = self._transitions_by_origin
+        if transitions_by_origin is None:
+            transitions_by_origin = {(transition.from_state, transition.from_outcome): transition
+                                     for transition in self._transitions.values()}
+            self._transitions_by_origin = transitions_by_origin
+        return transitions_by_origin
+
+    def reset_transition_index(self):
+        """Marks the index of transitions by origin as outdated, thus it is rebuilt on next access
+
+        Needs to be called if the origin of a transition is changed.
+        """
+        self._transitions_by_origin = None
 
     @lock_state_machine
     @Observable.observed
@@ -1282,7 +1308,12 @@ class ContainerState(State):
             raise AttributeError("The transition_id %s does not exist" % str(transition_id))
 
         self.transitions[transition_id].parent = None
-        return self.transitions.pop(transition_id)
+        transition = self.transitions.pop(transition_id)
+        if self._transitions_by_origin is not None:
+            origin = (transition.from_state, transition.from_outcome)
+            if self._transitions_by_origin.get(origin) is transition:
+                del self._transitions_by_origin[origin]
+        return transition
 
     @lock_state_machine
     def remove_outcome_hook(self, outcome_id):
@@ -1333,6 +1364,7 @@ class ContainerState(State):
 
         self.data_flows[data_flow_id] = DataFlow(from_state_id, from_data_port_id, to_state_id, to_data_port_id,
                                                  data_flow_id, self)
+        self._data_flow_routes = None
         return data_flow_id
 
     @lock_state_machine
@@ -1347,8 +1379,56 @@ class ContainerState(State):
             raise AttributeError("The data_flow_id %s does not exist" % str(data_flow_id))
 
         self._data_flows[data_flow_id].parent = None
+        self._data_flow_routes = None
         return self._data_flows.pop(data_flow_id)
 
+    def get_data_flow_routes(self):
+        """Returns the routing tables of the data flows of the container state
+
+        The first table maps the target port (to_state, to_key) of data flows to the scoped data keys and state ids
+        (scoped_data_key, from_state) of all connected source ports. The second table maps the source port
+        (from_state, from_key) to all connected target ports (to_state, to_key). The tables are built on first access
+        and rebuilt after changes of the data flows.
+
+        :return: the routing tables by target and by source
+        :rtype: tuple(dict, dict)
+        """
+        data_flow_routes = self._data_flow_routes
+        if data_flow_routes is None:
+            routes_by_target = {}
+            routes_by_source = {}
+            for data_flow in self._data_flows.values():
+                routes_by_target.setdefault((data_flow.to_state, data_flow.to_key), []).append(
+                    (str(data_flow.from_key) + data_flow.from_state, data_flow.from_state))
+                routes_by_source.setdefault((data_flow.from_state, data_flow.from_key), []).append(
+                    (data_flow.to_state, data_flow.to_key))
+            data_flow_routes = routes_by_target, routes_by_source
+            self._data_flow_routes = data_flow_routes
+        return data_flow_routes
+
+    def reset_data_flow_routes(self):
+        """Marks the data flow routing tables as outdated, thus they are rebuilt on next access
+
+        Needs to be called if the origin or target of a data flow is changed.
+        """
+        self._data_flow_routes = None
+
+    def _get_newest_scoped_data(self, sources):
+        """Determines the most current scoped data of several sources
+
+        :param list sources: the sources as (scoped_data_key, from_state) tuples, as found in the data flow routes
+        :return: the most current scoped data or None if no source has written any data
+        :rtype: rafcon.core.state_elements.scope.ScopedData
+        """
+        newest_scoped_data = None
+        for key, _ in sources:
+            scoped_data = self.scoped_data.get(key)
+            if scoped_data is not None:
+                if newest_scoped_data is None or newest_scoped_data.value is None or \
+                        newest_scoped_data.timestamp < scoped_data.timestamp:
+                    newest_scoped_data = scoped_data
+        return newest_scoped_data
+
     @lock_state_machine
     def remove_data_flows_with_data_port_id(self, data_port_id):
         """Remove an data ports whose from_key or to_key equals the passed data_port_id
@@ -1509,23 +1589,16 @@ class ContainerState(State):
         tmp_dict = self.get_default_input_values_for_state(state)
         result_dict.update(tmp_dict)
 
+        routes_by_target = self.get_data_flow_routes()[0]
+        data_passing_policy = get_data_passing_policy()
         for input_port_key, value in state.input_data_ports.items():
-            # for all input keys fetch the correct data_flow connection and read data into the result_dict
-            actual_value = None
-            actual_value_time = 0
-            for data_flow_key, data_flow in self.data_flows.items():
-
-                if data_flow.to_key == input_port_key:
-                    if data_flow.to_state == state.state_id:
-                        # fetch data from the scoped_data list: the key is the data_port_key + the state_id
-                        key = str(data_flow.from_key) + data_flow.from_state
-                        if key in self.scoped_data:
-                            if actual_value is None or actual_value_time < self.scoped_data[key].timestamp:
-                                actual_value = deepcopy(self.scoped_data[key].value)
-                                actual_value_time = self.scoped_data[key].timestamp
-
-            if actual_value is not None:
-                result_dict[value.name] = actual_value
+            # for all input keys fetch the connected data_flow sources and read the newest data into the result_dict
+            sources = routes_by_target.get((state.state_id, input_port_key))
+            if not sources:
+                continue
+            newest_scoped_data = self._get_newest_scoped_data(sources)
+            if newest_scoped_data is not None and newest_scoped_data.value is not None:
+                result_dict[value.name] = pass_value(newest_scoped_data.value, data_passing_policy)
 
         return result_dict
 
@@ -1543,19 +1616,19 @@ class ContainerState(State):
         :param dictionary: The dictionary that is added to the scoped data
         :param state: The state to which the input_data was passed (should be self in most cases)
         """
+        routes_by_source = self.get_data_flow_routes()[1]
         for dict_key, value in dictionary.items():
             for input_data_port_key, data_port in list(self.input_data_ports.items()):
                 if dict_key == data_port.name:
                     self.scoped_data[str(input_data_port_key) + self.state_id] = \
                         ScopedData(data_port.name, value, type(value), self.state_id, ScopedVariable, parent=self)
                     # forward the data to scoped variables
-                    for data_flow_key, data_flow in self.data_flows.items():
-                        if data_flow.from_key == input_data_port_key and data_flow.from_state == self.state_id:
-                            if data_flow.to_state == self.state_id and data_flow.to_key in self.scoped_variables:
-                                current_scoped_variable = self.scoped_variables[data_flow.to_key]
-                                self.scoped_data[str(data_flow.to_key) + self.state_id] = \
-                                    ScopedData(current_scoped_variable.name, value, type(value), self.state_id,
-                                               ScopedVariable, parent=self)
+                    for to_state, to_key in routes_by_source.get((self.state_id, input_data_port_key), ()):
+                        if to_state == self.state_id and to_key in self.scoped_variables:
+                            current_scoped_variable = self.scoped_variables[to_key]
+                            self.scoped_data[str(to_key) + self.state_id] = \
+                                ScopedData(current_scoped_variable.name, value, type(value), self.state_id,
+                                           ScopedVariable, parent=self)
 
     @lock_state_machine
     def add_state_execution_output_to_scoped_data(self, dictionary, state):
@@ -1593,6 +1666,7 @@ class ContainerState(State):
         :param: the dictionary to update the scoped variables with
         :param: the state the output dictionary belongs to
         """
+        routes_by_source = self.get_data_flow_routes()[1]
         for key, value in dictionary.items():
             output_data_port_key = None
             # search for the correct output data port key of the source state
@@ -1604,14 +1678,13 @@ class ContainerState(State):
                 if not key == "error":
                     logger.warning("Output variable %s was written during state execution, "
                                    "that has no data port connected to it.", str(key))
-            for data_flow_key, data_flow in self.data_flows.items():
-                if data_flow.from_key == output_data_port_key and data_flow.from_state == state.state_id:
-                    if data_flow.to_state == self.state_id:  # is target of data flow own state id?
-                        if data_flow.to_key in self.scoped_variables.keys():  # is target data port scoped?
-                            current_scoped_variable = self.scoped_variables[data_flow.to_key]
-                            self.scoped_data[str(data_flow.to_key) + self.state_id] = \
-                                ScopedData(current_scoped_variable.name, value, type(value), state.state_id,
-                                           ScopedVariable, parent=self)
+            for to_state, to_key in routes_by_source.get((state.state_id, output_data_port_key), ()):
+                if to_state == self.state_id:  # is target of data flow own state id?
+                    if to_key in self.scoped_variables:  # is target data port scoped?
+                        current_scoped_variable = self.scoped_variables[to_key]
+                        self.scoped_data[str(to_key) + self.state_id] = \
+                            ScopedData(current_scoped_variable.name, value, type(value), state.state_id,
+                                       ScopedVariable, parent=self)
 
     # ---------------------------------------------------------------------------------------------
     # ------------------------ functions to modify the scoped data end ----------------------------
@@ -1634,6 +1707,7 @@ class ContainerState(State):
                 transition._from_state = self.state_id
             if transition.to_state == old_state_id:
                 transition._to_state = self.state_id
+        self.reset_transition_index()
 
         # change id in all data_flows
         for data_flow in self.data_flows.values():
@@ -1641,6 +1715,7 @@ class ContainerState(State):
                 data_flow._from_state = self.state_id
             if data_flow.to_state == old_state_id:
                 data_flow._to_state = self.state_id
+        self.reset_data_flow_routes()
 
     def get_state_for_transition(self, transition):
         """Calculate the target state of a transition
@@ -1668,32 +1743,26 @@ class ContainerState(State):
         else:
             output_dict = self.output_data
 
+        routes_by_target = self.get_data_flow_routes()[0]
+        data_passing_policy = get_data_passing_policy()
         for output_name, value in self.output_data.items():
             output_port_id = self.get_io_data_port_id_from_name_and_type(output_name, OutputDataPort)
-            actual_value = None
-            actual_value_was_written = False
-            actual_value_time = 0
-            for data_flow_id, data_flow in self.data_flows.items():
-                if data_flow.to_state == self.state_id:
-                    if data_flow.to_key == output_port_id:
-                        scoped_data_key = str(data_flow.from_key) + data_flow.from_state
-                        if scoped_data_key in self.scoped_data:
-                            # if self.scoped_data[scoped_data_key].timestamp > actual_value_time is True
-                            # the data of a previous execution of the same state is overwritten
-                            if actual_value is None or self.scoped_data[scoped_data_key].timestamp > actual_value_time:
-                                actual_value = deepcopy(self.scoped_data[scoped_data_key].value)
-                                actual_value_time = self.scoped_data[scoped_data_key].timestamp
-                                actual_value_was_written = True
-                        else:
-                            if not self.backward_execution:
-                                logger.debug(
-                                    "Output data with name {0} of state {1} was not found in the scoped data "
-                                    "of state {2}. Thus the state did not write onto this output. "
-                                    "This can mean a state machine design error.".format(
-                                        str(output_name), str(self.states[data_flow.from_state].get_path()),
-                                        self.get_path()))
-            if actual_value_was_written:
-                output_dict[output_name] = actual_value
+            sources = routes_by_target.get((self.state_id, output_port_id))
+            if not sources:
+                continue
+            if not self.backward_execution:
+                for scoped_data_key, data_flow_from_state in sources:
+                    if scoped_data_key not in self.scoped_data:
+                        logger.debug(
+                            "Output data with name {0} of state {1} was not found in the scoped data "
+                            "of state {2}. Thus the state did not write onto this output. "
+                            "This can mean a state machine design error.".format(
+                                str(output_name), str(self.states[data_flow_from_state].get_path()),
+                                self.get_path()))
+            # if a newer scoped data is found, the data of a previous execution of the same state is overwritten
+            newest_scoped_data = self._get_newest_scoped_data(sources)
+            if newest_scoped_data is not None:
+                output_dict[output_name] = pass_value(newest_scoped_data.value, data_passing_policy)
 
     # ---------------------------------------------------------------------------------------------
     # -------------------------------------- check methods ---------------------------------------
@@ -2159,6 +2228,7 @@ class ContainerState(State):
 
         old_transitions = self._transitions
         self._transitions = transitions
+        self._transitions_by_origin = None
         transition_ids_to_delete = []
         for transition_id, transition in transitions.items():
             try:
@@ -2174,6 +2244,7 @@ class ContainerState(State):
 
         self._transitions = dict((transition_id, t) for (transition_id, t) in self._transitions.items()
                                  if transition_id not in transition_ids_to_delete)
+        self._transitions_by_origin = None
 
         # check that all old_transitions are no more referencing self as there parent
         for old_transition in old_transitions.values():
@@ -2216,6 +2287,7 @@ class ContainerState(State):
 
         old_data_flows = self._data_flows
         self._data_flows = data_flows
+        self._data_flow_routes = None
         data_flow_ids_to_delete = []
         for data_flow_id, data_flow in data_flows.items():
             try:
@@ -2231,6 +2303,7 @@ class ContainerState(State):
 
         self._data_flows = dict((data_flow_id, d) for (data_flow_id, d) in self._data_flows.items()
                                 if data_flow_id not in data_flow_ids_to_delete)
+        self._data_flow_routes = None
 
         # check that all old_data_flows are no more referencing self as there parent
         for old_data_flow in old_data_flows.values():
@@ -183,7 +183,7 @@ class HierarchyState(ContainerState):
             self.execution_history.push_call_history_item(
                 self.child_state, CallType.EXECUTE, self, self.child_state.input_data)
         self.child_state.start(self.execution_history, backward_execution=self.backward_execution,
-                               generate_run_id=False)
+                               generate_run_id=False, inline=True)
 
         self.child_state.join()
 
@@ -19,11 +19,13 @@
 """
 from future.utils import string_types
 from builtins import str
+import threading
 from copy import copy, deepcopy
 
 from gtkmvc3.observable import Observable
 from rafcon.core.states.state import StateExecutionStatus
 from rafcon.core.singleton import library_manager
+from rafcon.core.config import global_config
 from rafcon.core.states.state import State, PATH_SEPARATOR
 from rafcon.core.decorators import lock_state_machine
 from rafcon.utils import log
@@ -51,6 +53,14 @@ class LibraryState(State):
     :ivar dict output_data_port_runtime_values: a dict to store all the runtime values for the output data ports
     :ivar dict use_runtime_value_output_data_ports: flags to indicate if the runtime or the default value should be used
                                                     for a specific output data port
+
+    All library states of a library share the root state of the loaded library as template. The own copy of the library
+    root state (`state_copy`) is only created, when it is accessed for the first time, e.g. when the library state is
+    executed or its content is inspected or edited.
+
+    If `LIBRARY_LAZY_LOADING` is enabled, the library is not even loaded when the library state is created. Only the
+    root state of the library without child states is loaded to provide the interface (outcomes and data ports). The
+    library is then loaded together with the state copy, see also :meth:`preload`.
     """
 
     yaml_tag = u'!LibraryState'
@@ -59,6 +69,8 @@ class LibraryState(State):
     _library_name = None
     _version = None
     _state_copy = None
+    _library_template = None
+    _library_interface = None
 
     _input_data_port_runtime_values = {}
     _use_runtime_value_input_data_ports = {}
@@ -76,6 +88,8 @@ class LibraryState(State):
         # this variable is set to true if the state initialization is finished! after initialization no change to the
         # library state is allowed any more
         self.initialized = False
+        # guards the creation of the state copy, which can be triggered from several threads
+        self._state_copy_lock = threading.RLock()
         State.__init__(self, name, state_id, None, None, income, outcomes)
 
         self.library_path = library_path
@@ -94,22 +108,26 @@ class LibraryState(State):
             logger.info("Old library name '{0}' was located at {1}".format(library_name, library_path))
             logger.info("New library name '{0}' is located at {1}".format(new_library_name, new_library_path))
 
-        # key = load_library_root_state_timer.start()
-        lib_version, state_copy = library_manager.get_library_state_copy_instance(self.lib_os_path)
-        self.state_copy = state_copy
-        # load_library_root_state_timer.stop(key)
-        self.state_copy.parent = self
+        if global_config.get_config_value("LIBRARY_LAZY_LOADING", False):
+            lib_version, library_root_state = library_manager.get_library_interface(self.lib_os_path)
+            self._library_interface = library_root_state
+        else:
+            library_state_machine = library_manager.get_library_template(self.lib_os_path)
+            lib_version, library_root_state = library_state_machine.version, library_state_machine.root_state
+            self._library_template = library_root_state
         if not str(lib_version) == version and not str(lib_version) == "None":
             raise AttributeError("Library does not have the correct version!")
 
         if name is None:
-            self.name = self.state_copy.name
+            self.name = library_root_state.name
 
-        # copy all ports and outcomes of self.state_copy to let the library state appear like the container state
-        # this will also set the parent of all outcomes and data ports to self
-        self.outcomes = self.state_copy.outcomes
-        self.input_data_ports = self.state_copy.input_data_ports
-        self.output_data_ports = self.state_copy.output_data_ports
+        # copy all ports and outcomes of the library root state to let the library state appear like the container
+        # state, this will also set the parent of all outcomes and data ports to self
+        self.outcomes = {outcome_id: copy(outcome) for outcome_id, outcome in library_root_state.outcomes.items()}
+        self.input_data_ports = {data_port_id: copy(data_port) for data_port_id, data_port
+                                 in library_root_state.input_data_ports.items()}
+        self.output_data_ports = {data_port_id: copy(data_port) for data_port_id, data_port
+                                  in library_root_state.output_data_ports.items()}
 
         # handle input runtime values
         self.input_data_port_runtime_values = input_data_port_runtime_values
@@ -176,7 +194,7 @@ class LibraryState(State):
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
-        return str(self) == str(other) and self._state_copy == other.state_copy
+        return str(self) == str(other) and self._get_library_root_state() == other._get_library_root_state()
 
     def __copy__(self):
         income = self._income
@@ -201,11 +219,13 @@ class LibraryState(State):
     def destroy(self, recursive=True):
         super(LibraryState, self).destroy(recursive)
         if recursive:
-            if self.state_copy:
-                self.state_copy.destroy(recursive)
-            else:
+            if self._state_copy is not None:
+                self._state_copy.destroy(recursive)
+            elif self._library_template is None and self._library_interface is None:
                 logger.verbose("Multiple calls of destroy {0}".format(self))
             self._state_copy = None
+            self._library_template = None
+            self._library_interface = None
 
     def run(self):
         """ This defines the sequence of actions that are taken when the library state is executed
@@ -230,19 +250,25 @@ class LibraryState(State):
         """Preempt the state and all of it child states.
         """
         super(LibraryState, self).recursively_preempt_states()
-        self.state_copy.recursively_preempt_states()
+        # without state copy, the library state was never executed
+        if self._state_copy is not None:
+            self._state_copy.recursively_preempt_states()
 
     def recursively_pause_states(self):
         """Pause the state and all of it child states.
         """
         super(LibraryState, self).recursively_pause_states()
-        self.state_copy.recursively_pause_states()
+        # without state copy, the library state was never executed
+        if self._state_copy is not None:
+            self._state_copy.recursively_pause_states()
 
     def recursively_resume_states(self):
         """Resume the state and all of it child states.
         """
         super(LibraryState, self).recursively_resume_states()
-        self.state_copy.recursively_resume_states()
+        # without state copy, the library state was never executed
+        if self._state_copy is not None:
+            self._state_copy.recursively_resume_states()
 
     @lock_state_machine
     def add_outcome(self, name, outcome_id=None):
@@ -322,7 +348,7 @@ class LibraryState(State):
     @lock_state_machine
     @Observable.observed
     def set_input_runtime_value(self, input_data_port_id, value):
-        checked_value = self.state_copy.input_data_ports[input_data_port_id].check_default_value(value)
+        checked_value = self.input_data_ports[input_data_port_id].check_default_value(value)
         self._input_data_port_runtime_values[input_data_port_id] = checked_value
 
     @lock_state_machine
@@ -333,7 +359,7 @@ class LibraryState(State):
     @lock_state_machine
     @Observable.observed
     def set_output_runtime_value(self, output_data_port_id, value):
-        checked_value = self.state_copy.output_data_ports[output_data_port_id].check_default_value(value)
+        checked_value = self.output_data_ports[output_data_port_id].check_default_value(value)
         self._output_data_port_runtime_values[output_data_port_id] = checked_value
 
     @lock_state_machine
@@ -376,7 +402,7 @@ class LibraryState(State):
 
     def update_hash(self, obj_hash):
         super(LibraryState, self).update_hash(obj_hash)
-        self.state_copy.update_hash(obj_hash)
+        self._get_library_root_state().update_hash(obj_hash)
 
     @staticmethod
     def state_to_dict(state):
@@ -397,16 +423,42 @@ class LibraryState(State):
     def get_states_statistics(self, hierarchy_level):
         """
         Returns the numer of child states. As per default states do not have child states return 1.
+        Library states, whose library is not loaded yet, are counted as single state.
         :return:
         """
-        return self.state_copy.get_states_statistics(hierarchy_level)
+        if not self.is_library_loaded():
+            return State.get_states_statistics(self, hierarchy_level)
+        return self._get_library_root_state().get_states_statistics(hierarchy_level)
 
     def get_number_of_transitions(self):
         """
         Return the number of transitions for a state. Per default states do not have transitions.
         :return:
         """
-        return self.state_copy.get_number_of_transitions()
+        if not self.is_library_loaded():
+            return 0
+        return self._get_library_root_state().get_number_of_transitions()
+
+    def is_library_loaded(self):
+        """Checks whether the library of the library state is loaded
+
+        This is only not the case, if `LIBRARY_LAZY_LOADING` is enabled and neither the state copy was accessed nor
+        :meth:`preload` was called.
+
+        :rtype: bool
+        """
+        return self._library_template is not None or self._state_copy is not None
+
+    def preload(self, recursive=True):
+        """Loads the library and creates the state copy
+
+        Allows to avoid the delay of loading the library when the library state is executed the first time.
+
+        :param bool recursive: Whether to also preload all library states within the library
+        """
+        state_copy = self.state_copy
+        if recursive:
+            preload_library_states(state_copy)
 
     #########################################################################
     # Properties for all class fields that must be observed by gtkmvc3
@@ -460,11 +512,39 @@ class LibraryState(State):
 
         self._version = str(version)
 
+    def _get_library_template(self):
+        if self._library_template is None and self._library_interface is not None:
+            self._library_template = library_manager.get_library_template(self.lib_os_path).root_state
+        return self._library_template
+
+    def _create_state_copy(self):
+        state_copy = deepcopy(self._library_template)
+        # the library state and its state copy share their outcomes and data ports
+        state_copy._outcomes = self._outcomes
+        state_copy._input_data_ports = self._input_data_ports
+        state_copy._output_data_ports = self._output_data_ports
+        state_copy.parent = self
+        self._state_copy = state_copy
+
+    def _get_library_root_state(self):
+        """Returns the state copy, if already created, otherwise the shared library template
+
+        Used for read-only access to the content of the library, without creating a state copy.
+        """
+        if self._state_copy is not None:
+            return self._state_copy
+        return self._get_library_template()
+
     @property
     def state_copy(self):
         """Property for the _state_copy field
 
+        The state copy is created from the library template on first access.
         """
+        if self._state_copy is None:
+            with self._state_copy_lock:
+                if self._state_copy is None and self._get_library_template() is not None:
+                    self._create_state_copy()
         return self._state_copy
 
     @state_copy.setter
@@ -578,3 +658,20 @@ class LibraryState(State):
             current_library_hierarchy_depth += 1
             library_root_state = library_root_state.parent.get_next_upper_library_root_state()
         return current_library_hierarchy_depth
+
+
+def preload_library_states(state):
+    """Loads the libraries of all library states within a state
+
+    Library states created with enabled `LIBRARY_LAZY_LOADING` only load their library when their content is accessed
+    for the first time. This function can be used to load all libraries of e.g. a state machine before its execution.
+
+    :param rafcon.core.states.state.State state: The state, whose library states are to be loaded
+    """
+    states = [state]
+    while states:
+        state = states.pop()
+        if isinstance(state, LibraryState):
+            states.append(state.state_copy)
+        elif hasattr(state, 'states'):
+            states.extend(state.states.values())
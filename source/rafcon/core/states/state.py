@@ -37,6 +37,7 @@ from gtkmvc3.observable import Observable
 from jsonconversion.jsonobject import JSONObject
 from yaml import YAMLObject
 
+from rafcon.core.execution.notification_coalescer import observed_during_execution
 from rafcon.core.id_generator import *
 from rafcon.core.state_elements.state_element import StateElement
 from rafcon.core.state_elements.data_port import DataPort, InputDataPort, OutputDataPort
@@ -244,16 +245,21 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
     # ---------------------------------------------------------------------------------------------
 
     # give the state the appearance of a thread that can be started several times
-    def start(self, execution_history, backward_execution=False, generate_run_id=True):
+    def start(self, execution_history, backward_execution=False, generate_run_id=True, inline=False):
         """ Starts the execution of the state in a new thread.
 
+        The thread is provided by the state executor of the execution engine, which can also reuse pooled threads.
+
+        :param bool inline: if True and the state executor is in INLINE mode, the state is executed in the calling
+            thread and this method only returns when the execution is finished
         :return:
         """
+        from rafcon.core.singleton import state_machine_execution_engine
         self.execution_history = execution_history
         if generate_run_id:
             self._run_id = run_id_generator()
         self.backward_execution = copy.copy(backward_execution)
-        self.thread = threading.Thread(target=self.run)
+        self.thread = state_machine_execution_engine.state_executor.create_handle(self.run, self.name, inline)
         self.thread.start()
 
     def generate_run_id(self):
@@ -1395,7 +1401,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
 
     @state_execution_status.setter
     @lock_state_machine
-    @Observable.observed
+    @observed_during_execution
     def state_execution_status(self, state_execution_status):
         if not isinstance(state_execution_status, StateExecutionStatus):
             raise TypeError("state_execution_status must be of type StateExecutionStatus")
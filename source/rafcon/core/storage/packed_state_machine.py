@@ -0,0 +1,235 @@
+# Copyright (C) 2015-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Franz Steinmetz <franz.steinmetz@dlr.de>
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: packed_state_machine
+   :synopsis: A single-file storage format for state machines
+
+A packed state machine is a zip file with the extension :data:`FILE_EXTENSION`. It holds all files of a state machine
+stored in the directory format (statemachine.json and the core data, script, semantic data and meta data files of all
+states) under their paths relative to the state machine directory. The central directory of the zip file serves as
+index, allowing random access to the files of single states.
+
+Files within a packed state machine are addressed by appending their relative path to the path of the packed state
+machine, e.g. `/path/to/state_machine.rafcon/ROOT_STATE/core_data.json`.
+"""
+from builtins import object
+from builtins import range
+import argparse
+import errno
+import io
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+FILE_EXTENSION = 'rafcon'
+#: The number of packed state machines kept in memory by :func:`get_packed_state_machine`
+CACHE_SIZE = 4
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def is_packed_state_machine_path(path):
+    """Checks whether the path refers to a packed state machine
+
+    An existing path is a packed state machine, if it is a zip file. A path not existing yet, e.g. the target of a
+    save operation, is one, if it has the extension of packed state machines.
+
+    :param str path: the path to check
+    :rtype: bool
+    """
+    if os.path.exists(path):
+        return os.path.isfile(path) and zipfile.is_zipfile(path)
+    return path.endswith('.' + FILE_EXTENSION)
+
+
+def split_path(path):
+    """Splits a path pointing into a packed state machine
+
+    :param str path: the path
+    :return: the path of the packed state machine and the path of the file relative to it or None if the path does not
+        point into an existing packed state machine
+    :rtype: tuple
+    """
+    marker = '.' + FILE_EXTENSION
+    if path.endswith(marker):
+        filename, member_path = path, ''
+    else:
+        index = path.find(marker + os.sep)
+        if index < 0:
+            return None
+        filename, member_path = path[:index + len(marker)], path[index + len(marker) + 1:]
+    if not os.path.isfile(filename):
+        return None
+    return filename, member_path
+
+
+class PackedStateMachine(object):
+    """Read access to the files of a packed state machine
+
+    The file is read at once with a single sequential read. The methods accept full paths, i.e. the path of the
+    packed state machine followed by the relative path of the file, and mimic the functions of :mod:`os` resp.
+    :mod:`os.path`.
+
+    :ivar filename: the path of the packed state machine
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+        with open(filename, 'rb') as packed_file:
+            self._zip_file = zipfile.ZipFile(io.BytesIO(packed_file.read()))
+        self._files = set()
+        self._directories = {'': set()}
+        for name in self._zip_file.namelist():
+            if name.endswith('/'):
+                name = name.rstrip('/')
+                self._directories.setdefault(name, set())
+            else:
+                self._files.add(name)
+            parts = name.split('/')
+            for index in range(len(parts)):
+                self._directories.setdefault('/'.join(parts[:index]), set()).add(parts[index])
+
+    def _get_member_name(self, path):
+        if path == self.filename:
+            return ''
+        if not path.startswith(self.filename + os.sep):
+            raise ValueError("{0} is not located in the packed state machine {1}".format(path, self.filename))
+        return path[len(self.filename) + 1:].rstrip(os.sep).replace(os.sep, '/')
+
+    def exists(self, path):
+        member_name = self._get_member_name(path)
+        return member_name in self._files or member_name in self._directories
+
+    def isdir(self, path):
+        return self._get_member_name(path) in self._directories
+
+    def isfile(self, path):
+        return self._get_member_name(path) in self._files
+
+    def listdir(self, path):
+        member_name = self._get_member_name(path)
+        if member_name not in self._directories:
+            raise OSError(errno.ENOENT, "No such directory in packed state machine", path)
+        return list(self._directories[member_name])
+
+    def get_file_paths(self):
+        """Returns the paths of all files in the packed state machine"""
+        return [os.path.join(self.filename, *name.split('/')) for name in sorted(self._files)]
+
+    def read(self, path):
+        """Returns the content of a file
+
+        :param str path: the path of the file
+        :rtype: bytes
+        :raises IOError: if the file does not exist
+        """
+        member_name = self._get_member_name(path)
+        if member_name not in self._files:
+            raise IOError(errno.ENOENT, "No such file in packed state machine", path)
+        with self._lock:
+            return self._zip_file.read(member_name)
+
+    def read_text(self, path):
+        return self.read(path).decode('utf-8')
+
+    def close(self):
+        self._zip_file.close()
+
+
+def get_packed_state_machine(filename):
+    """Returns the opened packed state machine
+
+    The last :data:`CACHE_SIZE` packed state machines are cached, as long as their files are not modified.
+
+    :param str filename: the path of the packed state machine
+    :rtype: PackedStateMachine
+    """
+    stat = os.stat(filename)
+    with _cache_lock:
+        if filename in _cache:
+            packed_state_machine, cached_stat = _cache.pop(filename)
+            if (cached_stat.st_mtime, cached_stat.st_size) == (stat.st_mtime, stat.st_size):
+                _cache[filename] = packed_state_machine, cached_stat
+                return packed_state_machine
+        packed_state_machine = PackedStateMachine(filename)
+        _cache[filename] = packed_state_machine, stat
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+        return packed_state_machine
+
+
+def invalidate_cache(filename):
+    with _cache_lock:
+        _cache.pop(filename, None)
+
+
+def pack_state_machine(directory_path, filename):
+    """Packs a state machine stored in the directory format into a single file
+
+    All files in the directory are packed. The file is written to a temporary file first, which then replaces the
+    target file. If packing fails, the temporary file is removed and the target file is left untouched.
+
+    :param str directory_path: the path of the state machine directory
+    :param str filename: the path of the packed state machine
+    """
+    temporary_filename = filename + '.tmp'
+    try:
+        with zipfile.ZipFile(temporary_filename, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            # the files of parent states are stored before the ones of their children, matching the loading order
+            for dir_path, dir_names, file_names in os.walk(directory_path):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    path = os.path.join(dir_path, file_name)
+                    zip_file.write(path, os.path.relpath(path, directory_path).replace(os.sep, '/'))
+        os.rename(temporary_filename, filename)
+    finally:
+        if os.path.exists(temporary_filename):
+            os.remove(temporary_filename)
+    invalidate_cache(filename)
+
+
+def unpack_state_machine(filename, directory_path):
+    """Extracts a packed state machine into the directory format
+
+    :param str filename: the path of the packed state machine
+    :param str directory_path: the path of the state machine directory
+    """
+    with zipfile.ZipFile(filename) as zip_file:
+        zip_file.extractall(directory_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converts state machines between the directory format and the "
+                                                 "packed single-file format (*.{0})".format(FILE_EXTENSION))
+    parser.add_argument("source", help="path of the state machine directory or the packed state machine")
+    parser.add_argument("target", nargs='?', help="path of the converted state machine, defaults to the source path "
+                                                  "with added or removed extension")
+    args = parser.parse_args()
+    source = args.source.rstrip(os.sep)
+    if os.path.isdir(source):
+        target = args.target or source + '.' + FILE_EXTENSION
+        pack_state_machine(source, target)
+    else:
+        target = args.target or os.path.splitext(source)[0]
+        unpack_state_machine(source, target)
+    logger.info("Converted {0} to {1}".format(source, target))
+
+
+if __name__ == '__main__':
+    main()
@@ -16,21 +16,30 @@
 
 """
 
+from future import standard_library
+standard_library.install_aliases()
 from future.utils import string_types
 from builtins import str
+from builtins import range
+from builtins import object
 import os
+import queue
+import threading
 import re
 import math
 import shutil
 import glob
+import tempfile
 import copy
 import yaml
 from distutils.version import StrictVersion
+from timeit import default_timer as timer
 
 import rafcon
 
-from rafcon.utils.filesystem import read_file, write_file
+from rafcon.utils.filesystem import read_file
 from rafcon.utils import storage_utils
+from rafcon.utils.storage_utils import write_file_if_changed
 from rafcon.utils import log
 from rafcon.utils.timer import measure_time
 
@@ -38,6 +47,7 @@ from rafcon.core.custom_exceptions import LibraryNotFoundException
 from rafcon.core.constants import DEFAULT_SCRIPT_PATH
 from rafcon.core.config import global_config
 from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import packed_state_machine as packed_storage
 
 logger = log.get_logger(__name__)
 
@@ -64,7 +74,26 @@ if os.path.exists(DEFAULT_SCRIPT_PATH):
         shutil.rmtree(f)
 
 
-def remove_obsolete_folders(states, path):
+class SaveReport(object):
+    """Statistics of a save operation
+
+    :ivar int files_written: the number of files written, as their content changed
+    :ivar int files_unchanged: the number of files not written, as they already had the content to be saved
+    :ivar int folders_removed: the number of removed folders of states no longer existing
+    """
+    __slots__ = ('files_written', 'files_unchanged', 'folders_removed')
+
+    def __init__(self):
+        self.files_written = 0
+        self.files_unchanged = 0
+        self.folders_removed = 0
+
+    def __str__(self):
+        return "{0} of {1} files written, {2} obsolete state folders removed".format(
+            self.files_written, self.files_written + self.files_unchanged, self.folders_removed)
+
+
+def remove_obsolete_folders(states, path, report=None):
     """Removes obsolete state machine folders
 
     This function removes all folders in the file system folder `path` that do not belong to the states given by
@@ -72,24 +101,24 @@ def remove_obsolete_folders(states, path):
     
     :param list states: the states that should reside in this very folder
     :param str path: the file system path to be checked for valid folders
+    :param SaveReport report: the report counting the removed folders
     """
-    elements_in_folder = os.listdir(path)
-    # find all state folder elements in system path
-    state_folders_in_file_system = []
-    for folder_name in elements_in_folder:
+    storage_folders_of_states = set(get_storage_id_for_state(state) for state in states)
+    # find all state folder elements in system path, which are not used by existing states
+    obsolete_state_folders = []
+    for folder_name in os.listdir(path):
+        if folder_name in storage_folders_of_states:
+            continue
         if os.path.exists(os.path.join(path, folder_name, FILE_NAME_CORE_DATA)) or \
                 os.path.exists(os.path.join(path, folder_name, FILE_NAME_CORE_DATA_OLD)):
-            state_folders_in_file_system.append(folder_name)
-
-    # remove elements used by existing states and storage format
-    for state in states:
-        storage_folder_for_state = get_storage_id_for_state(state)
-        if storage_folder_for_state in state_folders_in_file_system:
-            state_folders_in_file_system.remove(storage_folder_for_state)
+            obsolete_state_folders.append(folder_name)
 
     # remove the remaining state folders
-    for folder_name in state_folders_in_file_system:
+    for folder_name in obsolete_state_folders:
         shutil.rmtree(os.path.join(path, folder_name))
+        storage_utils.forget_written_files(os.path.join(path, folder_name))
+        if report is not None:
+            report.folders_removed += 1
 
 
 def clean_path_from_deprecated_naming(base_path):
@@ -144,20 +173,35 @@ def clean_path(base_path):
     return base_path
 
 
-def save_state_machine_to_path(state_machine, base_path, delete_old_state_machine=False, as_copy=False):
+def save_state_machine_to_path(state_machine, base_path, delete_old_state_machine=False, as_copy=False,
+                               meta_data_callback=None):
     """Saves a state machine recursively to the file system
 
     The `as_copy` flag determines whether the state machine is saved as copy. If so (`as_copy=True`), some state
     machine attributes will be left untouched, such as the `file_system_path` or the `dirty_flag`.
 
+    Only files whose content changed are written, see :func:`rafcon.utils.storage_utils.write_file_if_changed`.
+
+    If `base_path` is an existing packed state machine or a new path with the extension of packed state machines, the
+    state machine is packed into a single file (see :mod:`rafcon.core.storage.packed_state_machine`).
+
     :param rafcon.core.state_machine.StateMachine state_machine: the state_machine to be saved
     :param str base_path: base_path to which all further relative paths refers to
     :param bool delete_old_state_machine: Whether to delete any state machine existing at the given path
     :param bool as_copy: Whether to use a copy storage for the state machine
+    :param meta_data_callback: Only used for packed state machines: function called with the path of the state
+        machine in the directory format before it is packed, allowing to store further files, e.g. the meta data
+    :return: the statistics of the save operation
+    :rtype: SaveReport
     """
+    if packed_storage.is_packed_state_machine_path(base_path):
+        return save_packed_state_machine_to_path(state_machine, base_path, delete_old_state_machine, as_copy,
+                                                 meta_data_callback)
+
     # warns the user in the logger when using deprecated names
     clean_path_from_deprecated_naming(base_path)
 
+    report = SaveReport()
     state_machine.acquire_modification_lock()
     try:
         root_state = state_machine.root_state
@@ -166,6 +210,7 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
         if delete_old_state_machine:
             if os.path.exists(base_path):
                 shutil.rmtree(base_path)
+                storage_utils.forget_written_files(base_path)
 
         # Ensure that path is existing
         if not os.path.exists(base_path):
@@ -174,7 +219,8 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
         old_update_time = state_machine.last_update
         state_machine.last_update = storage_utils.get_current_time_string()
         state_machine_dict = state_machine.to_dict()
-        storage_utils.write_dict_to_json(state_machine_dict, os.path.join(base_path, STATEMACHINE_FILE))
+        write_file_if_changed(os.path.join(base_path, STATEMACHINE_FILE),
+                              storage_utils.dict_to_json_string(state_machine_dict), report)
 
         # set the file_system_path of the state machine
         if not as_copy:
@@ -183,19 +229,82 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
             state_machine.last_update = old_update_time
 
         # add root state recursively
-        remove_obsolete_folders([root_state], base_path)
-        save_state_recursively(root_state, base_path, "", as_copy)
+        remove_obsolete_folders([root_state], base_path, report)
+        save_state_recursively(root_state, base_path, "", as_copy, report)
 
         if state_machine.marked_dirty and not as_copy:
             state_machine.marked_dirty = False
-        logger.debug("State machine with id {0} was saved at {1}".format(state_machine.state_machine_id, base_path))
+        logger.debug("State machine with id {0} was saved at {1} ({2})".format(state_machine.state_machine_id,
+                                                                              base_path, report))
     except Exception:
         raise
     finally:
         state_machine.release_modification_lock()
+    return report
+
 
+def save_packed_state_machine_to_path(state_machine, filename, delete_old_state_machine=False, as_copy=False,
+                                      meta_data_callback=None):
+    """Saves a state machine into a single file
 
-def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=False):
+    The state machine is saved in the directory format to a temporary directory, which is then packed. Meta data files
+    of an already existing packed state machine are kept for all states still existing, if they are not replaced by
+    `meta_data_callback` and `delete_old_state_machine` is not set.
+
+    :param rafcon.core.state_machine.StateMachine state_machine: the state_machine to be saved
+    :param str filename: the path of the packed state machine
+    :param bool delete_old_state_machine: Whether to discard the files of the existing packed state machine
+    :param bool as_copy: Whether to use a copy storage for the state machine
+    :param meta_data_callback: function called with the path of the temporary state machine directory
+    :return: the statistics of saving the state machine to the temporary directory
+    :rtype: SaveReport
+    """
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.container_state import ContainerState
+    temporary_path = tempfile.mkdtemp(prefix="packed_state_machine_")
+    with state_machine.modification_lock():
+        try:
+            # the temporary directory is deleted in any case, thus the state machine must not refer to it
+            report = save_state_machine_to_path(state_machine, temporary_path, as_copy=True)
+            if meta_data_callback is not None:
+                meta_data_callback(temporary_path)
+
+            if not delete_old_state_machine and os.path.isfile(filename):
+                old_packed_state_machine = packed_storage.get_packed_state_machine(filename)
+                for path in old_packed_state_machine.get_file_paths():
+                    if os.path.basename(path) != FILE_NAME_META_DATA:
+                        continue
+                    temporary_file_path = temporary_path + path[len(filename):]
+                    if os.path.isdir(os.path.dirname(temporary_file_path)) and \
+                            not os.path.exists(temporary_file_path):
+                        with open(temporary_file_path, 'wb') as meta_data_file:
+                            meta_data_file.write(old_packed_state_machine.read(path))
+
+            packed_storage.pack_state_machine(temporary_path, filename)
+
+            if not as_copy:
+                # the file system paths point into the packed state machine, once it was packed successfully
+                state_machine.last_update = storage_utils.load_objects_from_json(
+                    os.path.join(temporary_path, STATEMACHINE_FILE), as_dict=True)['last_update']
+                state_machine.file_system_path = filename
+                states = [(state_machine.root_state, filename)]
+                while states:
+                    state, parent_path = states.pop()
+                    state.file_system_path = os.path.join(parent_path, get_storage_id_for_state(state))
+                    if isinstance(state, ExecutionState):
+                        state.script.filename = SCRIPT_FILE
+                        state.script.path = state.file_system_path
+                    if isinstance(state, ContainerState):
+                        states.extend((child_state, state.file_system_path) for child_state in state.states.values())
+                if state_machine.marked_dirty:
+                    state_machine.marked_dirty = False
+        finally:
+            shutil.rmtree(temporary_path)
+    logger.debug("State machine with id {0} was packed into {1}".format(state_machine.state_machine_id, filename))
+    return report
+
+
+def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=False, report=None):
     """Saves the script file for a state to the directory of the state.
 
     The script name will be set to the SCRIPT_FILE constant.
@@ -203,6 +312,7 @@ def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=F
     :param state: The state of which the script file should be saved
     :param str state_path_full: The path to the file system storage location of the state
     :param bool as_copy: Temporary storage flag to signal that the given path is not the new file_system_path
+    :param SaveReport report: the report counting the written files
     """
     from rafcon.core.states.execution_state import ExecutionState
     if isinstance(state, ExecutionState):
@@ -210,7 +320,7 @@ def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=F
         destination_script_file = os.path.join(state_path_full, SCRIPT_FILE)
 
         try:
-            write_file(destination_script_file, state.script_text)
+            write_file_if_changed(destination_script_file, state.script_text, report)
         except Exception:
             logger.exception("Storing of script file failed: {0} -> {1}".format(state.get_path(),
                                                                                 destination_script_file))
@@ -221,24 +331,25 @@ def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=F
             state.script.path = state_path_full
 
 
-def save_semantic_data_for_state(state, state_path_full):
+def save_semantic_data_for_state(state, state_path_full, report=None):
     """Saves the semantic data in a separate json file.
 
     :param state: The state of which the script file should be saved
     :param str state_path_full: The path to the file system storage location of the state
+    :param SaveReport report: the report counting the written files
     """
 
     destination_script_file = os.path.join(state_path_full, SEMANTIC_DATA_FILE)
 
     try:
-        storage_utils.write_dict_to_json(state.semantic_data, destination_script_file)
+        write_file_if_changed(destination_script_file, storage_utils.dict_to_json_string(state.semantic_data), report)
     except IOError:
         logger.exception("Storing of semantic data for state {0} failed! Destination path: {1}".
                          format(state.get_path(), destination_script_file))
         raise
 
 
-def save_state_recursively(state, base_path, parent_path, as_copy=False):
+def save_state_recursively(state, base_path, parent_path, as_copy=False, report=None):
     """Recursively saves a state to a json file
 
     It calls this method on all its substates.
@@ -247,6 +358,7 @@ def save_state_recursively(state, base_path, parent_path, as_copy=False):
     :param base_path: Path to the state machine
     :param parent_path: Path to the parent state
     :param bool as_copy: Temporary storage flag to signal that the given path is not the new file_system_path
+    :param SaveReport report: the report counting the written files
     :return:
     """
     from rafcon.core.states.execution_state import ExecutionState
@@ -257,26 +369,30 @@ def save_state_recursively(state, base_path, parent_path, as_copy=False):
     if not os.path.exists(state_path_full):
         os.makedirs(state_path_full)
 
-    storage_utils.write_dict_to_json(state, os.path.join(state_path_full, FILE_NAME_CORE_DATA))
+    write_file_if_changed(os.path.join(state_path_full, FILE_NAME_CORE_DATA),
+                          storage_utils.dict_to_json_string(state), report)
     if not as_copy:
         state.file_system_path = state_path_full
 
     if isinstance(state, ExecutionState):
-        save_script_file_for_state_and_source_path(state, state_path_full, as_copy)
+        save_script_file_for_state_and_source_path(state, state_path_full, as_copy, report)
 
-    save_semantic_data_for_state(state, state_path_full)
+    save_semantic_data_for_state(state, state_path_full, report)
 
     # create yaml files for all children
     if isinstance(state, ContainerState):
-        remove_obsolete_folders(state.states.values(), os.path.join(base_path, state_path))
+        remove_obsolete_folders(state.states.values(), os.path.join(base_path, state_path), report)
         for state in state.states.values():
-            save_state_recursively(state, base_path, state_path, as_copy)
+            save_state_recursively(state, base_path, state_path, as_copy, report)
 
 
 @measure_time
 def load_state_machine_from_path(base_path, state_machine_id=None):
     """Loads a state machine from the given path
 
+    The state machine can either be stored in the directory format or be packed into a single file (see
+    :mod:`rafcon.core.storage.packed_state_machine`).
+
     :param base_path: An optional base path for the state machine.
     :return: a tuple of the loaded container state, the version of the state and the creation time
     :raises ValueError: if the provided path does not contain a valid state machine
@@ -286,19 +402,27 @@ def load_state_machine_from_path(base_path, state_machine_id=None):
     state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
     state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
 
-    # was the root state specified as state machine base_path to load from?
-    if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
+    if packed_storage.is_packed_state_machine_path(base_path) and os.path.exists(base_path):
+        packed_state_machine = packed_storage.get_packed_state_machine(base_path)
+        if not packed_state_machine.isfile(state_machine_file_path):
+            raise ValueError("Provided file doesn't contain a valid state machine: {0}".format(base_path))
+        state_machine_dict = storage_utils.json_string_to_objects(
+            packed_state_machine.read_text(state_machine_file_path))
+    else:
+        # was the root state specified as state machine base_path to load from?
+        if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
 
-        # catch the case that a state machine root file is handed
-        if os.path.exists(base_path) and os.path.isfile(base_path):
-            base_path = os.path.dirname(base_path)
-            state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
-            state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
+            # catch the case that a state machine root file is handed
+            if os.path.exists(base_path) and os.path.isfile(base_path):
+                base_path = os.path.dirname(base_path)
+                state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
+                state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
 
-        if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
-            raise ValueError("Provided path doesn't contain a valid state machine: {0}".format(base_path))
+            if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
+                raise ValueError("Provided path doesn't contain a valid state machine: {0}".format(base_path))
+
+        state_machine_dict = storage_utils.load_objects_from_json(state_machine_file_path)
 
-    state_machine_dict = storage_utils.load_objects_from_json(state_machine_file_path)
     if 'used_rafcon_version' in state_machine_dict:
         previously_used_rafcon_version = StrictVersion(state_machine_dict['used_rafcon_version']).version
         active_rafcon_version = StrictVersion(rafcon.__version__).version
@@ -371,38 +495,220 @@ def load_state_from_path(state_path):
     return load_state_recursively(parent=None, state_path=state_path)
 
 
-def load_state_recursively(parent, state_path=None, dirty_states=[]):
+class _StateFiles(object):
+    """The content of the files in the directory of a state, as read by :func:`read_state_files`
+
+    :ivar state_path: the path of the state directory
+    :ivar core_data_path: the path of the core data file
+    :ivar core_data: the parsed, but not yet decoded, core data (see :func:`storage_utils.decode_parsed_json`)
+    :ivar core_data_error: the exception raised while reading the core data, if any
+    :ivar script_text: the content of the script file or None
+    :ivar semantic_data: the parsed semantic data or None
+    :ivar child_state_paths: the paths of the child state directories, sorted by name
+    """
+    __slots__ = ('state_path', 'core_data_path', 'core_data', 'core_data_error', 'script_text', 'semantic_data',
+                 'child_state_paths')
+
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self.core_data_path = os.path.join(state_path, FILE_NAME_CORE_DATA)
+        self.core_data = None
+        self.core_data_error = None
+        self.script_text = None
+        self.semantic_data = None
+        self.child_state_paths = []
+
+
+class _DirectoryFileSystem(object):
+    """Access to the files of state machines stored in the directory format
+
+    :class:`packed_storage.PackedStateMachine` provides the same methods for packed state machines.
+    """
+    exists = staticmethod(os.path.exists)
+    isdir = staticmethod(os.path.isdir)
+    listdir = staticmethod(os.listdir)
+
+    @staticmethod
+    def read_text(path):
+        with open(path, 'r') as text_file:
+            return text_file.read()
+
+
+_directory_file_system = _DirectoryFileSystem()
+
+
+def get_file_system(path):
+    """Returns the object giving access to the files of a state machine
+
+    :param str path: a path within a state machine, either stored in the directory format or packed
+    :return: the packed state machine, if the path points into one, otherwise an object accessing the file system
+    """
+    packed_path = packed_storage.split_path(path)
+    if packed_path is None:
+        return _directory_file_system
+    return packed_storage.get_packed_state_machine(packed_path[0])
+
+
+def read_state_files(state_path, file_system=None):
+    """Reads and parses the files in the directory of a state
+
+    The function only accesses the file system and is thus safe to be called from several threads.
+
+    :param str state_path: the path of the state directory
+    :param file_system: the object giving access to the files, see :func:`get_file_system`
+    :rtype: _StateFiles
+    """
+    if file_system is None:
+        file_system = get_file_system(state_path)
+    state_files = _StateFiles(state_path)
+    try:
+        file_names = sorted(file_system.listdir(state_path))
+    except OSError:
+        # handled as missing core data file
+        file_names = []
+
+    # TODO: Should be removed with next minor release
+    if FILE_NAME_CORE_DATA not in file_names:
+        state_files.core_data_path = os.path.join(state_path, FILE_NAME_CORE_DATA_OLD)
+    try:
+        state_files.core_data = storage_utils.parse_json_string(file_system.read_text(state_files.core_data_path))
+    except (IOError, OSError) as e:
+        if file_system.exists(state_files.core_data_path):
+            state_files.core_data_error = e
+        else:
+            state_files.core_data_error = ValueError("Data file not found: {0}".format(state_files.core_data_path))
+    except ValueError as e:
+        state_files.core_data_error = e
+
+    if SCRIPT_FILE in file_names:
+        state_files.script_text = file_system.read_text(os.path.join(state_path, SCRIPT_FILE))
+
+    if SEMANTIC_DATA_FILE in file_names:
+        try:
+            state_files.semantic_data = storage_utils.parse_json_string(
+                file_system.read_text(os.path.join(state_path, SEMANTIC_DATA_FILE)))
+        except Exception:
+            # semantic data file does not have to be valid
+            pass
+
+    for file_name in file_names:
+        child_state_path = os.path.join(state_path, file_name)
+        if file_system.isdir(child_state_path):
+            state_files.child_state_paths.append(child_state_path)
+    return state_files
+
+
+def read_state_tree(state_path, number_of_threads=1):
+    """Reads the files of a state and all its descendants
+
+    With more than one thread, the directories are read by a pool of threads, each state directory being a separate
+    task. This speeds up loading especially on network file systems. Packed state machines are always read by the
+    calling thread, as they are already held in memory.
+
+    :param str state_path: the path of the state directory
+    :param int number_of_threads: the number of threads reading the directories
+    :return: a dict mapping state paths to :class:`_StateFiles`
+    :rtype: dict
+    """
+    state_files_by_path = {}
+    file_system = get_file_system(state_path)
+
+    if number_of_threads <= 1 or file_system is not _directory_file_system:
+        state_paths = [state_path]
+        while state_paths:
+            state_files = read_state_files(state_paths.pop(), file_system)
+            state_files_by_path[state_files.state_path] = state_files
+            state_paths.extend(state_files.child_state_paths)
+        return state_files_by_path
+
+    tasks = queue.Queue()
+    errors = []
+
+    def read_state_directories():
+        while True:
+            path = tasks.get()
+            try:
+                if path is None:
+                    return
+                state_files = read_state_files(path, file_system)
+                state_files_by_path[path] = state_files
+                for child_state_path in state_files.child_state_paths:
+                    tasks.put(child_state_path)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                tasks.task_done()
+
+    tasks.put(state_path)
+    workers = [threading.Thread(target=read_state_directories, name="StateMachineLoader")
+               for _ in range(number_of_threads)]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    tasks.join()
+    for _ in workers:
+        tasks.put(None)
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+    return state_files_by_path
+
+
+class _LoadTimings(object):
+    """The time spent in the phases of loading states"""
+
+    def __init__(self):
+        self.read = 0.
+        self.decode = 0.
+        self.link = 0.
+
+
+def load_state_recursively(parent, state_path=None, dirty_states=[], state_files_by_path=None, timings=None):
     """Recursively loads the state
 
     It calls this method on each sub-state of a container state.
 
+    The files of the state and all its descendants are read first, in parallel if the config option
+    `STORAGE_LOADER_THREADS` is greater than one. Afterwards, the states are created and linked in a deterministic order
+    in the calling thread.
+
     :param parent:  the root state of the last load call to which the loaded state will be added
     :param state_path: the path on the filesystem where to find the meta file for the state
     :param dirty_states: a dict of states which changed during loading
+    :param dict state_files_by_path: the already read files of the states, only passed in recursive calls
+    :param _LoadTimings timings: the timings of the loading phases, only passed in recursive calls
     :return:
     """
     from rafcon.core.states.execution_state import ExecutionState
     from rafcon.core.states.container_state import ContainerState
     from rafcon.core.states.hierarchy_state import HierarchyState
 
-    path_core_data = os.path.join(state_path, FILE_NAME_CORE_DATA)
+    is_root_call = state_files_by_path is None
+    if is_root_call:
+        timings = _LoadTimings()
+        start_time = timer()
+        number_of_threads = global_config.get_config_value("STORAGE_LOADER_THREADS", 8)
+        state_files_by_path = read_state_tree(state_path, number_of_threads)
+        timings.read = timer() - start_time
 
-    logger.debug("Load state recursively: {0}".format(str(state_path)))
+    state_files = state_files_by_path[state_path]
+    path_core_data = state_files.core_data_path
 
-    # TODO: Should be removed with next minor release
-    if not os.path.exists(path_core_data):
-        path_core_data = os.path.join(state_path, FILE_NAME_CORE_DATA_OLD)
+    logger.debug("Load state recursively: {0}".format(str(state_path)))
 
+    start_time = timer()
     try:
-        state_info = load_data_file(path_core_data)
+        if state_files.core_data_error is not None:
+            raise state_files.core_data_error
+        state_info = storage_utils.decode_parsed_json(state_files.core_data)
     except ValueError as e:
         logger.exception("Error while loading state data: {0}".format(e))
         return
     except LibraryNotFoundException as e:
         logger.error("Library could not be loaded: {0}\n"
                      "Skipping library and continuing loading the state machine".format(e))
-        state_info = storage_utils.load_objects_from_json(path_core_data, as_dict=True)
-        state_id = state_info["state_id"]
+        state_id = state_files.core_data["state_id"]
         dummy_state = HierarchyState(LIBRARY_NOT_FOUND_DUMMY_STATE_NAME, state_id=state_id)
         # set parent of dummy state
         if isinstance(parent, ContainerState):
@@ -429,27 +735,30 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
 
     # read script file if an execution state
     if isinstance(state, ExecutionState):
-        script_text = read_file(state_path, state.script.filename)
+        if state.script.filename == SCRIPT_FILE:
+            script_text = state_files.script_text
+        else:
+            script_text = read_file(state_path, state.script.filename)
         state.script_text = script_text
 
     # load semantic data
-    try:
-        semantic_data = load_data_file(os.path.join(state_path, SEMANTIC_DATA_FILE))
-        state.semantic_data = semantic_data
-    except Exception as e:
-        # semantic data file does not have to be there
-        pass
+    if state_files.semantic_data is not None:
+        try:
+            state.semantic_data = storage_utils.decode_parsed_json(state_files.semantic_data)
+        except Exception as e:
+            # semantic data file does not have to be there
+            pass
+    timings.decode += timer() - start_time
 
     one_of_my_child_states_not_found = False
 
     # load child states
-    for p in os.listdir(state_path):
-        child_state_path = os.path.join(state_path, p)
-        if os.path.isdir(child_state_path):
-            child_state = load_state_recursively(state, child_state_path, dirty_states)
-            if child_state.name is LIBRARY_NOT_FOUND_DUMMY_STATE_NAME:
-                one_of_my_child_states_not_found = True
+    for child_state_path in state_files.child_state_paths:
+        child_state = load_state_recursively(state, child_state_path, dirty_states, state_files_by_path, timings)
+        if child_state.name is LIBRARY_NOT_FOUND_DUMMY_STATE_NAME:
+            one_of_my_child_states_not_found = True
 
+    start_time = timer()
     if one_of_my_child_states_not_found:
         # omit adding transitions and data flows in this case
         pass
@@ -463,6 +772,13 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
 
     if state.marked_dirty:
         dirty_states.append(state)
+    timings.link += timer() - start_time
+
+    if is_root_call:
+        logger.debug("Loaded {0} states from {1} in {2:.3f}s (reading files: {3:.3f}s, creating states: {4:.3f}s, "
+                     "adding transitions and data flows: {5:.3f}s)".format(
+                         len(state_files_by_path), state_path, timings.read + timings.decode + timings.link,
+                         timings.read, timings.decode, timings.link))
 
     return state
 
@@ -476,9 +792,51 @@ def load_data_file(path_of_file):
     """
     if os.path.exists(path_of_file):
         return storage_utils.load_objects_from_json(path_of_file)
+    file_system = get_file_system(path_of_file)
+    if file_system is not _directory_file_system and file_system.isfile(path_of_file):
+        return storage_utils.json_string_to_objects(file_system.read_text(path_of_file))
     raise ValueError("Data file not found: {0}".format(path_of_file))
 
 
+def load_state_machine_interface(base_path):
+    """Loads the version and the root state of a state machine without its child states
+
+    Only the state machine file and the core data file of the root state are read. This is sufficient to create
+    library states, which only need the outcomes and data ports of the library root state.
+
+    :param str base_path: the path of the state machine
+    :return: the version of the state machine and its root state without child states, transitions and data flows
+    :rtype: str, rafcon.core.states.state.State
+    :raises ValueError: if the provided path does not contain a valid state machine
+    """
+    state_machine_dict = load_data_file(os.path.join(base_path, STATEMACHINE_FILE))
+    version = state_machine_dict['version'] if 'version' in state_machine_dict \
+        else state_machine_dict['state_machine_version']
+    if "root_state_storage_id" not in state_machine_dict:
+        root_state_storage_id = state_machine_dict['root_state_id']
+    else:
+        root_state_storage_id = state_machine_dict['root_state_storage_id']
+    root_state_path = os.path.join(base_path, root_state_storage_id)
+    core_data_path = os.path.join(root_state_path, FILE_NAME_CORE_DATA)
+    if not data_file_exists(core_data_path):
+        core_data_path = os.path.join(root_state_path, FILE_NAME_CORE_DATA_OLD)
+    state_info = load_data_file(core_data_path)
+    root_state = state_info[0] if isinstance(state_info, tuple) else state_info
+    return version, root_state
+
+
+def data_file_exists(path_of_file):
+    """Checks whether a file exists, also within packed state machines
+
+    :param path_of_file: the path of the file
+    :rtype: bool
+    """
+    if os.path.exists(path_of_file):
+        return True
+    file_system = get_file_system(path_of_file)
+    return file_system is not _directory_file_system and file_system.isfile(path_of_file)
+
+
 def limit_text_max_length(text, max_length, separator='_'):
     """
     Limits the length of a string. The returned string will be the first `max_length/2` characters of the input string
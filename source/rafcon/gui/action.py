@@ -24,12 +24,9 @@ from future.utils import string_types
 from builtins import object
 from builtins import str
 import copy
-import json
 import difflib
 
 from gtkmvc3.model_mt import ModelMT
-from jsonconversion.decoder import JSONObjectDecoder
-from jsonconversion.encoder import JSONObjectEncoder
 
 from rafcon.core.constants import UNIQUE_DECIDER_STATE_ID
 from rafcon.core.global_variable_manager import GlobalVariableManager
@@ -54,7 +51,7 @@ from rafcon.gui.utils.notification_overview import NotificationOverview
 
 from rafcon.utils import log
 from rafcon.utils.constants import RAFCON_TEMP_PATH_BASE, BY_EXECUTION_TRIGGERED_OBSERVABLE_STATE_METHODS
-from rafcon.utils.storage_utils import substitute_modules
+from rafcon.utils.storage_utils import object_to_compact_json_string, json_string_to_objects
 
 logger = log.get_logger(__name__)
 
@@ -90,8 +87,7 @@ def get_state_tuple(state, state_m=None):
     :param rafcon.core.states.state.State state: The state that should be stored
     :return: state_tuple tuple
     """
-    state_str = json.dumps(state, cls=JSONObjectEncoder,
-                           indent=4, check_circular=False, sort_keys=True)
+    state_str = object_to_compact_json_string(state)
 
     state_tuples_dict = {}
     if isinstance(state, ContainerState):
@@ -114,8 +110,7 @@ def get_state_from_state_tuple(state_tuple):
     # Transitions and data flows are not added, as also states are not added
     # We have to wait until the child states are loaded, before adding transitions and data flows, as otherwise the
     # validity checks for transitions and data flows would fail
-    state_info = json.loads(state_tuple[STATE_TUPLE_JSON_STR_INDEX],
-                            cls=JSONObjectDecoder, substitute_modules=substitute_modules)
+    state_info = json_string_to_objects(state_tuple[STATE_TUPLE_JSON_STR_INDEX])
     if not isinstance(state_info, tuple):
         state = state_info
     else:
@@ -488,10 +483,8 @@ class MetaAction(AbstractAction):
         overview['instance'].append(overview['model'][-1])
         overview['info'][-1]['instance'] = overview['model'][-1]
 
-        meta_str = json.dumps(overview['model'][-1].meta, cls=JSONObjectEncoder,
-                              indent=4, check_circular=False, sort_keys=True)
-        # print(meta_str)
-        self.meta = json.loads(meta_str, cls=JSONObjectDecoder, substitute_modules=substitute_modules)
+        meta_str = object_to_compact_json_string(overview['model'][-1].meta)
+        self.meta = json_string_to_objects(meta_str)
 
     def get_storage(self):
         state_model = self.state_machine_model.get_state_model_by_path(self.parent_path)
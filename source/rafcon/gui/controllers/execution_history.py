@@ -25,10 +25,13 @@ from builtins import range
 from builtins import next
 from builtins import str
 from os import path
+import time
 from gi.repository import Gtk
 from gi.repository import Gdk
 from gi.repository import GObject
+from gi.repository import GLib
 from threading import RLock
+from weakref import WeakKeyDictionary
 
 import rafcon
 
@@ -64,13 +67,21 @@ class ExecutionHistoryTreeController(ExtendedController):
     TOOL_TIP_TEXT = "Right click for more details\n" \
                     "Middle click for external more detailed viewer\n" \
                     "Double click to select corresponding state"
+    #: Runs with more history items are only inserted into the tree store, when their row is expanded
+    LAZY_POPULATION_THRESHOLD = 1000
+    #: The methods of state machines and execution histories, after which the tree store is updated
+    OBSERVED_STATE_MACHINE_METHODS = ('_add_new_execution_history', 'clear_execution_histories')
+    OBSERVED_EXECUTION_HISTORY_METHODS = ('push_call_history_item', 'push_return_history_item',
+                                          'push_concurrency_history_item', 'push_state_machine_start_history_item',
+                                          'pop_last_item')
 
     def __init__(self, model=None, view=None):
         assert isinstance(model, StateMachineManagerModel)
         assert isinstance(view, ExecutionHistoryView)
 
         super(ExecutionHistoryTreeController, self).__init__(model, view)
-        self.history_tree_store = Gtk.TreeStore(GObject.TYPE_STRING, GObject.TYPE_PYOBJECT, GObject.TYPE_STRING)
+        self._empty_tree_store = self._create_tree_store()
+        self.history_tree_store = self._empty_tree_store
         # a TreeView
         self.history_tree = view['history_tree']
         self.history_tree.set_model(self.history_tree_store)
@@ -78,17 +89,53 @@ class ExecutionHistoryTreeController(ExtendedController):
 
         self.observe_model(state_machine_execution_model)
         self._expansion_state = {}
+        self._history_trees = {}
+        self._displayed_state_machine_id = None
         self._update_lock = RLock()
+        self._update_scheduled = False
+        # the observed state machines and execution histories with the names of the observed methods
+        self._observed_objects = WeakKeyDictionary()
+        self.last_update_number_of_items = 0
+        self.last_update_duration = 0.
 
         self.update()
 
     def destroy(self):
-        self.clean_history(None, None)
+        with self._update_lock:
+            self._history_trees.clear()
+            for observable, method_names in list(self._observed_objects.items()):
+                for method_name in method_names:
+                    observable.remove_observer(self, method_name)
+            self._observed_objects.clear()
         super(ExecutionHistoryTreeController, self).destroy()
 
+    def _observe(self, observable, method_names):
+        """Schedules an update of the tree store after each call of the given methods of a state machine or history
+
+        The methods are called by the execution, i.e. the notifications are either delivered in the GTK main loop by
+        the notification coalescer or directly in the execution thread.
+        """
+        if observable in self._observed_objects:
+            return
+        for method_name in method_names:
+            observable.add_observer(self, method_name, None, self._on_history_changed)
+        self._observed_objects[observable] = method_names
+
+    def _on_history_changed(self, instance, result, args):
+        if self._update_scheduled:
+            return
+        self._update_scheduled = True
+        GLib.idle_add(self._run_scheduled_update)
+
+    def _run_scheduled_update(self):
+        self._update_scheduled = False
+        self.update()
+        return False
+
     def register_view(self, view):
         super(ExecutionHistoryTreeController, self).register_view(view)
         self.history_tree.connect('button_press_event', self.mouse_click)
+        self.history_tree.connect('test-expand-row', self.on_test_expand_row)
         view['reload_button'].connect('clicked', self.reload_history)
         view['clean_button'].connect('clicked', self.clean_history)
         view['open_separately_button'].connect('clicked', self.open_selected_history_separately)
@@ -161,7 +208,10 @@ class ExecutionHistoryTreeController(ExtendedController):
                         self.history_tree.collapse_row(histroy_item_path)
                     else:
                         self.history_tree.expand_to_path(histroy_item_path)
-                sm = self.get_history_item_for_tree_iter(histroy_item_iter).state_reference.get_state_machine()
+                history_item = self.get_history_item_for_tree_iter(histroy_item_iter)
+                if history_item is None:  # empty concurrency branch or placeholder of a collapsed run
+                    return True
+                sm = history_item.state_reference.get_state_machine()
                 if sm:
                     if sm.state_machine_id != self.model.selected_state_machine_id:
                         self.model.selected_state_machine_id = sm.state_machine_id
@@ -171,7 +221,7 @@ class ExecutionHistoryTreeController(ExtendedController):
                     return
                 active_sm_m = self.model.get_selected_state_machine_model()
                 assert active_sm_m.state_machine is sm
-                state_path = self.get_history_item_for_tree_iter(histroy_item_iter).state_reference.get_path()
+                state_path = history_item.state_reference.get_path()
                 ref_state_m = active_sm_m.get_state_model_by_path(state_path)
                 if ref_state_m and active_sm_m:
                     active_sm_m.selection.set(ref_state_m)
@@ -242,12 +292,6 @@ class ExecutionHistoryTreeController(ExtendedController):
 
             return True
 
-    # TODO: implement! To do this efficiently a mechanism is needed that does not regenerate the whole tree view
-    # TODO: the appropriate state machine would have to be observed as well
-    # @ExtendedController.observe("execution_history_container", after=True)
-    # def model_changed(self, model, prop_name, info):
-    #     #self.update()
-
     def get_history_item_for_tree_iter(self, child_tree_iter):
         """Hands history item for tree iter and compensate if tree item is a dummy item
 
@@ -265,61 +309,41 @@ class ExecutionHistoryTreeController(ExtendedController):
         return history_item
 
     def _store_expansion_state(self):
-        """Iter recursively all tree items and store expansion state"""
-
-        def store_tree_expansion(child_tree_iter, expansion_state):
-
-            tree_item_path = self.history_tree_store.get_path(child_tree_iter)
-            history_item = self.get_history_item_for_tree_iter(child_tree_iter)
-
-            # store expansion state if tree item path is valid and expansion state was not stored already
-            if tree_item_path is not None:
-                # if first element of sub-tree has same history_item as the parent ignore it's expansion state
-                if history_item not in expansion_state:
-                    expansion_state[history_item] = self.history_tree.row_expanded(tree_item_path)
-
-            for n in range(self.history_tree_store.iter_n_children(child_tree_iter)):
-                child_iter = self.history_tree_store.iter_nth_child(child_tree_iter, n)
-                store_tree_expansion(child_iter, expansion_state)
-
-        root_iter = self.history_tree_store.get_iter_first()
-        if not root_iter:
+        """Iter recursively all expanded tree items and store their expansion state"""
+
+        def store_tree_expansion(parent_iter, expansion_state):
+            child_iter = self.history_tree_store.iter_children(parent_iter)
+            while child_iter:
+                tree_item_path = self.history_tree_store.get_path(child_iter)
+                # collapsed rows hide the expansion state of their children
+                if self.history_tree.row_expanded(tree_item_path):
+                    history_item = self.get_history_item_for_tree_iter(child_iter)
+                    # if first element of sub-tree has same history_item as the parent ignore it's expansion state
+                    if history_item not in expansion_state:
+                        expansion_state[history_item] = True
+                    store_tree_expansion(child_iter, expansion_state)
+                child_iter = self.history_tree_store.iter_next(child_iter)
+
+        if self._displayed_state_machine_id not in self._history_trees:
             return
         current_expansion_state = {}
-        # this can be the case when the execution history tree is currently being deleted
-        if not self.get_history_item_for_tree_iter(root_iter).state_reference:
-            return
-        state_machine = self.get_history_item_for_tree_iter(root_iter).state_reference.get_state_machine()
-        self._expansion_state[state_machine.state_machine_id] = current_expansion_state
-        while root_iter:
-            store_tree_expansion(root_iter, current_expansion_state)
-            root_iter = self.history_tree_store.iter_next(root_iter)
+        self._expansion_state[self._displayed_state_machine_id] = current_expansion_state
+        store_tree_expansion(None, current_expansion_state)
 
     def _restore_expansion_state(self):
-        """Iter recursively all tree items and restore expansion state"""
+        """Iter recursively all tree items, which were expanded, and restore their expansion state"""
 
-        def restore_tree_expansion(child_tree_iter, expansion_state):
-            tree_item_path = self.history_tree_store.get_path(child_tree_iter)
-            history_item = self.get_history_item_for_tree_iter(child_tree_iter)
+        def restore_tree_expansion(parent_iter, expansion_state):
+            child_iter = self.history_tree_store.iter_children(parent_iter)
+            while child_iter:
+                if self.get_history_item_for_tree_iter(child_iter) in expansion_state:
+                    self.history_tree.expand_row(self.history_tree_store.get_path(child_iter), False)
+                    restore_tree_expansion(child_iter, expansion_state)
+                child_iter = self.history_tree_store.iter_next(child_iter)
 
-            # restore expansion state if tree item path is valid and expansion state was not stored already
-            if tree_item_path and history_item in expansion_state:
-                if expansion_state[history_item]:
-                    self.history_tree.expand_to_path(tree_item_path)
-
-            for n in range(self.history_tree_store.iter_n_children(child_tree_iter)):
-                child_iter = self.history_tree_store.iter_nth_child(child_tree_iter, n)
-                restore_tree_expansion(child_iter, expansion_state)
-
-        root_iter = self.history_tree_store.get_iter_first()
-        if not root_iter:
-            return
-        state_machine = self.get_history_item_for_tree_iter(root_iter).state_reference.get_state_machine()
-        if state_machine.state_machine_id not in self._expansion_state:
+        if self._displayed_state_machine_id not in self._expansion_state:
             return
-        while root_iter:
-            restore_tree_expansion(root_iter, self._expansion_state[state_machine.state_machine_id])
-            root_iter = self.history_tree_store.iter_next(root_iter)
+        restore_tree_expansion(None, self._expansion_state[self._displayed_state_machine_id])
 
     @ExtendedController.observe("selected_state_machine_id", assign=True)
     def notification_selected_sm_changed(self, model, prop_name, info):
@@ -335,6 +359,10 @@ class ExecutionHistoryTreeController(ExtendedController):
         for state_machine_id in list(self._expansion_state.keys()):
             if state_machine_id not in self.model.state_machines:
                 del self._expansion_state[state_machine_id]
+        with self._update_lock:
+            for state_machine_id in list(self._history_trees.keys()):
+                if state_machine_id not in self.model.state_machines:
+                    del self._history_trees[state_machine_id]
 
     @ExtendedController.observe("execution_engine", after=True)
     def execution_history_focus(self, model, prop_name, info):
@@ -357,9 +385,11 @@ class ExecutionHistoryTreeController(ExtendedController):
     def clean_history(self, widget, event=None):
         """Triggered when the 'Clean History' button is clicked.
 
-        Empties the execution history tree by adjusting the start index and updates tree store and view.
+        Drops the tree stores of all state machines and inserts the execution histories of the selected state machine
+        again.
         """
-        self.history_tree_store.clear()
+        with self._update_lock:
+            self._history_trees.clear()
         selected_sm_m = self.model.get_selected_state_machine_model()
         if selected_sm_m:
             # this must not be done here!
@@ -369,47 +399,143 @@ class ExecutionHistoryTreeController(ExtendedController):
 
     def reload_history(self, widget, event=None):
         """Triggered when the 'Reload History' button is clicked."""
+        with self._update_lock:
+            self._history_trees.pop(self._displayed_state_machine_id, None)
         self.update()
 
+    @property
+    def number_of_items(self):
+        """The number of history items inserted into the tree store of the selected state machine"""
+        history_tree = self._history_trees.get(self._displayed_state_machine_id)
+        return history_tree.number_of_items if history_tree else 0
+
     def update(self):
+        """Updates the tree store of the selected state machine with the history items added since the last update
+
+        Each state machine has its own tree store, which is shown, when the state machine is selected. For each
+        execution history, a cursor remembers up to which item the history was inserted. Only if items were removed
+        from a history (e.g. by backward stepping) or the execution histories were cleared, the tree store is
+        rebuilt. Runs with more than :attr:`LAZY_POPULATION_THRESHOLD` items are only inserted, when their row is
+        expanded.
+
+        The number of inserted items and the duration of the update are stored in :attr:`last_update_number_of_items`
+        and :attr:`last_update_duration`.
         """
-        rebuild the tree view of the history item tree store
-        :return:
+        with self._update_lock:
+            start_time = time.time()
+            selected_sm_m = self.model.get_selected_state_machine_model()
+            state_machine_id = selected_sm_m.state_machine.state_machine_id if selected_sm_m else None
+            if state_machine_id not in self._history_trees and state_machine_id is not None:
+                self._history_trees[state_machine_id] = _HistoryTree(self._create_tree_store())
+                self._observe(selected_sm_m.state_machine, self.OBSERVED_STATE_MACHINE_METHODS)
+            history_tree = self._history_trees.get(state_machine_id)
+
+            tree_store = history_tree.store if history_tree else self._empty_tree_store
+            tree_switched = tree_store is not self.history_tree_store
+            if tree_switched:
+                self._store_expansion_state()
+                self.history_tree_store = tree_store
+                self._displayed_state_machine_id = state_machine_id
+                self.history_tree.set_model(tree_store)
+
+            number_of_items = 0
+            if history_tree:
+                number_of_items = self._update_history_tree(history_tree,
+                                                            selected_sm_m.state_machine.execution_histories)
+                if tree_switched:
+                    self._restore_expansion_state()
+
+            self.last_update_number_of_items = number_of_items
+            self.last_update_duration = time.time() - start_time
+            if number_of_items:
+                logger.verbose("Inserted {0} history items in {1:.3f}s ({2} items in total)".format(
+                    number_of_items, self.last_update_duration, self.number_of_items))
+
+    def _create_tree_store(self):
+        return Gtk.TreeStore(GObject.TYPE_STRING, GObject.TYPE_PYOBJECT, GObject.TYPE_STRING)
+
+    def _update_history_tree(self, history_tree, execution_histories):
+        """Inserts the new items of all execution histories into the tree store
+
+        :param _HistoryTree history_tree: the tree store of the state machine and the cursors of its runs
+        :param list[ExecutionHistory] execution_histories: the execution histories of the state machine
+        :return: the number of inserted history items
+        :rtype: int
         """
-        # with self._update_lock:
-        self._update_lock.acquire()
-        self._store_expansion_state()
-        self.history_tree_store.clear()
-        selected_sm_m = self.model.get_selected_state_machine_model()
-        if not selected_sm_m:
-            return
+        if not history_tree.is_consistent(execution_histories):
+            history_tree.clear()
+
+        number_of_items = 0
+        for run_cursor in history_tree.run_cursors:
+            if run_cursor.populated:
+                number_of_items += self._insert_new_history_items(run_cursor)
+
+        for execution_number in range(len(history_tree.run_cursors), len(execution_histories)):
+            execution_history = execution_histories[execution_number]
+            self._observe(execution_history, self.OBSERVED_EXECUTION_HISTORY_METHODS)
+            run_cursor = self._insert_run(execution_history, execution_number)
+            if run_cursor is None:
+                # the history only holds the StateMachineStartItem, yet
+                break
+            history_tree.run_cursors.append(run_cursor)
+            if len(execution_history) > self.LAZY_POPULATION_THRESHOLD:
+                run_cursor.populated = False
+                self.history_tree_store.insert_before(
+                    run_cursor.parent, None,
+                    ("Expand to show {0} history items".format(len(execution_history)), None, None))
+            else:
+                number_of_items += self._insert_new_history_items(run_cursor)
+        history_tree.number_of_items += number_of_items
+        return number_of_items
 
-        for execution_number, execution_history in enumerate(selected_sm_m.state_machine.execution_histories):
-            if len(execution_history) > 0:
-                first_history_item = execution_history[0]
-                # the next lines filter out the StateMachineStartItem, which is not intended to
-                # be displayed, but merely as convenient entry point in the saved log file
-                if isinstance(first_history_item, StateMachineStartItem):
-                    if len(execution_history) > 1:
-                        first_history_item = execution_history[1]
-                        tree_item = self.history_tree_store.insert_after(
-                            None,
-                            None,
-                            (first_history_item.state_reference.name + " - Run " + str(execution_number + 1),
-                             first_history_item, self.TOOL_TIP_TEXT))
-                        self.insert_execution_history(tree_item, execution_history[1:], is_root=True)
-                    else:
-                        pass  # there was only the Start item in the history
-                else:
-                    tree_item = self.history_tree_store.insert_after(
-                        None,
-                        None,
-                        (first_history_item.state_reference.name + " - Run " + str(execution_number + 1),
-                         first_history_item, self.TOOL_TIP_TEXT))
-                    self.insert_execution_history(tree_item, execution_history, is_root=True)
+    def _insert_run(self, execution_history, execution_number):
+        """Inserts the row of a state machine execution at the top of the tree store
 
-        self._restore_expansion_state()
-        self._update_lock.release()
+        :param ExecutionHistory execution_history: all history items of a certain state machine execution
+        :param int execution_number: the index of the execution
+        :return: the cursor of the execution history or None, if the history has no items to be displayed
+        :rtype: _HistoryCursor
+        """
+        # the StateMachineStartItem is not intended to be displayed, but merely as convenient entry point in the
+        # saved log file
+        number_of_dropped_items, first_history_items = execution_history.get_items_after(0, 2)
+        number_of_skipped_items = 0
+        if first_history_items and isinstance(first_history_items[0], StateMachineStartItem):
+            number_of_skipped_items = 1
+        if len(first_history_items) <= number_of_skipped_items:
+            return None
+        first_history_item = first_history_items[number_of_skipped_items]
+        tree_item = self.history_tree_store.insert_after(
+            None,
+            None,
+            (first_history_item.state_reference.name + " - Run " + str(execution_number + 1),
+             first_history_item, self.TOOL_TIP_TEXT))
+        run_cursor = _HistoryCursor(execution_history, tree_item, is_root=True)
+        run_cursor.number_of_items = number_of_dropped_items + number_of_skipped_items
+        return run_cursor
+
+    def on_test_expand_row(self, tree_view, tree_iter, tree_path):
+        """Inserts the items of a run, which was not populated, yet, before its row is expanded"""
+        if tree_path.get_depth() != 1:
+            return False
+        with self._update_lock:
+            history_tree = self._history_trees.get(self._displayed_state_machine_id)
+            if not history_tree:
+                return False
+            run_cursors = history_tree.run_cursors
+            run_cursor = run_cursors[len(run_cursors) - 1 - tree_path.get_indices()[0]]
+            if not run_cursor.populated:
+                # remove the placeholder row
+                self.history_tree_store.remove(self.history_tree_store.iter_children(tree_iter))
+                run_cursor.populated = True
+                history_tree.number_of_items += self._insert_new_history_items(run_cursor)
+        return False
+
+    def _get_history_item_label(self, history_item, description):
+        if global_gui_config.get_config_value("SHOW_PATH_NAMES_IN_EXECUTION_HISTORY", False):
+            return history_item.state_reference.name + " - " + history_item.state_reference.get_path() + " - " + \
+                description
+        return history_item.state_reference.name + " - " + description
 
     def insert_history_item(self, parent, history_item, description, dummy=False):
         """Enters a single history item into the tree store
@@ -424,79 +550,154 @@ class ExecutionHistoryTreeController(ExtendedController):
         if not history_item.state_reference:
             logger.error("This must never happen! Current history_item is {}".format(history_item))
             return None
-        content = None
-
-        if global_gui_config.get_config_value("SHOW_PATH_NAMES_IN_EXECUTION_HISTORY", False):
-            content = (history_item.state_reference.name + " - " +
-                           history_item.state_reference.get_path() + " - " +
-                           description, None if dummy else history_item,
-                           None if dummy else self.TOOL_TIP_TEXT)
-        else:
-            content = (history_item.state_reference.name + " - " +
-                           description, None if dummy else history_item,
-                           None if dummy else self.TOOL_TIP_TEXT)
+        content = (self._get_history_item_label(history_item, description), None if dummy else history_item,
+                   None if dummy else self.TOOL_TIP_TEXT)
 
         tree_item = self.history_tree_store.insert_before(
             parent, None, content)
         return tree_item
 
-    def insert_execution_history(self, parent, execution_history, is_root=False):
-        """Insert a list of history items into a the tree store
+    def _insert_new_history_items(self, cursor):
+        """Inserts the history items added to an execution history since the last call
 
-        If there are concurrency history items, the method is called recursively.
+        The items of the child execution histories of concurrency states are inserted recursively.
 
-        :param Gtk.TreeItem parent: the parent to add the next history item to
-        :param ExecutionHistory execution_history: all history items of a certain state machine execution
-        :param bool is_root: Whether this is the root execution history
+        :param _HistoryCursor cursor: the cursor of the execution history
+        :return: the number of inserted history items
+        :rtype: int
         """
-        current_parent = parent
-        execution_history_iterator = iter(execution_history)
-        for history_item in execution_history_iterator:
-            if isinstance(history_item, ConcurrencyItem):
-                self.insert_concurrent_execution_histories(current_parent, history_item.execution_histories)
-
-            elif isinstance(history_item, CallItem):
-                tree_item = self.insert_history_item(current_parent, history_item, "Enter" if is_root else "Call")
-                if not tree_item:
-                    return
-                if history_item.call_type is CallType.EXECUTE:
-                    # this is necessary that already the CallType.EXECUTE item opens a new hierarchy in the
-                    # tree view and not the CallType.CONTAINER item
-                    next_history_item = history_item.next
-                    if next_history_item and next_history_item.call_type is CallType.CONTAINER:
-                        current_parent = tree_item
-                        self.insert_history_item(current_parent, next_history_item, "Enter")
-                        try:
-                            next(execution_history_iterator)  # skips the next history item in the iterator
-                        except StopIteration as e:
-                            # the execution engine does not have another item
-                            return
-
-            else:  # history_item is ReturnItem
-                if current_parent is None:
-                    # The reasons here can be: missing history items, items in the wrong order etc.
-                    # Does not happen when using RAFCON without plugins
-                    logger.error("Invalid execution history: current_parent is None")
-                    return
-                if history_item.call_type is CallType.EXECUTE:
-                    self.insert_history_item(current_parent, history_item, "Return")
-                else:  # CONTAINER
-                    self.insert_history_item(current_parent, history_item, "Exit")
-                    current_parent = self.history_tree_store.iter_parent(current_parent)
-
-            is_root = False
-
-    def insert_concurrent_execution_histories(self, parent, concurrent_execution_histories):
-        """Adds the child execution histories of a concurrency state.
+        if cursor.invalid:
+            return 0
+        number_of_items = 0
+        # the history may be extended by the execution meanwhile, thus the new items are taken at once
+        number_of_previous_items, new_history_items = cursor.execution_history.get_items_after(cursor.number_of_items)
+        if cursor.label_pending and new_history_items:
+            # this is just a dummy item to have an extra parent for each branch
+            # gives better overview in case that one of the child state is a simple execution state
+            self.history_tree_store.set_value(cursor.parent, self.LABEL_NAME_STORAGE_ID, self._get_history_item_label(
+                new_history_items[0], "Concurrency Branch"))
+            cursor.label_pending = False
+        for index, history_item in enumerate(new_history_items):
+            if not self._insert_history_item_at_cursor(cursor, history_item):
+                cursor.invalid = True
+                break
+            cursor.number_of_items = number_of_previous_items + index + 1
+            cursor.last_item = history_item
+            number_of_items += 1
+
+        for branch_cursor in cursor.branch_cursors:
+            number_of_items += self._insert_new_history_items(branch_cursor)
+        return number_of_items
+
+    def _insert_history_item_at_cursor(self, cursor, history_item):
+        """Inserts the next history item of an execution history
+
+        :param _HistoryCursor cursor: the cursor of the execution history
+        :param HistoryItem history_item: the history item following the last inserted one
+        :return: False, if the execution history is invalid
+        :rtype: bool
+        """
+        execute_call_item, cursor.execute_call_item = cursor.execute_call_item, None
+        if execute_call_item is not None and isinstance(history_item, CallItem) and \
+                history_item.call_type is CallType.CONTAINER:
+            # this is necessary that already the CallType.EXECUTE item opens a new hierarchy in the
+            # tree view and not the CallType.CONTAINER item
+            cursor.parent = execute_call_item
+            self.insert_history_item(cursor.parent, history_item, "Enter")
+
+        elif isinstance(history_item, ConcurrencyItem):
+            for execution_history in history_item.execution_histories:
+                self._observe(execution_history, self.OBSERVED_EXECUTION_HISTORY_METHODS)
+                # the branch rows are labeled, as soon as the first item of the branch is inserted
+                branch_item = self.history_tree_store.insert_before(cursor.parent, None,
+                                                                    ("Concurrency Branch", None, None))
+                branch_cursor = _HistoryCursor(execution_history, branch_item)
+                branch_cursor.label_pending = True
+                cursor.branch_cursors.append(branch_cursor)
+
+        elif isinstance(history_item, CallItem):
+            tree_item = self.insert_history_item(cursor.parent, history_item, "Enter" if cursor.is_root else "Call")
+            if not tree_item:
+                return False
+            if history_item.call_type is CallType.EXECUTE:
+                cursor.execute_call_item = tree_item
+
+        else:  # history_item is ReturnItem
+            if cursor.parent is None:
+                # The reasons here can be: missing history items, items in the wrong order etc.
+                # Does not happen when using RAFCON without plugins
+                logger.error("Invalid execution history: current_parent is None")
+                return False
+            if history_item.call_type is CallType.EXECUTE:
+                self.insert_history_item(cursor.parent, history_item, "Return")
+            else:  # CONTAINER
+                self.insert_history_item(cursor.parent, history_item, "Exit")
+                cursor.parent = self.history_tree_store.iter_parent(cursor.parent)
+
+        cursor.is_root = False
+        return True
+
+
+class _HistoryCursor(object):
+    """Remembers up to which item an execution history was inserted into the tree store
+
+    :ivar ExecutionHistory execution_history: the execution history
+    :ivar Gtk.TreeIter parent: the tree item, to which the next history item is added
+    :ivar int number_of_items: the number of inserted or skipped items, including items dropped from the history
+    :ivar HistoryItem last_item: the history item inserted last
+    :ivar Gtk.TreeIter execute_call_item: the tree item of a call item of type CallType.EXECUTE inserted last, as
+        the call item of type CallType.CONTAINER following it opens a new hierarchy
+    :ivar list[_HistoryCursor] branch_cursors: the cursors of the child execution histories of concurrency states
+    """
 
-        :param Gtk.TreeItem parent: the parent to add the next history item to
-        :param list[ExecutionHistory] concurrent_execution_histories: a list of all child execution histories
-        :return:
+    def __init__(self, execution_history, parent, is_root=False):
+        self.execution_history = execution_history
+        self.parent = parent
+        self.is_root = is_root
+        self.number_of_items = 0
+        self.last_item = None
+        self.execute_call_item = None
+        self.branch_cursors = []
+        self.label_pending = False
+        self.populated = True
+        self.invalid = False
+
+    def is_consistent(self):
+        """Checks whether the inserted history items are still contained in the execution history
+
+        :return: False, if items were removed from the execution history (e.g. by backward stepping)
+        :rtype: bool
         """
-        for execution_history in concurrent_execution_histories:
-            if len(execution_history) >= 1:
-                first_history_item = execution_history[0]
-                # this is just a dummy item to have an extra parent for each branch
-                # gives better overview in case that one of the child state is a simple execution state
-                tree_item = self.insert_history_item(parent, first_history_item, "Concurrency Branch", dummy=True)
-                self.insert_execution_history(tree_item, execution_history)
+        if self.last_item is not None:
+            try:
+                number_of_previous_items, history_items = self.execution_history.get_items_after(
+                    self.number_of_items - 1, 1)
+            except TypeError:  # the history was destroyed
+                return False
+            # the last inserted item is either dropped by now or must still be at its position
+            if number_of_previous_items < self.number_of_items and \
+                    (not history_items or history_items[0] is not self.last_item):
+                return False
+        return all(branch_cursor.is_consistent() for branch_cursor in self.branch_cursors)
+
+
+class _HistoryTree(object):
+    """The tree store of the execution histories of a state machine and the cursors of its runs"""
+
+    def __init__(self, store):
+        self.store = store
+        self.run_cursors = []
+        self.number_of_items = 0
+
+    def is_consistent(self, execution_histories):
+        if len(self.run_cursors) > len(execution_histories):
+            return False
+        for run_cursor, execution_history in zip(self.run_cursors, execution_histories):
+            if run_cursor.execution_history is not execution_history or not run_cursor.is_consistent():
+                return False
+        return True
+
+    def clear(self):
+        self.store.clear()
+        self.run_cursors = []
+        self.number_of_items = 0
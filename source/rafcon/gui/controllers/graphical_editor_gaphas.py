@@ -49,6 +49,7 @@ from rafcon.gui.mygaphas import guide
 from rafcon.gui.mygaphas.items.connection import DataFlowView, TransitionView
 from rafcon.gui.mygaphas.items.ports import OutcomeView, DataPortView, ScopedVariablePortView
 from rafcon.gui.mygaphas.items.state import StateView, NameView
+from rafcon.gui.mygaphas.utils.cache.surface_cache import get_surface_cache
 import rafcon.gui.singleton
 from rafcon.gui.views.graphical_editor_gaphas import GraphicalEditorView
 import rafcon.gui.helpers.meta_data as gui_helper_meta_data
@@ -88,6 +89,14 @@ class GraphicalEditorController(ExtendedController):
         self._ongoing_complex_actions = {}
         # the variable is for debugging -> I like to have it to improve complex actions
         self._nested_action_already_in = {}
+
+        # Content views of container states are only created when needed, see _update_lazy_state_views
+        self._lazy_state_views = rafcon.gui.singleton.global_gui_config.get_config_value(
+            'GAPHAS_EDITOR_LAZY_STATE_VIEWS', False)
+        self._last_viewport = None
+        self._lazy_update_id = None
+        if self._lazy_state_views:
+            self.observe_model(model.selection)
         view.setup_canvas(self.canvas, self.zoom)
 
         view.editor.drag_dest_set(Gtk.DestDefaults.ALL, None, Gdk.DragAction.COPY)
@@ -96,8 +105,12 @@ class GraphicalEditorController(ExtendedController):
                        "".format(time.time() - start_time, self.model.state_machine_id))
 
     def destroy(self):
+        if self._lazy_update_id is not None:
+            GLib.source_remove(self._lazy_update_id)
+            self._lazy_update_id = None
         if self.view:
             self.view.editor.prepare_destruction()
+        get_surface_cache().log_statistics()
         super(GraphicalEditorController, self).destroy()
 
     def register_view(self, view):
@@ -108,6 +121,8 @@ class GraphicalEditorController(ExtendedController):
         self.focus_changed_handler_id = self.view.editor.connect('focus-changed', self._move_focused_item_into_viewport)
         self.view.editor.connect("drag-data-received", self.on_drag_data_received)
         self.drag_motion_handler_id = self.view.editor.connect("drag-motion", self.on_drag_motion)
+        if self._lazy_state_views:
+            self.view.editor.connect_after("draw", self._on_editor_drawn)
 
         self.setup_canvas()
 
@@ -312,6 +327,8 @@ class GraphicalEditorController(ExtendedController):
         self.view.editor.vadjustment.set_value(state_pos[VERTICAL] - padding_offset_vertical)
 
     def _meta_data_changed(self, view, model, name, affects_children):
+        # States might have been moved or resized into the viewport
+        self._last_viewport = None
         msg = MetaSignalMsg('graphical_editor_gaphas', name, affects_children)
         model.meta_signal.emit(msg)
 
@@ -343,6 +360,8 @@ class GraphicalEditorController(ExtendedController):
 
         model = notification.model
         view = self.canvas.get_view_for_model(model)
+        if view is None:  # The content of the parent state has not been created, see GAPHAS_EDITOR_LAZY_STATE_VIEWS
+            return
 
         if meta_signal_message.change == 'show_content':
             library_state_m = model
@@ -363,6 +382,7 @@ class GraphicalEditorController(ExtendedController):
                 state_copy_v = self.canvas.get_view_for_model(library_state_m.state_copy)
                 if state_copy_v:
                     state_copy_v.remove()
+                library_state_v.content_created = True
         else:
             if isinstance(view, StateView):
                 view.apply_meta_data(recursive=meta_signal_message.affects_children)
@@ -472,6 +492,10 @@ class GraphicalEditorController(ExtendedController):
                     if not parent_library_root_state_m.parent.show_content():
                         return
 
+            # the views of the content of container states are eventually not created, yet
+            if self._lazy_state_views and not self._is_model_shown(model, method_name):
+                return
+
             if method_name == 'state_execution_status':
                 state_v = self.canvas.get_view_for_model(model)
                 if state_v:  # Children of LibraryStates are not modeled, yet
@@ -686,6 +710,8 @@ class GraphicalEditorController(ExtendedController):
     @lock_state_machine
     def adapt_complex_action(self, old_state_m, new_state_m):
         old_state_v = self.canvas.get_view_for_model(old_state_m)
+        if old_state_v is None:  # The content of the parent state has not been created, see _is_model_shown
+            return
         parent_state_v = self.canvas.get_view_for_model(new_state_m.parent)
         old_state_v.remove()
 
@@ -767,6 +793,8 @@ class GraphicalEditorController(ExtendedController):
         """
         state_machine_m = self.model
         state_v = self.canvas.get_view_for_model(state_m)
+        if state_v is None and self._lazy_state_views:
+            state_v = self._create_state_views_for_model(state_m)
         if state_v is None:
             logger.warning('There is no view for state model {0}'.format(state_m))
         self.move_item_into_viewport(state_v)
@@ -805,6 +833,8 @@ class GraphicalEditorController(ExtendedController):
 
         The method uses the `StateModel` `state_m` to create the according `StateView`. For all content within 
         `state_m`, such as connections, states and ports, the views are also created. All views are added to the canvas.
+        If `GAPHAS_EDITOR_LAZY_STATE_VIEWS` is enabled, the views of the content (child states and connections) of
+        non-root states are created later on, when the state becomes visible.
 
         :param rafcon.gui.models.state.StateModel state_m: The state to be drawn
         :param rafcon.gui.mygaphas.items.state.StateView parent_v: The parent state view of new state view `state_m`
@@ -861,6 +891,42 @@ class GraphicalEditorController(ExtendedController):
             # Keep state within parent
             pass
 
+        if isinstance(state_m, ContainerStateModel):
+            for scoped_variable_m in state_m.scoped_variables:
+                state_v.add_scoped_variable(scoped_variable_m)
+
+        if self._lazy_state_views and parent_v is not None and self._has_content_views(state_m):
+            # The content views are created, when the state becomes visible, see _update_lazy_state_views
+            state_v.content_created = False
+            self._last_viewport = None
+        else:
+            self._add_state_content_views(state_m, state_v)
+
+        return state_v
+
+    @staticmethod
+    def _has_content_views(state_m):
+        """Checks whether views for the content of a state are drawn, e.g. the child states of a container state
+
+        :param rafcon.gui.models.abstract_state.AbstractStateModel state_m: The state model to check
+        :return: True for container states and library states showing their content
+        :rtype: bool
+        """
+        if isinstance(state_m, LibraryStateModel):
+            return state_m.show_content() and state_m.state_copy_initialized
+        return isinstance(state_m, ContainerStateModel)
+
+    @lock_state_machine
+    def _add_state_content_views(self, state_m, state_v):
+        """Creates the views for the content of a state and adds them to the canvas
+
+        The content of a container state are its child states (recursively), transitions and data flows. The content
+        of a library state, which shows its content, is the state copy.
+
+        :param rafcon.gui.models.abstract_state.AbstractStateModel state_m: The state whose content is to be drawn
+        :param StateView state_v: The view of `state_m`
+        """
+        hierarchy_level = state_v.hierarchy_level
         if isinstance(state_m, LibraryStateModel) and state_m.show_content() and state_m.state_copy_initialized:
             gui_helper_meta_data.scale_library_content(state_m)
             self.add_state_view_for_model(state_m.state_copy, state_v, hierarchy_level=hierarchy_level + 1)
@@ -868,9 +934,6 @@ class GraphicalEditorController(ExtendedController):
         elif isinstance(state_m, ContainerStateModel):
             num_child_state = 0
 
-            for scoped_variable_m in state_m.scoped_variables:
-                state_v.add_scoped_variable(scoped_variable_m)
-
             for child_state_m in state_m.states.values():
                 # generate optional meta data for child state - not used if valid meta data already in child state model
                 child_rel_pos, child_size = gui_helper_meta_data.generate_default_state_meta_data(state_m, self.canvas,
@@ -885,7 +948,136 @@ class GraphicalEditorController(ExtendedController):
             for data_flow_m in state_m.data_flows:
                 self.add_data_flow_view_for_model(data_flow_m, state_m)
 
-        return state_v
+        state_v.content_created = True
+
+    @lock_state_machine
+    def _remove_state_content_views(self, state_v):
+        """Removes the views of the content of a state from the canvas
+
+        The content is kept, if one of its elements is selected, focused or moved.
+
+        :param StateView state_v: The state view whose content views are to be removed
+        :return: Whether the content views were removed
+        :rtype: bool
+        """
+        selection = self.model.selection
+        for item in self.canvas.get_all_children(state_v):
+            item_m = getattr(item, 'model', None)
+            if isinstance(item, NameView) or item_m is None:
+                continue
+            if item_m in selection or item_m is selection.focus or getattr(item, 'moving', False):
+                return False
+            if isinstance(item, StateView) and any(port_v.model in selection for port_v in item.get_all_ports()):
+                return False
+
+        children = self.canvas.get_children(state_v)
+        # Connections are removed first, as they are connected to the ports of the child states
+        for child in [child for child in children if isinstance(child, (TransitionView, DataFlowView))] + \
+                [child for child in children if isinstance(child, StateView)]:
+            child.remove()
+        state_v.content_created = False
+        return True
+
+    def _create_state_views_for_model(self, model):
+        """Creates the content views of all parent states of `model`, which have not been created, yet
+
+        :param model: The model, for which a view is needed
+        :return: The view of `model` or None, if it cannot be drawn (e.g. within a library state not showing its
+            content)
+        """
+        parent_models = []
+        parent_m = model.parent
+        while isinstance(parent_m, AbstractStateModel):
+            parent_models.insert(0, parent_m)
+            parent_m = parent_m.parent
+
+        for parent_m in parent_models:
+            parent_v = self.canvas.get_view_for_model(parent_m)
+            if parent_v is None:
+                return None
+            if not parent_v.content_created:
+                self._add_state_content_views(parent_m, parent_v)
+                self.canvas.wait_for_update()
+        return self.canvas.get_view_for_model(model)
+
+    def _is_model_shown(self, model, method_name):
+        """Checks whether the views affected by a change of `model` exist
+
+        This is not the case, if the content of the parent state has not been created, yet, see
+        `GAPHAS_EDITOR_LAZY_STATE_VIEWS`.
+
+        :param model: The model, which has changed
+        :param str method_name: The name of the method causing the change
+        :rtype: bool
+        """
+        if method_name in ['add_state', 'add_transition', 'add_data_flow']:
+            state_v = self.canvas.get_view_for_model(model)
+            return state_v is not None and state_v.content_created
+        if isinstance(model, (TransitionModel, DataFlowModel)):
+            return self.canvas.get_view_for_model(model) is not None
+        state_m = model if isinstance(model, AbstractStateModel) else model.parent
+        return self.canvas.get_view_for_model(state_m) is not None
+
+    def _on_editor_drawn(self, editor, context):
+        """Schedules an update of the content views, if the viewport has changed since the last update"""
+        allocation = editor.get_allocation()
+        viewport = (editor.get_zoom_factor(), editor.hadjustment.get_value(), editor.vadjustment.get_value(),
+                    allocation.width, allocation.height)
+        if viewport != self._last_viewport and self._lazy_update_id is None:
+            self._last_viewport = viewport
+            self._lazy_update_id = GLib.idle_add(self._update_lazy_state_views)
+
+    def _update_lazy_state_views(self):
+        """Creates and removes the content views of states depending on their visibility
+
+        The content views of a state are created, if the state is within the viewport and its sides are at least
+        `MINIMUM_SIZE_FOR_CONTENT` pixels long. Otherwise, they are removed. Only one hierarchy level is created per
+        call, as the newly created views are positioned with the next update of the canvas. Further levels are handled
+        with the next redraw.
+        """
+        self._lazy_update_id = None
+        if not self.view:
+            return False
+        root_state_v = self.canvas.get_view_for_model(self.root_state_m)
+        if root_state_v is None:
+            return False
+        editor = self.view.editor
+        allocation = editor.get_allocation()
+        minimum_size = rafcon.gui.singleton.global_gui_config.get_config_value('MINIMUM_SIZE_FOR_CONTENT', 30)
+
+        changed = False
+        state_views = list(root_state_v.child_state_views())
+        while state_views:
+            state_v = state_views.pop()
+            i2v = editor.get_matrix_i2v(state_v)
+            x0, y0 = i2v.transform_point(0, 0)
+            x1, y1 = i2v.transform_point(state_v.width, state_v.height)
+            is_visible = x1 >= 0 and y1 >= 0 and x0 <= allocation.width and y0 <= allocation.height
+            is_large = min(x1 - x0, y1 - y0) >= minimum_size
+            if not state_v.content_created:
+                if is_visible and is_large:
+                    self._add_state_content_views(state_v.model, state_v)
+                    changed = True
+            elif self._has_content_views(state_v.model) and not (is_visible and is_large):
+                changed |= self._remove_state_content_views(state_v)
+            else:
+                state_views.extend(state_v.child_state_views())
+
+        if changed:
+            self._last_viewport = None
+            self.canvas.request_update(root_state_v)
+        return False
+
+    @ExtendedController.observe("focus_signal", signal=True)
+    def _on_focus_changed(self, selection_m, signal_name, signal_msg):
+        """Creates the view of the focused model, if the content of its parent state has not been created, yet"""
+        focus_m = signal_msg.arg.new_focus
+        if focus_m is None or self.canvas.get_view_for_model(focus_m) is not None:
+            return
+        focused_item = self._create_state_views_for_model(focus_m)
+        if focused_item is not None:
+            self.view.editor.queue_draw_item(focused_item)
+            self.move_item_into_viewport(focused_item)
 
     @lock_state_machine
     def add_transition_view_for_model(self, transition_m, parent_state_m):
@@ -539,6 +539,20 @@ def resize_state_meta(state_m, factor, gaphas_editor=True):
     # print("re-sized state", state_m.get_meta_data_editor(for_gaphas=gaphas_editor), state_m.core_element)
 
 
+def resize_state_content_meta(state_m, factor, gaphas_editor=True):
+    """ Resize the meta data of the content of a state, but not of the state itself
+
+    The content are the child states and connections of a container state or the state copy of a library state.
+    """
+    if isinstance(state_m, LibraryStateModel):
+        if state_m.state_copy_initialized:
+            resize_state_meta(state_m.state_copy, factor, gaphas_editor)
+    elif isinstance(state_m, ContainerStateModel):
+        _resize_connection_models_list(state_m.transitions[:] + state_m.data_flows[:], factor, gaphas_editor)
+        for child_state_m in state_m.states.values():
+            resize_state_meta(child_state_m, factor, gaphas_editor)
+
+
 def resize_of_all_models_in_dict(models_dict, factor, gaphas_editor=True):
     # print("\n", "#"*30, "resize models", factor, "#"*30,)
 
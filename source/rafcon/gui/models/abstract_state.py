@@ -489,7 +489,7 @@ class AbstractStateModel(MetaModel, Hashable):
         path_meta_data = os.path.join(path, storage.FILE_NAME_META_DATA)
 
         # TODO: Should be removed with next minor release
-        if not os.path.exists(path_meta_data):
+        if not storage.data_file_exists(path_meta_data):
             logger.debug("Because meta data was not found in {0} use backup option {1}"
                          "".format(path_meta_data, os.path.join(path, storage.FILE_NAME_META_DATA_OLD)))
             path_meta_data = os.path.join(path, storage.FILE_NAME_META_DATA_OLD)
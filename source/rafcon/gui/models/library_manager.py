@@ -10,6 +10,7 @@
 # Rico Belder <rico.belder@dlr.de>
 # Sebastian Brunner <sebastian.brunner@dlr.de>
 
+from gi.repository import GLib
 from gtkmvc3.model_mt import ModelMT
 from rafcon.utils.vividict import Vividict
 from rafcon.core.library_manager import LibraryManager
@@ -39,6 +40,9 @@ class LibraryManagerModel(ModelMT):
         assert isinstance(library_manager, LibraryManager)
 
         self.library_manager = library_manager
+        # the library tree is observed by GTK widgets, thus changes detected by the library watcher are applied in the
+        # GTK main loop
+        library_manager.set_update_dispatcher(self._dispatch_library_update)
 
         if isinstance(meta, Vividict):
             self.meta = meta
@@ -48,6 +52,13 @@ class LibraryManagerModel(ModelMT):
         # this class is an observer of its own properties:
         self.register_observer(self)
 
+    @staticmethod
+    def _dispatch_library_update(function, *args):
+        def apply_update():
+            function(*args)
+            return False
+        GLib.idle_add(apply_update)
+
     def state_machine_was_stored(self, state_machine_m, old_path):
         """ Updates library manager and notifies the state machines if a mounted library was saved.
 
@@ -26,11 +26,20 @@ class MyCanvas(gaphas.canvas.Canvas):
 
     _core_view_map = None
     _model_view_map = None
+    _view_core_map = None
+    _id_view_map = None
+    _view_id_map = None
 
     def __init__(self):
         super(MyCanvas, self).__init__()
         self._core_view_map = {}
         self._model_view_map = {}
+        # Reverse mapping of _core_view_map
+        self._view_core_map = {}
+        # Maps (view class, element id) to the views with this id, see get_view_for_id
+        self._id_view_map = {}
+        # Reverse mapping of _id_view_map
+        self._view_id_map = {}
 
     def _add_view_maps(self, view):
         model = view.model
@@ -40,20 +49,56 @@ class MyCanvas(gaphas.canvas.Canvas):
             raise RuntimeError("Model is already existing in _model_view_map")
         self._core_view_map[model.core_element] = view
         self._model_view_map[model] = view
+        self._view_core_map[view] = model.core_element
 
     def _remove_view_maps(self, view):
         model = view.model
         del self._model_view_map[model]
         # Do not retrieve core element from model, as the model could have already been destroyed
-        core_element = list(self._core_view_map.keys())[list(self._core_view_map.values()).index(view)]
+        core_element = self._view_core_map.pop(view)
         del self._core_view_map[core_element]
 
+    @staticmethod
+    def _get_id_key(view, model=None):
+        """Returns the key of a view in the _id_view_map
+
+        :param view: The view of a state, transition or data flow
+        :param model: The model of the view, if it differs from view.model
+        :return: The view class and the id of the element of the view or None for other views
+        :rtype: tuple
+        """
+        from rafcon.gui.mygaphas.items.state import StateView
+        from rafcon.gui.mygaphas.items.connection import DataFlowView, TransitionView
+        model = model or view.model
+        if isinstance(view, StateView):
+            return StateView, model.state.state_id
+        if isinstance(view, TransitionView):
+            return TransitionView, model.transition.transition_id
+        if isinstance(view, DataFlowView):
+            return DataFlowView, model.data_flow.data_flow_id
+        return None
+
+    def _add_id_view_map(self, view, model=None):
+        key = self._get_id_key(view, model)
+        if key is not None:
+            self._id_view_map.setdefault(key, []).append(view)
+            self._view_id_map[view] = key
+
+    def _remove_id_view_map(self, view):
+        key = self._view_id_map.pop(view, None)
+        if key is not None:
+            views = self._id_view_map[key]
+            views.remove(view)
+            if not views:
+                del self._id_view_map[key]
+
     def add(self, item, parent=None, index=None):
         from rafcon.gui.mygaphas.items.state import StateView
         from rafcon.gui.mygaphas.items.connection import ConnectionView, ConnectionPlaceholderView
         if isinstance(item, (StateView, ConnectionView)) and not isinstance(item, ConnectionPlaceholderView):
             # print("add view", item)
             self._add_view_maps(item)
+            self._add_id_view_map(item)
         super(MyCanvas, self).add(item, parent, index)
 
     def remove(self, item):
@@ -62,6 +107,7 @@ class MyCanvas(gaphas.canvas.Canvas):
         if isinstance(item, (StateView, ConnectionView)) and not isinstance(item, ConnectionPlaceholderView):
             # print("remove", item)
             self._remove_view_maps(item)
+            self._remove_id_view_map(item)
 
         # Gtk TODO: fix destruct of gaphas
         try:
@@ -86,6 +132,9 @@ class MyCanvas(gaphas.canvas.Canvas):
         del self._model_view_map[old_model]
         self._core_view_map[new_model.core_element] = view
         self._model_view_map[new_model] = view
+        self._view_core_map[view] = new_model.core_element
+        self._remove_id_view_map(view)
+        self._add_id_view_map(view, new_model)
 
     def update_root_items(self):
         for root_item in self.get_root_items():
@@ -126,23 +175,33 @@ class MyCanvas(gaphas.canvas.Canvas):
         :param gaphas.item.Item parent_item: Restrict the search to this parent item
         :return: The view for the given id or None if not found
         """
-        from rafcon.gui.mygaphas.items.state import StateView
-        from rafcon.gui.mygaphas.items.connection import DataFlowView, TransitionView
-        if parent_item is None:
-            items = self.get_all_items()
-        else:
-            items = self.get_children(parent_item)
-        for item in items:
-            if view_class is StateView and isinstance(item, StateView) and item.model.state.state_id == element_id:
-                return item
-            if view_class is TransitionView and isinstance(item, TransitionView) and \
-                    item.model.transition.transition_id == element_id:
-                return item
-            if view_class is DataFlowView and isinstance(item, DataFlowView) and \
-                    item.model.data_flow.data_flow_id == element_id:
+        key = (view_class, element_id)
+        view = self._find_view_for_id_key(key, parent_item)
+        if view is None and self._update_id_view_map():
+            view = self._find_view_for_id_key(key, parent_item)
+        return view
+
+    def _find_view_for_id_key(self, key, parent_item=None):
+        for item in self._id_view_map.get(key, ()):
+            # The id of a state can change after its view has been added
+            if self._get_id_key(item) != key:
+                continue
+            if parent_item is None or self.get_parent(item) is parent_item:
                 return item
         return None
 
+    def _update_id_view_map(self):
+        """Re-keys the views, whose element id changed after they have been added, e.g. by `State.change_state_id`
+
+        :return: Whether any view was re-keyed
+        :rtype: bool
+        """
+        changed_views = [view for view, key in self._view_id_map.items() if self._get_id_key(view) != key]
+        for view in changed_views:
+            self._remove_id_view_map(view)
+            self._add_id_view_map(view)
+        return bool(changed_views)
+
     def wait_for_update(self, trigger_update=False):
         """Update canvas and handle all events in the gtk queue
 
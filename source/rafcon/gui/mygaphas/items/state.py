@@ -38,10 +38,10 @@ from rafcon.gui.mygaphas.items.connection import TransitionView
 from rafcon.gui.mygaphas.utils.enums import SnappedSide
 from rafcon.gui.mygaphas.utils.gap_draw_helper import get_col_rgba
 from rafcon.gui.mygaphas.utils import gap_draw_helper
-from rafcon.gui.mygaphas.utils.cache.image_cache import ImageCache
+from rafcon.gui.mygaphas.utils.cache.surface_cache import get_surface_cache
 
 from rafcon.gui.models import AbstractStateModel, LibraryStateModel, ContainerStateModel
-from rafcon.gui.helpers.meta_data import contains_geometric_info
+from rafcon.gui.helpers.meta_data import contains_geometric_info, resize_state_content_meta
 from rafcon.gui.config import global_gui_config as gui_config
 from rafcon.gui.runtime_config import global_runtime_config
 from rafcon.gui.utils import constants
@@ -90,8 +90,13 @@ class StateView(Element):
 
         self._view = None
 
+        # False, if the views of the child states and connections have not (yet) been created, see
+        # GAPHAS_EDITOR_LAZY_STATE_VIEWS
+        self.content_created = True
+
         self.__symbol_size_cache = {}
-        self._image_cache = ImageCache()
+        # the surface drawn last, kept even if it is dropped from the surface cache
+        self._last_surface = None
 
         self._border_width = Variable(min(self.width, self.height) / constants.BORDER_WIDTH_STATE_SIZE_FACTOR)
         border_width_constraint = BorderWidthConstraint(self._handles[NW].pos, self._handles[SE].pos,
@@ -386,7 +391,8 @@ class StateView(Element):
                 update_port_position(scoped_port_v, scoped_port_v.model.get_meta_data_editor())
             for transition_m in self.model.transitions:
                 transition_v = self.canvas.get_view_for_model(transition_m)
-                transition_v.apply_meta_data()
+                if transition_v:
+                    transition_v.apply_meta_data()
 
             if recursive:
                 for state_v in self.canvas.get_children(self):
@@ -414,27 +420,32 @@ class StateView(Element):
 
         c = context.cairo
         nw = self._handles[NW].pos
+        upper_left_corner = (nw.x.value, nw.y.value)
         parameters = {
             'execution_state':  self.model.state.state_execution_status,
             'selected': self.selected,
             'moving': self.moving,
             'border_width': border_width,
             'transparency': self.transparency,
-            'draw_all': context.draw_all
+            'draw_all': context.draw_all,
+            'upper_left_corner': upper_left_corner
         }
 
-        upper_left_corner = (nw.x.value, nw.y.value)
         current_zoom = self.view.get_zoom_factor()
-        from_cache, image, zoom = self._image_cache.get_cached_image(width, height, current_zoom, parameters)
+        surface_cache = get_surface_cache()
+        surface_key = surface_cache.get_key('state', width, height, parameters)
+        surface = surface_cache.get_surface(surface_key, current_zoom, self._last_surface)
 
-        # The parameters for drawing haven't changed, thus we can just copy the content from the last rendering result
-        if from_cache:
-            self._image_cache.copy_image_to_context(c, upper_left_corner)
+        # A state with the same drawing parameters has already been rendered, thus we can just copy the cached image
+        if surface:
+            surface.copy_to_context(c, upper_left_corner)
 
         # Parameters have changed or nothing in cache => redraw
         else:
-            c = self._image_cache.get_context_for_image(current_zoom)
-            multiplicator = self._image_cache.multiplicator
+            surface = surface_cache.create_surface(surface_key, width, height, current_zoom)
+            self._last_surface = surface
+            c = surface.get_context()
+            multiplicator = surface.multiplicator
             default_line_width = border_width / constants.BORDER_WIDTH_OUTLINE_WIDTH_FACTOR * multiplicator
 
             c.rectangle(nw.x, nw.y, width, height)
@@ -469,7 +480,7 @@ class StateView(Element):
             c.stroke()
 
             # Copy image surface to current cairo context
-            self._image_cache.copy_image_to_context(context.cairo, upper_left_corner, zoom=current_zoom)
+            surface.copy_to_context(context.cairo, upper_left_corner)
 
         self._income.draw(context, self)
 
@@ -486,7 +497,9 @@ class StateView(Element):
         for scoped_variable_v in self._scoped_variables_ports:
             scoped_variable_v.draw(context, self)
 
-        if isinstance(self.model, LibraryStateModel) and not self.moving:
+        if not self.content_created and not self.moving:
+            self._draw_symbol(context, constants.SIGN_CONTENT, gui_config.gtk_colors['STATE_NAME'], 0.75)
+        elif isinstance(self.model, LibraryStateModel) and not self.moving:
             symbol_transparency = 0.9 if self.show_content(with_content=True) else 0.75
             self._draw_symbol(context, constants.SIGN_LIB, gui_config.gtk_colors['STATE_NAME'], symbol_transparency)
 
@@ -871,7 +884,10 @@ class StateView(Element):
                 new_port_rel_pos = calc_new_rel_pos(port_v.handle.pos, old_state_size, new_state_size)
                 port_v.handle.pos = new_port_rel_pos
 
-            if isinstance(state_v.model, ContainerStateModel):
+            if not state_v.content_created:
+                # There are no views for the content, thus its meta data is scaled directly
+                resize_state_content_meta(state_v.model, (width_factor, height_factor))
+            elif isinstance(state_v.model, ContainerStateModel):
                 for transition_v in state_v.get_transitions():
                     for waypoint in transition_v.waypoints:
                         old_rel_pos = self.canvas.get_matrix_i2i(transition_v, transition_v.parent).transform_point(
@@ -917,7 +933,8 @@ class NameView(Element):
 
         self._view = None
 
-        self._image_cache = ImageCache(multiplicator=1.5)
+        # the surface drawn last, kept even if it is dropped from the surface cache
+        self._last_surface = None
 
     def remove(self):
         self.canvas.remove(self)
@@ -1000,14 +1017,18 @@ class NameView(Element):
 
         upper_left_corner = (0, 0)
         current_zoom = self.view.get_zoom_factor()
-        from_cache, image, zoom = self._image_cache.get_cached_image(width, height, current_zoom, parameters)
-        # The parameters for drawing haven't changed, thus we can just copy the content from the last rendering result
-        if from_cache:
-            self._image_cache.copy_image_to_context(c, upper_left_corner)
+        surface_cache = get_surface_cache()
+        surface_key = surface_cache.get_key('name', width, height, parameters)
+        surface = surface_cache.get_surface(surface_key, current_zoom, self._last_surface)
+        # A name with the same drawing parameters has already been rendered, thus we can just copy the cached image
+        if surface:
+            surface.copy_to_context(c, upper_left_corner)
 
         # Parameters have changed or nothing in cache => redraw
         else:
-            c = self._image_cache.get_context_for_image(current_zoom)
+            surface = surface_cache.create_surface(surface_key, width, height, current_zoom, multiplicator=1.5)
+            self._last_surface = surface
+            c = surface.get_context()
 
             if context.selected:
                 # Draw light background color if selected
@@ -1093,4 +1114,4 @@ class NameView(Element):
             c.restore()
 
             # Copy image surface to current cairo context
-            self._image_cache.copy_image_to_context(context.cairo, upper_left_corner, zoom=current_zoom)
+            surface.copy_to_context(context.cairo, upper_left_corner)
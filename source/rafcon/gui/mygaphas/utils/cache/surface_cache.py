@@ -0,0 +1,265 @@
+# Copyright (C) 2015-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Franz Steinmetz <franz.steinmetz@dlr.de>
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: surface_cache
+   :synopsis: A process wide cache of rendered image surfaces, shared by all views
+
+Items of the graphical editor are drawn on an ImageSurface, which is then copied to the cairo context of the view.
+The :class:`SurfaceCache` stores these surfaces by all parameters used for drawing them. Thus, visually identical items
+(e.g. several instances of the same library) are rendered only once. The surfaces are rendered for quantized zoom
+levels and several zoom levels of an item are kept, so that zooming in and out again does not cause all items to be
+rendered again. The least recently used surfaces are dropped, when the memory limit is exceeded.
+
+Independent of the cache, each item keeps the surface it has drawn last and passes it to
+:meth:`SurfaceCache.get_surface`. Thus, an unchanged item is never rendered again, even if its surface was dropped
+from the cache.
+"""
+
+from builtins import object
+from collections import OrderedDict
+from math import ceil, sqrt
+import math
+
+from cairo import ImageSurface, FORMAT_ARGB32, Context, Error
+
+from rafcon.gui.config import global_gui_config
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+# Number of zoom levels, for which surfaces are rendered, per doubling of the zoom factor
+ZOOM_LEVELS_PER_OCTAVE = 2
+MAX_ALLOWED_AREA = 5000. * 5000.
+# Surfaces larger than this fraction of the memory limit are not cached, but only kept by the item drawing them
+MAX_SURFACE_SHARE = 1. / 8
+
+_surface_cache = None
+
+
+def get_surface_cache():
+    """Returns the surface cache of the process, which is created with the first call
+
+    The memory limit is read from the GUI config value `SURFACE_CACHE_MEMORY_LIMIT` (in MB).
+
+    :rtype: SurfaceCache
+    """
+    global _surface_cache
+    if _surface_cache is None:
+        memory_limit = global_gui_config.get_config_value('SURFACE_CACHE_MEMORY_LIMIT', 100)
+        _surface_cache = SurfaceCache(memory_limit * 1024 * 1024)
+    return _surface_cache
+
+
+class CachedSurface(object):
+    """An ImageSurface together with the scaling it was rendered with
+
+    :ivar cairo.ImageSurface surface: The image
+    :ivar float zoom: The zoom factor, for which the image was rendered
+    :ivar float multiplicator: The zoom factor is multiplied with this value to prepare the image for higher zoom levels
+    :ivar tuple key: The key of the surface and the zoom level, for which it was rendered, or None, if the surface
+        was created with disabled caching
+    """
+
+    def __init__(self, surface, zoom, multiplicator, key=None):
+        self.surface = surface
+        self.zoom = zoom
+        self.multiplicator = multiplicator
+        self.key = key
+
+    @property
+    def size(self):
+        """The memory used by the image in bytes"""
+        return self.surface.get_stride() * self.surface.get_height()
+
+    def get_context(self):
+        """Creates a cairo context for drawing on the image in item coordinates
+
+        :return: Cairo context to draw on
+        """
+        cairo_context = Context(self.surface)
+        cairo_context.scale(self.zoom * self.multiplicator, self.zoom * self.multiplicator)
+        return cairo_context
+
+    def copy_to_context(self, context, position, rotation=0):
+        """Draws the image on the given context
+
+        :param context: The Cairo context to draw on
+        :param position: The position of the image in item coordinates
+        :param rotation: The rotation of the image
+        """
+        zoom_multiplicator = self.zoom * self.multiplicator
+        context.save()
+        context.scale(1. / zoom_multiplicator, 1. / zoom_multiplicator)
+
+        image_position = round(position[0] * zoom_multiplicator), round(position[1] * zoom_multiplicator)
+        context.translate(*image_position)
+        context.rotate(rotation)
+        context.set_source_surface(self.surface, 0, 0)
+
+        context.paint()
+        context.restore()
+
+
+class SurfaceCache(object):
+    """LRU cache of rendered image surfaces with a memory limit
+
+    Surfaces are identified by a key, which contains all parameters used for drawing them (see :meth:`get_key`), and
+    by the zoom level. Surfaces using more than :data:`MAX_SURFACE_SHARE` of the memory limit are not cached, so that a
+    single strongly zoomed item cannot drop all other surfaces. If the GUI config value `ENABLE_CACHING` is False, no
+    surfaces are cached.
+
+    :param int memory_limit: The maximum memory used by all cached surfaces in bytes
+    """
+
+    def __init__(self, memory_limit):
+        self.memory_limit = memory_limit
+        self._surfaces = OrderedDict()
+        self._memory_usage = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def get_key(name, width, height, parameters):
+        """Calculates the key of a surface
+
+        :param str name: The name of the kind of item, e.g. "state"
+        :param float width: The width of the image in item coordinates
+        :param float height: The height of the image in item coordinates
+        :param dict parameters: All other parameters influencing the drawing, the values must be hashable
+        :return: All parameters
+        :rtype: tuple
+        """
+        return name, width, height, tuple(sorted(parameters.items()))
+
+    @staticmethod
+    def get_zoom_level(zoom):
+        """Quantizes a zoom factor
+
+        :param float zoom: The zoom factor
+        :return: The zoom level, surfaces are rendered for the zoom factor 2 ** (level / ZOOM_LEVELS_PER_OCTAVE)
+        :rtype: int
+        """
+        return int(round(math.log(zoom, 2) * ZOOM_LEVELS_PER_OCTAVE))
+
+    @property
+    def memory_usage(self):
+        """The memory used by all cached surfaces in bytes"""
+        return self._memory_usage
+
+    @property
+    def hit_rate(self):
+        """The ratio of lookups, for which a surface was found"""
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def get_surface(self, key, zoom, last_surface=None):
+        """Returns the cached surface for the given key and zoom factor
+
+        :param tuple key: The key of the surface, see :meth:`get_key`
+        :param float zoom: The current zoom factor
+        :param CachedSurface last_surface: The surface drawn last by the calling item, which is returned, if it was
+            rendered for the key and zoom level, even if it is no longer cached
+        :return: The cached surface or None, if no surface is cached for the key and the zoom level of `zoom`
+        :rtype: CachedSurface
+        """
+        if not global_gui_config.get_config_value('ENABLE_CACHING', True):
+            return None
+        cache_key = (key, self.get_zoom_level(zoom))
+        surface = self._surfaces.pop(cache_key, None)
+        if surface is None and last_surface is not None and last_surface.key == cache_key:
+            self.hits += 1
+            return last_surface
+        if surface is None:
+            self.misses += 1
+            return None
+        # Mark surface as most recently used
+        self._surfaces[cache_key] = surface
+        self.hits += 1
+        return surface
+
+    def create_surface(self, key, width, height, zoom, multiplicator=2):
+        """Creates a blank surface for the given key and zoom factor and adds it to the cache
+
+        The surface is rendered for the zoom level of `zoom`. If caching is disabled, the surface is rendered for
+        `zoom` and not cached.
+
+        :param tuple key: The key of the surface, see :meth:`get_key`
+        :param float width: The width of the image in item coordinates
+        :param float height: The height of the image in item coordinates
+        :param float zoom: The current zoom factor
+        :param float multiplicator: The zoom factor is multiplied with this value to prepare the image for higher zoom
+          levels
+        :return: The new surface, to be drawn on using :meth:`CachedSurface.get_context`
+        :rtype: CachedSurface
+        """
+        if not global_gui_config.get_config_value('ENABLE_CACHING', True):
+            return self._create_surface(width, height, zoom, multiplicator)
+
+        zoom_level = self.get_zoom_level(zoom)
+        surface = self._create_surface(width, height, 2 ** (zoom_level / float(ZOOM_LEVELS_PER_OCTAVE)),
+                                       multiplicator)
+        cache_key = (key, zoom_level)
+        surface.key = cache_key
+        replaced_surface = self._surfaces.pop(cache_key, None)
+        if replaced_surface is not None:
+            self._memory_usage -= replaced_surface.size
+        if surface.size > self.memory_limit * MAX_SURFACE_SHARE:
+            return surface
+        self._surfaces[cache_key] = surface
+        self._memory_usage += surface.size
+
+        # Drop least recently used surfaces, but keep the new one
+        while self._memory_usage > self.memory_limit and len(self._surfaces) > 1:
+            _, dropped_surface = self._surfaces.popitem(last=False)
+            self._memory_usage -= dropped_surface.size
+            self.evictions += 1
+        return surface
+
+    @staticmethod
+    def _create_surface(width, height, zoom, multiplicator):
+        global MAX_ALLOWED_AREA
+        # Restrict image surface size to prevent excessive use of memory
+        while True:
+            try:
+                limiting_multiplicator = 1
+                area = width * zoom * multiplicator * height * zoom * multiplicator
+                if area > MAX_ALLOWED_AREA:
+                    limiting_multiplicator = sqrt(MAX_ALLOWED_AREA / area)
+                scale = zoom * multiplicator * limiting_multiplicator
+                image = ImageSurface(FORMAT_ARGB32, int(ceil(width * scale)), int(ceil(height * scale)))
+                return CachedSurface(image, zoom, multiplicator * limiting_multiplicator)
+            except Error:
+                MAX_ALLOWED_AREA *= 0.8
+
+    def clear(self):
+        """Drops all cached surfaces"""
+        self._surfaces.clear()
+        self._memory_usage = 0
+
+    def get_statistics(self):
+        """Returns the statistics of the cache
+
+        :return: The number of hits, misses and evictions, the hit rate, the number of cached surfaces and their memory
+          usage in bytes
+        :rtype: dict
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate, 'evictions': self.evictions,
+                'surfaces': len(self._surfaces), 'memory_usage': self._memory_usage}
+
+    def log_statistics(self):
+        logger.debug("Surface cache: {hits} hits, {misses} misses (hit rate {hit_rate:.1%}), {evictions} evictions, "
+                     "{surfaces} surfaces using {memory:.1f} MB".format(memory=self._memory_usage / 1024. / 1024.,
+                                                                       **self.get_statistics()))
@@ -17,7 +17,9 @@ from gtkmvc3.observer import Observer
 
 from gaphas.view import GtkView
 from gaphas.item import Element
+from gaphas.quadtree import Quadtree
 
+from rafcon.gui.mygaphas.connector import RectanglePointPort
 from rafcon.gui.mygaphas.painter import BoundingBoxPainter
 from rafcon.gui.mygaphas.utils.cache.value_cache import ValueCache
 
@@ -37,6 +39,9 @@ class ExtendedGtkView(GtkView, Observer):
         self.observe_model(state_machine_m.root_state)
         self._bounding_box_painter = BoundingBoxPainter(self)
         self._graphical_editor = ref(graphical_editor_v)
+        # Spatial index of the ports of the items in view coordinates, see _update_port_index
+        self._port_qtree = Quadtree()
+        self._indexed_ports = {}
 
     def prepare_destruction(self):
         """Get rid of circular references"""
@@ -79,7 +84,6 @@ class ExtendedGtkView(GtkView, Observer):
         """
         # Method had to be inherited, as the base method has a bug:
         # It misses the statement max_dist = d
-        v2i = self.get_matrix_v2i
         vx, vy = vpos
 
         max_dist = distance
@@ -89,16 +93,35 @@ class ExtendedGtkView(GtkView, Observer):
 
         rect = (vx - distance, vy - distance, distance * 2, distance * 2)
         items = self.get_items_in_rectangle(rect, reverse=True)
+
+        # The distance of the glue is measured in item coordinates, thus the search area for the indexed ports must be
+        # scaled, if the view is zoomed in
+        port_distance = distance * max(1., self.get_zoom_factor())
+        port_rect = (vx - port_distance, vy - port_distance, port_distance * 2, port_distance * 2)
+        # Only ports within the bounds of the tree are found, which is resized together with the widget
+        if self._port_qtree.bounds != self._qtree.bounds:
+            self._port_qtree.resize(self._qtree.bounds)
+        close_ports = {}
+        for p in self._port_qtree.find_intersect(port_rect):
+            close_ports.setdefault(self._port_qtree.get_data(p), []).append(p)
+
         for i in items:
             if exclude and i in exclude:
                 continue
-            for p in i.ports():
+            ports = close_ports.get(i, [])
+            indexed_ports = self._indexed_ports.get(i, ())
+            if len(indexed_ports) != len(i.ports()):
+                ports += [p for p in i.ports() if p not in indexed_ports]
+            if not ports:
+                continue
+
+            ix, iy = self.get_matrix_v2i(i).transform_point(vx, vy)
+            for p in ports:
                 if not p.connectable:
                     continue
                 if exclude_port_fun and exclude_port_fun(p):
                     continue
 
-                ix, iy = v2i(i).transform_point(vx, vy)
                 pg, d = p.glue((ix, iy))
                 if d > max_dist:
                     continue
@@ -114,6 +137,48 @@ class ExtendedGtkView(GtkView, Observer):
 
         return item, port, glue_pos
 
+    def _update_port_index(self, item):
+        """Updates the view coordinates of the ports of `item` in the port index
+
+        Only rectangular ports (those of states) are indexed, the ports of other items are checked one by one in
+        :meth:`get_port_at_point`.
+
+        :param gaphas.item.Item item: The item, whose ports have changed or moved
+        """
+        self._remove_from_port_index(item)
+        ports = [port for port in item.ports() if isinstance(port, RectanglePointPort)]
+        if not ports:
+            return
+        i2v = self.get_matrix_i2v(item).transform_point
+        for port in ports:
+            x, y = float(port.point.x), float(port.point.y)
+            half_width, half_height = port.width / 2., port.height / 2.
+            x0, y0 = i2v(x - half_width, y - half_height)
+            x1, y1 = i2v(x + half_width, y + half_height)
+            self._port_qtree.add(port, (min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0)), item)
+        self._indexed_ports[item] = set(ports)
+
+    def _remove_from_port_index(self, item):
+        for port in self._indexed_ports.pop(item, ()):
+            self._port_qtree.remove(port)
+
+    def set_item_bounding_box(self, item, bounds):
+        """Extends the base class method to also update the port index after the item has been updated"""
+        super(ExtendedGtkView, self).set_item_bounding_box(item, bounds)
+        self._update_port_index(item)
+
+    def update_matrix(self, item):
+        """Extends the base class method to also update the port index after the item has been moved or zoomed"""
+        super(ExtendedGtkView, self).update_matrix(item)
+        if item in self._indexed_ports:
+            self._update_port_index(item)
+
+    def request_update(self, items, matrix_only_items=(), removed_items=()):
+        """Extends the base class method to remove the ports of removed items from the port index"""
+        for item in removed_items:
+            self._remove_from_port_index(item)
+        super(ExtendedGtkView, self).request_update(items, matrix_only_items, removed_items)
+
     def get_item_at_point_exclude(self, pos, selected=True, exclude=None):
         """
         Return the topmost item located at ``pos`` (x, y).
@@ -123,8 +188,9 @@ class ExtendedGtkView(GtkView, Observer):
          - exclude: if specified don't check for these items
         """
         items = self._qtree.find_intersect((pos[0], pos[1], 1, 1))
+        selected_items = self.selected_items if not selected else ()
         for item in self._canvas.sort(items, reverse=True):
-            if not selected and item in self.selected_items:
+            if item in selected_items:
                 continue  # skip selected items
             if item in exclude:
                 continue
@@ -183,9 +249,10 @@ class ExtendedGtkView(GtkView, Observer):
          :param float distance: Maximum distance to be considered as "at point" (in viewport pixel)
         """
         items = self._qtree.find_intersect((pos[0] - distance, pos[1] - distance, 2 * distance, 2 * distance))
+        selected_items = self.selected_items if not selected else ()
         filtered_items = []
         for item in self._canvas.sort(items, reverse=True):
-            if not selected and item in self.selected_items:
+            if item in selected_items:
                 continue  # skip selected items
 
             v2i = self.get_matrix_v2i(item)
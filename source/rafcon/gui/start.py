@@ -32,6 +32,8 @@ from rafcon.gui.config import global_gui_config
 import rafcon.gui.singleton as gui_singletons
 from rafcon.gui.runtime_config import global_runtime_config
 from rafcon.gui.utils.splash_screen import SplashScreen
+from rafcon.gui.utils.execution_notifications import setup_execution_notification_coalescing, \
+    shutdown_execution_notification_coalescing
 import rafcon.gui.backup.session as backup_session
 
 # state machine
@@ -221,6 +223,7 @@ def stop_gtk():
 
 
 def post_gui_destruction():
+    shutdown_execution_notification_coalescing()
     plugins.run_hook("post_destruction")
 
     if global_gui_config.get_config_value('AUTO_RECOVERY_LOCK_ENABLED'):
@@ -347,6 +350,7 @@ def main():
     # loading the state state machine
     splash_screen.set_text("Loading GUI...")
     setup_gui()
+    setup_execution_notification_coalescing()
 
     wait_for_gui()
 
@@ -147,6 +147,7 @@ BUTTON_DOWNA = "f0d7"
 BUTTON_UNDOCK = "f24d"
 SIGN_LIB = "f02d"
 SIGN_ARROW = "f047"
+SIGN_CONTENT = "f141"
 ICON_SOURCE = "f121"
 ICON_DLINK = "f0c1"
 ICON_LLINK = "f1e0"
@@ -0,0 +1,67 @@
+# Copyright (C) 2014-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Franz Steinmetz <franz.steinmetz@dlr.de>
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: execution_notifications
+   :synopsis: Delivers the coalesced execution notifications to the GUI models in the GTK main loop
+
+"""
+from gi.repository import GLib
+
+from rafcon.core.execution.notification_coalescer import NotificationCoalescer
+from rafcon.core.execution.execution_status import StateMachineExecutionStatus
+from rafcon.gui.config import global_gui_config
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+_coalescer = None
+_timeout_id = None
+
+
+def _flush_notifications(decoupled):
+    import rafcon.core.singleton as core_singletons
+    if decoupled and core_singletons.state_machine_execution_engine.status.execution_mode is \
+            StateMachineExecutionStatus.STARTED:
+        return True
+    _coalescer.flush()
+    return True
+
+
+def setup_execution_notification_coalescing():
+    """Installs a notification coalescer, which is flushed in the GTK main loop
+
+    The rate of the updates is configured by ``EXECUTION_NOTIFICATION_RATE``. If it is 0, no coalescer is installed and
+    the GUI models are notified about each change. If ``EXECUTION_NOTIFICATION_DECOUPLED`` is set, the notifications are
+    only delivered while no state machine is running, e.g. when the execution is paused or stopped.
+
+    Must be called in the thread of the GTK main loop.
+    """
+    global _coalescer, _timeout_id
+    rate = global_gui_config.get_config_value('EXECUTION_NOTIFICATION_RATE', 30)
+    if not rate or _coalescer is not None:
+        return
+    decoupled = global_gui_config.get_config_value('EXECUTION_NOTIFICATION_DECOUPLED', False)
+    _coalescer = NotificationCoalescer()
+    _coalescer.install()
+    _timeout_id = GLib.timeout_add(max(int(1000. / rate), 1), _flush_notifications, decoupled)
+    logger.debug("Execution notifications are delivered with at most {0} Hz{1}".format(
+        rate, " while no state machine is running" if decoupled else ""))
+
+
+def shutdown_execution_notification_coalescing():
+    """Uninstalls the notification coalescer and delivers all pending notifications"""
+    global _coalescer, _timeout_id
+    if _coalescer is None:
+        return
+    GLib.source_remove(_timeout_id)
+    _coalescer.uninstall()
+    _coalescer = _timeout_id = None
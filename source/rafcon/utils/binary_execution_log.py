@@ -0,0 +1,321 @@
+# Copyright (C) 2017-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Franz Steinmetz <franz.steinmetz@dlr.de>
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: binary_execution_log
+   :synopsis: An append-only binary file format for execution logs
+
+The file starts with a header (:data:`FILE_MAGIC` and a version byte) followed by the records. Each record consists
+of the length of its summary (4 bytes), the length of its payload (4 bytes), the CRC32 checksum of summary and payload
+(4 bytes), the summary and the payload. The summary is the pickled tuple of the :data:`SUMMARY_KEYS` values of the
+history item, the payload is the pickled history_item_dict. All integers are stored big-endian. The summary allows
+readers to skip records without unpickling their payload.
+
+When the log is closed, a footer is appended, holding the pickled index (offset of each record by history item id,
+history item ids grouped by run id), followed by the offset of the footer (8 bytes) and :data:`FOOTER_MAGIC`.
+
+Logs without footer, e.g. of a crashed process, can still be read: the records are scanned sequentially up to the
+first incomplete or corrupt record.
+"""
+from future.utils import native_str
+from builtins import object
+import os
+import mmap
+import pickle
+import struct
+import zlib
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from rafcon.utils import log
+logger = log.get_logger(__name__)
+
+FILE_MAGIC = b'RAFCONLOG'
+#: The version of the file format, version 1 logs (without record summaries) are not supported
+FILE_VERSION = 2
+FOOTER_MAGIC = b'RLOGIDX1'
+FILE_EXTENSION = 'binlog'
+PICKLE_PROTOCOL = 2
+SUMMARY_KEYS = ('history_item_id', 'item_type', 'call_type', 'run_id', 'path', 'state_type', 'timestamp')
+
+_HEADER = FILE_MAGIC + struct.pack('>B', FILE_VERSION)
+_RECORD_HEADER = struct.Struct('>III')
+_TRAILER = struct.Struct('>Q')
+_TRAILER_SIZE = _TRAILER.size + len(FOOTER_MAGIC)
+
+
+def is_binary_execution_log(filename):
+    """Checks whether the given file is a binary execution log
+
+    :param str filename: path of the file
+    :rtype: bool
+    """
+    try:
+        with open(filename, 'rb') as log_file:
+            return log_file.read(len(FILE_MAGIC)) == FILE_MAGIC
+    except (IOError, OSError):
+        return False
+
+
+def _create_summary(key, record):
+    if not isinstance(record, dict):
+        return (key,) + (None,) * (len(SUMMARY_KEYS) - 1)
+    return (key,) + tuple(record.get(summary_key) for summary_key in SUMMARY_KEYS[1:])
+
+
+class BinaryExecutionLogWriter(object):
+    """Writes history items to a binary execution log
+
+    The writer supports the item assignment of a dict/shelve, thus `writer[history_item_id] = record` appends a
+    record.
+
+    :ivar filename: the path of the log file
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._offsets = {}
+        self._run_ids = {}
+        self._file = open(filename, 'wb')
+        self._file.write(_HEADER)
+        self._offset = len(_HEADER)
+
+    def append(self, key, record):
+        """Appends a record to the log
+
+        :param str key: the history item id
+        :param dict record: the dict representation of the history item
+        """
+        key = native_str(key)
+        summary = _create_summary(key, record)
+        summary_data = pickle.dumps(summary, PICKLE_PROTOCOL)
+        payload = pickle.dumps(record, PICKLE_PROTOCOL)
+        checksum = zlib.crc32(payload, zlib.crc32(summary_data)) & 0xffffffff
+        self._file.write(_RECORD_HEADER.pack(len(summary_data), len(payload), checksum))
+        self._file.write(summary_data)
+        self._file.write(payload)
+        if key not in self._offsets:
+            self._run_ids.setdefault(summary[SUMMARY_KEYS.index('run_id')], []).append(key)
+        self._offsets[key] = self._offset
+        self._offset += _RECORD_HEADER.size + len(summary_data) + len(payload)
+
+    __setitem__ = append
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def flush(self):
+        """Writes all records to the disk"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        """Writes the footer index and closes the file"""
+        if self._file.closed:
+            return
+        index = {'offsets': self._offsets, 'run_ids': self._run_ids}
+        self._file.write(pickle.dumps(index, PICKLE_PROTOCOL))
+        self._file.write(_TRAILER.pack(self._offset) + FOOTER_MAGIC)
+        self._file.close()
+
+
+class BinaryExecutionLog(Mapping):
+    """Read access to a binary execution log
+
+    The log behaves like a read-only dict (or an opened shelve) mapping history item ids to the dict representation
+    of the history items. Thus, it can directly be passed to the functions of :mod:`rafcon.utils.execution_log`. The
+    file is memory-mapped, records are only unpickled on access.
+
+    :ivar filename: the path of the log file
+    :ivar complete: False if the log has no footer, e.g. as the writing process crashed
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        if self._data[:len(FILE_MAGIC)] != FILE_MAGIC:
+            self.close()
+            raise ValueError("{0} is not a binary execution log".format(filename))
+        version = bytearray(self._data[len(FILE_MAGIC):len(_HEADER)])
+        if not version or version[0] != FILE_VERSION:
+            self.close()
+            raise ValueError("The binary execution log {0} has the unsupported version {1}, only version {2} can be "
+                             "read".format(filename, version[0] if version else None, FILE_VERSION))
+        self.complete = False
+        self._offsets = None
+        self._run_ids = None
+        self._records_end = size
+        self._read_footer()
+        if self._offsets is None:
+            self._scan_records()
+
+    def _read_footer(self):
+        size = len(self._data)
+        if size < len(_HEADER) + _TRAILER_SIZE or self._data[size - len(FOOTER_MAGIC):] != FOOTER_MAGIC:
+            return
+        footer_offset, = _TRAILER.unpack_from(self._data, size - _TRAILER_SIZE)
+        try:
+            index = pickle.loads(self._data[footer_offset:size - _TRAILER_SIZE])
+        except Exception:
+            logger.warning("The index of the execution log {0} is corrupt".format(self.filename))
+            return
+        self._offsets = index['offsets']
+        self._run_ids = index['run_ids']
+        self._records_end = footer_offset
+        self.complete = True
+
+    def _scan_records(self):
+        self._offsets = {}
+        self._run_ids = {}
+        for offset, summary, _, _ in self._iter_records(verify=True):
+            key = summary['history_item_id']
+            if key not in self._offsets:
+                self._run_ids.setdefault(summary['run_id'], []).append(key)
+            self._offsets[key] = offset
+        logger.warning("The execution log {0} was not closed properly, {1} items could be recovered".format(
+            self.filename, len(self._offsets)))
+
+    def _read_record(self, offset, verify=False):
+        """Reads the header and summary of the record at the given offset
+
+        :return: the offset of the next record, the summary and the offset of the payload or None if the record is
+            incomplete or corrupt
+        """
+        summary_start = offset + _RECORD_HEADER.size
+        if summary_start > self._records_end:
+            return None
+        summary_length, payload_length, checksum = _RECORD_HEADER.unpack_from(self._data, offset)
+        payload_start = summary_start + summary_length
+        record_end = payload_start + payload_length
+        if record_end > self._records_end:
+            return None
+        if verify and zlib.crc32(self._data[summary_start:record_end]) & 0xffffffff != checksum:
+            return None
+        try:
+            summary = dict(zip(SUMMARY_KEYS, pickle.loads(self._data[summary_start:payload_start])))
+        except Exception:
+            return None
+        return record_end, summary, payload_start
+
+    def _load_payload(self, payload_start, record_end):
+        return pickle.loads(self._data[payload_start:record_end])
+
+    def _iter_records(self, verify=False):
+        offset = len(_HEADER)
+        while offset < self._records_end:
+            result = self._read_record(offset, verify)
+            if result is None:
+                if verify:
+                    logger.warning("Incomplete or corrupt record at offset {0} of the execution log {1}".format(
+                        offset, self.filename))
+                break
+            next_offset, summary, payload_start = result
+            yield offset, summary, payload_start, next_offset
+            offset = next_offset
+
+    def __getitem__(self, key):
+        offset = self._offsets[native_str(key)]
+        record_end, _, payload_start = self._read_record(offset)
+        return self._load_payload(payload_start, record_end)
+
+    def __contains__(self, key):
+        return native_str(key) in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def items(self, select=None):
+        """Iterates all history items in the order they were written
+
+        This is faster than accessing the items by key, as the records are read sequentially. If a history item was
+        written several times, only its last record is yielded.
+
+        :param select: optional function called with the summary of each record, a dict holding the
+            :data:`SUMMARY_KEYS` of the history item; records for which it returns False are skipped without
+            unpickling them
+        """
+        for offset, summary, payload_start, record_end in self._iter_records():
+            key = summary['history_item_id']
+            # only the last record of a history item is valid, as for the item assignment of a dict
+            if self._offsets.get(key) != offset or (select is not None and not select(summary)):
+                continue
+            yield key, self._load_payload(payload_start, record_end)
+
+    def get_run_ids(self):
+        """Returns the run ids of all history items in the log"""
+        return list(self._run_ids.keys())
+
+    def get_items_of_run_id(self, run_id):
+        """Returns the history items with the given run id
+
+        :param str run_id: the run id
+        :return: list of the dict representation of the history items, in the order they were written
+        :rtype: list
+        """
+        return [self[key] for key in self._run_ids.get(run_id, [])]
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def convert_shelve_to_binary_log(shelve_filename, filename=None):
+    """Converts an execution log stored as shelve into a binary execution log
+
+    :param str shelve_filename: path of the shelve
+    :param str filename: path of the binary log, defaults to the shelve path with the binary log file extension
+    :return: the path of the binary log
+    :rtype: str
+    """
+    import shelve
+    if filename is None:
+        filename = os.path.splitext(shelve_filename)[0] + '.' + FILE_EXTENSION
+    history_items = shelve.open(shelve_filename, 'r')
+    try:
+        # shelves are not ordered, so the items are written in the order of their execution
+        items = sorted(history_items.items(), key=lambda item: (item[1].get('timestamp', 0), item[0]))
+        writer = BinaryExecutionLogWriter(filename)
+        try:
+            for key, record in items:
+                writer.append(key, record)
+        finally:
+            writer.close()
+    finally:
+        history_items.close()
+    return filename
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Converts execution logs stored as shelve into binary logs")
+    parser.add_argument("shelve", nargs='+', help="path of the shelve execution log")
+    args = parser.parse_args()
+    for shelve_filename in args.shelve:
+        filename = convert_shelve_to_binary_log(shelve_filename)
+        logger.info("Converted {0} to {1}".format(shelve_filename, filename))
+
+
+if __name__ == '__main__':
+    main()
@@ -13,18 +13,37 @@
 from future.utils import string_types, native_str
 from builtins import range
 from builtins import str
+import os
 import shelve
 import json
 import pickle
+from array import array
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
 from rafcon.utils import log
+from rafcon.utils.binary_execution_log import BinaryExecutionLog, is_binary_execution_log
 logger = log.get_logger(__name__)
 
 
+def open_execution_log(filename):
+    """Opens an execution log for reading
+
+    :param str filename: the path of the log, either a binary execution log or a shelve
+    :return: the history items of the log, a dict like object mapping history item ids to history items
+    :rtype: rafcon.utils.binary_execution_log.BinaryExecutionLog | shelve.Shelf
+    """
+    if is_binary_execution_log(filename):
+        return BinaryExecutionLog(filename)
+    return shelve.open(filename, 'r')
+
+
 def log_to_raw_structure(execution_history_items):
     """
     :param dict execution_history_items: history items, in the simplest case
-           directly the opened shelve log file
+           directly the opened log file (see :func:`open_execution_log`) or the path of the log file
     :return: start_item, the StateMachineStartItem of the log file
              previous, a dict mapping history_item_id --> history_item_id of previous history item
              next_, a dict mapping history_item_id --> history_item_id of the next history item (except if
@@ -34,6 +53,9 @@ def log_to_raw_structure(execution_history_items):
              grouped, a dict mapping run_id --> []list of history items with this run_id
     :rtype: tuple
     """
+    if isinstance(execution_history_items, string_types):
+        execution_history_items = open_execution_log(execution_history_items)
+
     previous = {}
     next_ = {}
     concurrent = {}
@@ -75,6 +97,94 @@ def log_to_raw_structure(execution_history_items):
     return start_item, previous, next_, concurrent, grouped_by_run_id
 
 
+def _unpickle_data(data_dict, throw_on_pickle_error=True, include_erroneous_data_ports=False):
+    r = dict()
+    # support backward compatibility
+    if isinstance(data_dict, string_types):  # formerly data dict was a json string
+        r = json.loads(data_dict)
+    else:
+        for k, v in data_dict.items():
+            if not k.startswith('!'): # ! indicates storage error
+                try:
+                    r[k] = pickle.loads(v)
+                except Exception as e:
+                    if throw_on_pickle_error:
+                        raise
+                    elif include_erroneous_data_ports:
+                        r['!' + k] = (str(e), v)
+                    else:
+                        pass # ignore
+            elif include_erroneous_data_ports:
+                r[k] = v
+
+    return r
+
+
+class LazyData(Mapping):
+    """The data of a state execution (data ports, scoped data or semantic data), unpickled on first access
+
+    :param data_dict: the pickled data as stored in the execution log
+    """
+
+    def __init__(self, data_dict, throw_on_pickle_error=True, include_erroneous_data_ports=False):
+        self._pickled_data = data_dict
+        self._throw_on_pickle_error = throw_on_pickle_error
+        self._include_erroneous_data_ports = include_erroneous_data_ports
+        self._data = None
+
+    @property
+    def data(self):
+        """The unpickled data as dict"""
+        if self._data is None:
+            self._data = _unpickle_data(self._pickled_data, self._throw_on_pickle_error,
+                                        self._include_erroneous_data_ports)
+            self._pickled_data = None
+        return self._data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        if self._data is None:
+            return "LazyData(<{0} pickled items>)".format(len(self._pickled_data))
+        return "LazyData({0})".format(self._data)
+
+
+def _create_execution_item(call_item, return_item, load_data):
+    execution_item = {}
+    ## add base properties will throw if not existing
+    for l in ['description', 'path_by_name', 'state_name', 'run_id', 'state_type', 'path']:
+        execution_item[l] = call_item[l]
+
+    ## add extended properties (added in later rafcon versions),
+    ## will add default value if not existing instead
+    for l, default in [('semantic_data', {}),
+                         ('is_library', None),
+                         ('library_state_name', None),
+                         ('library_name', None),
+                         ('library_path', None)]:
+        execution_item[l] = return_item.get(l, default)
+
+    for l in ['outcome_name', 'outcome_id']:
+        execution_item[l] = return_item[l]
+    for l in ['timestamp']:
+        execution_item[l+'_call'] = call_item[l]
+        execution_item[l+'_return'] = return_item[l]
+
+    execution_item['data_ins'] = load_data(call_item['input_output_data'])
+    execution_item['data_outs'] = load_data(return_item['input_output_data'])
+    execution_item['scoped_data_ins'] = load_data(call_item['scoped_data'])
+    execution_item['scoped_data_outs'] = load_data(return_item['scoped_data'])
+    execution_item['semantic_data'] = load_data(execution_item['semantic_data'])
+    return execution_item
+
+
 def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=True,
                                include_erroneous_data_ports=False, full_next=False):
     """
@@ -84,7 +194,7 @@ def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=Tr
     The collapsed items hold input as well as output data (direct and scoped), and the outcome
     the state execution.
     :param dict execution_history_items: history items, in the simplest case
-           directly the opened shelve log file
+           directly the opened log file (see :func:`open_execution_log`) or the path of the log file
     :param bool throw_on_pickle_error: flag if an error is thrown if an object cannot be un-pickled
     :param bool include_erroneous_data_ports: flag if to include erroneous data ports
     :param bool full_next: flag to indicate if the next relationship has also to be created at the end
@@ -106,6 +216,9 @@ def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=Tr
     # for k, v in execution_history_items.items():
     #     execution_history_items_dict[k] = v
 
+    if isinstance(execution_history_items, string_types):
+        execution_history_items = open_execution_log(execution_history_items)
+
     start_item, previous, next_, concurrent, grouped = log_to_raw_structure(execution_history_items)
 
     start_item = None
@@ -249,59 +362,227 @@ def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=Tr
                         collapsed_concurrent[prev_rid] = [rid]
 
             # assemble grouped item
-            execution_item = {}
-            ## add base properties will throw if not existing
-            for l in ['description', 'path_by_name', 'state_name', 'run_id', 'state_type', 'path']:
-                execution_item[l] = call_item[l]
-
-            ## add extended properties (added in later rafcon versions),
-            ## will add default value if not existing instead
-            for l, default in [('semantic_data', {}),
-                                 ('is_library', None),
-                                 ('library_state_name', None),
-                                 ('library_name', None),
-                                 ('library_path', None)]:
-                execution_item[l] = return_item.get(l, default)
-
-            for l in ['outcome_name', 'outcome_id']:
-                execution_item[l] = return_item[l]
-            for l in ['timestamp']:
-                execution_item[l+'_call'] = call_item[l]
-                execution_item[l+'_return'] = return_item[l]
-
-            def unpickle_data(data_dict):
-                r = dict()
-                # support backward compatibility
-                if isinstance(data_dict, string_types):  # formerly data dict was a json string
-                    r = json.loads(data_dict)
-                else:
-                    for k, v in data_dict.items():
-                        if not k.startswith('!'): # ! indicates storage error
-                            try:
-                                r[k] = pickle.loads(v)
-                            except Exception as e:
-                                if throw_on_pickle_error:
-                                    raise
-                                elif include_erroneous_data_ports:
-                                    r['!' + k] = (str(e), v)
-                                else:
-                                    pass # ignore
-                        elif include_erroneous_data_ports:
-                            r[k] = v
-
-                return r
-
-            execution_item['data_ins'] = unpickle_data(call_item['input_output_data'])
-            execution_item['data_outs'] = unpickle_data(return_item['input_output_data'])
-            execution_item['scoped_data_ins'] = unpickle_data(call_item['scoped_data'])
-            execution_item['scoped_data_outs'] = unpickle_data(return_item['scoped_data'])
-            execution_item['semantic_data'] = unpickle_data(execution_item['semantic_data'])
+            execution_item = _create_execution_item(
+                call_item, return_item,
+                lambda data_dict: _unpickle_data(data_dict, throw_on_pickle_error, include_erroneous_data_ports))
 
             collapsed_items[rid] = execution_item
 
     return start_item, collapsed_next, collapsed_concurrent, collapsed_hierarchy, collapsed_items
 
 
+def _iter_records_in_order(execution_history_items, select):
+    if isinstance(execution_history_items, BinaryExecutionLog):
+        # binary logs are read sequentially, skipped records are not unpickled at all
+        for key, record in execution_history_items.items(select):
+            yield key, record
+        return
+    # shelves and dicts are not ordered, thus the items have to be sorted by their timestamp first
+    keys = sorted((record['timestamp'], key) for key, record in execution_history_items.items())
+    for _, key in keys:
+        record = execution_history_items[key]
+        if select(record):
+            yield key, record
+
+
+def iter_collapsed_executions(execution_history_items, path_prefix=None, state_types=None, start_time=None,
+                              end_time=None, throw_on_pickle_error=True, include_erroneous_data_ports=False):
+    """Yields the collapsed state executions of an execution log one by one
+
+    In contrast to :func:`log_to_collapsed_structure`, the log is not loaded into memory: only the call items of the
+    currently running states are kept until their return items are read. The executions are yielded in the order in
+    which they finished, i.e. a container state after its children. The collapsed items have the same form as the
+    ones of :func:`log_to_collapsed_structure`, but their data (`data_ins`, `data_outs`, `scoped_data_ins`,
+    `scoped_data_outs` and `semantic_data`) are :class:`LazyData` objects, which are only unpickled on access.
+
+    The filters are applied on the history items before their data is loaded. For binary execution logs, history
+    items not passing the filters are not even unpickled. Shelves are not ordered and thus require an additional pass
+    over all items.
+
+    :param execution_history_items: history items, in the simplest case directly the opened log file (see
+           :func:`open_execution_log`) or the path of the log file
+    :param str path_prefix: only yield executions of states whose path starts with this prefix
+    :param state_types: only yield executions of states with these types, e.g. ['ExecutionState']
+    :param float start_time: only yield executions started at or after this epoch time
+    :param float end_time: only yield executions started at or before this epoch time
+    :param bool throw_on_pickle_error: flag if an error is thrown if an object cannot be un-pickled
+    :param bool include_erroneous_data_ports: flag if to include erroneous data ports
+    :return: generator of collapsed state executions
+    """
+    if isinstance(execution_history_items, string_types):
+        execution_history_items = open_execution_log(execution_history_items)
+    if state_types is not None:
+        state_types = set(state_types)
+
+    # run_id --> call item of the states being executed
+    running = {}
+
+    def is_execution_call(item):
+        if path_prefix is not None and not (item['path'] or '').startswith(path_prefix):
+            return False
+        if state_types is not None and item['state_type'] not in state_types:
+            return False
+        if start_time is not None and item['timestamp'] < start_time:
+            return False
+        if end_time is not None and item['timestamp'] > end_time:
+            return False
+        # states are executed by their parents (EXECUTE calls), the root state (having a path without separator) is
+        # only called as container
+        return item['call_type'] == 'EXECUTE' or '/' not in item['path']
+
+    def select(item):
+        if item['item_type'] == 'CallItem':
+            return item['run_id'] not in running and is_execution_call(item)
+        if item['item_type'] == 'ReturnItem':
+            return item['run_id'] in running and item['call_type'] == running[item['run_id']]['call_type']
+        return False
+
+    def load_data(data_dict):
+        return LazyData(data_dict, throw_on_pickle_error, include_erroneous_data_ports)
+
+    for _, item in _iter_records_in_order(execution_history_items, select):
+        run_id = item['run_id']
+        if item['item_type'] == 'CallItem':
+            running[run_id] = item
+        else:
+            yield _create_execution_item(running.pop(run_id), item, load_data)
+
+
+def log_to_columns(execution_history_items, **filters):
+    """Returns the state executions of an execution log as columns of numpy arrays
+
+    In contrast to :func:`log_to_DataFrame`, no objects are created per state execution: the executions are streamed
+    by :func:`iter_collapsed_executions` into typed buffers, which are then converted into numpy arrays. Strings are
+    stored once in lookup tables and referenced by integer ids. This allows to compute statistics (see
+    :func:`columns_to_state_statistics`) with vectorized operations also for millions of state executions.
+
+    The returned columns are:
+
+    * run_id: the run ids (byte strings)
+    * path_id: the index of the state in the `paths`, `path_names` tables
+    * state_type_id: the index of the state type in the `state_types` table
+    * outcome_id: the id of the outcome of the execution
+    * timestamp_call, timestamp_return: the epoch time of the call and of the return of the state
+    * duration: the execution time of the state in seconds
+    * paths, path_names, state_types: the lookup tables
+
+    :param execution_history_items: history items, in the simplest case directly the opened log file (see
+           :func:`open_execution_log`) or the path of the log file
+    :param filters: keyword arguments passed to :func:`iter_collapsed_executions`, e.g. `path_prefix`
+    :return: dict mapping column names to numpy arrays
+    :rtype: dict
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("The Python package 'numpy' is required for log_to_columns.")
+
+    run_ids = []
+    path_ids = array('i')
+    state_type_ids = array('i')
+    outcome_ids = array('i')
+    timestamps_call = array('d')
+    timestamps_return = array('d')
+    path_table = {}
+    path_names = []
+    state_type_table = {}
+
+    for execution in iter_collapsed_executions(execution_history_items, **filters):
+        run_ids.append(native_str(execution['run_id']))
+        if execution['path'] not in path_table:
+            path_table[execution['path']] = len(path_table)
+            path_names.append(execution['path_by_name'])
+        path_ids.append(path_table[execution['path']])
+        state_type_ids.append(state_type_table.setdefault(execution['state_type'], len(state_type_table)))
+        outcome_ids.append(execution['outcome_id'])
+        timestamps_call.append(execution['timestamp_call'])
+        timestamps_return.append(execution['timestamp_return'])
+
+    def to_table(table):
+        return np.array(sorted(table, key=table.get), dtype=np.str_)
+
+    def to_column(buffer, dtype):
+        # the typed buffers are wrapped without copying them
+        return np.frombuffer(buffer, dtype=dtype) if len(buffer) else np.empty(0, dtype=dtype)
+
+    columns = {
+        'run_id': np.array(run_ids, dtype=np.bytes_),
+        'path_id': to_column(path_ids, np.intc),
+        'state_type_id': to_column(state_type_ids, np.intc),
+        'outcome_id': to_column(outcome_ids, np.intc),
+        'timestamp_call': to_column(timestamps_call, np.float64),
+        'timestamp_return': to_column(timestamps_return, np.float64),
+        'paths': to_table(path_table),
+        'path_names': np.array(path_names, dtype=np.str_),
+        'state_types': to_table(state_type_table),
+    }
+    columns['duration'] = columns['timestamp_return'] - columns['timestamp_call']
+    return columns
+
+
+def save_columns(columns, path):
+    """Saves the columns of :func:`log_to_columns` as directory of .npy files
+
+    :param dict columns: the columns
+    :param str path: the path of the directory, created if it does not exist
+    """
+    import numpy as np
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    for name, column in columns.items():
+        np.save(os.path.join(path, name + '.npy'), column)
+
+
+def load_columns(path, mmap_mode='r'):
+    """Loads columns saved by :func:`save_columns`
+
+    :param str path: the path of the directory
+    :param str mmap_mode: the mode for memory-mapping the columns (see :func:`numpy.load`), None to load the columns
+        into memory
+    :return: dict mapping column names to numpy arrays
+    :rtype: dict
+    """
+    import numpy as np
+    columns = {}
+    for filename in os.listdir(path):
+        name, extension = os.path.splitext(filename)
+        if extension == '.npy':
+            columns[name] = np.load(os.path.join(path, filename), mmap_mode=mmap_mode)
+    return columns
+
+
+def columns_to_state_statistics(columns):
+    """Computes the execution time statistics of each state from the columns of :func:`log_to_columns`
+
+    :param dict columns: the columns
+    :return: dict with the columns path, path_name, count, total_duration, mean_duration, min_duration and
+             max_duration, each holding one entry per state
+    :rtype: dict
+    """
+    import numpy as np
+    path_ids = columns['path_id']
+    durations = columns['duration']
+    number_of_paths = len(columns['paths'])
+
+    count = np.bincount(path_ids, minlength=number_of_paths)
+    total_duration = np.bincount(path_ids, weights=durations, minlength=number_of_paths)
+    min_duration = np.full(number_of_paths, np.nan)
+    np.fmin.at(min_duration, path_ids, durations)
+    max_duration = np.full(number_of_paths, np.nan)
+    np.fmax.at(max_duration, path_ids, durations)
+    mean_duration = np.full(number_of_paths, np.nan)
+    np.divide(total_duration, count, out=mean_duration, where=count > 0)
+    return {
+        'path': columns['paths'],
+        'path_name': columns['path_names'],
+        'count': count,
+        'total_duration': total_duration,
+        'mean_duration': mean_duration,
+        'min_duration': min_duration,
+        'max_duration': max_duration,
+    }
+
+
 def log_to_DataFrame(execution_history_items, data_in_columns=[], data_out_columns=[], scoped_in_columns=[],
                      scoped_out_columns=[], semantic_data_columns=[], throw_on_pickle_error=True):
     """
@@ -372,28 +653,33 @@ def log_to_DataFrame(execution_history_items, data_in_columns=[], data_out_colum
 
 def log_to_ganttplot(execution_history_items):
     """
-    Example how to use the DataFrame representation
+    Example how to use the columnar representation
     """
+    import datetime
     import matplotlib.pyplot as plt
     import matplotlib.dates as dates
     import numpy as np
 
-    d = log_to_DataFrame(execution_history_items)
+    columns = log_to_columns(execution_history_items)
 
-    # de-duplicate states and make mapping from state to idx
-    unique_states, idx = np.unique(d.path_by_name, return_index=True)
-    ordered_unique_states = np.array(d.path_by_name)[np.sort(idx)]
-    name2idx = {k: i for i, k in enumerate(ordered_unique_states)}
+    # one row per state, ordered by the first execution of the states
+    first_call = np.full(len(columns['paths']), np.inf)
+    np.minimum.at(first_call, columns['path_id'], columns['timestamp_call'])
+    ordered_path_ids = np.argsort(first_call, kind='mergesort')
+    path_id2row = np.empty(len(ordered_path_ids), dtype=int)
+    path_id2row[ordered_path_ids] = np.arange(len(ordered_path_ids))
 
-    calldate = dates.date2num(d.timestamp_call.dt.to_pydatetime())
-    returndate = dates.date2num(d.timestamp_return.dt.to_pydatetime())
+    epoch = dates.date2num(datetime.datetime(1970, 1, 1))
+    calldate = epoch + columns['timestamp_call'] / 86400.
+    returndate = epoch + columns['timestamp_return'] / 86400.
 
     state2color = {'HierarchyState': 'k',
                    'ExecutionState': 'g',
                    'BarrierConcurrencyState': 'y',
                    'PreemptiveConcurrencyState': 'y'}
+    state_type_colors = np.array([state2color.get(state_type, 'b') for state_type in columns['state_types']])
 
     fig, ax = plt.subplots(1, 1)
-    ax.barh(bottom=[name2idx[k] for k in d.path_by_name], width=returndate-calldate,
-            left=calldate, align='center', color=[state2color[s] for s in d.state_type], lw=0.0)
-    plt.yticks(list(range(len(ordered_unique_states))), ordered_unique_states)
+    ax.barh(bottom=path_id2row[columns['path_id']], width=returndate-calldate,
+            left=calldate, align='center', color=state_type_colors[columns['state_type_id']], lw=0.0)
+    plt.yticks(list(range(len(ordered_path_ids))), columns['path_names'][ordered_path_ids])
@@ -16,12 +16,34 @@
 
 """
 
+import binascii
+import errno
+import hashlib
 import json
+import os
+import stat
+import sys
+import tempfile
+import threading
 import yaml
+from collections import OrderedDict
 from time import gmtime, strftime, strptime, mktime
 
-from jsonconversion.decoder import JSONObjectDecoder
+from jsonconversion.conversion import get_class_from_qualified_name, string2type
 from jsonconversion.encoder import JSONObjectEncoder
+from jsonconversion.jsonobject import JSONObject
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if sys.version_info >= (3,):
+    _builtins_module_name = 'builtins'
+    _primitive_types = (str, int, float, type(None))
+else:
+    _builtins_module_name = '__builtin__'
+    _primitive_types = (str, unicode, int, long, float, type(None))
 
 substitute_modules = {
     # backward compatibiliy (remove in next minor release): state elements
@@ -99,18 +121,270 @@ def load_dict_from_yaml(path):
     return dictionary
 
 
+def _encode_primitive(obj):
+    return obj
+
+
+def _encode_list(obj):
+    return [_to_json_compatible(item) for item in obj]
+
+
+def _encode_dict(obj):
+    return {key: _to_json_compatible(value) for key, value in obj.items()}
+
+
+def _encode_json_object(obj):
+    dictionary = _encode_dict(obj.to_dict())
+    dictionary['__jsonqualname__'] = _qualified_names[obj.__class__]
+    return dictionary
+
+
+def _encode_type(obj):
+    # the name of types differs between the versions of jsonconversion, thus its encoder is used
+    return _type_encoder.default(obj)
+
+
+def _encode_items(obj):
+    return {'__jsonqualname__': _qualified_names[obj.__class__], 'items': _encode_list(obj)}
+
+
+def _encode_ndarray(obj):
+    return {'__jsonqualname__': "numpy.ndarray", 'items': obj.tolist()}
+
+
+def _get_encoder(cls):
+    """Determines the function converting objects of the given class
+
+    The checks follow the order of the :class:`jsonconversion.encoder.JSONObjectEncoder`: values handled by the json
+    module itself come first (tuples and sets excluded), then the classes handled by its `default` method.
+    """
+    if issubclass(cls, _primitive_types):
+        return _encode_primitive
+    if issubclass(cls, list):
+        return _encode_list
+    if issubclass(cls, dict):
+        return _encode_dict
+    if issubclass(cls, JSONObject):
+        # the class name of the object is used, together with the module of the class, as done by jsonconversion
+        _qualified_names[cls] = cls.__module__ + '.' + cls.__name__
+        return _encode_json_object
+    if issubclass(cls, type):
+        return _encode_type
+    if issubclass(cls, (set, tuple)):
+        _qualified_names[cls] = _builtins_module_name + ('.set' if issubclass(cls, set) else '.tuple')
+        return _encode_items
+    if cls.__module__ == 'numpy' and cls.__name__ == 'ndarray':
+        return _encode_ndarray
+    raise TypeError("Object of type {0} is not JSON serializable".format(cls.__name__))
+
+
+#: The conversion function for each class, see :func:`_get_encoder`
+_encoders = {}
+_qualified_names = {}
+_type_encoder = JSONObjectEncoder()
+
+
+def _to_json_compatible(obj):
+    cls = obj.__class__
+    try:
+        encoder = _encoders[cls]
+    except KeyError:
+        encoder = _encoders[cls] = _get_encoder(cls)
+    return encoder(obj)
+
+
+def to_json_compatible(obj):
+    """Converts an object into data consisting of dicts, lists and primitive values only
+
+    The objects are converted as done by the :class:`jsonconversion.encoder.JSONObjectEncoder`, i.e. the dictionaries
+    of JSONObjects (like states and state elements) get their `__jsonqualname__`, while tuples, sets and types are
+    also converted into dictionaries. The conversion function is looked up once per class, so serializing the
+    result with the json module is considerably faster than using the `JSONObjectEncoder`.
+
+    :param obj: The object to convert
+    :return: the converted data, the keys of dictionaries are left unchanged
+    :raises TypeError: if the object contains objects that cannot be serialized
+    """
+    return _to_json_compatible(obj)
+
+
+def _sort_keys_as_strings(json_compatible_data):
+    if isinstance(json_compatible_data, dict):
+        return OrderedDict((key, _sort_keys_as_strings(json_compatible_data[key]))
+                           for key in sorted(json_compatible_data.keys(), key=str))
+    if isinstance(json_compatible_data, list):
+        return [_sort_keys_as_strings(item) for item in json_compatible_data]
+    return json_compatible_data
+
+
+def dict_to_json_string(dictionary, **kwargs):
+    """
+    Serializes a dictionary to a json string, formatted as written by :func:`write_dict_to_json`.
+    By default, the string is indented by four spaces and the keys are sorted.
+    :param dictionary: The dictionary to serialize
+    :param kwargs: optional additional parameters for dumper, overriding the default formatting
+    :return: the json string
+    """
+    json_compatible_data = to_json_compatible(dictionary)
+    json_kwargs = dict(indent=4, check_circular=False, sort_keys=True)
+    json_kwargs.update(kwargs)
+    try:
+        return json.dumps(json_compatible_data, **json_kwargs)
+    except TypeError:
+        if not json_kwargs['sort_keys']:
+            raise
+        # keys of different types, e.g. int and str, cannot be compared in Python 3
+        json_kwargs['sort_keys'] = False
+        return json.dumps(_sort_keys_as_strings(json_compatible_data), **json_kwargs)
+
+
+def object_to_compact_json_string(obj):
+    """
+    Serializes an object to a json string without indentation and without sorting keys, e.g. for in-memory snapshots.
+    The string is created by the C implementation of the json module.
+    :param obj: The object to serialize
+    :return: the json string, which can be decoded with :func:`json_string_to_objects`
+    """
+    return json.dumps(to_json_compatible(obj), check_circular=False, separators=(',', ':'))
+
+
+#: The digests of the files written by :func:`write_file_if_changed` and the status of the files after writing them,
+#: the least recently written files are dropped if more than `MAX_WRITTEN_FILES` files are known
+_written_files = OrderedDict()
+_written_files_lock = threading.Lock()
+MAX_WRITTEN_FILES = 10000
+
+
+def _get_file_status(path):
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    return file_stat.st_ino, file_stat.st_size, file_stat.st_mtime, stat.S_IMODE(file_stat.st_mode)
+
+
+def _create_temporary_file(path):
+    """Creates a unique temporary file next to the given file
+
+    A unique file is needed, as the same file might be saved concurrently, e.g. by the auto backup. Unlike
+    :func:`tempfile.mkstemp`, the file is created with the permissions of new files as defined by the umask, which thus
+    does not have to be read.
+
+    :param str path: the path of the file to be replaced by the temporary file
+    :return: the file descriptor and the path of the temporary file
+    """
+    for _ in range(tempfile.TMP_MAX):
+        temporary_path = '{0}.{1}.tmp'.format(path, binascii.hexlify(os.urandom(6)).decode('ascii'))
+        try:
+            return os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), temporary_path
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+    raise IOError(errno.EEXIST, "No unique temporary file name found", path)
+
+
+def write_file_if_changed(path, content, report=None):
+    """Writes a text file, unless it already has the given content
+
+    The content is compared by its digest, if the file was written by this function before and has not been modified
+    since. Otherwise, the content is compared with the file on disk. Files are written to a temporary file, which then
+    atomically replaces the file, so that an interrupted save never leaves a partially written file.
+
+    :param str path: the path of the file
+    :param str content: the content of the file
+    :param rafcon.core.storage.storage.SaveReport report: the report counting the written and unchanged files
+    :return: whether the file was written
+    :rtype: bool
+    """
+    if not isinstance(content, bytes):
+        content = content.encode('utf-8')
+    digest = hashlib.sha1(content).digest()
+    file_status = _get_file_status(path)
+
+    unchanged = False
+    if file_status is not None and file_status[1] == len(content):
+        with _written_files_lock:
+            written_file = _written_files.get(path)
+        if written_file is not None and written_file[1] == file_status:
+            unchanged = written_file[0] == digest
+        else:
+            with open(path, 'rb') as existing_file:
+                unchanged = existing_file.read() == content
+
+    if not unchanged:
+        file_descriptor, temporary_path = _create_temporary_file(path)
+        try:
+            with os.fdopen(file_descriptor, 'wb') as temporary_file:
+                temporary_file.write(content)
+            if file_status is not None:
+                os.chmod(temporary_path, file_status[3])
+            os.rename(temporary_path, path)
+        except Exception:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        file_status = _get_file_status(path)
+    with _written_files_lock:
+        _written_files.pop(path, None)
+        _written_files[path] = digest, file_status
+        while len(_written_files) > MAX_WRITTEN_FILES:
+            _written_files.popitem(last=False)
+
+    if report is not None:
+        if unchanged:
+            report.files_unchanged += 1
+        else:
+            report.files_written += 1
+    return not unchanged
+
+
+def forget_written_files(path):
+    """Drops the digests of the files written by :func:`write_file_if_changed` in a removed or closed folder
+
+    :param str path: the path of the folder or file
+    """
+    folder_path = os.path.join(path, '')
+    with _written_files_lock:
+        for file_path in [file_path for file_path in _written_files
+                          if file_path == path or file_path.startswith(folder_path)]:
+            del _written_files[file_path]
+
+
 def write_dict_to_json(dictionary, path, **kwargs):
     """
-    Write a dictionary to a json file.
+    Write a dictionary to a json file, unless it already has this content (see :func:`write_file_if_changed`).
     :param path: The relative path to save the dictionary to
     :param dictionary: The dictionary to get saved
     :param kwargs: optional additional parameters for dumper
+    :return: whether the file was written
     """
-    result_string = json.dumps(dictionary, cls=JSONObjectEncoder,
-                               indent=4, check_circular=False, sort_keys=True, **kwargs)
-    with open(path, 'w') as f:
-        # We cannot write directly to the file, as otherwise the 'encode' method wouldn't be called
-        f.write(result_string)
+    return write_file_if_changed(path, dict_to_json_string(dictionary, **kwargs))
+
+
+def parse_json_string(json_string):
+    """Parses a json string into dicts, lists and primitive values
+
+    If `orjson` is installed, it is used for parsing. Strings it does not accept, e.g. containing NaN values as written
+    by the json module, are parsed with the json module.
+
+    :param str json_string: The json string
+    :return: the parsed data
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(json_string)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(json_string)
+
+
+def json_string_to_objects(json_string):
+    """Decodes the objects of a json string
+
+    :param str json_string: The json string
+    :return: the decoded objects, see :func:`decode_parsed_json`
+    """
+    return decode_parsed_json(parse_json_string(json_string))
 
 
 def load_objects_from_json(path, as_dict=False):
@@ -119,10 +393,76 @@ def load_objects_from_json(path, as_dict=False):
     :param path: The relative path of the json file.
     :return: The dictionary specified in the json file
     """
-    f = open(path, 'r')
+    with open(path, 'r') as f:
+        parsed_json = parse_json_string(f.read())
     if as_dict:
-        result = json.load(f)
-    else:
-        result = json.load(f, cls=JSONObjectDecoder, substitute_modules=substitute_modules)
-    f.close()
-    return result
+        return parsed_json
+    return decode_parsed_json(parsed_json)
+
+
+#: The classes of already decoded qualified names, see :func:`_get_class`
+_classes = {}
+
+
+def _get_class(qualified_name):
+    try:
+        return _classes[qualified_name]
+    except KeyError:
+        cls = get_class_from_qualified_name(substitute_modules.get(qualified_name, qualified_name))
+        _classes[qualified_name] = cls
+        return cls
+
+
+def _decode_dict(dictionary):
+    """Creates the object of a dictionary, as done by :class:`jsonconversion.decoder.JSONObjectDecoder`
+
+    :param dict dictionary: The dictionary, of which all values are already decoded. It is modified.
+    """
+    if '__jsonqualname__' in dictionary:
+        cls = _get_class(dictionary.pop('__jsonqualname__'))
+        if cls is tuple:
+            return tuple(dictionary['items'])
+        if cls is set:
+            return set(dictionary['items'])
+        if cls.__module__ == 'numpy' and cls.__name__ == 'ndarray':
+            import numpy as np
+            return np.array(dictionary['items'])
+        if hasattr(cls, "from_dict"):
+            return cls.from_dict(dictionary)
+        return dictionary
+    if '__type__' in dictionary:
+        type_name = dictionary['__type__']
+        return string2type(substitute_modules.get(type_name, type_name))
+    # Converts keys to integers, where possible; keys starting with a letter can never be converted
+    decoded_dictionary = {}
+    for key, value in dictionary.items():
+        if not key[:1].isalpha():
+            try:
+                key = int(key)
+            except ValueError:
+                pass
+        decoded_dictionary[key] = value
+    return decoded_dictionary
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        return _decode_dict({key: _decode(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def decode_parsed_json(parsed_json):
+    """Decodes the objects of already parsed json data
+
+    The result equals the result of :func:`load_objects_from_json`, if `parsed_json` was loaded with `as_dict=True`.
+    This allows to parse json files, e.g. in another thread, and to create the objects later. `parsed_json` is not
+    modified. The objects are decoded as by the :class:`jsonconversion.decoder.JSONObjectDecoder`, but the classes of
+    the qualified names are only looked up once.
+
+    :param parsed_json: the parsed json data, consisting of dicts, lists and primitive values
+    :return: the decoded objects
+    """
+    # the dicts are decoded from the innermost to the outermost, as done by the json decoder
+    return _decode(parsed_json)
@@ -68,3 +68,61 @@ class Timer(object):
     @property
     def duration(self):
         return self.__duration
+
+
+class PhaseTimer(object):
+    """Measures the durations of consecutive phases, e.g. of the start-up of a process
+
+    Each phase lasts from its start to the start of the next phase or the call of :meth:`stop`.
+    """
+
+    def __init__(self):
+        self._phases = []
+        self._current_phase = None
+        self._current_phase_start_time = None
+
+    def start_phase(self, name, start_time=None):
+        """Stops the current phase and starts a new one
+
+        :param str name: the name of the new phase
+        :param float start_time: the time the phase started, as returned by :func:`time.time`, defaults to now
+        """
+        if start_time is None:
+            start_time = time.time()
+        if self._current_phase is not None:
+            self._phases.append((self._current_phase, start_time - self._current_phase_start_time))
+        self._current_phase = name
+        self._current_phase_start_time = start_time
+
+    def stop(self, stop_time=None):
+        """Stops the current phase
+
+        :param float stop_time: the time the phase ended, as returned by :func:`time.time`, defaults to now
+        """
+        if stop_time is None:
+            stop_time = time.time()
+        if self._current_phase is not None:
+            self._phases.append((self._current_phase, stop_time - self._current_phase_start_time))
+        self._current_phase = None
+
+    @property
+    def phases(self):
+        """The names and durations of all finished phases
+
+        :rtype: list(tuple(str, float))
+        """
+        return list(self._phases)
+
+    def get_report(self, title="Phase durations"):
+        """Formats the durations of all finished phases as table
+
+        :param str title: the title of the table
+        :rtype: str
+        """
+        lines = [title + ":"]
+        name_length = max([len(name) for name, _ in self._phases] + [len("total")])
+        for name, duration in self._phases:
+            lines.append("  {0:<{1}} {2:8.1f} ms".format(name, name_length, duration * 1000))
+        total = sum(duration for _, duration in self._phases)
+        lines.append("  {0:<{1}} {2:8.1f} ms".format("total", name_length, total * 1000))
+        return "\n".join(lines)
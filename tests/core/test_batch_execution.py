@@ -0,0 +1,100 @@
+import os
+import json
+
+import pytest
+
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+from rafcon.core import batch_execution
+
+import testing_utils
+
+SQUARE_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    outputs["square"] = inputs["value"] ** 2
+    return 0 if outputs["square"] < 10 else 1
+"""
+
+
+def create_square_state_machine(path):
+    root_state = ExecutionState("square")
+    root_state.script_text = SQUARE_SCRIPT
+    root_state.add_outcome("large", 1)
+    root_state.add_input_data_port("value", "int", 0)
+    root_state.add_output_data_port("square", "int")
+    storage.save_state_machine_to_path(StateMachine(root_state), path)
+
+
+def check_results(results, input_data_list):
+    assert [result['run'] for result in results] == list(range(len(input_data_list)))
+    for result, input_data in zip(results, input_data_list):
+        square = input_data.get('value', 0) ** 2
+        assert result['input_data'] == input_data
+        assert result['output_data'] == {'square': square}
+        assert result['outcome_name'] == ("success" if square < 10 else "large")
+        assert result['duration'] >= 0
+
+
+def test_load_input_data():
+    path = os.path.join(testing_utils.get_unique_temp_path(), 'input.json')
+    input_data_list = [{'value': 1}, {'value': 2}]
+    with open(path, 'w') as input_file:
+        json.dump(input_data_list, input_file)
+    assert batch_execution.load_input_data(path) == input_data_list
+    with open(path, 'w') as input_file:
+        input_file.write("\n".join(json.dumps(input_data) for input_data in input_data_list) + "\n")
+    assert batch_execution.load_input_data(path) == input_data_list
+
+
+@pytest.mark.parametrize("number_of_processes", [1, 2])
+def test_run_batch(number_of_processes, caplog):
+    testing_utils.initialize_environment_core()
+    try:
+        path = os.path.join(testing_utils.get_unique_temp_path(), 'square')
+        create_square_state_machine(path)
+        results_path = path + '_results.json'
+        input_data_list = [{'value': value} for value in range(5)] + [{}]
+
+        results = batch_execution.run_batch(path, input_data_list, results_path, number_of_processes)
+        check_results(results, input_data_list)
+        with open(results_path) as results_file:
+            written_results = [json.loads(line) for line in results_file]
+        assert sorted(written_results, key=lambda result: result['run']) == results
+        assert len(set(result['process_id'] for result in results)) <= number_of_processes
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_unknown_input_data(caplog):
+    testing_utils.initialize_environment_core()
+    try:
+        path = os.path.join(testing_utils.get_unique_temp_path(), 'square')
+        create_square_state_machine(path)
+        input_data_list = [{'value': 2}, {'valeu': 3}, {'value': 1}]
+
+        results = batch_execution.run_batch(path, input_data_list)
+        assert "'valeu'" in results[1]['error']
+        assert 'outcome_name' not in results[1]
+        # the runs before and after the invalid one are executed
+        check_results([results[0]], [input_data_list[0]])
+        assert results[2]['output_data'] == {'square': 1}
+
+        state_machine = storage.load_state_machine_from_path(path)
+        with pytest.raises(ValueError):
+            state_machine.start({'value': 2, 'valeu': 3})
+
+        # the engine neither activates the state machine nor changes its mode, if the input data is invalid
+        from rafcon.core.singleton import state_machine_manager, state_machine_execution_engine
+        state_machine_manager.add_state_machine(state_machine)
+        active_state_machine_id = state_machine_manager.active_state_machine_id
+        with pytest.raises(ValueError):
+            state_machine_execution_engine.start(state_machine.state_machine_id, input_data={'valeu': 3})
+        assert state_machine_manager.active_state_machine_id == active_state_machine_id
+        assert state_machine_execution_engine.finished_or_stopped()
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_errors=1)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
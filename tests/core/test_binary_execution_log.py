@@ -0,0 +1,111 @@
+import os
+import shelve
+import struct
+
+import pytest
+
+from rafcon.utils.binary_execution_log import BinaryExecutionLog, BinaryExecutionLogWriter, \
+    convert_shelve_to_binary_log, is_binary_execution_log, FILE_MAGIC, FILE_VERSION
+import rafcon.utils.execution_log as log_helper
+
+import testing_utils
+
+
+def create_records(number_of_records):
+    return [("item_{0}".format(index),
+             {'history_item_id': "item_{0}".format(index), 'run_id': "run_{0}".format(index // 2),
+              'timestamp': float(index), 'data': list(range(index))})
+            for index in range(number_of_records)]
+
+
+def write_log(filename, records, close=True):
+    writer = BinaryExecutionLogWriter(filename)
+    for key, record in records:
+        writer[key] = record
+    if close:
+        writer.close()
+    else:
+        writer.flush()
+    return writer
+
+
+def test_write_and_read():
+    filename = os.path.join(testing_utils.get_unique_temp_path(), "log.binlog")
+    records = create_records(10)
+    write_log(filename, records)
+    assert is_binary_execution_log(filename)
+
+    with BinaryExecutionLog(filename) as execution_log:
+        assert execution_log.complete
+        assert len(execution_log) == 10
+        assert "item_3" in execution_log
+        assert execution_log["item_3"] == records[3][1]
+        assert dict(execution_log) == dict(records)
+        assert list(execution_log.items()) == records
+        assert sorted(execution_log.get_run_ids()) == ["run_{0}".format(index) for index in range(5)]
+        assert execution_log.get_items_of_run_id("run_1") == [records[2][1], records[3][1]]
+
+
+@pytest.mark.parametrize("close", [True, False])
+def test_rewritten_items(close):
+    filename = os.path.join(testing_utils.get_unique_temp_path(), "log.binlog")
+    records = create_records(4)
+    updated_record = dict(records[1][1], data="updated")
+    writer = write_log(filename, records + [("item_1", updated_record)], close=close)
+
+    # the last record of an item wins, as for a dict
+    with BinaryExecutionLog(filename) as execution_log:
+        assert len(execution_log) == 4
+        assert execution_log["item_1"] == updated_record
+        assert list(execution_log.items()) == [records[0], records[2], records[3], ("item_1", updated_record)]
+        assert execution_log.get_items_of_run_id("run_0") == [records[0][1], updated_record]
+    if not close:
+        writer._file.close()
+
+
+def test_unknown_version():
+    filename = os.path.join(testing_utils.get_unique_temp_path(), "log.binlog")
+    write_log(filename, create_records(2))
+    with open(filename, 'rb+') as log_file:
+        log_file.seek(len(FILE_MAGIC))
+        log_file.write(struct.pack('>B', FILE_VERSION - 1))
+
+    with pytest.raises(ValueError) as error:
+        BinaryExecutionLog(filename)
+    assert "unsupported version {0}".format(FILE_VERSION - 1) in str(error.value)
+
+
+def test_read_incomplete_log(caplog):
+    filename = os.path.join(testing_utils.get_unique_temp_path(), "log.binlog")
+    records = create_records(5)
+    writer = write_log(filename, records, close=False)
+    # simulate a crash while writing the last record
+    with open(filename, 'rb+') as log_file:
+        log_file.truncate(os.path.getsize(filename) - 3)
+
+    with BinaryExecutionLog(filename) as execution_log:
+        assert not execution_log.complete
+        assert dict(execution_log) == dict(records[:-1])
+    writer._file.close()
+    assert "was not closed properly" in caplog.text
+
+
+def test_convert_shelve():
+    path = testing_utils.get_unique_temp_path()
+    shelve_filename = os.path.join(path, "log.shelve")
+    records = create_records(6)
+    history_items = shelve.open(shelve_filename, flag='c', protocol=2)
+    for key, record in reversed(records):
+        history_items[key] = record
+    history_items.close()
+
+    filename = convert_shelve_to_binary_log(shelve_filename)
+    assert filename == os.path.join(path, "log.binlog")
+    assert not is_binary_execution_log(shelve_filename)
+    with log_helper.open_execution_log(filename) as execution_log:
+        # items are ordered by their timestamp
+        assert list(execution_log.items()) == records
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -0,0 +1,185 @@
+import pytest
+
+import rafcon.core.singleton
+from rafcon.core.config import global_config
+from rafcon.core.data_passing import DataPassingPolicy, pass_value, store_value, is_immutable, \
+    register_immutable_type, unregister_immutable_type
+from rafcon.core.execution.execution_history import ScopedDataItem
+from rafcon.core.global_variable_manager import GlobalVariableManager
+from rafcon.core.state_elements.scope import ScopedData
+from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+
+import testing_utils
+
+PRODUCER_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    outputs["data"] = gvm.get_variable("shared_data", per_reference=True)
+    return 0
+"""
+
+CONSUMER_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    gvm.set_variable("received_data", inputs["data"], per_reference=True)
+    return 0
+"""
+
+
+class Point(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+@pytest.fixture
+def data_passing_policy(request):
+    global_config.set_config_value("DATA_PASSING_POLICY", request.param.name)
+    yield request.param
+    global_config.set_config_value("DATA_PASSING_POLICY", "DEEPCOPY")
+
+
+def test_is_immutable():
+    assert is_immutable(1)
+    assert is_immutable("text")
+    assert is_immutable((1, ("a", b"b"), frozenset([2.0])))
+    assert not is_immutable((1, []))
+    assert not is_immutable([1])
+    assert not is_immutable(Point(1, 2))
+
+    register_immutable_type(Point)
+    try:
+        assert is_immutable(Point(1, 2))
+    finally:
+        unregister_immutable_type(Point)
+
+
+def test_pass_value():
+    value = (1, "a")
+    assert pass_value(value, DataPassingPolicy.DEEPCOPY) == value
+    assert pass_value(value, DataPassingPolicy.IMMUTABLE) is value
+    assert pass_value(value, DataPassingPolicy.SHARED_READ_ONLY) is value
+
+    shared_tuple = (1, 2)
+    value = {"list": [shared_tuple, Point(1, 2)]}
+    value["list"].append(value["list"])
+    for policy in DataPassingPolicy:
+        passed_value = pass_value(value, policy)
+        assert passed_value is not value
+        assert passed_value["list"] is not value["list"]
+        assert passed_value["list"][1] is not value["list"][1]
+        assert passed_value["list"][2] is passed_value["list"]
+    assert pass_value(value, DataPassingPolicy.SHARED_READ_ONLY)["list"][0] is shared_tuple
+
+
+def test_pass_numpy_array():
+    numpy = pytest.importorskip("numpy")
+    array = numpy.arange(10)
+    passed_array = pass_value(array, DataPassingPolicy.SHARED_READ_ONLY)
+    assert numpy.shares_memory(array, passed_array)
+    with pytest.raises(ValueError):
+        passed_array[0] = 1
+    assert not numpy.shares_memory(array, pass_value(array, DataPassingPolicy.IMMUTABLE))
+
+    # a read-only view does not protect from changes made through the writable base array
+    assert not is_immutable(passed_array)
+    stored_array = store_value(passed_array, DataPassingPolicy.SHARED_READ_ONLY)
+    assert not numpy.shares_memory(array, stored_array)
+    array[0] = 1
+    assert passed_array[0] == 1
+    assert stored_array[0] == 0
+
+    array.flags.writeable = False
+    assert is_immutable(array)
+    assert pass_value(array, DataPassingPolicy.IMMUTABLE) is array
+    assert store_value(array, DataPassingPolicy.SHARED_READ_ONLY) is array
+
+
+def test_global_variable_numpy_array():
+    numpy = pytest.importorskip("numpy")
+    global_config.set_config_value("DATA_PASSING_POLICY", DataPassingPolicy.SHARED_READ_ONLY.name)
+    try:
+        gvm = GlobalVariableManager()
+        array = numpy.zeros(3)
+        gvm.set_variable("array", array)
+        array[0] = 1
+        # the global variable does not alias the memory of the array
+        assert gvm.get_variable("array")[0] == 0
+    finally:
+        global_config.set_config_value("DATA_PASSING_POLICY", "DEEPCOPY")
+
+
+@pytest.mark.parametrize("data_passing_policy", list(DataPassingPolicy), indirect=True)
+def test_global_variable_policy(data_passing_policy):
+    gvm = GlobalVariableManager()
+    value = (frozenset([1, 2]), [3])
+    gvm.set_variable("value", value)
+    stored_value = gvm.get_variable("value")
+    assert stored_value == value
+    assert stored_value[1] is not value[1]
+    if data_passing_policy is DataPassingPolicy.SHARED_READ_ONLY:
+        assert stored_value[0] is value[0]
+    if data_passing_policy is DataPassingPolicy.DEEPCOPY:
+        assert stored_value[0] is not value[0]
+
+
+def create_state_machine():
+    root_state = HierarchyState("root")
+    producer = ExecutionState("producer")
+    producer.script_text = PRODUCER_SCRIPT
+    producer.add_output_data_port("data", "frozenset")
+    consumer = ExecutionState("consumer")
+    consumer.script_text = CONSUMER_SCRIPT
+    consumer.add_input_data_port("data", "frozenset")
+    root_state.add_state(producer)
+    root_state.add_state(consumer)
+    root_state.set_start_state(producer.state_id)
+    root_state.add_transition(producer.state_id, 0, consumer.state_id, None)
+    root_state.add_transition(consumer.state_id, 0, root_state.state_id, 0)
+    root_state.add_data_flow(producer.state_id,
+                             producer.get_io_data_port_id_from_name_and_type("data", OutputDataPort),
+                             consumer.state_id,
+                             consumer.get_io_data_port_id_from_name_and_type("data", InputDataPort))
+    return StateMachine(root_state)
+
+
+@pytest.mark.parametrize("data_passing_policy", list(DataPassingPolicy), indirect=True)
+def test_data_passed_between_states(caplog, data_passing_policy):
+    testing_utils.initialize_environment_core(core_config={"DATA_PASSING_POLICY": data_passing_policy.name})
+    gvm = rafcon.core.singleton.global_variable_manager
+    shared_data = frozenset(["large", "immutable", "data"])
+    gvm.set_variable("shared_data", shared_data, per_reference=True)
+
+    state_machine = create_state_machine()
+    try:
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+        rafcon.core.singleton.state_machine_execution_engine.join()
+
+        received_data = gvm.get_variable("received_data", per_reference=True)
+        assert received_data == shared_data
+        if data_passing_policy is DataPassingPolicy.DEEPCOPY:
+            assert received_data is not shared_data
+        else:
+            assert received_data is shared_data
+
+        # the history holds separate scoped data objects, which are not linked to the state
+        root_state = state_machine.root_state
+        scoped_data_items = [item for item in state_machine.execution_histories[-1]
+                             if isinstance(item, ScopedDataItem) and item.scoped_data]
+        assert scoped_data_items
+        for item in scoped_data_items:
+            for key, scoped_data in item.scoped_data.items():
+                assert isinstance(scoped_data, ScopedData)
+                assert scoped_data is not root_state.scoped_data.get(key)
+                if data_passing_policy is not DataPassingPolicy.DEEPCOPY:
+                    assert scoped_data.parent is None
+    finally:
+        gvm.delete_variable("shared_data")
+        gvm.delete_variable("received_data")
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -0,0 +1,87 @@
+import time
+import threading
+
+import pytest
+
+import rafcon.core.singleton
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+
+import testing_utils
+
+SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    outputs["result"] = inputs["value"] * 2
+    return "done"
+"""
+
+
+def create_state_machine():
+    root_state = HierarchyState("root")
+    root_state.add_outcome("done", 1)
+    root_input = root_state.add_input_data_port("value", "int", 21)
+    root_output = root_state.add_output_data_port("result", "int")
+    execution_state = ExecutionState("double")
+    execution_state.script_text = SCRIPT
+    execution_state.add_outcome("done", 1)
+    input_port = execution_state.add_input_data_port("value", "int")
+    output_port = execution_state.add_output_data_port("result", "int")
+    root_state.add_state(execution_state)
+    root_state.set_start_state(execution_state.state_id)
+    root_state.add_data_flow(root_state.state_id, root_input, execution_state.state_id, input_port)
+    root_state.add_data_flow(execution_state.state_id, output_port, root_state.state_id, root_output)
+    root_state.add_transition(execution_state.state_id, 1, root_state.state_id, 1)
+    return StateMachine(root_state)
+
+
+def test_execution_handle(caplog):
+    testing_utils.initialize_environment_core()
+    execution_engine = rafcon.core.singleton.state_machine_execution_engine
+    try:
+        state_machine = create_state_machine()
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        callback_handles = []
+        finished_event = threading.Event()
+
+        start_time = time.time()
+        execution_handle = execution_engine.start(state_machine.state_machine_id)
+        assert state_machine.execution_handle is execution_handle
+        execution_handle.add_done_callback(lambda handle: (callback_handles.append(handle), finished_event.set()))
+        assert execution_handle.join(5)
+        # the execution is finished without polling delays
+        assert time.time() - start_time < 0.5
+        assert execution_handle.finished
+        assert execution_engine.finished_or_stopped()
+        assert execution_handle.final_outcome.name == "done"
+        assert execution_handle.output_data["result"] == 42
+        assert finished_event.wait(1)
+        assert callback_handles == [execution_handle]
+
+        # callbacks added after the execution finished are called directly
+        execution_handle.add_done_callback(callback_handles.append)
+        assert callback_handles == [execution_handle] * 2
+
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_wait_for_state_machine_finished(caplog):
+    import rafcon.core.start
+    testing_utils.initialize_environment_core()
+    try:
+        state_machine = create_state_machine()
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        start_time = time.time()
+        execution_handle = rafcon.core.start.start_state_machine(state_machine)
+        rafcon.core.start.wait_for_state_machine_finished(state_machine)
+        assert time.time() - start_time < 0.5
+        assert execution_handle.finished
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -0,0 +1,127 @@
+import pytest
+
+import rafcon.core.singleton
+from rafcon.core.execution.execution_engine import ExecutionEngine
+from rafcon.core.execution.execution_history import ScopedDataItem, CallType
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+import rafcon.utils.execution_log as log_helper
+
+import testing_utils
+
+LOOP_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    counter = gvm.get_variable("loop_counter", default=0) + 1
+    gvm.set_variable("loop_counter", counter)
+    return 0 if counter < 100 else 1
+"""
+
+
+def create_state_machine():
+    root_state = HierarchyState("root")
+    root_state.add_scoped_variable("scoped", "int", 1)
+    loop_state = ExecutionState("loop")
+    loop_state.script_text = LOOP_SCRIPT
+    loop_state.add_outcome("done", 1)
+    root_state.add_state(loop_state)
+    root_state.set_start_state(loop_state.state_id)
+    root_state.add_transition(loop_state.state_id, 0, loop_state.state_id, None)
+    root_state.add_transition(loop_state.state_id, 1, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+def run_state_machine(state_machine):
+    rafcon.core.singleton.global_variable_manager.set_variable("loop_counter", 0)
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+    rafcon.core.singleton.state_machine_execution_engine.join()
+    return state_machine.execution_histories[-1]
+
+
+def test_bounded_execution_history(caplog):
+    testing_utils.initialize_environment_core(
+        core_config={'EXECUTION_HISTORY_MAX_LENGTH': 20,
+                     'EXECUTION_LOG_ENABLE': True,
+                     'EXECUTION_LOG_PATH': testing_utils.get_unique_temp_path() + '/test_execution_log'})
+    state_machine = create_state_machine()
+    try:
+        execution_history = run_state_machine(state_machine)
+
+        assert len(execution_history) == 20
+        assert execution_history.number_of_dropped_items > 0
+        assert execution_history[0].prev is None
+        assert all(item.next is execution_history[index + 1] for index, item in enumerate(execution_history[:-1]))
+        items = list(execution_history)
+        for index in [slice(-3, None), slice(2, 5), slice(None, None, -2), slice(15, 3, -4), slice(7, 7)]:
+            assert execution_history[index] == items[index]
+        assert not execution_history.is_backward_stepping_possible(20)
+        assert execution_history.is_backward_stepping_possible(3)
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+        assert rafcon.core.singleton.state_machine_execution_engine._is_backward_step_possible()
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = None
+
+        # the dropped items are still contained in the execution log
+        execution_history.execution_history_storage.close()
+        execution_log = log_helper.open_execution_log(state_machine.get_last_execution_log_filename())
+        assert len(execution_log) == len(execution_history) + execution_history.number_of_dropped_items
+        execution_log.close()
+
+        # the histories of running concurrency branches are checked as well
+        execution_history.set_execution_history_storage(None)
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+        root_state = state_machine.root_state
+        loop_state = list(root_state.states.values())[0]
+        branch_history = execution_history.push_concurrency_history_item(root_state, 2).execution_histories[0]
+        assert rafcon.core.singleton.state_machine_execution_engine._is_backward_step_possible()
+        for _ in range(11):
+            branch_history.push_call_history_item(loop_state, CallType.EXECUTE, root_state)
+            branch_history.push_return_history_item(loop_state, CallType.EXECUTE, root_state)
+        for _ in range(17):
+            branch_history.pop_last_item()
+        assert branch_history.number_of_dropped_items > 0 and len(branch_history) == 3
+        assert not rafcon.core.singleton.state_machine_execution_engine._is_backward_step_possible()
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = None
+    finally:
+        rafcon.core.singleton.global_variable_manager.delete_variable("loop_counter")
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=1)
+
+
+def test_unbounded_execution_history(caplog, monkeypatch):
+    testing_utils.initialize_environment_core()
+    state_machine = create_state_machine()
+    try:
+        execution_history = run_state_machine(state_machine)
+        assert execution_history.number_of_dropped_items == 0
+
+        # the hierarchy of the state machine is only checked, if items were dropped
+        monkeypatch.setattr(ExecutionEngine, "_get_hierarchy_depth",
+                            staticmethod(lambda state: pytest.fail("hierarchy depth calculated")))
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+        assert rafcon.core.singleton.state_machine_execution_engine._is_backward_step_possible()
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = None
+    finally:
+        rafcon.core.singleton.global_variable_manager.delete_variable("loop_counter")
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_execution_history_without_scoped_data(caplog):
+    testing_utils.initialize_environment_core(core_config={'EXECUTION_HISTORY_STORE_SCOPED_DATA': False})
+    state_machine = create_state_machine()
+    try:
+        execution_history = run_state_machine(state_machine)
+
+        scoped_data_items = [item for item in execution_history if isinstance(item, ScopedDataItem)]
+        assert len(scoped_data_items) == 2 * 100 + 2
+        assert all(item.scoped_data == {} for item in scoped_data_items)
+        assert not execution_history.is_backward_stepping_possible()
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+        assert not rafcon.core.singleton.state_machine_execution_engine._is_backward_step_possible()
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = None
+    finally:
+        rafcon.core.singleton.global_variable_manager.delete_variable("loop_counter")
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=1)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -1,6 +1,9 @@
 # singleton elements
 import rafcon.core.singleton
 from rafcon.core.storage import storage as global_storage
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
 import rafcon.utils.execution_log as log_helper
 
 # test environment elements
@@ -23,9 +26,7 @@ def test_execution_log(caplog):
         rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
         rafcon.core.singleton.state_machine_execution_engine.join()
 
-        import shelve
-        import json
-        ss = shelve.open(state_machine.get_last_execution_log_filename())
+        ss = log_helper.open_execution_log(state_machine.get_last_execution_log_filename())
 
         assert len(ss) == 36
 
@@ -62,6 +63,120 @@ def test_execution_log(caplog):
     finally:
         testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=0, expected_errors=0)
 
+
+COUNTER_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    outputs["counter"] = inputs["counter"] + 1
+    return 0 if outputs["counter"] < 3 else 1
+"""
+
+
+def create_counter_state_machine():
+    root_state = HierarchyState("root")
+    container = HierarchyState("container")
+    counter_state = ExecutionState("counter")
+    counter_state.script_text = COUNTER_SCRIPT
+    counter_state.add_outcome("done", 1)
+    counter_input = counter_state.add_input_data_port("counter", "int", 0)
+    counter_output = counter_state.add_output_data_port("counter", "int")
+    container.add_state(counter_state)
+    container.set_start_state(counter_state.state_id)
+    counter_variable = container.add_scoped_variable("counter", "int", 0)
+    container.add_data_flow(container.state_id, counter_variable, counter_state.state_id, counter_input)
+    container.add_data_flow(counter_state.state_id, counter_output, container.state_id, counter_variable)
+    container.add_transition(counter_state.state_id, 0, counter_state.state_id, None)
+    container.add_transition(counter_state.state_id, 1, container.state_id, 0)
+    root_state.add_state(container)
+    root_state.set_start_state(container.state_id)
+    root_state.add_transition(container.state_id, 0, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+def test_streaming_execution_log(caplog):
+    testing_utils.initialize_environment_core(
+        core_config={'EXECUTION_LOG_ENABLE': True,
+                     'EXECUTION_LOG_FORMAT': 'BINARY',
+                     'EXECUTION_LOG_PATH': testing_utils.get_unique_temp_path()+'/test_execution_log'})
+    try:
+        state_machine = create_counter_state_machine()
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+        rafcon.core.singleton.state_machine_execution_engine.join()
+        filename = state_machine.get_last_execution_log_filename()
+        # closes the execution log
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+        start, next_, concurrent, hierarchy, collapsed_items = log_helper.log_to_collapsed_structure(filename)
+        collapsed_items.pop(start['run_id'])
+
+        executions = list(log_helper.iter_collapsed_executions(filename))
+        assert len(executions) == len(collapsed_items) == 5
+        for execution in executions:
+            collapsed_item = collapsed_items[execution['run_id']]
+            assert isinstance(execution['data_ins'], log_helper.LazyData)
+            assert dict(execution['data_ins']) == collapsed_item['data_ins']
+            assert dict(execution['data_outs']) == collapsed_item['data_outs']
+            assert dict(execution['scoped_data_outs']) == collapsed_item['scoped_data_outs']
+            assert execution['outcome_name'] == collapsed_item['outcome_name']
+        # children finish before their parents
+        assert [execution['state_name'] for execution in executions] == ['counter'] * 3 + ['container', 'root']
+        # unordered logs (e.g. shelves) are sorted before
+        with log_helper.open_execution_log(filename) as execution_log:
+            unordered_log = dict(reversed(list(execution_log.items())))
+        assert [execution['run_id'] for execution in log_helper.iter_collapsed_executions(unordered_log)] == \
+            [execution['run_id'] for execution in executions]
+
+        container_path = executions[3]['path']
+        counter_executions = list(log_helper.iter_collapsed_executions(
+            filename, path_prefix=container_path + '/', state_types=['ExecutionState']))
+        assert [execution['data_outs']['counter'] for execution in counter_executions] == [1, 2, 3]
+
+        end_time = counter_executions[1]['timestamp_call']
+        assert len(list(log_helper.iter_collapsed_executions(filename, state_types=['ExecutionState'],
+                                                             end_time=end_time))) == 2
+        assert len(list(log_helper.iter_collapsed_executions(filename, start_time=end_time))) == 2
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_columnar_execution_log(caplog):
+    np = pytest.importorskip("numpy")
+    testing_utils.initialize_environment_core(
+        core_config={'EXECUTION_LOG_ENABLE': True,
+                     'EXECUTION_LOG_PATH': testing_utils.get_unique_temp_path()+'/test_execution_log'})
+    try:
+        state_machine = create_counter_state_machine()
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+        rafcon.core.singleton.state_machine_execution_engine.join()
+        filename = state_machine.get_last_execution_log_filename()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+        columns = log_helper.log_to_columns(filename)
+        assert len(columns['run_id']) == 5
+        assert list(columns['path_names'][columns['path_id']]) == \
+            ['root/container/counter'] * 3 + ['root/container', 'root']
+        assert list(columns['state_types'][columns['state_type_id']]) == ['ExecutionState'] * 3 + ['HierarchyState'] * 2
+        assert list(columns['outcome_id']) == [0, 0, 1, 0, 0]
+        assert np.all(columns['duration'] >= 0)
+
+        path = os.path.join(testing_utils.get_unique_temp_path(), 'columns')
+        log_helper.save_columns(columns, path)
+        loaded_columns = log_helper.load_columns(path)
+        assert sorted(loaded_columns.keys()) == sorted(columns.keys())
+        assert isinstance(loaded_columns['timestamp_call'], np.memmap)
+        assert np.array_equal(loaded_columns['duration'], columns['duration'])
+
+        statistics = log_helper.columns_to_state_statistics(loaded_columns)
+        counter_index = list(statistics['path_name']).index('root/container/counter')
+        assert statistics['count'][counter_index] == 3
+        assert np.isclose(statistics['total_duration'][counter_index], columns['duration'][:3].sum())
+        assert statistics['min_duration'][counter_index] <= statistics['mean_duration'][counter_index] <= \
+            statistics['max_duration'][counter_index]
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
 if __name__ == '__main__':
     test_execution_log(None)
     # pytest.main([__file__])
@@ -0,0 +1,105 @@
+import pickle
+import threading
+
+import pytest
+
+from rafcon.core.execution.execution_history_writer import ExecutionHistoryWriter, BackpressurePolicy
+from rafcon.core.execution.execution_history import HistoryItem
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+
+
+class Item(object):
+    def __init__(self, history_item_id):
+        self.history_item_id = history_item_id
+
+    def to_dict(self):
+        return {'history_item_id': self.history_item_id}
+
+
+class SlowStorage(object):
+    """Storage, which blocks the writer until it is released"""
+
+    filename = "slow_storage"
+
+    def __init__(self):
+        self.items = {}
+        self.batch_sizes = []
+        self.released = threading.Event()
+
+    def store_items(self, items):
+        self.released.wait()
+        self.batch_sizes.append(len(items))
+        self.items.update(items)
+
+
+def fill_writer(policy, number_of_items, queue_size=10):
+    storage = SlowStorage()
+    writer = ExecutionHistoryWriter(storage, queue_size=queue_size, backpressure_policy=policy, sampling_interval=4)
+    writer.start()
+    for history_item_id in range(number_of_items):
+        writer.submit(Item(history_item_id))
+    return storage, writer
+
+
+def test_block_writes_all_items_in_batches():
+    storage = SlowStorage()
+    storage.released.set()
+    writer = ExecutionHistoryWriter(storage, queue_size=5, batch_size=3)
+    writer.start()
+    for history_item_id in range(100):
+        writer.submit(Item(history_item_id))
+    writer.drain()
+    assert len(storage.items) == 100
+    writer.stop()
+    assert not writer.is_alive()
+    assert max(storage.batch_sizes) <= 3
+    assert writer.number_of_dropped_items == 0
+
+
+def test_drop_policy():
+    storage, writer = fill_writer(BackpressurePolicy.DROP, 50)
+    storage.released.set()
+    writer.stop()
+    # one item may be taken by the blocked writer, the queue holds the next ten items
+    assert len(storage.items) + writer.number_of_dropped_items == 50
+    assert len(storage.items) <= 11
+    assert storage.items[0] == {'history_item_id': 0}
+
+
+def test_sample_policy():
+    storage, writer = fill_writer(BackpressurePolicy.SAMPLE, 20)
+    storage.released.set()
+    writer.stop()
+    # items are sampled as soon as the queue is half full
+    assert 0 < writer.number_of_dropped_items < 20
+    assert len(storage.items) + writer.number_of_dropped_items == 20
+
+
+def test_captured_state_data():
+    root_state = HierarchyState("root")
+    state = ExecutionState("name")
+    root_state.add_state(state)
+    state.semantic_data = {"key": {"nested": 1}}
+    history_item = HistoryItem(state, None, "run_id")
+    history_item.capture_state_data()
+    path = state.get_path()
+
+    # the record contains the data at the time of the capture
+    state.name = "changed name"
+    root_state.name = "changed root name"
+    state.change_state_id()
+    state.semantic_data = {"key": {"nested": 2}}
+    record = history_item.to_dict()
+    assert record['state_name'] == "name"
+    assert record['path'] == path != state.get_path()
+    assert record['path_by_name'] == "root/name"
+    assert pickle.loads(record['semantic_data']['key']) == {"nested": 1}
+    assert record['history_item_id'] == history_item.history_item_id
+
+    # items not passed to a writer are serialized with the current data
+    assert HistoryItem(state, None, "run_id").to_dict()['state_name'] == "changed name"
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -0,0 +1,142 @@
+import os
+import json
+
+import pytest
+from jsonconversion.decoder import JSONObjectDecoder
+from jsonconversion.encoder import JSONObjectEncoder
+
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.states.barrier_concurrency_state import BarrierConcurrencyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+from rafcon.utils import storage_utils
+from rafcon.utils.vividict import Vividict
+
+import testing_utils
+
+
+def encode_with_jsonconversion(obj):
+    # the arguments are set after the construction, as some versions of jsonconversion ignore them with Python 3
+    encoder = JSONObjectEncoder()
+    encoder.indent = 4
+    encoder.item_separator = ","
+    encoder.sort_keys = True
+    encoder.check_circular = False
+    return encoder.encode(obj)
+
+
+def decode_with_jsonconversion(json_string):
+    return json.loads(json_string, cls=JSONObjectDecoder, substitute_modules=storage_utils.substitute_modules)
+
+
+def get_core_data_paths():
+    for dir_path, _, file_names in os.walk(testing_utils.get_test_sm_path("unit_test_state_machines")):
+        for file_name in file_names:
+            if file_name.endswith('.json') and not file_name.startswith('meta_data'):
+                yield os.path.join(dir_path, file_name)
+
+
+def create_state():
+    root_state = HierarchyState("root")
+    root_state.add_input_data_port("input", "float", 4.2)
+    root_state.add_scoped_variable("scoped", "int", 1)
+    root_state.semantic_data = Vividict({"key": {"nested": [1, 2.5, None, True]}, "3": "int key"})
+    execution_state = ExecutionState("execution")
+    execution_state.add_output_data_port("output", "list", [1, (2, 3)])
+    execution_state.add_outcome("done", 1)
+    root_state.add_state(execution_state)
+    root_state.add_state(BarrierConcurrencyState("barrier"))
+    root_state.set_start_state(execution_state.state_id)
+    root_state.add_transition(execution_state.state_id, 1, root_state.state_id, 0)
+    return root_state
+
+
+def test_files_compatibility():
+    number_of_files = 0
+    for path in get_core_data_paths():
+        with open(path) as json_file:
+            json_string = json_file.read()
+        if "library_state.LibraryState" in json_string:
+            # decoding library states requires the libraries
+            continue
+        try:
+            reference_objects = decode_with_jsonconversion(json_string)
+        except ImportError:
+            # e.g. data ports of types of not installed modules
+            continue
+        objects = storage_utils.load_objects_from_json(path)
+        assert objects == reference_objects
+        assert storage_utils.dict_to_json_string(objects) == encode_with_jsonconversion(objects)
+        number_of_files += 1
+    assert number_of_files > 10
+
+
+def test_objects_compatibility():
+    root_state = create_state()
+    values = [root_state, root_state.states, (root_state.outcomes, {1, 2}), [float, int, type(None), ExecutionState],
+              {1: "a", 10: (1.5, "c"), -1: {"0": [], "x": None}}, root_state.semantic_data, float('nan')]
+    for value in values:
+        json_string = storage_utils.dict_to_json_string(value)
+        assert json_string == encode_with_jsonconversion(value)
+        decoded_value = storage_utils.json_string_to_objects(json_string)
+        reference_value = decode_with_jsonconversion(json_string)
+        if value is values[-1]:
+            assert repr(decoded_value) == repr(reference_value) == 'nan'
+            continue
+        assert decoded_value == reference_value
+        assert storage_utils.json_string_to_objects(storage_utils.object_to_compact_json_string(value)) == \
+            reference_value
+
+    # keys of different types are sorted as strings
+    json_string = storage_utils.dict_to_json_string({1: "a", "b": 2, "-2": 3})
+    assert json_string == '{\n    "-2": 3,\n    "1": "a",\n    "b": 2\n}'
+    assert storage_utils.json_string_to_objects(json_string) == {1: "a", "b": 2, -2: 3}
+
+    # the formatting can be changed
+    assert storage_utils.dict_to_json_string({"b": 1, "a": 2}, indent=None, sort_keys=False) == '{"b": 1, "a": 2}'
+
+    # types of renamed modules
+    old_type_name = 'rafcon.statemachine.states.execution_state.ExecutionState'
+    assert storage_utils.json_string_to_objects('{"__type__": "%s"}' % old_type_name) is ExecutionState
+
+    with pytest.raises(TypeError):
+        storage_utils.dict_to_json_string({"key": object()})
+
+
+def test_file_bytes_compatibility():
+    root_state = create_state()
+    path = os.path.join(testing_utils.get_unique_temp_path(), "compatibility")
+    storage.save_state_machine_to_path(StateMachine(root_state), path)
+
+    states = [(root_state, os.path.join(path, storage.get_storage_id_for_state(root_state)))]
+    while states:
+        state, state_path = states.pop()
+        with open(os.path.join(state_path, storage.FILE_NAME_CORE_DATA), 'rb') as core_data_file:
+            assert core_data_file.read() == encode_with_jsonconversion(state).encode('utf-8')
+        with open(os.path.join(state_path, storage.SEMANTIC_DATA_FILE), 'rb') as semantic_data_file:
+            assert semantic_data_file.read() == encode_with_jsonconversion(state.semantic_data).encode('utf-8')
+        if isinstance(state, HierarchyState):
+            states.extend((child_state, os.path.join(state_path, storage.get_storage_id_for_state(child_state)))
+                          for child_state in state.states.values())
+
+    meta_data = {"gui": {"editor_gaphas": {"rel_pos": (10.5, 20), "size": (50, 50)}}, "1": [1, None]}
+    meta_data_path = os.path.join(path, "meta_data.json")
+    storage_utils.write_dict_to_json(meta_data, meta_data_path)
+    with open(meta_data_path, 'rb') as meta_data_file:
+        assert meta_data_file.read() == encode_with_jsonconversion(meta_data).encode('utf-8')
+
+
+def test_decoded_state_copy():
+    root_state = create_state()
+    state_info = storage_utils.json_string_to_objects(storage_utils.object_to_compact_json_string(root_state))
+    state, transitions, data_flows = state_info
+    assert isinstance(state, HierarchyState)
+    assert state.state_id == root_state.state_id
+    assert state.input_data_ports == root_state.input_data_ports
+    assert state.scoped_variables == root_state.scoped_variables
+    assert sorted(transitions.keys()) == sorted(root_state.transitions.keys())
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -0,0 +1,139 @@
+import os
+import time
+
+import pytest
+
+import rafcon.core.singleton
+from rafcon.core.library_manager import LibraryIndex, LibraryManager, LibraryWatcher
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.library_state import LibraryState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+
+import testing_utils
+
+
+def save_library(path, name):
+    state = ExecutionState(name)
+    state.add_input_data_port("input", "int", 0)
+    storage.save_state_machine_to_path(StateMachine(state), path)
+
+
+def create_library_root():
+    library_root_path = os.path.join(testing_utils.get_unique_temp_path(), "index_libraries")
+    save_library(os.path.join(library_root_path, "folder", "library_1"), "library_1")
+    save_library(os.path.join(library_root_path, "library_2"), "library_2")
+    return library_root_path
+
+
+def test_library_index(caplog, monkeypatch):
+    library_root_path = create_library_root()
+    index_path = os.path.join(testing_utils.get_unique_temp_path(), "library_index.json")
+    testing_utils.initialize_environment_core(core_config={'LIBRARY_INDEX_PATH': index_path},
+                                              libraries={"index_libraries": library_root_path})
+    library_manager = rafcon.core.singleton.library_manager
+    try:
+        libraries = library_manager.libraries["index_libraries"]
+        assert libraries["folder"]["library_1"] == os.path.join(library_root_path, "folder", "library_1")
+        assert libraries["library_2"] == os.path.join(library_root_path, "library_2")
+        assert os.path.isfile(index_path)
+
+        # unchanged folders are taken from the stored index
+        index = LibraryIndex(index_path)
+        monkeypatch.setattr(os, "listdir", lambda path: pytest.fail("{0} was listed".format(path)))
+        assert index.get_folder(library_root_path) == (False, ["folder", "library_2"])
+        assert index.get_folder(os.path.join(library_root_path, "library_2")) == (True, [])
+        monkeypatch.undo()
+
+        assert not library_manager.update_libraries()
+        save_library(os.path.join(library_root_path, "folder", "library_3"), "library_3")
+        assert library_manager.update_libraries()
+        assert sorted(library_manager.libraries["index_libraries"]["folder"].keys()) == ["library_1", "library_3"]
+
+        # changed libraries are reloaded
+        library_state = LibraryState("index_libraries/folder", "library_1", "0.1")
+        assert library_state.name == "library_1"
+        save_library(os.path.join(library_root_path, "folder", "library_1"), "library_1_changed")
+        assert library_manager.update_libraries()
+        assert library_state.name == "library_1"
+        assert LibraryState("index_libraries/folder", "library_1", "0.1").name == "library_1_changed"
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def initialize_environment(library_root_path):
+    # the index is not written to the default path of the user
+    index_path = os.path.join(testing_utils.get_unique_temp_path(), "library_index.json")
+    testing_utils.initialize_environment_core(core_config={'LIBRARY_INDEX_PATH': index_path},
+                                              libraries={"index_libraries": library_root_path})
+
+
+def test_library_fingerprints_on_demand(caplog, monkeypatch):
+    library_root_path = create_library_root()
+    initialize_environment(library_root_path)
+    library_manager = rafcon.core.singleton.library_manager
+    try:
+        # the files of libraries are not checked, as long as the libraries are not updated
+        monkeypatch.setattr(LibraryManager, "_get_library_fingerprint",
+                            staticmethod(lambda path: pytest.fail("fingerprint of {0} calculated".format(path))))
+        assert LibraryState("index_libraries/folder", "library_1", "0.1").name == "library_1"
+        monkeypatch.undo()
+
+        # the first update only calculates the fingerprint
+        assert not library_manager.update_libraries()
+        save_library(os.path.join(library_root_path, "folder", "library_1"), "library_1_changed")
+        assert library_manager.update_libraries()
+        assert LibraryState("index_libraries/folder", "library_1", "0.1").name == "library_1_changed"
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def wait_for(condition, timeout=5.):
+    end_time = time.time() + timeout
+    while not condition() and time.time() < end_time:
+        time.sleep(0.05)
+    return condition()
+
+
+def test_library_watcher(caplog):
+    library_root_path = create_library_root()
+    initialize_environment(library_root_path)
+    library_manager = rafcon.core.singleton.library_manager
+    watcher = LibraryWatcher(library_manager, 0.05)
+    watcher.start()
+    try:
+        save_library(os.path.join(library_root_path, "library_3"), "library_3")
+        assert wait_for(lambda: "library_3" in library_manager.libraries["index_libraries"])
+    finally:
+        watcher.stop()
+        watcher.join()
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_library_watcher_dispatcher(caplog):
+    library_root_path = create_library_root()
+    initialize_environment(library_root_path)
+    library_manager = rafcon.core.singleton.library_manager
+    dispatched_updates = []
+    library_manager.set_update_dispatcher(lambda function, *args: dispatched_updates.append((function, args)))
+    watcher = LibraryWatcher(library_manager, 0.05)
+    watcher.start()
+    try:
+        save_library(os.path.join(library_root_path, "library_3"), "library_3")
+        assert wait_for(lambda: dispatched_updates)
+        # the watcher only detects the change, the library tree is changed by the dispatched call
+        assert "library_3" not in library_manager.libraries["index_libraries"]
+        watcher.stop()
+        watcher.join()
+        function, args = dispatched_updates[-1]
+        function(*args)
+        assert "library_3" in library_manager.libraries["index_libraries"]
+    finally:
+        watcher.stop()
+        watcher.join()
+        library_manager.set_update_dispatcher(None)
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
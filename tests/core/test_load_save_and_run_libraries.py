@@ -1,4 +1,5 @@
 import os
+import threading
 from os.path import join
 
 # core elements
@@ -186,6 +187,41 @@ def test_nested_library_state_machine(caplog):
         testing_utils.test_multithreading_lock.release()
 
 
+def test_shared_library_template(caplog):
+    rafcon.core.singleton.library_manager.initialize()
+    library_states = [LibraryState("temporary_libraries", "hierarchy_library", "0.1", "library_state_{0}".format(i))
+                      for i in range(3)]
+    # all library states share the loaded library root state until their state copy is needed
+    template = rafcon.core.singleton.library_manager.get_library_template(
+        library_states[0].lib_os_path).root_state
+    assert all(library_state._state_copy is None for library_state in library_states)
+    assert all(library_state._library_template is template for library_state in library_states)
+    assert library_states[0].get_states_statistics(0) == template.get_states_statistics(0)
+
+    data_port_id = library_states[0].get_io_data_port_id_from_name_and_type("data_input_port1", InputDataPort)
+    library_states[0].set_input_runtime_value(data_port_id, 3.0)
+    assert library_states[0].input_data_port_runtime_values[data_port_id] == 3.0
+    assert library_states[0]._state_copy is None
+    assert library_states[0].input_data_ports[data_port_id] is not template.input_data_ports[data_port_id]
+
+    state_copy = library_states[1].state_copy
+    assert state_copy is not template
+    assert state_copy.parent is library_states[1]
+    assert state_copy.input_data_ports is library_states[1].input_data_ports
+    assert library_states[1].state_copy is state_copy
+    assert library_states[2]._state_copy is None
+    assert state_copy == template
+
+    # the creation of a state copy is not blocked by the creation of another one
+    with library_states[1]._state_copy_lock:
+        copy_thread = threading.Thread(target=lambda: library_states[2].state_copy)
+        copy_thread.start()
+        copy_thread.join(5)
+        assert not copy_thread.is_alive()
+    assert library_states[2]._state_copy is not None
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
 def test_rafcon_library_path_variable(caplog):
     rafcon.core.config.global_config.set_config_value("LIBRARY_PATHS", {})
     os.environ['RAFCON_LIBRARY_PATH'] = os.path.join(testing_utils.LIBRARY_SM_PATH, 'generic')
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+import rafcon.core.singleton
+from rafcon.core.execution.notification_coalescer import NotificationCoalescer, get_installed_coalescer
+from rafcon.core.states.state import StateExecutionStatus
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+
+import testing_utils
+
+LOOP_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    counter = gvm.get_variable("counter", default=0) + 1
+    gvm.set_variable("counter", counter)
+    return 0 if counter < 3 else 1
+"""
+
+
+def create_loop_state_machine():
+    root_state = HierarchyState("root")
+    loop_state = ExecutionState("loop")
+    loop_state.script_text = LOOP_SCRIPT
+    loop_state.add_outcome("done", 1)
+    root_state.add_state(loop_state)
+    root_state.set_start_state(loop_state.state_id)
+    root_state.add_transition(loop_state.state_id, 0, loop_state.state_id, None)
+    root_state.add_transition(loop_state.state_id, 1, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+class NotificationRecorder(object):
+    """Records the after notifications of an observable together with the notifying thread"""
+
+    def __init__(self, observable):
+        self.notifications = []
+        observable._notify_method_after = self.record
+
+    def record(self, instance, method_name, result, args, kwargs):
+        self.notifications.append((method_name, args[1:], threading.current_thread()))
+
+
+def execute(state_machine):
+    rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id).join()
+
+
+def test_notification_coalescing(caplog):
+    testing_utils.initialize_environment_core()
+    coalescer = NotificationCoalescer()
+    try:
+        state_machine = create_loop_state_machine()
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        loop_state = list(state_machine.root_state.states.values())[0]
+
+        recorder = NotificationRecorder(loop_state)
+        execute(state_machine)
+        # each of the three executions of the loop state changes the status several times
+        assert len(recorder.notifications) > 3
+        assert all(thread is not threading.current_thread() for _, _, thread in recorder.notifications)
+
+        coalescer.install()
+        assert get_installed_coalescer() is coalescer
+        rafcon.core.singleton.global_variable_manager.set_variable("counter", 0)
+        recorder = NotificationRecorder(loop_state)
+        execute(state_machine)
+        assert not recorder.notifications
+        assert coalescer.number_of_pending_notifications > 0
+
+        assert coalescer.flush() > 0
+        assert recorder.notifications == [('state_execution_status', (StateExecutionStatus.INACTIVE, ),
+                                           threading.current_thread())]
+        assert coalescer.number_of_pending_notifications == 0
+
+        # changes in the delivery thread are not delayed
+        loop_state.state_execution_status = StateExecutionStatus.ACTIVE
+        loop_state.state_execution_status = StateExecutionStatus.INACTIVE
+        assert len(recorder.notifications) == 3
+        assert coalescer.number_of_pending_notifications == 0
+
+        with pytest.raises(RuntimeError):
+            NotificationCoalescer().install()
+    finally:
+        coalescer.uninstall()
+        assert get_installed_coalescer() is None
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
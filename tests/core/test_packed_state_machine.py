@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from rafcon.core.storage import storage
+from rafcon.core.storage import packed_state_machine as packed_storage
+
+import testing_utils
+
+
+def get_test_state_machine_path():
+    return testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines", "stepping_test_with_library"))
+
+
+def pack_test_state_machine():
+    filename = os.path.join(testing_utils.get_unique_temp_path(), "stepping_test_with_library.rafcon")
+    packed_storage.pack_state_machine(get_test_state_machine_path(), filename)
+    return filename
+
+
+def test_pack_and_unpack():
+    filename = pack_test_state_machine()
+    assert storage.packed_storage.is_packed_state_machine_path(filename)
+    packed_state_machine = packed_storage.get_packed_state_machine(filename)
+    assert packed_state_machine is packed_storage.get_packed_state_machine(filename)
+    assert packed_state_machine.isfile(os.path.join(filename, storage.STATEMACHINE_FILE))
+    assert not packed_state_machine.isdir(os.path.join(filename, storage.STATEMACHINE_FILE))
+
+    path = os.path.join(testing_utils.get_unique_temp_path(), "unpacked")
+    packed_storage.unpack_state_machine(filename, path)
+    for dir_path, dir_names, file_names in os.walk(get_test_state_machine_path()):
+        unpacked_dir_path = os.path.join(path, os.path.relpath(dir_path, get_test_state_machine_path()))
+        assert sorted(os.listdir(unpacked_dir_path)) == sorted(dir_names + file_names)
+        packed_dir_path = os.path.normpath(os.path.join(filename, os.path.relpath(dir_path,
+                                                                                  get_test_state_machine_path())))
+        assert sorted(packed_state_machine.listdir(packed_dir_path)) == sorted(dir_names + file_names)
+
+
+def test_packed_state_machine_detection():
+    filename = pack_test_state_machine()
+    assert packed_storage.is_packed_state_machine_path(filename)
+    # new paths are detected by their extension, existing ones by their content
+    temp_path = testing_utils.get_unique_temp_path()
+    assert packed_storage.is_packed_state_machine_path(os.path.join(temp_path, "new.rafcon"))
+    assert not packed_storage.is_packed_state_machine_path(os.path.join(temp_path, "new"))
+    directory_path = os.path.join(temp_path, "directory.rafcon")
+    os.makedirs(directory_path)
+    assert not packed_storage.is_packed_state_machine_path(directory_path)
+    renamed_filename = os.path.join(temp_path, "renamed")
+    os.rename(filename, renamed_filename)
+    assert packed_storage.is_packed_state_machine_path(renamed_filename)
+
+
+def test_failed_packing(monkeypatch):
+    filename = pack_test_state_machine()
+    with open(filename, 'rb') as packed_file:
+        content = packed_file.read()
+
+    def fail(*args, **kwargs):
+        raise IOError("packing failed")
+
+    monkeypatch.setattr(packed_storage.zipfile.ZipFile, 'write', fail)
+    with pytest.raises(IOError):
+        packed_storage.pack_state_machine(get_test_state_machine_path(), filename)
+    # the temporary file is removed and the existing packed state machine is kept
+    assert sorted(os.listdir(os.path.dirname(filename))) == [os.path.basename(filename)]
+    with open(filename, 'rb') as packed_file:
+        assert packed_file.read() == content
+
+
+def test_load_and_save_packed_state_machine(caplog):
+    testing_utils.initialize_environment_core(
+        libraries={"unit_test_state_machines": testing_utils.get_test_sm_path("unit_test_state_machines")})
+    try:
+        filename = pack_test_state_machine()
+        state_machine = storage.load_state_machine_from_path(get_test_state_machine_path())
+        packed_state_machine = storage.load_state_machine_from_path(filename)
+        assert packed_state_machine.root_state == state_machine.root_state
+        assert packed_state_machine.file_system_path == filename
+        assert packed_state_machine.root_state.file_system_path.startswith(filename + os.sep)
+
+        # single states and data files can be read directly from the packed state machine
+        root_state_path = packed_state_machine.root_state.file_system_path
+        child_state = list(packed_state_machine.root_state.states.values())[0]
+        child_state_path = os.path.join(root_state_path, child_state.get_storage_path().split(os.sep)[-1])
+        assert storage.load_state_from_path(child_state_path) == child_state
+        core_data_path = os.path.join(root_state_path, storage.FILE_NAME_CORE_DATA)
+        assert storage.data_file_exists(core_data_path)
+        assert storage.load_data_file(core_data_path)[0].state_id == packed_state_machine.root_state.state_id
+
+        # a failed save leaves the file system paths untouched
+        def fail(path):
+            raise RuntimeError("meta data could not be stored")
+        failed_filename = os.path.join(testing_utils.get_unique_temp_path(), "failed.rafcon")
+        with pytest.raises(RuntimeError):
+            storage.save_state_machine_to_path(packed_state_machine, failed_filename, meta_data_callback=fail)
+        assert packed_state_machine.file_system_path == filename
+        assert packed_state_machine.root_state.file_system_path == root_state_path
+        assert not os.path.exists(failed_filename)
+
+        # save the state machine into another packed file
+        saved_filename = os.path.join(testing_utils.get_unique_temp_path(), "saved.rafcon")
+        storage.save_state_machine_to_path(packed_state_machine, saved_filename)
+        assert packed_state_machine.file_system_path == saved_filename
+        assert packed_state_machine.root_state.file_system_path.startswith(saved_filename + os.sep)
+        assert not packed_state_machine.marked_dirty
+        assert child_state.file_system_path == os.path.join(packed_state_machine.root_state.file_system_path,
+                                                            child_state.get_storage_path().split(os.sep)[-1])
+        assert storage.load_state_from_path(child_state.file_system_path) == child_state
+        reloaded_state_machine = storage.load_state_machine_from_path(saved_filename)
+        assert reloaded_state_machine.root_state == state_machine.root_state
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
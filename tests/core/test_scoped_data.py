@@ -71,5 +71,38 @@ def test_scoped_data(caplog):
         testing_utils.test_multithreading_lock.release()
 
 
+def test_data_flow_routes():
+    state_machine = create_state_machine()
+    root_state = state_machine.root_state
+    state1, state2 = sorted(root_state.states.values(), key=lambda state: state.name)
+    input_port_id = state2.get_io_data_port_id_from_name_and_type("data_input_port1", InputDataPort)
+    output_port_id = state1.get_io_data_port_id_from_name_and_type("data_output_port1", OutputDataPort)
+
+    routes_by_target, routes_by_source = root_state.get_data_flow_routes()
+    assert routes_by_target[(state2.state_id, input_port_id)] == [(str(output_port_id) + state1.state_id,
+                                                                    state1.state_id)]
+    assert routes_by_source[(state1.state_id, output_port_id)] == [(state2.state_id, input_port_id)]
+
+    # the routes are rebuilt after modifying a data flow
+    data_flow = [df for df in root_state.data_flows.values() if df.to_state == state2.state_id][0]
+    scoped_variable_id = root_state.add_scoped_variable("scoped", "float", 1.0)
+    data_flow.modify_origin(root_state.state_id, scoped_variable_id)
+    routes_by_target, routes_by_source = root_state.get_data_flow_routes()
+    assert routes_by_target[(state2.state_id, input_port_id)] == [(str(scoped_variable_id) + root_state.state_id,
+                                                                    root_state.state_id)]
+    assert (state1.state_id, output_port_id) not in routes_by_source
+
+    # the newest of several sources is passed to the input
+    root_state.add_data_flow(state1.state_id, output_port_id, state2.state_id, input_port_id)
+    root_state.add_default_values_of_scoped_variables_to_scoped_data()
+    assert root_state.get_inputs_for_state(state2)["data_input_port1"] == 1.0
+    root_state.add_state_execution_output_to_scoped_data({"data_output_port1": 2.0}, state1)
+    assert root_state.get_inputs_for_state(state2)["data_input_port1"] == 2.0
+
+    root_state.remove_data_flow(data_flow.data_flow_id)
+    assert root_state.get_data_flow_routes()[0][(state2.state_id, input_port_id)] == [
+        (str(output_port_id) + state1.state_id, state1.state_id)]
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
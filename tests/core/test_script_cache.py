@@ -0,0 +1,76 @@
+import pytest
+
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.script import script_cache
+from rafcon.core.config import global_config
+
+COUNTER_SCRIPT = """
+counter = 0
+
+def execute(self, inputs, outputs, gvm):
+    global counter
+    counter += 1
+    outputs["counter"] = counter
+    return 0
+"""
+
+
+def run_script(state):
+    outputs = {"counter": None}
+    state.script.build_module()
+    state.script.execute(state, {}, outputs)
+    return outputs["counter"]
+
+
+def test_module_reused_between_runs():
+    script_cache.clear()
+    state = ExecutionState("counter")
+    state.script_text = COUNTER_SCRIPT
+
+    assert [run_script(state) for _ in range(3)] == [1, 2, 3]
+    statistics = script_cache.get_statistics()
+    assert statistics['misses'] == 1
+    assert statistics['module_hits'] == 2
+
+
+def test_module_rebuilt_on_script_change():
+    script_cache.clear()
+    state = ExecutionState("counter")
+    state.script_text = COUNTER_SCRIPT
+    run_script(state)
+    run_script(state)
+
+    state.script_text = COUNTER_SCRIPT.replace("counter += 1", "counter += 10")
+    assert run_script(state) == 10
+    assert script_cache.get_statistics()['misses'] == 2
+
+
+def test_code_shared_between_states():
+    script_cache.clear()
+    states = [ExecutionState("counter_{}".format(i)) for i in range(5)]
+    for state in states:
+        state.script_text = COUNTER_SCRIPT
+        assert run_script(state) == 1
+    statistics = script_cache.get_statistics()
+    assert statistics['misses'] == 1
+    assert statistics['code_hits'] == 4
+
+
+def test_fresh_module_per_run():
+    script_cache.clear()
+    state = ExecutionState("counter")
+    state.script_text = COUNTER_SCRIPT
+    state.script.fresh_module_per_run = True
+    assert [run_script(state) for _ in range(3)] == [1, 1, 1]
+    assert script_cache.get_statistics()['misses'] == 1
+
+    state.script.fresh_module_per_run = None
+    global_config.set_config_value("SCRIPT_FRESH_MODULE_PER_RUN", True)
+    try:
+        assert [run_script(state) for _ in range(2)] == [1, 1]
+    finally:
+        global_config.set_config_value("SCRIPT_FRESH_MODULE_PER_RUN", False)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
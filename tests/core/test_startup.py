@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from rafcon.core.library_manager import LibraryManager
+from rafcon.utils.timer import PhaseTimer
+
+import testing_utils
+
+
+def test_library_manager_initialization_on_demand(caplog):
+    testing_utils.initialize_environment_core(
+        libraries={"unit_test_state_machines": testing_utils.get_test_sm_path("unit_test_state_machines")})
+    try:
+        library_manager = LibraryManager()
+        library_manager.initialize(on_demand=True)
+        assert library_manager._library_root_paths == {}
+        # the libraries are searched on first access
+        assert "unit_test_state_machines" in library_manager.libraries
+        assert "unit_test_state_machines" in library_manager._library_root_paths
+        library_os_path, _, _ = library_manager.get_os_path_to_library(
+            os.path.join("unit_test_state_machines", "libraries_for_stepping_tests"), "library_1")
+        assert os.path.isdir(library_os_path)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_phase_timer():
+    timer = PhaseTimer()
+    timer.start_phase("first", start_time=0.)
+    timer.start_phase("second", start_time=1.5)
+    timer.stop(stop_time=2.)
+    phases = timer.phases
+    assert [name for name, _ in phases] == ["first", "second"]
+    assert phases[0][1] == 1.5
+    assert phases[1][1] == 0.5
+    assert "first" in timer.get_report() and "total" in timer.get_report()
+
+
+def test_profile_startup():
+    script = os.path.join(testing_utils.RAFCON_PATH, "core", "start.py")
+    state_machine_path = testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines", "start_script_test"))
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join([os.path.dirname(testing_utils.RAFCON_PATH),
+                                                 os.path.dirname(testing_utils.__file__),
+                                                 environment.get("PYTHONPATH", "")])
+    output = subprocess.check_output([sys.executable, script, "-o", state_machine_path, "-c", "None",
+                                      "--profile-startup"], env=environment, stderr=subprocess.STDOUT)
+    output = output.decode("utf-8")
+    assert "Start-up profile" in output
+    for phase in ["imports", "configuration", "state machine loading", "execution start", "total"]:
+        assert phase in output
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -0,0 +1,104 @@
+import threading
+
+import pytest
+
+import rafcon.core.singleton
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.states.barrier_concurrency_state import BarrierConcurrencyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.constants import UNIQUE_DECIDER_STATE_ID
+from rafcon.core.execution.state_executor import StateExecutor, StateExecutorMode, StateExecutionHandle
+
+import testing_utils
+
+THREAD_RECORDING_SCRIPT = """
+import threading
+
+def execute(self, inputs, outputs, gvm):
+    gvm.set_variable("thread_ids", gvm.get_variable("thread_ids") + [threading.current_thread().ident])
+    return 0
+"""
+
+RETURN_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    return 0
+"""
+
+NUMBER_OF_CHILDREN = 20
+
+
+def create_state_machine():
+    root_state = HierarchyState("root")
+    previous_state = None
+    for i in range(NUMBER_OF_CHILDREN):
+        state = ExecutionState("state_{}".format(i))
+        state.script_text = THREAD_RECORDING_SCRIPT
+        root_state.add_state(state)
+        if previous_state is None:
+            root_state.set_start_state(state.state_id)
+        else:
+            root_state.add_transition(previous_state.state_id, 0, state.state_id, None)
+        previous_state = state
+
+    concurrency_state = BarrierConcurrencyState("concurrency")
+    for i in range(2):
+        state = ExecutionState("concurrent_{}".format(i))
+        state.script_text = RETURN_SCRIPT
+        concurrency_state.add_state(state)
+    concurrency_state.add_transition(UNIQUE_DECIDER_STATE_ID, 0, concurrency_state.state_id, 0)
+    root_state.add_state(concurrency_state)
+    root_state.add_transition(previous_state.state_id, 0, concurrency_state.state_id, None)
+    root_state.add_transition(concurrency_state.state_id, 0, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+@pytest.mark.parametrize("mode", [StateExecutorMode.THREAD, StateExecutorMode.POOL, StateExecutorMode.INLINE])
+def test_state_executor_modes(caplog, mode):
+    testing_utils.initialize_environment_core()
+    gvm = rafcon.core.singleton.global_variable_manager
+    gvm.set_variable("thread_ids", [])
+    state_executor = rafcon.core.singleton.state_machine_execution_engine.state_executor
+    state_executor.mode = mode
+
+    state_machine = create_state_machine()
+    try:
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+        rafcon.core.singleton.state_machine_execution_engine.join()
+
+        thread_ids = gvm.get_variable("thread_ids")
+        assert len(thread_ids) == NUMBER_OF_CHILDREN
+        assert state_machine.root_state.final_outcome.outcome_id == 0
+        sequential_thread_ids = set(thread_ids)
+        if mode is StateExecutorMode.INLINE:
+            assert len(sequential_thread_ids) == 1
+        elif mode is StateExecutorMode.POOL:
+            assert len(sequential_thread_ids) < NUMBER_OF_CHILDREN
+            assert 0 < state_executor.number_of_idle_workers <= state_executor.get_pool_size()
+    finally:
+        state_executor.mode = None
+        state_executor.shutdown()
+        gvm.delete_variable("thread_ids")
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+@pytest.mark.parametrize("mode", [StateExecutorMode.THREAD, StateExecutorMode.POOL, StateExecutorMode.INLINE])
+def test_state_execution_handle(mode):
+    state_executor = StateExecutor(mode=mode)
+    results = []
+    try:
+        handle = state_executor.create_handle(lambda: results.append(threading.current_thread().name), name="run")
+        if mode is StateExecutorMode.THREAD:
+            assert isinstance(handle, threading.Thread)
+        else:
+            assert isinstance(handle, StateExecutionHandle)
+        handle.start()
+        handle.join()
+        assert len(results) == 1
+    finally:
+        state_executor.shutdown()
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
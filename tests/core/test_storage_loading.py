@@ -0,0 +1,99 @@
+import os
+import json
+
+import pytest
+
+import rafcon.core.singleton
+from rafcon.core.config import global_config
+from rafcon.core.states.library_state import LibraryState, preload_library_states
+from rafcon.core.storage import storage
+from rafcon.utils import storage_utils
+
+import testing_utils
+
+
+def get_test_state_machine_path():
+    return testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines", "stepping_test_with_library"))
+
+
+def load_state_machine(number_of_threads):
+    global_config.set_config_value("STORAGE_LOADER_THREADS", number_of_threads)
+    return storage.load_state_machine_from_path(get_test_state_machine_path())
+
+
+def test_decode_parsed_json():
+    path = os.path.join(testing_utils.TEST_ASSETS_PATH, "unit_test_state_machines", "return_none_test_sm")
+    for dir_path, _, file_names in os.walk(path):
+        if storage.FILE_NAME_CORE_DATA in file_names:
+            core_data_path = os.path.join(dir_path, storage.FILE_NAME_CORE_DATA)
+            parsed_json = storage_utils.load_objects_from_json(core_data_path, as_dict=True)
+            parsed_json_copy = json.loads(json.dumps(parsed_json))
+            assert storage_utils.decode_parsed_json(parsed_json) == \
+                storage_utils.load_objects_from_json(core_data_path)
+            assert parsed_json == parsed_json_copy
+
+
+def test_read_state_tree():
+    root_state_path = os.path.join(get_test_state_machine_path(), "stepping_test_with_library_GLSUJY")
+    sequentially_read_files = storage.read_state_tree(root_state_path, 1)
+    parallel_read_files = storage.read_state_tree(root_state_path, 4)
+    assert sorted(sequentially_read_files.keys()) == sorted(parallel_read_files.keys())
+    for state_path, state_files in sequentially_read_files.items():
+        assert state_files.core_data == parallel_read_files[state_path].core_data
+        assert state_files.script_text == parallel_read_files[state_path].script_text
+        assert state_files.child_state_paths == sorted(state_files.child_state_paths)
+
+
+def test_parallel_loading(caplog):
+    testing_utils.initialize_environment_core(
+        libraries={"unit_test_state_machines": testing_utils.get_test_sm_path("unit_test_state_machines")})
+    try:
+        sequentially_loaded_state_machine = load_state_machine(1)
+        parallel_loaded_state_machine = load_state_machine(4)
+        assert sequentially_loaded_state_machine.root_state == parallel_loaded_state_machine.root_state
+        assert list(sequentially_loaded_state_machine.root_state.states.keys()) == \
+            list(parallel_loaded_state_machine.root_state.states.keys())
+        assert not parallel_loaded_state_machine.marked_dirty
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def get_library_states(state):
+    library_states = []
+    for child_state in getattr(state, 'states', {}).values():
+        if isinstance(child_state, LibraryState):
+            library_states.append(child_state)
+        else:
+            library_states.extend(get_library_states(child_state))
+    return library_states
+
+
+def test_lazy_library_loading(caplog):
+    testing_utils.initialize_environment_core(
+        libraries={"unit_test_state_machines": testing_utils.get_test_sm_path("unit_test_state_machines")})
+    try:
+        state_machine = storage.load_state_machine_from_path(get_test_state_machine_path())
+        global_config.set_config_value("LIBRARY_LAZY_LOADING", True)
+        rafcon.core.singleton.library_manager.clean_loaded_libraries()
+        lazy_state_machine = storage.load_state_machine_from_path(get_test_state_machine_path())
+
+        library_states = get_library_states(state_machine.root_state)
+        lazy_library_states = get_library_states(lazy_state_machine.root_state)
+        assert len(lazy_library_states) == len(library_states) > 0
+        assert not any(library_state.is_library_loaded() for library_state in lazy_library_states)
+        for library_state, lazy_library_state in zip(library_states, lazy_library_states):
+            assert lazy_library_state.outcomes == library_state.outcomes
+            assert lazy_library_state.input_data_ports == library_state.input_data_ports
+            assert lazy_library_state.output_data_ports == library_state.output_data_ports
+        assert not rafcon.core.singleton.library_manager._loaded_libraries
+
+        preload_library_states(lazy_state_machine.root_state)
+        assert all(library_state._state_copy is not None for library_state in lazy_library_states)
+        assert lazy_state_machine.root_state == state_machine.root_state
+    finally:
+        global_config.set_config_value("LIBRARY_LAZY_LOADING", False)
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -0,0 +1,107 @@
+import os
+import stat
+
+import pytest
+
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+from rafcon.utils import storage_utils
+
+import testing_utils
+
+
+def create_state_machine():
+    root_state = HierarchyState("root")
+    for name in ["first", "second"]:
+        root_state.add_state(ExecutionState(name))
+    return StateMachine(root_state)
+
+
+def get_state_path(state, file_name):
+    return os.path.join(state.file_system_path, file_name)
+
+
+def test_incremental_saving(caplog):
+    testing_utils.initialize_environment_core()
+    try:
+        path = os.path.join(testing_utils.get_unique_temp_path(), "incremental_saving")
+        state_machine = create_state_machine()
+        first_state, second_state = sorted(state_machine.root_state.states.values(), key=lambda state: state.name)
+
+        report = storage.save_state_machine_to_path(state_machine, path)
+        # statemachine.json, core data and semantic data of three states and two scripts
+        assert report.files_written == 9
+        assert report.files_unchanged == 0
+        second_core_data_inode = os.stat(get_state_path(second_state, storage.FILE_NAME_CORE_DATA)).st_ino
+
+        report = storage.save_state_machine_to_path(state_machine, path)
+        # only the update time of the state machine may have changed
+        assert report.files_written <= 1
+        assert report.files_written + report.files_unchanged == 9
+
+        first_state.script_text += "\n"
+        report = storage.save_state_machine_to_path(state_machine, path)
+        assert 1 <= report.files_written <= 2
+        with open(get_state_path(first_state, storage.SCRIPT_FILE)) as script_file:
+            assert script_file.read() == first_state.script_text
+        assert os.stat(get_state_path(second_state, storage.FILE_NAME_CORE_DATA)).st_ino == second_core_data_inode
+
+        # files modified by others are detected
+        semantic_data_path = get_state_path(second_state, storage.SEMANTIC_DATA_FILE)
+        with open(semantic_data_path) as semantic_data_file:
+            semantic_data = semantic_data_file.read()
+        with open(semantic_data_path, 'w') as semantic_data_file:
+            semantic_data_file.write(" " * len(semantic_data))
+        storage.save_state_machine_to_path(state_machine, path)
+        with open(semantic_data_path) as semantic_data_file:
+            assert semantic_data_file.read() == semantic_data
+
+        # new files get the default permissions, despite being written to temporary files first
+        umask = os.umask(0)
+        os.umask(umask)
+        assert stat.S_IMODE(os.stat(semantic_data_path).st_mode) == 0o666 & ~umask
+
+        # meta data files are written only if changed as well
+        meta_data_path = get_state_path(first_state, storage.FILE_NAME_META_DATA)
+        assert storage_utils.write_dict_to_json({"gui": {"size": (10, 20)}}, meta_data_path)
+        assert not storage_utils.write_dict_to_json({"gui": {"size": (10, 20)}}, meta_data_path)
+
+        second_state_path = second_state.file_system_path
+        state_machine.root_state.remove_state(second_state.state_id)
+        report = storage.save_state_machine_to_path(state_machine, path)
+        assert report.folders_removed == 1
+        assert not any(file_path.startswith(second_state_path) for file_path in storage_utils._written_files)
+        assert not any(file_name.endswith('.tmp') for _, _, file_names in os.walk(path) for file_name in file_names)
+        assert storage.load_state_machine_from_path(path).root_state == state_machine.root_state
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_written_files_are_forgotten(caplog, monkeypatch):
+    testing_utils.initialize_environment_core()
+    try:
+        import rafcon.core.singleton
+        path = os.path.join(testing_utils.get_unique_temp_path(), "forgotten_files")
+        state_machine = create_state_machine()
+        storage.save_state_machine_to_path(state_machine, path)
+        assert any(file_path.startswith(path) for file_path in storage_utils._written_files)
+
+        # the files of closed state machines are forgotten
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+        assert not any(file_path.startswith(path) for file_path in storage_utils._written_files)
+
+        # only the most recently written files are kept
+        monkeypatch.setattr(storage_utils, "MAX_WRITTEN_FILES", 3)
+        file_paths = [os.path.join(path, "file_{0}.txt".format(index)) for index in range(5)]
+        for file_path in file_paths:
+            assert storage_utils.write_file_if_changed(file_path, "content")
+        assert list(storage_utils._written_files.keys()) == file_paths[2:]
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
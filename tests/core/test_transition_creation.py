@@ -84,5 +84,40 @@ def test_transition_creation(caplog):
     rafcon.core.singleton.state_machine_manager.delete_all_state_machines()
 
 
+def test_transition_lookup_index():
+    root_state = create_state_machine().root_state
+    states = {state.name: state for state in root_state.states.values()}
+    state1, state2, state3 = states["DummyState1"], states["DummyState2"], states["DummyState3"]
+
+    def lookup(state, outcome_id):
+        return root_state.get_transition_for_outcome(state, state.outcomes[outcome_id])
+
+    assert lookup(state1, 3).to_state == state2.state_id
+    assert lookup(state2, 0) is None
+
+    # adding and removing transitions keeps the index up to date
+    transition_id = root_state.add_transition(state2.state_id, 0, state3.state_id, None)
+    assert lookup(state2, 0).transition_id == transition_id
+    root_state.remove_transition(transition_id)
+    assert lookup(state2, 0) is None
+
+    # modifying the origin of a transition
+    transition = lookup(state3, 4)
+    transition.modify_origin(state2.state_id, 0)
+    assert lookup(state3, 4) is None
+    assert lookup(state2, 0) is transition
+    transition.from_outcome = -1
+    assert lookup(state2, 0) is None
+    assert lookup(state2, -1) is transition
+
+    # removing a state removes its transitions
+    root_state.remove_state(state3.state_id)
+    assert lookup(state1, 4) is None
+
+    # setting all transitions at once
+    root_state.transitions = {}
+    assert lookup(state1, 3) is None
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
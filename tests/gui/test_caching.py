@@ -30,3 +30,52 @@ def test_value_retrieval():
     assert None is cache.get_value("a", {})
     assert None is cache.get_value("b", {"x": 2, "y": 1})
     assert None is cache.get_value("b", {"x": 1, "y": 2})
+
+
+def test_surface_cache():
+
+    testing_utils.dummy_gui(None)
+
+    from rafcon.gui.mygaphas.utils.cache.surface_cache import SurfaceCache
+    cache = SurfaceCache(memory_limit=1024 * 1024)
+
+    key = cache.get_key("state", 100, 50, {"selected": False})
+    assert key == cache.get_key("state", 100, 50, {"selected": False})
+    assert key != cache.get_key("state", 100, 50, {"selected": True})
+    assert key != cache.get_key("name", 100, 50, {"selected": False})
+
+    assert None is cache.get_surface(key, 1.)
+    surface = cache.create_surface(key, 100, 50, 1.)
+    assert surface is cache.get_surface(key, 1.)
+    # zoom factors of the same zoom level share the surface
+    assert surface is cache.get_surface(key, 1.1)
+    assert None is cache.get_surface(key, 2.)
+    assert cache.hits == 2 and cache.misses == 2
+    assert cache.hit_rate == 0.5
+    assert cache.memory_usage == surface.size
+
+    # each surface uses 200 * 100 * 4 bytes, thus 13 fit into the cache
+    keys = [cache.get_key("state", 100, 50, {"index": index}) for index in range(20)]
+    for other_key in keys:
+        cache.create_surface(other_key, 100, 50, 1.)
+    assert cache.memory_usage <= cache.memory_limit
+    assert cache.evictions > 0
+    assert None is cache.get_surface(key, 1.)
+    assert None is not cache.get_surface(keys[-1], 1.)
+
+    # the surface drawn last by an item is used, even if it was dropped from the cache
+    assert surface is cache.get_surface(key, 1., last_surface=surface)
+    assert None is cache.get_surface(key, 2., last_surface=surface)
+
+    # surfaces exceeding a share of the memory limit do not drop the other surfaces
+    number_of_surfaces = len(cache)
+    large_key = cache.get_key("state", 1000, 500, {})
+    large_surface = cache.create_surface(large_key, 1000, 500, 1.)
+    assert len(cache) == number_of_surfaces
+    assert None is cache.get_surface(large_key, 1.)
+    assert large_surface is cache.get_surface(large_key, 1., last_surface=large_surface)
+    assert None is not cache.get_surface(keys[-1], 1.)
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.memory_usage == 0
@@ -0,0 +1,120 @@
+import os
+import time
+import pytest
+
+import testing_utils
+from testing_utils import call_gui_callback
+
+
+sm_path_recursive_resize = os.path.join(testing_utils.TEST_ASSETS_PATH, "unit_test_state_machines", "recursive_resize")
+
+state_path_Ex = "YCBQQV/PBUVVY"
+
+
+def open_test_state_machine():
+    import rafcon.gui.singleton
+
+    smm_m = rafcon.gui.singleton.state_machine_manager_model
+    main_window_controller = rafcon.gui.singleton.main_window_controller
+    menubar_ctrl = main_window_controller.get_controller('menu_bar_controller')
+    state_machines_ctrl = main_window_controller.get_controller("state_machines_editor_ctrl")
+
+    call_gui_callback(menubar_ctrl.on_open_activate, None, None, sm_path_recursive_resize)
+    time.sleep(0.5)
+    testing_utils.wait_for_gui()  # Wait for gaphas view
+
+    sm_m = smm_m.state_machines[smm_m.selected_state_machine_id]
+    sm_id = sm_m.state_machine.state_machine_id
+    sm_gaphas_ctrl = state_machines_ctrl.get_controller(sm_id)
+    canvas = sm_gaphas_ctrl.canvas
+    gaphas_view = sm_gaphas_ctrl.view.editor
+
+    return sm_m, canvas, gaphas_view
+
+
+def get_port_view_pos(view, state_v, port_v):
+    port_pos = port_v.port_pos
+    return view.get_matrix_i2v(state_v).transform_point(float(port_pos.x), float(port_pos.y))
+
+
+def get_port_at_port_view(view, state_v, port_v):
+    vpos = get_port_view_pos(view, state_v, port_v)
+    _, port, _ = view.get_port_at_point(vpos, distance=1)
+    return port
+
+
+def zoom(canvas, view, factor):
+    view.zoom(factor)
+    canvas.update_now()
+
+
+def move_state(canvas, state_v, offset):
+    x, y = state_v.position
+    state_v.position = x + offset[0], y + offset[1]
+    canvas.request_matrix_update(state_v)
+    canvas.update_now()
+
+
+def test_port_index(caplog):
+    testing_utils.run_gui(gui_config={'HISTORY_ENABLED': False},
+                          runtime_config={
+                              'LEFT_BAR_HIDDEN': True,
+                              'RIGHT_BAR_HIDDEN': True,
+                              'CONSOLE_HIDDEN': True,
+                              'MAIN_WINDOW_SIZE': (1000.0, 800.0)
+                          })
+
+    try:
+        sm_m, canvas, view = open_test_state_machine()
+        state_m = sm_m.get_state_model_by_path(state_path_Ex)
+        state_v = canvas.get_view_for_model(state_m)
+        port_v = state_v.outcomes[0]
+
+        assert call_gui_callback(get_port_at_port_view, view, state_v, port_v) is port_v.port
+
+        # the index is updated, when the view is zoomed
+        call_gui_callback(zoom, canvas, view, 2.)
+        assert call_gui_callback(get_port_at_port_view, view, state_v, port_v) is port_v.port
+        call_gui_callback(zoom, canvas, view, 0.5)
+        assert call_gui_callback(get_port_at_port_view, view, state_v, port_v) is port_v.port
+
+        # the index is updated, when the state is moved
+        old_vpos = call_gui_callback(get_port_view_pos, view, state_v, port_v)
+        call_gui_callback(move_state, canvas, state_v, (20, 20))
+        _, port, _ = call_gui_callback(view.get_port_at_point, old_vpos, 1)
+        assert port is not port_v.port
+        assert call_gui_callback(get_port_at_port_view, view, state_v, port_v) is port_v.port
+    finally:
+        testing_utils.close_gui()
+        testing_utils.shutdown_environment(caplog=caplog)
+
+
+def test_id_view_map(caplog):
+    testing_utils.run_gui(gui_config={'HISTORY_ENABLED': False})
+
+    try:
+        from rafcon.gui.mygaphas.items.state import StateView
+        sm_m, canvas, view = open_test_state_machine()
+        root_state = sm_m.root_state.state
+        root_state_v = canvas.get_view_for_model(sm_m.root_state)
+        state_m = sm_m.get_state_model_by_path(state_path_Ex)
+        state_v = canvas.get_view_for_model(state_m)
+
+        assert canvas.get_view_for_id(StateView, root_state.state_id) is root_state_v
+        assert canvas.get_view_for_id(StateView, state_m.state.state_id) is state_v
+        assert canvas.get_view_for_id(StateView, state_m.state.state_id, parent_item=root_state_v) is state_v
+        assert canvas.get_view_for_id(StateView, state_m.state.state_id, parent_item=state_v) is None
+
+        # views are found by the new id of their state
+        old_state_id = root_state.state_id
+        call_gui_callback(root_state.change_state_id)
+        assert root_state.state_id != old_state_id
+        assert canvas.get_view_for_id(StateView, root_state.state_id) is root_state_v
+        assert canvas.get_view_for_id(StateView, old_state_id) is None
+    finally:
+        testing_utils.close_gui()
+        testing_utils.shutdown_environment(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-xs'])
@@ -0,0 +1,219 @@
+import os
+import time
+import pytest
+
+import testing_utils
+from testing_utils import call_gui_callback
+
+
+sm_path_recursive_resize = os.path.join(testing_utils.TEST_ASSETS_PATH, "unit_test_state_machines", "recursive_resize")
+
+state_path_P = "YCBQQV/IZCVSG"
+state_path_PC = "YCBQQV/IZCVSG/PAMWNB"
+state_path_e = "YCBQQV/IZCVSG/PAMWNB/YRGGWX"
+state_path_A = "YCBQQV/IZCVSG/QUVLJG"
+
+# no content views are created, as long as this minimum size is configured
+HUGE_MINIMUM_SIZE_FOR_CONTENT = 100000
+
+gui_config = {
+    'HISTORY_ENABLED': False,
+    'GAPHAS_EDITOR_LAZY_STATE_VIEWS': True,
+    'MINIMUM_SIZE_FOR_CONTENT': HUGE_MINIMUM_SIZE_FOR_CONTENT
+}
+runtime_config = {
+    'LEFT_BAR_HIDDEN': True,
+    'RIGHT_BAR_HIDDEN': True,
+    'CONSOLE_HIDDEN': True,
+    'MAIN_WINDOW_SIZE': (1000.0, 800.0)
+}
+
+
+def open_test_state_machine():
+    import rafcon.gui.singleton
+
+    smm_m = rafcon.gui.singleton.state_machine_manager_model
+    main_window_controller = rafcon.gui.singleton.main_window_controller
+    menubar_ctrl = main_window_controller.get_controller('menu_bar_controller')
+    state_machines_ctrl = main_window_controller.get_controller("state_machines_editor_ctrl")
+
+    call_gui_callback(menubar_ctrl.on_open_activate, None, None, sm_path_recursive_resize)
+    time.sleep(0.5)
+    testing_utils.wait_for_gui()  # Wait for gaphas view
+
+    sm_m = smm_m.state_machines[smm_m.selected_state_machine_id]
+    sm_gaphas_ctrl = state_machines_ctrl.get_controller(sm_m.state_machine.state_machine_id)
+    return sm_m, sm_gaphas_ctrl
+
+
+def set_minimum_size_for_content(minimum_size):
+    from rafcon.gui.config import global_gui_config
+    global_gui_config.set_config_value('MINIMUM_SIZE_FOR_CONTENT', minimum_size)
+
+
+def update_lazy_state_views(gaphas_ctrl, number_of_levels=3):
+    # one hierarchy level is created per update
+    for _ in range(number_of_levels):
+        gaphas_ctrl._update_lazy_state_views()
+        gaphas_ctrl.canvas.update_now()
+
+
+def get_view_size(view, state_v):
+    """The length of the shorter side of the state in pixels"""
+    return min(view.get_matrix_i2v(state_v).transform_distance(state_v.width, state_v.height))
+
+
+def zoom_to_state(gaphas_ctrl, state_v, factor):
+    gaphas_ctrl.view.editor.zoom(factor)
+    gaphas_ctrl.canvas.update_now()
+    gaphas_ctrl.move_item_into_viewport(state_v)
+
+
+def resize_state(state_v, factor):
+    old_size = (state_v.width, state_v.height)
+    state_v.width = old_size[0] * factor
+    state_v.height = old_size[1] * factor
+    state_v.resize_all_children(old_size)
+    return state_v.width / old_size[0], state_v.height / old_size[1]
+
+
+def focus_model(sm_m, model):
+    sm_m.selection.focus = model
+
+
+def clear_selection(sm_m):
+    sm_m.selection.focus = None
+    sm_m.selection.clear()
+
+
+def test_content_creation_on_zoom(caplog):
+    testing_utils.run_gui(gui_config=gui_config.copy(), runtime_config=runtime_config)
+
+    try:
+        from rafcon.core.states.execution_state import ExecutionState
+        sm_m, gaphas_ctrl = open_test_state_machine()
+        canvas = gaphas_ctrl.canvas
+        view = gaphas_ctrl.view.editor
+        state_m_P = sm_m.get_state_model_by_path(state_path_P)
+        state_m_A = sm_m.get_state_model_by_path(state_path_A)
+        state_m_PC = sm_m.get_state_model_by_path(state_path_PC)
+        state_v_P = canvas.get_view_for_model(state_m_P)
+
+        # the content of the root state is created, the content of its child states is not
+        assert canvas.get_view_for_model(sm_m.root_state).content_created
+        assert state_v_P is not None
+        assert not state_v_P.content_created
+        assert canvas.get_view_for_model(state_m_A) is None
+        assert canvas.get_view_for_model(state_m_PC) is None
+
+        # the state is too small for its content
+        minimum_size = 1.5 * call_gui_callback(get_view_size, view, state_v_P)
+        call_gui_callback(set_minimum_size_for_content, minimum_size)
+        call_gui_callback(update_lazy_state_views, gaphas_ctrl)
+        assert not state_v_P.content_created
+        assert canvas.get_view_for_model(state_m_A) is None
+
+        # the content is created, when the state is zoomed in
+        call_gui_callback(zoom_to_state, gaphas_ctrl, state_v_P, 2.)
+        call_gui_callback(update_lazy_state_views, gaphas_ctrl)
+        assert call_gui_callback(get_view_size, view, state_v_P) >= minimum_size
+        assert state_v_P.content_created
+        assert canvas.get_view_for_model(state_m_A) is not None
+        assert canvas.get_view_for_model(state_m_PC) is not None
+
+        # and removed again, when it is zoomed out
+        call_gui_callback(zoom_to_state, gaphas_ctrl, state_v_P, 0.5)
+        call_gui_callback(update_lazy_state_views, gaphas_ctrl)
+        assert not state_v_P.content_created
+        assert canvas.get_view_for_model(state_m_A) is None
+        assert canvas.get_view_for_model(state_m_PC) is None
+
+        # states added to a state without content views get their view, when the content is created
+        new_state = ExecutionState("new")
+        call_gui_callback(state_m_P.state.add_state, new_state)
+        new_state_m = state_m_P.states[new_state.state_id]
+        assert canvas.get_view_for_model(new_state_m) is None
+        call_gui_callback(set_minimum_size_for_content, 0)
+        call_gui_callback(update_lazy_state_views, gaphas_ctrl)
+        assert state_v_P.content_created
+        assert canvas.get_view_for_model(new_state_m) is not None
+    finally:
+        testing_utils.close_gui()
+        testing_utils.shutdown_environment(caplog=caplog)
+
+
+def test_content_creation_on_focus(caplog):
+    testing_utils.run_gui(gui_config=gui_config.copy(), runtime_config=runtime_config)
+
+    try:
+        sm_m, gaphas_ctrl = open_test_state_machine()
+        canvas = gaphas_ctrl.canvas
+        state_m_P = sm_m.get_state_model_by_path(state_path_P)
+        state_m_PC = sm_m.get_state_model_by_path(state_path_PC)
+        state_m_e = sm_m.get_state_model_by_path(state_path_e)
+        state_v_P = canvas.get_view_for_model(state_m_P)
+        assert canvas.get_view_for_model(state_m_e) is None
+
+        # focusing a state creates the content of all its parents
+        call_gui_callback(focus_model, sm_m, state_m_e)
+        testing_utils.wait_for_gui()
+        assert state_v_P.content_created
+        assert canvas.get_view_for_model(state_m_PC).content_created
+        assert canvas.get_view_for_model(state_m_e) is not None
+
+        # the content is kept, as long as one of its elements is selected
+        call_gui_callback(update_lazy_state_views, gaphas_ctrl)
+        assert canvas.get_view_for_model(state_m_e) is not None
+
+        call_gui_callback(clear_selection, sm_m)
+        call_gui_callback(update_lazy_state_views, gaphas_ctrl)
+        assert not state_v_P.content_created
+        assert canvas.get_view_for_model(state_m_PC) is None
+        assert canvas.get_view_for_model(state_m_e) is None
+    finally:
+        testing_utils.close_gui()
+        testing_utils.shutdown_environment(caplog=caplog)
+
+
+def test_resize_state_without_content_views(caplog):
+    testing_utils.run_gui(gui_config=gui_config.copy(), runtime_config=runtime_config)
+
+    try:
+        from rafcon.utils.geometry import equal
+        from rafcon.gui.helpers.meta_data import check_gaphas_state_meta_data_consistency
+        sm_m, gaphas_ctrl = open_test_state_machine()
+        canvas = gaphas_ctrl.canvas
+        state_m_P = sm_m.get_state_model_by_path(state_path_P)
+        state_m_A = sm_m.get_state_model_by_path(state_path_A)
+        state_m_e = sm_m.get_state_model_by_path(state_path_e)
+        state_v_P = canvas.get_view_for_model(state_m_P)
+        assert not state_v_P.content_created
+
+        old_meta_A = state_m_A.get_meta_data_editor()
+        old_size_A, old_rel_pos_A = tuple(old_meta_A['size']), tuple(old_meta_A['rel_pos'])
+        old_size_e = tuple(state_m_e.get_meta_data_editor()['size'])
+
+        # the meta data of the content is scaled, although it has no views
+        width_factor, height_factor = call_gui_callback(resize_state, state_v_P, 1.5)
+        assert not state_v_P.content_created
+        meta_A = state_m_A.get_meta_data_editor()
+        assert equal(meta_A['size'], (old_size_A[0] * width_factor, old_size_A[1] * height_factor), 5)
+        assert equal(meta_A['rel_pos'], (old_rel_pos_A[0] * width_factor, old_rel_pos_A[1] * height_factor), 5)
+        size_e = state_m_e.get_meta_data_editor()['size']
+        assert equal(size_e, (old_size_e[0] * width_factor, old_size_e[1] * height_factor), 5)
+
+        # the views created afterwards match the scaled meta data
+        call_gui_callback(set_minimum_size_for_content, 0)
+        call_gui_callback(update_lazy_state_views, gaphas_ctrl)
+        assert state_v_P.content_created
+        state_v_A = canvas.get_view_for_model(state_m_A)
+        assert equal((state_v_A.width, state_v_A.height), meta_A['size'], 5)
+        assert equal(state_v_A.position, meta_A['rel_pos'], 5)
+        check_gaphas_state_meta_data_consistency(state_m_P, canvas, recursive=True)
+    finally:
+        testing_utils.close_gui()
+        testing_utils.shutdown_environment(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-xs'])
@@ -0,0 +1,230 @@
+import pytest
+
+# general tool elements
+from testing_utils import call_gui_callback
+import testing_utils
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+
+def create_state_machine():
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.hierarchy_state import HierarchyState
+    from rafcon.core.state_machine import StateMachine
+
+    root_state = HierarchyState("root")
+    child_state = ExecutionState("child")
+    root_state.add_state(child_state)
+    root_state.set_start_state(child_state.state_id)
+    child_state.generate_run_id()
+    return StateMachine(root_state)
+
+
+def add_state_machine(state_machine):
+    import rafcon.core.singleton
+    import rafcon.gui.singleton
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    rafcon.gui.singleton.state_machine_manager_model.selected_state_machine_id = state_machine.state_machine_id
+
+
+def start_run(state_machine):
+    from rafcon.core.id_generator import run_id_generator
+    execution_history = state_machine._add_new_execution_history()
+    execution_history.push_state_machine_start_history_item(state_machine, run_id_generator())
+    return execution_history
+
+
+def push_executions(execution_history, state, number_of_executions):
+    """Pushes a call and a return item of the given state for each execution"""
+    from rafcon.core.execution.execution_history import CallType
+    for _ in range(number_of_executions):
+        execution_history.push_call_history_item(state, CallType.EXECUTE, state.parent)
+        execution_history.push_return_history_item(state, CallType.EXECUTE, state.parent)
+
+
+def step_back(execution_history, number_of_items):
+    for _ in range(number_of_items):
+        execution_history.pop_last_item()
+
+
+def wait_for_tree_update():
+    """The tree is updated in an idle callback after each change of the histories, which runs before test callbacks"""
+    call_gui_callback(lambda: None)
+
+
+def get_history_tree(execution_history_ctrl, state_machine):
+    return execution_history_ctrl._history_trees[state_machine.state_machine_id]
+
+
+def get_number_of_rows(tree_store, run_cursor=None):
+    """The number of runs or, if a run cursor is given, the number of rows of the run"""
+    return tree_store.iter_n_children(run_cursor.parent if run_cursor else None)
+
+
+def get_row_label(tree_store, tree_iter):
+    return tree_store.get_value(tree_iter, 0)
+
+
+def test_history_tree_update(caplog):
+    testing_utils.run_gui(gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False})
+
+    try:
+        import rafcon.gui.singleton
+        execution_history_ctrl = rafcon.gui.singleton.main_window_controller.get_controller('execution_history_ctrl')
+        state_machine = create_state_machine()
+        child_state = list(state_machine.root_state.states.values())[0]
+        call_gui_callback(add_state_machine, state_machine)
+
+        # the items of a run are appended to its rows, as soon as they are pushed
+        execution_history = call_gui_callback(start_run, state_machine)
+        call_gui_callback(push_executions, execution_history, child_state, 2)
+        wait_for_tree_update()
+        history_tree = get_history_tree(execution_history_ctrl, state_machine)
+        tree_store = history_tree.store
+        run_cursor = history_tree.run_cursors[0]
+        assert execution_history_ctrl.last_update_number_of_items == 4
+        assert call_gui_callback(get_number_of_rows, tree_store, run_cursor) == 4
+
+        call_gui_callback(push_executions, execution_history, child_state, 1)
+        assert run_cursor.is_consistent()
+        wait_for_tree_update()
+        assert history_tree.run_cursors[0] is run_cursor
+        assert execution_history_ctrl.last_update_number_of_items == 2
+        assert execution_history_ctrl.number_of_items == 6
+        assert call_gui_callback(get_number_of_rows, tree_store, run_cursor) == 6
+
+        # the tree is rebuilt, if inserted items were removed from the history by backward stepping
+        call_gui_callback(step_back, execution_history, 2)
+        wait_for_tree_update()
+        assert not run_cursor.is_consistent()
+        assert history_tree.is_consistent(state_machine.execution_histories)
+        assert history_tree.run_cursors[0] is not run_cursor
+        run_cursor = history_tree.run_cursors[0]
+        assert run_cursor.is_consistent()
+        assert execution_history_ctrl.last_update_number_of_items == 4
+        assert execution_history_ctrl.number_of_items == 4
+        assert call_gui_callback(get_number_of_rows, tree_store) == 1
+        assert call_gui_callback(get_number_of_rows, tree_store, run_cursor) == 4
+
+        # items pushed after a backward step are appended again
+        call_gui_callback(push_executions, execution_history, child_state, 1)
+        wait_for_tree_update()
+        assert history_tree.run_cursors[0] is run_cursor
+        assert execution_history_ctrl.last_update_number_of_items == 2
+        assert call_gui_callback(get_number_of_rows, tree_store, run_cursor) == 6
+
+        # a new run is inserted at the top
+        second_execution_history = call_gui_callback(start_run, state_machine)
+        call_gui_callback(push_executions, second_execution_history, child_state, 1)
+        wait_for_tree_update()
+        assert len(history_tree.run_cursors) == 2
+        assert history_tree.run_cursors[0] is run_cursor
+        assert execution_history_ctrl.last_update_number_of_items == 2
+        assert call_gui_callback(get_number_of_rows, tree_store) == 2
+        assert call_gui_callback(get_row_label, tree_store, history_tree.run_cursors[1].parent) == "child - Run 2"
+        assert call_gui_callback(tree_store.get_path, history_tree.run_cursors[1].parent).get_indices() == [0]
+
+        # the tree is rebuilt, if the histories are cleared
+        call_gui_callback(state_machine.clear_execution_histories)
+        wait_for_tree_update()
+        assert history_tree.run_cursors == []
+        assert execution_history_ctrl.number_of_items == 0
+        assert call_gui_callback(get_number_of_rows, tree_store) == 0
+    finally:
+        testing_utils.close_gui()
+        testing_utils.shutdown_environment(caplog=caplog)
+
+
+def test_history_tree_with_dropped_items(caplog):
+    testing_utils.run_gui(core_config={'EXECUTION_HISTORY_MAX_LENGTH': 10},
+                          gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False})
+
+    try:
+        import rafcon.gui.singleton
+        execution_history_ctrl = rafcon.gui.singleton.main_window_controller.get_controller('execution_history_ctrl')
+        state_machine = create_state_machine()
+        child_state = list(state_machine.root_state.states.values())[0]
+        call_gui_callback(add_state_machine, state_machine)
+
+        # only the retained items are inserted
+        execution_history = call_gui_callback(start_run, state_machine)
+        call_gui_callback(push_executions, execution_history, child_state, 8)
+        assert len(execution_history) == 10
+        assert execution_history.number_of_dropped_items == 7
+        wait_for_tree_update()
+        history_tree = get_history_tree(execution_history_ctrl, state_machine)
+        run_cursor = history_tree.run_cursors[0]
+        assert execution_history_ctrl.last_update_number_of_items == 10
+        assert call_gui_callback(get_number_of_rows, history_tree.store, run_cursor) == 10
+
+        # items dropped after the last update do not invalidate the tree
+        call_gui_callback(push_executions, execution_history, child_state, 2)
+        assert execution_history.number_of_dropped_items == 11
+        assert run_cursor.is_consistent()
+        wait_for_tree_update()
+        assert history_tree.run_cursors[0] is run_cursor
+        assert execution_history_ctrl.last_update_number_of_items == 4
+        assert call_gui_callback(get_number_of_rows, history_tree.store, run_cursor) == 14
+
+        # all retained items are new, if more items than the maximum length were pushed since the last update
+        call_gui_callback(push_executions, execution_history, child_state, 6)
+        assert run_cursor.is_consistent()
+        wait_for_tree_update()
+        assert history_tree.run_cursors[0] is run_cursor
+        assert execution_history_ctrl.last_update_number_of_items == 10
+        assert call_gui_callback(get_number_of_rows, history_tree.store, run_cursor) == 24
+    finally:
+        testing_utils.close_gui()
+        testing_utils.shutdown_environment(caplog=caplog)
+
+
+def test_lazy_population(caplog):
+    testing_utils.run_gui(gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False})
+
+    try:
+        from gi.repository import Gtk
+        import rafcon.gui.singleton
+        execution_history_ctrl = rafcon.gui.singleton.main_window_controller.get_controller('execution_history_ctrl')
+        execution_history_ctrl.LAZY_POPULATION_THRESHOLD = 5
+        state_machine = create_state_machine()
+        child_state = list(state_machine.root_state.states.values())[0]
+        call_gui_callback(add_state_machine, state_machine)
+
+        # runs exceeding the threshold only get a placeholder row
+        execution_history = call_gui_callback(start_run, state_machine)
+        call_gui_callback(push_executions, execution_history, child_state, 3)
+        wait_for_tree_update()
+        history_tree = get_history_tree(execution_history_ctrl, state_machine)
+        tree_store = history_tree.store
+        run_cursor = history_tree.run_cursors[0]
+        assert not run_cursor.populated
+        assert execution_history_ctrl.number_of_items == 0
+        assert call_gui_callback(get_number_of_rows, tree_store, run_cursor) == 1
+        placeholder_iter = call_gui_callback(tree_store.iter_children, run_cursor.parent)
+        assert call_gui_callback(get_row_label, tree_store, placeholder_iter) == "Expand to show 7 history items"
+
+        # new items of a run, which is not populated, are not inserted
+        call_gui_callback(push_executions, execution_history, child_state, 1)
+        wait_for_tree_update()
+        assert execution_history_ctrl.last_update_number_of_items == 0
+        assert call_gui_callback(get_number_of_rows, tree_store, run_cursor) == 1
+
+        # expanding the run replaces the placeholder by its items
+        call_gui_callback(execution_history_ctrl.history_tree.expand_row, Gtk.TreePath.new_first(), False)
+        assert run_cursor.populated
+        assert execution_history_ctrl.number_of_items == 8
+        assert call_gui_callback(get_number_of_rows, tree_store, run_cursor) == 8
+
+        call_gui_callback(push_executions, execution_history, child_state, 1)
+        wait_for_tree_update()
+        assert execution_history_ctrl.last_update_number_of_items == 2
+        assert call_gui_callback(get_number_of_rows, tree_store, run_cursor) == 10
+    finally:
+        testing_utils.close_gui()
+        testing_utils.shutdown_environment(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -11,9 +11,14 @@ from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
 from rafcon.core.state_machine import StateMachine
 
 from rafcon.utils.timer import measure_time
+from rafcon.utils import storage_utils
+from rafcon.utils import log
+from timeit import default_timer as timer
 
 import testing_utils
 
+logger = log.get_logger(__name__)
+
 
 @measure_time
 def create_hierarchy_state(number_child_states=10, sleep=False):
@@ -87,6 +92,27 @@ def test_hierarchy_state_execution(number_child_states=100):
     execute_state(hierarchy_state)
 
 
+@measure_time
+def test_wide_hierarchy_state_step_rate(number_child_states=300, number_lookup_rounds=100):
+    hierarchy_state = create_hierarchy_state(number_child_states)
+
+    start = timer()
+    execute_state(hierarchy_state)
+    duration = timer() - start
+    logger.info("Executed hierarchy with {0} children: {1:.1f} steps/s".format(number_child_states,
+                                                                              number_child_states / duration))
+
+    # measure the transition lookup in isolation, which is done after every child state execution
+    child_states = list(hierarchy_state.states.values())
+    start = timer()
+    for _ in range(number_lookup_rounds):
+        for state in child_states:
+            assert hierarchy_state.get_transition_for_outcome(state, state.outcomes[0]) is not None
+    duration = timer() - start
+    logger.info("Transition lookups with {0} transitions: {1:.0f} lookups/s".format(
+        len(hierarchy_state.transitions), number_lookup_rounds * number_child_states / duration))
+
+
 @measure_time
 def test_barrier_concurrency_state_execution(number_child_states=10, number_childs_per_child=10):
     barrier_state = create_barrier_concurrency_state(number_child_states, number_childs_per_child)
@@ -112,9 +138,39 @@ def test_preemption_concurrency_state_execution(number_child_states=10, number_c
     execute_state(preemption_state)
 
 
+@measure_time
+def test_json_serialization(number_child_states=300, number_rounds=10):
+    import json
+    from jsonconversion.decoder import JSONObjectDecoder
+    from jsonconversion.encoder import JSONObjectEncoder
+
+    hierarchy_state = create_hierarchy_state(number_child_states)
+    states = [hierarchy_state] + list(hierarchy_state.states.values())
+
+    def measure(name, function, values):
+        start = timer()
+        for _ in range(number_rounds):
+            results = [function(value) for value in values]
+        duration = timer() - start
+        logger.info("{0}: {1:.0f} states/s".format(name, number_rounds * len(values) / duration))
+        return results
+
+    json_strings = measure("Encoding with jsonconversion",
+                           lambda state: json.dumps(state, cls=JSONObjectEncoder, indent=4, check_circular=False,
+                                                    sort_keys=True), states)
+    measure("Encoding with storage_utils", storage_utils.dict_to_json_string, states)
+    measure("Compact encoding with storage_utils", storage_utils.object_to_compact_json_string, states)
+    measure("Decoding with jsonconversion",
+            lambda json_string: json.loads(json_string, cls=JSONObjectDecoder,
+                                           substitute_modules=storage_utils.substitute_modules), json_strings)
+    measure("Decoding with storage_utils", storage_utils.json_string_to_objects, json_strings)
+
+
 if __name__ == '__main__':
     # test_hierarchy_state_execution(10)
     test_hierarchy_state_execution(100)
+    test_wide_hierarchy_state_step_rate(300)
+    test_json_serialization(300)
     # TODO: state creation takes too long (> 100 seconds) => investigate
     # test_hierarchy_state_execution(1000)
     # test_barrier_concurrency_state_execution(10, 10)
@@ -408,7 +408,7 @@ def patch_gtkmvc3_model_mt():
     print(original_ModelMT_notify_observer, original_run_state_machine, original_state_start)
     state_threads = []
 
-    def state_start(self, execution_history, backward_execution=False, generate_run_id=True):
+    def state_start(self, execution_history, backward_execution=False, generate_run_id=True, inline=False):
         self.execution_history = execution_history
         if generate_run_id:
             self._run_id = run_id_generator()